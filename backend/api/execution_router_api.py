@@ -1,9 +1,14 @@
 # Intelligent Execution Router API - E2B/Scrapybara routing with Mama Bear intelligence
 
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, request, jsonify
 from typing import Dict, Any
 import asyncio
+import json
 import logging
+import queue
+import threading
+import time
+import uuid
 from datetime import datetime
 
 from services.intelligent_execution_router import get_intelligent_router
@@ -15,6 +20,10 @@ execution_router_bp = Blueprint('execution_router', __name__, url_prefix='/api/e
 
 logger = logging.getLogger(__name__)
 
+# Streaming executions in flight: execution id -> cancel event
+_active_executions: Dict[str, threading.Event] = {}
+_active_executions_lock = threading.Lock()
+
 @execution_router_bp.route('/analyze', methods=['POST'])
 async def analyze_task():
     """
@@ -56,7 +65,7 @@ async def analyze_task():
 @execution_router_bp.route('/route', methods=['POST'])
 async def route_execution():
     """
-    🚀 Route code execution to optimal platform (E2B or Scrapybara)
+    🚀 Route code execution to optimal platform (local subprocess, E2B or Scrapybara)
     """
     try:
         data = request.get_json()
@@ -80,7 +89,14 @@ async def route_execution():
         )
         
         # Execute based on routing decision
-        if routing_decision['platform'] == 'e2b':
+        execution_start = time.perf_counter()
+        if routing_decision['platform'] == 'local':
+            result = await _execute_on_local(
+                code=data['code'],
+                user_id=data['user_id'],
+                timeout=data.get('timeout', 30)
+            )
+        elif routing_decision['platform'] == 'e2b':
             result = await _execute_on_e2b(
                 code=data['code'],
                 user_id=data['user_id'],
@@ -94,13 +110,15 @@ async def route_execution():
                 task_context=data.get('task_context', {}),
                 timeout=data.get('timeout', 300)
             )
+        latency_seconds = time.perf_counter() - execution_start
         
         # Log execution metrics for learning
         intelligent_router = get_intelligent_router()
         await intelligent_router.log_execution_result(
             routing_decision=routing_decision,
             execution_result=result,
-            user_id=data['user_id']
+            user_id=data['user_id'],
+            latency_seconds=latency_seconds
         )
         
         return jsonify({
@@ -117,6 +135,218 @@ async def route_execution():
             'error': str(e)
         }), 500
 
+@execution_router_bp.route('/batch', methods=['POST'])
+def execute_batch():
+    """
+    🧩 Run several code snippets, independent ones in parallel
+    
+    With ``"stream": true`` each snippet group's result is sent as a
+    server-sent event as soon as it finishes, followed by a summary event.
+    
+    Session state: snippets that use names defined by earlier executions run
+    in the user's own sandbox session and may change it. Independent groups
+    may run in separate per-user batch sandboxes, so definitions they make
+    are not visible in the user's session afterwards.
+    """
+    data = request.get_json() or {}
+    
+    required_fields = ['code_snippets', 'task_type', 'user_id']
+    for field in required_fields:
+        if field not in data:
+            return jsonify({
+                'success': False,
+                'error': f'Missing required field: {field}'
+            }), 400
+    if not isinstance(data['code_snippets'], list) or not data['code_snippets']:
+        return jsonify({
+            'success': False,
+            'error': 'code_snippets must be a non-empty list'
+        }), 400
+    
+    def run_batch(on_result=None):
+        return asyncio.run(get_intelligent_router().execute_batch_with_optimal_routing(
+            task_description=f"{data['task_type']}: " + '\n\n'.join(data['code_snippets']),
+            code_snippets=data['code_snippets'],
+            user_id=data['user_id'],
+            user_context=data.get('user_preferences', {}),
+            max_concurrency=data.get('max_concurrency'),
+            on_result=on_result
+        ))
+    
+    if not data.get('stream'):
+        try:
+            return jsonify({
+                'success': True,
+                'batch': _batch_summary(run_batch()),
+                'timestamp': datetime.now().isoformat()
+            })
+        except Exception as e:
+            logger.error(f"Batch execution failed: {str(e)}")
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 500
+    
+    # Run the batch on its own event loop; group results are handed to the response as they finish
+    events: queue.Queue = queue.Queue()
+    
+    def produce():
+        try:
+            summary = run_batch(on_result=lambda result: events.put(('result', result)))
+            events.put(('summary', _batch_summary(summary)))
+        except Exception as e:
+            logger.error(f"Batch execution failed: {str(e)}")
+            events.put(('error', {'error': str(e)}))
+        events.put(None)
+    
+    threading.Thread(target=produce, name="batch-execution", daemon=True).start()
+    
+    def generate_events():
+        while True:
+            event = events.get()
+            if event is None:
+                return
+            kind, payload = event
+            yield f"event: {kind}\ndata: {json.dumps(payload)}\n\n"
+    
+    return Response(
+        generate_events(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache'}
+    )
+
+def _batch_summary(batch: Dict[str, Any]) -> Dict[str, Any]:
+    """JSON-ready batch result (the full analysis object is reduced to its headline fields)"""
+    analysis = batch['analysis']
+    return {
+        **{key: value for key, value in batch.items() if key != 'analysis'},
+        'complexity_score': analysis.score,
+        'reasoning': analysis.reasoning
+    }
+
+# === STREAMING EXECUTION ===
+
+def _start_streaming_execution(data: Dict[str, Any], send_event) -> str:
+    """
+    Run ``data['code']`` on its own thread and event loop, calling
+    ``send_event(kind, payload)`` with 'started', then for each output chunk
+    ('output'), then once with 'complete' or 'error'. Returns the execution id
+    used for cancellation.
+    """
+    execution_id = str(uuid.uuid4())
+    cancel_event = threading.Event()
+    with _active_executions_lock:
+        _active_executions[execution_id] = cancel_event
+    
+    def on_output(stream: str, chunk: str):
+        send_event('output', {'execution_id': execution_id, 'stream': stream, 'chunk': chunk})
+    
+    def run():
+        try:
+            result = asyncio.run(get_intelligent_router().execute_with_streaming(
+                task_description=f"{data.get('task_type', 'execute')}: {data['code']}",
+                code=data['code'],
+                user_id=data.get('user_id', 'default'),
+                user_context=data.get('user_preferences', {}),
+                on_output=on_output,
+                cancel_event=cancel_event
+            ))
+            send_event('complete', {'execution_id': execution_id, **result})
+        except Exception as e:
+            logger.error(f"Streaming execution {execution_id} failed: {str(e)}")
+            send_event('error', {'execution_id': execution_id, 'error': str(e)})
+        finally:
+            with _active_executions_lock:
+                _active_executions.pop(execution_id, None)
+    
+    send_event('started', {'execution_id': execution_id})
+    threading.Thread(target=run, name=f"execution-{execution_id[:8]}", daemon=True).start()
+    return execution_id
+
+def _cancel_streaming_execution(execution_id: str) -> bool:
+    with _active_executions_lock:
+        cancel_event = _active_executions.get(execution_id)
+    if cancel_event is None:
+        return False
+    cancel_event.set()
+    return True
+
+@execution_router_bp.route('/stream', methods=['POST'])
+def execute_streaming():
+    """
+    📡 Execute code on the optimal route, streaming stdout/stderr as server-sent events
+    
+    The first event ('started') carries the execution id for
+    ``POST /stream/<execution_id>/cancel``; closing the connection cancels too.
+    """
+    data = request.get_json() or {}
+    if 'code' not in data:
+        return jsonify({
+            'success': False,
+            'error': 'Missing required field: code'
+        }), 400
+    
+    events: queue.Queue = queue.Queue()
+    execution_id = _start_streaming_execution(data, lambda kind, payload: events.put((kind, payload)))
+    
+    def generate_events():
+        try:
+            while True:
+                kind, payload = events.get()
+                yield f"event: {kind}\ndata: {json.dumps(payload)}\n\n"
+                if kind in ('complete', 'error'):
+                    return
+        finally:
+            # Client went away (or the run finished): make sure nothing keeps running
+            _cancel_streaming_execution(execution_id)
+    
+    return Response(
+        generate_events(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Execution-Id': execution_id}
+    )
+
+@execution_router_bp.route('/stream/<execution_id>/cancel', methods=['POST'])
+def cancel_streaming_execution(execution_id):
+    """
+    🛑 Cancel a streaming execution (kills the process or sandbox running it)
+    """
+    if not _cancel_streaming_execution(execution_id):
+        return jsonify({
+            'success': False,
+            'error': 'Execution not found or already finished'
+        }), 404
+    return jsonify({
+        'success': True,
+        'execution_id': execution_id,
+        'timestamp': datetime.now().isoformat()
+    })
+
+def init_execution_stream_handlers(socketio):
+    """Socket.IO transport for streaming execution: 'execute_code_stream' / 'cancel_execution'"""
+    
+    @socketio.on('execute_code_stream')
+    def on_execute_code_stream(data):
+        if not data or 'code' not in data:
+            socketio.emit('execution_error', {'error': 'Missing required field: code'}, to=request.sid)
+            return
+        sid = request.sid
+        
+        def send_event(kind: str, payload: Dict[str, Any]):
+            socketio.emit(f'execution_{kind}', payload, to=sid)
+        
+        _start_streaming_execution(data, send_event)
+    
+    @socketio.on('cancel_execution')
+    def on_cancel_execution(data):
+        execution_id = (data or {}).get('execution_id', '')
+        socketio.emit('execution_cancel_requested', {
+            'execution_id': execution_id,
+            'cancelled': _cancel_streaming_execution(execution_id)
+        }, to=request.sid)
+    
+    logger.info("✅ Streaming execution socket handlers registered")
+
 @execution_router_bp.route('/e2b/execute', methods=['POST'])
 async def execute_on_e2b():
     """
@@ -226,6 +456,7 @@ async def get_execution_metrics():
         return jsonify({
             'success': True,
             'metrics': metrics,
+            'sandbox_pool': mama_bear_code_executor.get_pool_metrics(),
             'timestamp': datetime.now().isoformat()
         })
         
@@ -270,6 +501,17 @@ async def cleanup_sessions():
         }), 500
 
 # Helper functions for execution routing
+async def _execute_on_local(code: str, user_id: str, timeout: int = 30):
+    """Execute code in the local resource-limited subprocess (E2B if it can't start)"""
+    local_executor = get_intelligent_router().local
+    if local_executor is None:
+        return await _execute_on_e2b(code=code, user_id=user_id, timeout=timeout)
+    try:
+        return await local_executor.execute(code)
+    except OSError as e:
+        logger.warning(f"Local execution unavailable, falling back to E2B: {e}")
+        return await _execute_on_e2b(code=code, user_id=user_id, timeout=timeout)
+
 async def _execute_on_e2b(code: str, user_id: str, language: str = 'python', timeout: int = 30):
     """Execute code on E2B platform"""
     return await mama_bear_code_executor.execute_code_safely(
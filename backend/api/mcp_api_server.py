@@ -221,6 +221,7 @@ async def get_performance_metrics():
         return {
             "demo_mode": False,
             "metrics": metrics,
+            "prefetch": mcp_orchestrator.prefetch_scheduler.get_metrics(),
             "learning_patterns": dict(mcp_orchestrator.learning_patterns),
             "decision_history": list(mcp_orchestrator.decision_history)[-10:]  # Last 10 decisions
         }
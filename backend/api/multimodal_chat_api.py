@@ -8,13 +8,19 @@ import asyncio
 import logging
 import time
 import json
+import hashlib
 import base64
+import os
 from datetime import datetime
-from typing import Dict, Any, List, Optional, Union
+from typing import Dict, Any, List, Optional, Tuple, Union
 
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, send_file
 from functools import wraps
 
+from services.image_generation_queue import ImageGenerationQueue
+from services.image_payload import ImagePayloadPipeline, ImagePayloadError
+from services.semantic_response_cache import SemanticResponseCache
+
 logger = logging.getLogger(__name__)
 
 # Create Multimodal Chat blueprint
@@ -22,6 +28,13 @@ multimodal_chat_bp = Blueprint('multimodal_chat', __name__, url_prefix='/api/mul
 
 # Global supercharger instance
 _supercharger = None
+_vision_model_manager = None
+
+# Near-duplicate prompt cache shared by /chat and /ultra-fast
+_response_cache = SemanticResponseCache()
+
+# Decoded, deduplicated and downsized chat images, cached per session
+_image_pipeline = ImagePayloadPipeline()
 
 def require_supercharger(f):
     """Decorator to ensure supercharger is available"""
@@ -140,15 +153,23 @@ def universal_multimodal_chat():
     🎨🧠 Universal Multimodal Chat
     The most powerful chat endpoint available online
     Supports text, images, code, and any combination via ALL models
+    
+    Accepts JSON (images as base64 strings or data URLs) or multipart/form-data
+    (image files under ``images``, other fields as form values). Images already
+    sent in a session can be referenced again via ``image_refs``.
     """
     try:
-        data = request.get_json()
-        if not data:
+        data, uploads = _read_chat_payload()
+        if not data and not uploads:
             return jsonify({'success': False, 'error': 'No JSON data provided'}), 400
         
         # Extract message components
         message = data.get('message', '').strip()
-        images = data.get('images', [])  # Base64 encoded images
+        session_id = data.get('session_id')
+        try:
+            images = _prepare_images(uploads + list(data.get('images', [])), data.get('image_refs', []), session_id)
+        except ImagePayloadError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         model_preference = data.get('model', 'auto')  # auto, gemini-2.0-flash, claude-4-sonnet, etc.
         mode = data.get('mode', 'smart')  # smart, fast, research, creative
         
@@ -191,19 +212,41 @@ def universal_multimodal_chat():
                 'suggestion': 'Try gemini-2.0-flash or claude-4-sonnet for multimodal capabilities'
             }), 400
         
-        # Execute the request
-        result = asyncio.run(_execute_multimodal_request(multimodal_request))
+        # Image requests are never cached; the generation parameters are part of the scope
+        scope_extra = _cache_scope(
+            data,
+            multimodal_request['system_prompt'],
+            multimodal_request['max_tokens'],
+            multimodal_request['temperature']
+        )
+        use_cache = not images and scope_extra is not None and data.get('cache', True)
+        variant = _cache_variant(data)
+        hit = _response_cache.lookup(
+            message, selected_model, variant, scope_extra, mode=data.get('cache_mode')
+        ) if use_cache else None
+        
+        if hit:
+            result = _cached_result(hit)
+        else:
+            # Execute the request
+            result = asyncio.run(_execute_multimodal_request(multimodal_request))
+            if use_cache and result.get('success'):
+                _response_cache.store(message, selected_model, variant, result, scope_extra)
+        
+        if images:
+            # Refs let the client reuse these images in later turns without re-uploading
+            result['images'] = [image.summary() for image in images]
         
         # Add performance metrics
         result['performance_metrics'] = {
             'total_response_time_ms': round((time.time() - start_time) * 1000, 2),
             'model_used': selected_model,
             'model_provider': model_config.get('provider', 'vertex_ai'),
-            'estimated_cost': model_config['cost_per_1k_tokens'],
+            'estimated_cost': 0 if hit else model_config['cost_per_1k_tokens'],
             'timestamp': datetime.now().isoformat()
         }
         
-        return jsonify(result)
+        return _with_cache_header(jsonify(result), hit, use_cache)
         
     except Exception as e:
         logger.error(f"Error in universal multimodal chat: {e}")
@@ -218,7 +261,8 @@ def universal_multimodal_chat():
 def generate_images():
     """
     🎨 AI Image Generation
-    Generate images using Imagen and other image models
+    Queue an image generation job for Imagen and other image models.
+    Returns a job id immediately; poll /image-generation/<job_id> for the result.
     """
     try:
         data = request.get_json()
@@ -246,25 +290,20 @@ def generate_images():
                 'available_models': image_models
             }), 400
         
-        start_time = time.time()
-        
-        # Execute image generation
-        result = asyncio.run(_execute_image_generation(
-            prompt=prompt,
-            model=model,
-            style=style,
-            size=size,
-            num_images=num_images
-        ))
-        
-        result['performance_metrics'] = {
-            'generation_time_ms': round((time.time() - start_time) * 1000, 2),
-            'model_used': model,
-            'num_images_generated': num_images,
-            'timestamp': datetime.now().isoformat()
-        }
+        # Queue the job; compatible prompts are generated together in one batch
+        job = _image_generation_queue.submit(prompt, model, style, size, num_images)
+        if job is None:
+            return jsonify({
+                'success': False,
+                'error': 'Image generation queue is full, try again shortly'
+            }), 503
         
-        return jsonify(result)
+        return jsonify({
+            'success': True,
+            'job_id': job.job_id,
+            'status': job.status,
+            'poll_url': f"{multimodal_chat_bp.url_prefix}/image-generation/{job.job_id}"
+        }), 202
         
     except Exception as e:
         logger.error(f"Error in image generation: {e}")
@@ -273,6 +312,33 @@ def generate_images():
             'error': str(e)
         }), 500
 
+@multimodal_chat_bp.route('/image-generation/<job_id>', methods=['GET'])
+def get_image_generation_job(job_id: str):
+    """
+    🖼️ Image Generation Job Status
+    Pass ?wait=<seconds> (max 30) to long-poll until the job finishes
+    """
+    wait_seconds = min(request.args.get('wait', 0, type=float), 30)
+    job = _image_generation_queue.get(job_id, wait_seconds=wait_seconds)
+    if job is None:
+        return jsonify({'success': False, 'error': f'Image generation job {job_id} not found'}), 404
+    
+    if job['completed_at'] and job['started_at']:
+        job['performance_metrics'] = {
+            'queue_time_ms': round((job['started_at'] - job['created_at']) * 1000, 2),
+            'generation_time_ms': round((job['completed_at'] - job['started_at']) * 1000, 2),
+            'batch_size': job['batch_size']
+        }
+    return jsonify({'success': job['status'] != 'failed', **job})
+
+@multimodal_chat_bp.route('/image-generation/<job_id>/images/<int:index>', methods=['GET'])
+def get_generated_image(job_id: str, index: int):
+    """Serve a generated image stored on disk"""
+    path = _image_generation_queue.image_path(job_id, index)
+    if path is None or not os.path.exists(path):
+        return jsonify({'success': False, 'error': 'Image not found'}), 404
+    return send_file(os.path.abspath(path))
+
 @multimodal_chat_bp.route('/code-assistance', methods=['POST'])
 @require_supercharger
 def code_assistance():
@@ -412,10 +478,22 @@ def ultra_fast_chat():
         
         start_time = time.time()
         
-        result = asyncio.run(_supercharger.express_instant_mode(
-            message=message,
-            context=data.get('context', {})
-        ))
+        scope_extra = _cache_scope(data, 'ultra_fast')
+        use_cache = scope_extra is not None and data.get('cache', True)
+        variant = _cache_variant(data)
+        hit = _response_cache.lookup(
+            message, model, variant, scope_extra, mode=data.get('cache_mode')
+        ) if use_cache else None
+        
+        if hit:
+            result = _cached_result(hit)
+        else:
+            result = asyncio.run(_supercharger.express_instant_mode(
+                message=message,
+                context=data.get('context', {})
+            ))
+            if use_cache and result.get('success', True):
+                _response_cache.store(message, model, variant, result, scope_extra)
         
         result['performance_metrics'] = {
             'total_response_time_ms': round((time.time() - start_time) * 1000, 2),
@@ -425,7 +503,7 @@ def ultra_fast_chat():
             'timestamp': datetime.now().isoformat()
         }
         
-        return jsonify(result)
+        return _with_cache_header(jsonify(result), hit, use_cache)
         
     except Exception as e:
         logger.error(f"Error in ultra-fast chat: {e}")
@@ -434,8 +512,76 @@ def ultra_fast_chat():
             'error': str(e)
         }), 500
 
+@multimodal_chat_bp.route('/cache/stats', methods=['GET'])
+def get_response_cache_stats():
+    """📊 Semantic response cache and image pipeline statistics"""
+    return jsonify({
+        'success': True,
+        'cache': _response_cache.get_metrics(),
+        'images': _image_pipeline.get_metrics(),
+        'image_generation': _image_generation_queue.get_metrics(),
+        'timestamp': datetime.now().isoformat()
+    })
+
 # Helper functions
-def _select_optimal_model(message: str, images: List[str], mode: str) -> str:
+def _read_chat_payload():
+    """Request fields and raw uploaded image bytes, from JSON or multipart/form-data"""
+    if request.mimetype == 'multipart/form-data':
+        data = request.form.to_dict()
+        for key, parse in (('context', json.loads), ('images', json.loads), ('image_refs', json.loads),
+                           ('temperature', float), ('max_tokens', int)):
+            if key in data:
+                data[key] = parse(data[key])
+        if 'cache' in data:
+            data['cache'] = data['cache'].lower() not in ('0', 'false', 'no')
+        return data, [upload.read() for upload in request.files.getlist('images')]
+    return request.get_json(silent=True) or {}, []
+
+def _prepare_images(sources: List[Any], refs: List[str], session_id: Optional[str]) -> List[Any]:
+    """Prepared images for this turn: session refs first, then new uploads"""
+    images = _image_pipeline.resolve(session_id, refs) if refs and session_id else []
+    if refs and not session_id:
+        raise ImagePayloadError('image_refs require a session_id')
+    images.extend(_image_pipeline.prepare(source, session_id) for source in sources)
+    return images
+
+def _cache_variant(data: Dict[str, Any]) -> str:
+    """Mama Bear variant a cached answer is scoped to"""
+    context = data.get('context') or {}
+    if isinstance(context, dict) and context.get('mama_bear_variant'):
+        return str(context['mama_bear_variant'])
+    return str(data.get('variant', 'default'))
+
+def _cache_scope(data: Dict[str, Any], *parameters: Any) -> Optional[str]:
+    """
+    Cache scope for a request: its generation parameters, so identical FAQ
+    prompts are shared across users. Requests carrying conversation context
+    are additionally scoped to their user (or session) and that exact
+    context; None when such a request has no owner.
+    """
+    context = data.get('context') or {}
+    if isinstance(context, dict):
+        context = {key: value for key, value in context.items() if key != 'mama_bear_variant'}
+    if not context:
+        return json.dumps(list(parameters), default=str)
+    owner = data.get('user_id') or data.get('session_id')
+    if not owner:
+        return None
+    context_digest = hashlib.sha256(json.dumps(context, sort_keys=True, default=str).encode()).hexdigest()
+    return json.dumps([str(owner), context_digest, *parameters], default=str)
+
+def _cached_result(hit) -> Dict[str, Any]:
+    """Cached response flagged as such, so clients can tell it apart"""
+    result = hit.response
+    result['cached'] = True
+    result['cache'] = hit.info()
+    return result
+
+def _with_cache_header(response, hit, use_cache: bool):
+    response.headers['X-Cache'] = 'HIT' if hit else ('MISS' if use_cache else 'BYPASS')
+    return response
+
+def _select_optimal_model(message: str, images: List[Any], mode: str) -> str:
     """Select the optimal model based on request characteristics"""
     
     # If images are present, need multimodal model
@@ -463,7 +609,13 @@ def _select_optimal_model(message: str, images: List[str], mode: str) -> str:
         return 'gemini-2.0-flash'  # General purpose
 
 async def _execute_multimodal_request(request_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Execute a multimodal request via the supercharger"""
+    """
+    Execute a multimodal request via the supercharger
+
+    Image turns go to the Gemini model manager, whose provider call takes the
+    prepared inline parts (``{'mime_type', 'data'}``, already decoded and
+    downsized by the image pipeline) alongside the text, never the raw uploads.
+    """
     
     # For now, route to agentic request processor
     # In production, this would handle image processing and multimodal fusion
@@ -475,23 +627,49 @@ async def _execute_multimodal_request(request_data: Dict[str, Any]) -> Dict[str,
     }
     
     message = request_data['message']
-    if request_data.get('images'):
-        message += f"\n[Note: {len(request_data['images'])} images attached]"
+    if not request_data.get('images'):
+        return await _supercharger.process_agentic_request(
+            message=message,
+            user_preferences=user_preferences
+        )
     
-    return await _supercharger.process_agentic_request(
-        message=message,
-        user_preferences=user_preferences
+    # Prepared once by the image pipeline; parts reference the same bytes
+    image_parts = [image.to_part() for image in request_data['images']]
+    if request_data.get('system_prompt'):
+        message = f"{request_data['system_prompt']}\n\n{message}"
+    response = await _get_vision_model_manager().generate_response(
+        messages=[{'role': 'user', 'content': message}],
+        mama_bear_context={'variant': 'multi_modal', 'user_id': user_preferences['user_id']},
+        images=image_parts,
+        temperature=request_data['temperature'],
+        max_tokens=request_data['max_tokens']
     )
+    return {
+        'success': True,
+        'response': response.content,
+        'model_used': response.model_used,
+        'fallback_count': response.fallback_count,
+        'quota_warnings': response.quota_warnings,
+        'images_sent': len(image_parts)
+    }
+
+def _get_vision_model_manager():
+    """Gemini model manager for image turns (created on first use)"""
+    global _vision_model_manager
+    if _vision_model_manager is None:
+        from services.mama_bear_model_manager import MamaBearModelManager
+        _vision_model_manager = MamaBearModelManager()
+    return _vision_model_manager
 
-async def _execute_image_generation(prompt: str, model: str, style: str, size: str, num_images: int) -> Dict[str, Any]:
-    """Execute image generation request"""
+async def _execute_image_generation_batch(model: str, style: str, size: str,
+                                         requests: List[Tuple[str, int]]) -> List[List[Dict[str, Any]]]:
+    """Generate images for a batch of (prompt, num_images) sharing model, style and size"""
     
-    # For now, return a simulated response
-    # In production, this would call actual Imagen/image generation models
+    # For now, return simulated images
+    # In production, this would make one bulk Imagen/image generation call per batch
     
-    return {
-        'success': True,
-        'images': [
+    return [
+        [
             {
                 'id': f'img_{i+1}',
                 'url': f'https://placeholder.images/{size}?text=Generated+Image+{i+1}',
@@ -500,14 +678,9 @@ async def _execute_image_generation(prompt: str, model: str, style: str, size: s
                 'size': size
             }
             for i in range(num_images)
-        ],
-        'generation_info': {
-            'model': model,
-            'style': style,
-            'size': size,
-            'prompt': prompt
-        }
-    }
+        ]
+        for prompt, num_images in requests
+    ]
 
 async def _execute_code_assistance(prompt: str, model: str, language: str, task: str) -> Dict[str, Any]:
     """Execute code assistance request"""
@@ -548,6 +721,9 @@ Please provide a {depth} {research_type} addressing this query.
         user_preferences=user_preferences
     )
 
+# Background, batched image generation (workers start on first submission)
+_image_generation_queue = ImageGenerationQueue(_execute_image_generation_batch)
+
 def integrate_multimodal_chat_with_app(app):
     """
     Integrate Multimodal Chat API with the Flask app
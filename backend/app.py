@@ -5,8 +5,12 @@ Neurodivergent-friendly development sanctuary with 7 Mama Bear variants,
 """
 
 import os
+import sys
+import time
 import logging
 import asyncio
+import importlib
+import importlib.util
 from datetime import datetime
 from typing import Dict, Any, Optional
 
@@ -33,7 +37,7 @@ logging.basicConfig(
 )
 logger = logging.getLogger("PodplaySanctuary")
 
-# Import our sanctuary services
+# Import our sanctuary services (constructed lazily on first use)
 from config.settings import get_settings
 from services import (
     initialize_all_services,
@@ -42,113 +46,61 @@ from services import (
     get_memory_manager,
     get_scrapybara_manager,
     get_theme_manager,
-    get_service_status
+    get_service_status,
+    get_service_registry
 )
-
-# Import API blueprints
-from services.mama_bear_orchestration_api import integrate_orchestration_with_app
-from api.mama_bear_scrapybara_api import integrate_mama_bear_scrapybara_api
-from api.multi_model_api import register_multi_model_api
-
-# Import new Live API Studio routes
-from routes.memory import memory_bp
-from routes.chat import chat_bp
-from routes.scrape import scrape_bp
-
-# Import Gemini Orchestra
-try:
-    from backend.api.gemini_orchestra_api import gemini_orchestra_bp, init_gemini_orchestra
-    GEMINI_ORCHESTRA_AVAILABLE = True
-    logger.info("✅ Gemini Orchestra API integration available")
-except ImportError as e:
-    logger.warning(f"Gemini Orchestra API integration not available: {e}")
-    GEMINI_ORCHESTRA_AVAILABLE = False
-    gemini_orchestra_bp = None
-    init_gemini_orchestra = None
-
-# Import Enhanced Scout Workflow
-try:
-    from api.scout_workflow_api import integrate_scout_workflow_api
-    SCOUT_WORKFLOW_AVAILABLE = True
-    logger.info("✅ Enhanced Scout Workflow API integration available")
-except ImportError as e:
-    logger.warning(f"Enhanced Scout Workflow API integration not available: {e}")
-    SCOUT_WORKFLOW_AVAILABLE = False
-    integrate_scout_workflow_api = None
-
-# Import Express Mode + Vertex AI Supercharger
-try:
-    from api.express_mode_vertex_api import integrate_express_mode_with_app
-    EXPRESS_MODE_AVAILABLE = True
-    logger.info("✅ Express Mode + Vertex AI Supercharger integration available")
-except ImportError as e:
-    logger.warning(f"Express Mode + Vertex AI Supercharger integration not available: {e}")
-    EXPRESS_MODE_AVAILABLE = False
-    integrate_express_mode_with_app = None
-
-# Import Multimodal Chat API
-try:
-    from api.multimodal_chat_api import integrate_multimodal_chat_with_app
-    MULTIMODAL_CHAT_AVAILABLE = True
-    logger.info("✅ Multimodal Chat API integration available - ALL models accessible!")
-except ImportError as e:
-    logger.warning(f"Multimodal Chat API integration not available: {e}")
-    MULTIMODAL_CHAT_AVAILABLE = False
-    integrate_multimodal_chat_with_app = None
-
-# Import Agentic Superpowers V3.0
-try:
-    from api.agentic_superpowers_api import agentic_superpowers_bp, init_agentic_service
-    AGENTIC_SUPERPOWERS_AVAILABLE = True
-    logger.info("✅ 🐻 Mama Bear Agentic Superpowers V3.0 integration available!")
-except ImportError as e:
-    logger.warning(f"Agentic Superpowers integration not available: {e}")
-    AGENTIC_SUPERPOWERS_AVAILABLE = False
-    agentic_superpowers_bp = None
-    init_agentic_service = None
-
-# Import Supercharged Collaborative Workspaces V3.0
-try:
-    from api.collaborative_workspaces_api import collaborative_workspaces_bp, init_workspace_service
-    COLLABORATIVE_WORKSPACES_AVAILABLE = True
-    logger.info("✅ 🚀 Supercharged Collaborative Workspaces V3.0 integration available!")
-except ImportError as e:
-    logger.warning(f"Collaborative Workspaces integration not available: {e}")
-    COLLABORATIVE_WORKSPACES_AVAILABLE = False
-    collaborative_workspaces_bp = None
-    init_workspace_service = None
-
-# Import Pipedream Integration Service
-try:
-    from api.pipedream_api import pipedream_bp, integrate_pipedream_api_with_app
-    from services.pipedream_integration_service import integrate_pipedream_with_app
-    PIPEDREAM_AVAILABLE = True
-    logger.info("✅ 🔗 Pipedream Integration Service available - Autonomous workflow automation ready!")
-except ImportError as e:
-    logger.warning(f"Pipedream Integration Service not available: {e}")
-    PIPEDREAM_AVAILABLE = False
-    pipedream_bp = None
-    integrate_pipedream_api_with_app = None
-    integrate_pipedream_with_app = None
-
-# Try to import Mem0 for enhanced memory
-try:
-    from mem0 import MemoryClient
-    MEM0_AVAILABLE = True
-except ImportError:
-    MEM0_AVAILABLE = False
-    MemoryClient = None
-
-# Try to import Deep Research Center (Library)
-try:
-    from api.library_api import integrate_library_api, library_bp
-    LIBRARY_AVAILABLE = True
-    logger.info("✅ Deep Research Center (Library) integration available")
-except ImportError as e:
-    logger.warning(f"Deep Research Center (Library) integration not available: {e}")
-    LIBRARY_AVAILABLE = False
-    integrate_library_api = None
-    library_bp = None
+from services.lazy_import import lazy_import, ensure_loaded
+from services.warmup import WarmupManager
+
+# Print per-module import and init timings after startup
+PROFILE_STARTUP = '--profile-startup' in sys.argv or os.getenv('PROFILE_STARTUP', 'false').lower() == 'true'
+
+# Services built during startup rather than on first request (comma-separated, or "all")
+EAGER_SERVICES = os.getenv('EAGER_SERVICES', '')
+
+# API and route modules, imported at startup instead of at app.py import time. They
+# import each other, so they load one at a time on a worker thread (see _import_integrations).
+# Optional integrations log a warning and are skipped when their module can't be imported.
+INTEGRATION_MODULES = {
+    'orchestration_api': 'services.mama_bear_orchestration_api',
+    'scrapybara_api': 'api.mama_bear_scrapybara_api',
+    'multi_model_api': 'api.multi_model_api',
+    'memory_routes': 'routes.memory',
+    'chat_routes': 'routes.chat',
+    'scrape_routes': 'routes.scrape',
+    'gemini_orchestra': 'backend.api.gemini_orchestra_api',
+    'scout_workflow': 'api.scout_workflow_api',
+    'express_mode': 'api.express_mode_vertex_api',
+    'multimodal_chat': 'api.multimodal_chat_api',
+    'agentic_superpowers': 'api.agentic_superpowers_api',
+    'collaborative_workspaces': 'api.collaborative_workspaces_api',
+    'pipedream_api': 'api.pipedream_api',
+    'pipedream_service': 'services.pipedream_integration_service',
+    'library': 'api.library_api',
+    'agent_workbench_routes': 'routes.agent_workbench',
+    'execution_router_routes': 'routes.execution_router',
+    'execution_stream': 'api.execution_router_api',
+    'scout_routes': 'routes.scout',
+    'themes_routes': 'routes.themes',
+    'openai_vertex_api': 'api.openai_vertex_api_simple',
+    'revolutionary_mcp_api': 'api.revolutionary_mcp_api'
+}
+
+# Services pre-built by background warm-up before the worker reports ready
+WARMUP_SERVICES = os.getenv('WARMUP_SERVICES', 'memory_manager,model_manager')
+
+# Live model probes gate readiness on a provider actually answering; they cost
+# a little quota, so they're on by default only in production
+WARMUP_PROBES = os.getenv(
+    'WARMUP_PROBES', 'true' if os.getenv('FLASK_ENV') == 'production' else 'false'
+).lower() == 'true'
+
+# Lazily imported provider SDKs, loaded during warm-up instead of on the first
+# request that needs them so a broken install is reported before traffic arrives
+WARMUP_SDKS = ('google.generativeai', 'anthropic', 'openai', 'google.cloud.aiplatform', 'e2b_code_interpreter')
+
+# Mem0 is only needed by services that import it themselves; don't load it here
+MEM0_AVAILABLE = importlib.util.find_spec('mem0') is not None
 
 # Initialize Flask app
 app = Flask(__name__)
@@ -163,25 +115,87 @@ socketio = SocketIO(
     async_mode='threading'
 )
 
+# Background warm-up; /readyz reports 503 until its critical steps finish
+warmup = WarmupManager()
+
 # Global service status
 services_initialized = False
 gemini_orchestra_initialized = False
+GEMINI_ORCHESTRA_AVAILABLE = False
+
+# Imported integration modules by name, and startup timings per module/service
+_integrations: Dict[str, Any] = {}
+startup_timings: Dict[str, Dict[str, float]] = {}
+
+def _import_integration(name: str, module_path: str):
+    """Import one integration module, recording how long it took"""
+    start = time.perf_counter()
+    try:
+        _integrations[name] = importlib.import_module(module_path)
+    except ImportError as e:
+        logger.warning(f"{name} integration not available: {e}")
+    except Exception as e:
+        # A module that fails while executing is as unavailable as a missing one
+        logger.error(f"{name} integration failed to import: {e}")
+    finally:
+        startup_timings.setdefault(name, {})['import_ms'] = round((time.perf_counter() - start) * 1000, 2)
+
+def _integration(name: str, *attributes: str):
+    """Attributes of an imported integration module, or Nones if it isn't available"""
+    module = _integrations.get(name)
+    values = tuple(getattr(module, attribute, None) for attribute in attributes)
+    return values if len(values) > 1 else values[0]
+
+def _import_integrations_in_order():
+    for name, module_path in INTEGRATION_MODULES.items():
+        _import_integration(name, module_path)
+
+async def _import_integrations():
+    """
+    Import integration modules one after another on a worker thread. They
+    import each other, so concurrent imports could see half-initialized
+    modules. The only concurrency is with eager service construction, which
+    is empty unless EAGER_SERVICES names some services.
+    """
+    await asyncio.to_thread(_import_integrations_in_order)
+
+def _timed_init(name: str, init, *args, **kwargs):
+    """Run an integration's init function, recording how long it took"""
+    start = time.perf_counter()
+    try:
+        return init(*args, **kwargs)
+    finally:
+        startup_timings.setdefault(name, {})['init_ms'] = round((time.perf_counter() - start) * 1000, 2)
+
+def print_startup_profile():
+    """Per-module import/init timings, slowest first (--profile-startup)"""
+    rows = dict(startup_timings)
+    for name, init_ms in get_service_registry().init_timings_ms.items():
+        rows.setdefault(f"service:{name}", {})['init_ms'] = init_ms
+    ordered = sorted(rows.items(), key=lambda item: -sum(item[1].values()))
+    print(f"\n{'module':<36}{'import ms':>12}{'init ms':>12}")
+    for name, timing in ordered:
+        print(f"{name:<36}{timing.get('import_ms', 0):>12.1f}{timing.get('init_ms', 0):>12.1f}")
 
 async def initialize_sanctuary_services():
     """Initialize all sanctuary services using the service manager"""
-    global services_initialized, gemini_orchestra_initialized
+    global services_initialized, gemini_orchestra_initialized, GEMINI_ORCHESTRA_AVAILABLE
 
     try:
         logger.info("🚀 Initializing Podplay Sanctuary services...")
 
-        # Initialize basic services through the service manager
-        await initialize_all_services()
+        # Import integration modules alongside warming any EAGER_SERVICES;
+        # everything else is constructed on first use
+        eager = None if EAGER_SERVICES == 'all' else [n.strip() for n in EAGER_SERVICES.split(',') if n.strip()]
+        await asyncio.gather(_import_integrations(), initialize_all_services(eager))
 
         # Initialize Gemini Orchestra
-        if GEMINI_ORCHESTRA_AVAILABLE and init_gemini_orchestra:
+        gemini_orchestra_bp, init_gemini_orchestra = _integration('gemini_orchestra', 'gemini_orchestra_bp', 'init_gemini_orchestra')
+        GEMINI_ORCHESTRA_AVAILABLE = init_gemini_orchestra is not None
+        if GEMINI_ORCHESTRA_AVAILABLE:
             logger.info("🎭 Initializing Gemini Orchestra...")
             try:
-                gemini_orchestra_initialized = init_gemini_orchestra(app)
+                gemini_orchestra_initialized = _timed_init('gemini_orchestra', init_gemini_orchestra, app)
                 if gemini_orchestra_initialized:
                     logger.info("✅ Gemini Orchestra initialized successfully!")
                     # Register the blueprint
@@ -199,10 +213,11 @@ async def initialize_sanctuary_services():
             logger.warning("Gemini Orchestra not available")
 
         # Initialize Deep Research Center (Library)
-        if LIBRARY_AVAILABLE and integrate_library_api:
+        integrate_library_api = _integration('library', 'integrate_library_api')
+        if integrate_library_api:
             logger.info("🏛️ Initializing Deep Research Center (Library)...")
             try:
-                library_initialized = integrate_library_api(app)
+                library_initialized = _timed_init('library', integrate_library_api, app)
                 if library_initialized:
                     logger.info("✅ Deep Research Center initialized successfully!")
                     logger.info("✅ Library API endpoints registered")
@@ -214,10 +229,11 @@ async def initialize_sanctuary_services():
             logger.warning("Deep Research Center not available")
 
         # Initialize Enhanced Scout Workflow
-        if SCOUT_WORKFLOW_AVAILABLE and integrate_scout_workflow_api:
+        integrate_scout_workflow_api = _integration('scout_workflow', 'integrate_scout_workflow_api')
+        if integrate_scout_workflow_api:
             logger.info("🎯 Initializing Enhanced Scout Workflow...")
             try:
-                scout_success = integrate_scout_workflow_api(app, socketio)
+                scout_success = _timed_init('scout_workflow', integrate_scout_workflow_api, app, socketio)
                 if scout_success:
                     logger.info("✅ Enhanced Scout Workflow initialized!")
                 else:
@@ -228,12 +244,13 @@ async def initialize_sanctuary_services():
             logger.warning("Enhanced Scout Workflow not available")
 
         # Initialize Express Mode + Vertex AI Supercharger
-        if EXPRESS_MODE_AVAILABLE and integrate_express_mode_with_app:
+        integrate_express_mode_with_app = _integration('express_mode', 'integrate_express_mode_with_app')
+        if integrate_express_mode_with_app:
             logger.info("🐻⚡ Initializing Express Mode + Vertex AI Supercharger...")
             try:
                 # Store settings in app config for the supercharger
                 app.config['settings'] = settings
-                express_success = integrate_express_mode_with_app(app)
+                express_success = _timed_init('express_mode', integrate_express_mode_with_app, app)
                 if express_success:
                     logger.info("✅ Express Mode + Vertex AI Supercharger initialized! 6x faster responses available!")
                 else:
@@ -244,10 +261,11 @@ async def initialize_sanctuary_services():
             logger.warning("Express Mode + Vertex AI Supercharger not available")
 
         # Initialize Multimodal Chat API
-        if MULTIMODAL_CHAT_AVAILABLE and integrate_multimodal_chat_with_app:
+        integrate_multimodal_chat_with_app = _integration('multimodal_chat', 'integrate_multimodal_chat_with_app')
+        if integrate_multimodal_chat_with_app:
             logger.info("🎨🧠 Initializing Multimodal Chat API...")
             try:
-                multimodal_success = integrate_multimodal_chat_with_app(app)
+                multimodal_success = _timed_init('multimodal_chat', integrate_multimodal_chat_with_app, app)
                 if multimodal_success:
                     logger.info("✅ Multimodal Chat API initialized! ALL models accessible via comprehensive chat system!")
                 else:
@@ -258,7 +276,8 @@ async def initialize_sanctuary_services():
             logger.warning("Multimodal Chat API not available")
 
         # Initialize Agentic Superpowers V3.0
-        if AGENTIC_SUPERPOWERS_AVAILABLE and init_agentic_service:
+        agentic_superpowers_bp, init_agentic_service = _integration('agentic_superpowers', 'agentic_superpowers_bp', 'init_agentic_service')
+        if init_agentic_service:
             logger.info("🐻💥 Initializing Mama Bear Agentic Superpowers V3.0...")
             try:
                 agentic_config = {
@@ -266,7 +285,7 @@ async def initialize_sanctuary_services():
                     'express_mode_enabled': True,
                     'autonomous_actions_enabled': True
                 }
-                init_agentic_service(agentic_config)
+                _timed_init('agentic_superpowers', init_agentic_service, agentic_config)
                 app.register_blueprint(agentic_superpowers_bp, url_prefix='/api/agentic')
                 logger.info("✅ 🐻💥 Mama Bear Agentic Superpowers V3.0 initialized! Autonomous AI agent ready!")
             except Exception as e:
@@ -275,7 +294,8 @@ async def initialize_sanctuary_services():
             logger.warning("Agentic Superpowers not available")
 
         # Initialize Supercharged Collaborative Workspaces V3.0
-        if COLLABORATIVE_WORKSPACES_AVAILABLE and init_workspace_service:
+        collaborative_workspaces_bp, init_workspace_service = _integration('collaborative_workspaces', 'collaborative_workspaces_bp', 'init_workspace_service')
+        if init_workspace_service:
             logger.info("🚀✨ Initializing Supercharged Collaborative Workspaces V3.0...")
             try:
                 workspace_config = {
@@ -284,7 +304,7 @@ async def initialize_sanctuary_services():
                     'real_time_collaboration': True,
                     'agentic_control_enabled': True
                 }
-                init_workspace_service(workspace_config)
+                _timed_init('collaborative_workspaces', init_workspace_service, workspace_config)
                 app.register_blueprint(collaborative_workspaces_bp, url_prefix='/api/workspaces')
                 logger.info("✅ 🚀✨ Supercharged Collaborative Workspaces V3.0 initialized! Real-time AI collaboration ready!")
             except Exception as e:
@@ -293,7 +313,9 @@ async def initialize_sanctuary_services():
             logger.warning("Supercharged Collaborative Workspaces not available")
 
         # Initialize Pipedream Integration Service
-        if PIPEDREAM_AVAILABLE and integrate_pipedream_api_with_app and integrate_pipedream_with_app:
+        integrate_pipedream_api_with_app = _integration('pipedream_api', 'integrate_pipedream_api_with_app')
+        integrate_pipedream_with_app = _integration('pipedream_service', 'integrate_pipedream_with_app')
+        if integrate_pipedream_api_with_app and integrate_pipedream_with_app:
             logger.info("🔗 Initializing Pipedream Integration Service...")
             try:
                 # Initialize service first
@@ -306,8 +328,8 @@ async def initialize_sanctuary_services():
                     'agentic_integration_enabled': True
                 }
 
-                service_success = integrate_pipedream_with_app(app, pipedream_config)
-                api_success = integrate_pipedream_api_with_app(app)
+                service_success = _timed_init('pipedream_service', integrate_pipedream_with_app, app, pipedream_config)
+                api_success = _timed_init('pipedream_api', integrate_pipedream_api_with_app, app)
 
                 if service_success and api_success:
                     logger.info("✅ 🔗 Pipedream Integration Service fully initialized! Autonomous workflow automation ready!")
@@ -324,9 +346,16 @@ async def initialize_sanctuary_services():
         # Register API blueprints
         try:
             logger.info("🔗 Registering API blueprints...")
-            integrate_orchestration_with_app(app, socketio)
-            integrate_mama_bear_scrapybara_api(app)
-            register_multi_model_api(app)
+            for name, attribute, args in (
+                ('orchestration_api', 'integrate_orchestration_with_app', (app, socketio)),
+                ('scrapybara_api', 'integrate_mama_bear_scrapybara_api', (app,)),
+                ('multi_model_api', 'register_multi_model_api', (app,))
+            ):
+                integrate = _integration(name, attribute)
+                if integrate is not None:
+                    _timed_init(name, integrate, *args)
+                else:
+                    logger.warning(f"{name} not available")
 
             # Register new Intelligent Execution Router API (commented out - using routes version)
             # try:
@@ -345,55 +374,69 @@ async def initialize_sanctuary_services():
             #     logger.warning(f"Agent Workbench API not available: {e}")
 
             # Register Live API Studio routes
-            app.register_blueprint(memory_bp, url_prefix='/api/memory')
-            app.register_blueprint(chat_bp, url_prefix='/api/chat')
-            app.register_blueprint(scrape_bp, url_prefix='/api/scrape')
-            logger.info("✅ Live API Studio routes registered")
+            for name, attribute, url_prefix in (
+                ('memory_routes', 'memory_bp', '/api/memory'),
+                ('chat_routes', 'chat_bp', '/api/chat'),
+                ('scrape_routes', 'scrape_bp', '/api/scrape')
+            ):
+                blueprint = _integration(name, attribute)
+                if blueprint is not None:
+                    app.register_blueprint(blueprint, url_prefix=url_prefix)
+                    logger.info(f"✅ Live API Studio route {url_prefix} registered")
+                else:
+                    logger.warning(f"Live API Studio route {url_prefix} not available")
 
             # Register Enhanced Frontend API routes
-            try:
-                from routes.agent_workbench import agent_workbench_bp
+            agent_workbench_bp = _integration('agent_workbench_routes', 'agent_workbench_bp')
+            if agent_workbench_bp is not None:
                 app.register_blueprint(agent_workbench_bp, url_prefix='/api/agent-workbench')
                 logger.info("✅ Agent Workbench API registered")
-            except ImportError as e:
-                logger.warning(f"Agent Workbench API not available: {e}")
+            else:
+                logger.warning("Agent Workbench API not available")
 
-            try:
-                from routes.execution_router import execution_router_bp
+            execution_router_bp = _integration('execution_router_routes', 'execution_router_bp')
+            if execution_router_bp is not None:
                 app.register_blueprint(execution_router_bp, url_prefix='/api/execution-router')
                 logger.info("✅ Execution Router API registered")
-            except ImportError as e:
-                logger.warning(f"Execution Router API not available: {e}")
-
-            try:
-                from routes.scout import scout_bp
+            else:
+                logger.warning("Execution Router API not available")
+
+            # Socket.IO transport for streamed execution output (SSE lives on the API blueprint)
+            init_execution_stream_handlers = _integration('execution_stream', 'init_execution_stream_handlers')
+            if init_execution_stream_handlers is not None:
+                _timed_init('execution_stream', init_execution_stream_handlers, socketio)
+            else:
+                logger.warning("Streaming execution socket handlers not available")
+
+            scout_bp = _integration('scout_routes', 'scout_bp')
+            if scout_bp is not None:
                 app.register_blueprint(scout_bp, url_prefix='/api/scout')
                 logger.info("✅ Scout API registered")
-            except ImportError as e:
-                logger.warning(f"Scout API not available: {e}")
+            else:
+                logger.warning("Scout API not available")
 
-            try:
-                from routes.themes import themes_bp
+            themes_bp = _integration('themes_routes', 'themes_bp')
+            if themes_bp is not None:
                 app.register_blueprint(themes_bp, url_prefix='/api/themes')
                 logger.info("✅ Themes API registered")
-            except ImportError as e:
-                logger.warning(f"Themes API not available: {e}")
+            else:
+                logger.warning("Themes API not available")
 
             # Register OpenAI Vertex API
-            try:
-                from api.openai_vertex_api_simple import openai_vertex_api
+            openai_vertex_api = _integration('openai_vertex_api', 'openai_vertex_api')
+            if openai_vertex_api is not None:
                 app.register_blueprint(openai_vertex_api)
                 logger.info("✅ OpenAI Vertex API registered")
-            except ImportError as e:
-                logger.warning(f"OpenAI Vertex API not available: {e}")
+            else:
+                logger.warning("OpenAI Vertex API not available")
 
             # Register Revolutionary MCP Client API
-            try:
-                from api.revolutionary_mcp_api import revolutionary_mcp_bp
+            revolutionary_mcp_bp = _integration('revolutionary_mcp_api', 'revolutionary_mcp_bp')
+            if revolutionary_mcp_bp is not None:
                 app.register_blueprint(revolutionary_mcp_bp)
                 logger.info("✅ 🚀 Revolutionary MCP Client API registered")
-            except ImportError as e:
-                logger.warning(f"Revolutionary MCP Client API not available: {e}")
+            else:
+                logger.warning("Revolutionary MCP Client API not available")
 
             logger.info("✅ API blueprints registered successfully")
         except Exception as e:
@@ -408,6 +451,54 @@ async def initialize_sanctuary_services():
 
     logger.info("🐻 Podplay Sanctuary initialization complete!")
 
+async def _warm_core_services():
+    services = [n.strip() for n in WARMUP_SERVICES.split(',') if n.strip()]
+    await get_service_registry().warm(services)
+
+def _warm_provider_sdks():
+    broken = []
+    for name in WARMUP_SDKS:
+        try:
+            lazy_import(name)
+        except ImportError as e:
+            logger.warning(f"Provider SDK {name} not installed: {e}")
+            continue
+        try:
+            ensure_loaded(name)
+        except ImportError as e:
+            logger.error(f"❌ Provider SDK {name} is installed but failed to load: {e}")
+            broken.append(name)
+    if broken:
+        raise RuntimeError(f"provider SDKs failed to load: {', '.join(broken)}")
+
+def _warm_execution_router():
+    from services.intelligent_execution_router import get_intelligent_router
+    router = get_intelligent_router()
+    # Prime the analyzer's AST and regex caches
+    router._analyze_code_snippet("import os\nprint(os.getcwd())")
+    router._analyze_code_snippet("console.log(require('fs'))")
+
+async def _warm_sandbox_pool():
+    from services.enhanced_code_execution import mama_bear_code_executor
+    await mama_bear_code_executor.pool.prewarm()
+
+async def _probe_models():
+    # Probed directly: the registry's model_manager can be a mock, which has nothing to probe
+    from services.mama_bear_model_manager import MamaBearModelManager
+    results = await MamaBearModelManager().warm_up_models(probe_timeout=10.0)
+    if not any(results.values()):
+        raise RuntimeError("no model answered its warm-up probe")
+
+def start_warmup():
+    """Register warm-up steps and run them in the background"""
+    warmup.register('core_services', _warm_core_services)
+    warmup.register('provider_sdks', _warm_provider_sdks, critical=False)
+    warmup.register('execution_router', _warm_execution_router, critical=False)
+    warmup.register('sandbox_pool', _warm_sandbox_pool, critical=False, timeout_seconds=60)
+    if WARMUP_PROBES:
+        warmup.register('model_probes', _probe_models, timeout_seconds=20)
+    warmup.start_background()
+
 def get_service_instances():
     """Get all service instances"""
     if not services_initialized:
@@ -433,6 +524,7 @@ def health_check():
         return jsonify({
             'success': True,
             'status': 'healthy',
+            'ready': warmup.is_ready(),
             'services': status,
             'gemini_orchestra': {
                 'available': GEMINI_ORCHESTRA_AVAILABLE,
@@ -456,6 +548,17 @@ def health_check():
             'error': str(e)
         }), 500
 
+@app.route('/healthz', methods=['GET'])
+def liveness_check():
+    """Liveness: the process is up and serving requests"""
+    return jsonify(warmup.liveness())
+
+@app.route('/readyz', methods=['GET'])
+def readiness_check():
+    """Readiness: warm-up has finished, so the worker can take traffic"""
+    readiness = warmup.readiness()
+    return jsonify(readiness), 200 if readiness['ready'] else 503
+
 # ==============================================================================
 # WEBSOCKET HANDLERS
 # ==============================================================================
@@ -506,6 +609,10 @@ def create_app():
     loop = asyncio.new_event_loop()
     asyncio.set_event_loop(loop)
     loop.run_until_complete(initialize_sanctuary_services())
+    start_warmup()
+
+    if PROFILE_STARTUP:
+        print_startup_profile()
 
     return app
 
@@ -521,6 +628,10 @@ if __name__ == '__main__':
 
     # Run startup
     asyncio.run(startup())
+    start_warmup()
+
+    if PROFILE_STARTUP:
+        print_startup_profile()
 
     # Start the Sanctuary
     socketio.run(
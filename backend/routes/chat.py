@@ -12,6 +12,8 @@ from typing import Dict, List, Optional, Generator
 import asyncio
 import threading
 
+from services.context_compaction import context_compactor
+
 chat_bp = Blueprint('chat', __name__)
 
 # Model Registry for external imports
@@ -409,8 +411,22 @@ Model capabilities: {', '.join(model_config['capabilities'])}
 
 Always maintain a caring, supportive tone while being technically excellent. You're part of the Podplay Sanctuary - a neurodivergent-friendly development platform."""
 
-                # Prepare messages for AI model
+                # Prepare messages for AI model, compacted to the model's context budget
                 full_messages = [{'role': 'system', 'content': system_message}] + messages
+                compaction = context_compactor.compact(
+                    full_messages, model_id, session_id=f"{user_id}:{session_id}"
+                )
+                full_messages = compaction.messages
+                
+                compaction_data = {
+                    'id': 'context_compaction',
+                    'model': model_id,
+                    'chunk': '',
+                    'finished': False,
+                    'session_id': session_id,
+                    'context_compaction': compaction.report()
+                }
+                yield f"data: {json.dumps(compaction_data)}\n\n"
                 
                 # Route to appropriate AI model with intelligent orchestration
                 provider = model_config['provider']
@@ -616,7 +632,8 @@ def chat_health():
             'service': 'chat',
             'timestamp': datetime.utcnow().isoformat(),
             'available_models': len(MODEL_CONFIGS),
-            'model_names': list(MODEL_CONFIGS.keys())
+            'model_names': list(MODEL_CONFIGS.keys()),
+            'context_compaction': context_compactor.get_metrics()
         })
     except Exception as e:
         return jsonify({
@@ -750,13 +767,14 @@ def _generate_gemini_response(messages, model_id, mama_bear_variant, session_id)
         }
         
         actual_model_name = model_mapping.get(model_id, 'gemini-2.0-flash-exp')
-        model = genai.GenerativeModel(actual_model_name)
+        system_instruction = "\n\n".join(msg['content'] for msg in messages if msg['role'] == 'system')
+        model = genai.GenerativeModel(actual_model_name, system_instruction=system_instruction or None)
         
         # Convert messages to Gemini format
         gemini_messages = []
         for msg in messages:
             if msg['role'] == 'system':
-                continue  # System message handled separately
+                continue  # System message passed as system_instruction
             gemini_messages.append({
                 'role': 'user' if msg['role'] == 'user' else 'model',
                 'parts': [msg['content']]
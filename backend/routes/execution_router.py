@@ -10,12 +10,18 @@ import json
 import random
 from typing import Dict, List, Optional
 
+from services.execution_rollups import CreatedAtIndex
+
 execution_router_bp = Blueprint('execution_router_routes', __name__)
 
 # Mock execution data
 execution_store = {}
+execution_index = CreatedAtIndex()  # newest-first listing order for /executions
 route_metrics = {}
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
 # Initialize sample execution data
 sample_executions = {
     'exec-001': {
@@ -72,6 +78,8 @@ sample_executions = {
 }
 
 execution_store.update(sample_executions)
+for _execution in sample_executions.values():
+    execution_index.add(_execution['id'], _execution['created_at'])
 
 @execution_router_bp.route('/health', methods=['GET'])
 def execution_router_health():
@@ -98,34 +106,38 @@ def execution_router_health():
 
 @execution_router_bp.route('/executions', methods=['GET'])
 def get_executions():
-    """Get all executions with optional filtering"""
+    """Get executions, newest first, with optional filtering and cursor pagination"""
     try:
         status_filter = request.args.get('status')
         priority_filter = request.args.get('priority')
         route_filter = request.args.get('route')
-        limit = request.args.get('limit', type=int)
-        
-        executions = list(execution_store.values())
-        
-        if status_filter:
-            executions = [e for e in executions if e['status'] == status_filter]
-        
-        if priority_filter:
-            executions = [e for e in executions if e['priority'] == priority_filter]
-            
-        if route_filter:
-            executions = [e for e in executions if e['route'] == route_filter]
-        
-        # Sort by created_at descending
-        executions.sort(key=lambda x: x['created_at'], reverse=True)
-        
-        if limit:
-            executions = executions[:limit]
+        limit = min(request.args.get('limit', DEFAULT_PAGE_SIZE, type=int) or DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE)
+        cursor = request.args.get('cursor')
+        
+        def matches(execution_id: str) -> bool:
+            execution = execution_store[execution_id]
+            return (
+                (not status_filter or execution['status'] == status_filter)
+                and (not priority_filter or execution['priority'] == priority_filter)
+                and (not route_filter or execution['route'] == route_filter)
+            )
+        
+        # Walk the created_at index from the cursor; only this page is materialized
+        try:
+            execution_ids, next_cursor = execution_index.page(limit, cursor, include=matches)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        executions = [execution_store[execution_id] for execution_id in execution_ids]
         
         return jsonify({
             'success': True,
             'executions': executions,
-            'total': len(executions)
+            'total': len(executions),
+            'next_cursor': next_cursor,
+            'has_more': next_cursor is not None
         })
     except Exception as e:
         return jsonify({
@@ -185,6 +197,7 @@ def create_execution():
         }
         
         execution_store[execution_id] = execution
+        execution_index.add(execution_id, execution['created_at'])
         
         return jsonify({
             'success': True,
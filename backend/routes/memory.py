@@ -10,11 +10,12 @@ import json
 import os
 from typing import Dict, List, Optional
 
+from services.context_store import create_context_store, new_context
+
 memory_bp = Blueprint('memory', __name__)
 
-# In-memory storage for development (replace with Mem0 in production)
-memory_store = {}
-context_store = {}
+# Durable context storage (SQLite/WAL by default, CONTEXT_STORE_BACKEND=memory for tests)
+context_store = create_context_store()
 
 @memory_bp.route('/context', methods=['GET'])
 def get_context():
@@ -23,14 +24,7 @@ def get_context():
         user_id = request.args.get('user_id', 'default')
         session_id = request.args.get('session_id', 'default')
         
-        context_key = f"{user_id}:{session_id}"
-        context = context_store.get(context_key, {
-            'messages': [],
-            'relationships': {},
-            'preferences': {},
-            'created_at': datetime.utcnow().isoformat(),
-            'updated_at': datetime.utcnow().isoformat()
-        })
+        context = context_store.get_context(user_id, session_id) or new_context()
         
         return jsonify({
             'success': True,
@@ -60,8 +54,8 @@ def save_context():
         if 'created_at' not in context:
             context['created_at'] = datetime.utcnow().isoformat()
         
-        # Store context
-        context_store[context_key] = context
+        # Store context (only messages not already stored are written)
+        result = context_store.save_context(user_id, session_id, context)
         
         # TODO: Integrate with Mem0 for persistent storage
         # mem0_client.add_memory(user_id, context)
@@ -69,7 +63,8 @@ def save_context():
         return jsonify({
             'success': True,
             'message': 'Context saved successfully',
-            'context_id': context_key
+            'context_id': context_key,
+            'appended_messages': result['appended_messages']
         })
         
     except Exception as e:
@@ -85,7 +80,7 @@ def get_relationships():
     try:
         user_id = request.args.get('user_id', 'default')
         
-        relationships = memory_store.get(f"relationships:{user_id}", {
+        relationships = context_store.get_record('relationships', user_id, 'profile') or {
             'mama_bear_variants': {
                 'scout_commander': {'trust_level': 0.5, 'interaction_count': 0},
                 'research_specialist': {'trust_level': 0.5, 'interaction_count': 0},
@@ -100,7 +95,7 @@ def get_relationships():
                 'complexity_preference': 'moderate',
                 'learning_style': 'visual_kinesthetic'
             }
-        })
+        }
         
         return jsonify({
             'success': True,
@@ -123,11 +118,10 @@ def update_relationships():
         variant = data.get('variant')
         interaction_data = data.get('interaction_data', {})
         
-        relationships_key = f"relationships:{user_id}"
-        relationships = memory_store.get(relationships_key, {
+        relationships = context_store.get_record('relationships', user_id, 'profile') or {
             'mama_bear_variants': {},
             'preferences': {}
-        })
+        }
         
         # Update specific variant relationship
         if variant and variant in relationships.get('mama_bear_variants', {}):
@@ -144,7 +138,7 @@ def update_relationships():
         if interaction_data.get('preferences'):
             relationships['preferences'].update(interaction_data['preferences'])
         
-        memory_store[relationships_key] = relationships
+        context_store.put_record('relationships', user_id, 'profile', relationships)
         
         return jsonify({
             'success': True,
@@ -167,23 +161,11 @@ def search_memory():
         user_id = data.get('user_id', 'default')
         
         # Simple search implementation (replace with Mem0 semantic search)
-        results = []
-        
-        # Search through context store
-        for context_key, context in context_store.items():
-            if user_id in context_key:
-                for message in context.get('messages', []):
-                    if query.lower() in message.get('content', '').lower():
-                        results.append({
-                            'type': 'message',
-                            'content': message.get('content', ''),
-                            'timestamp': message.get('timestamp'),
-                            'context_id': context_key
-                        })
+        results = context_store.search_messages(user_id, query, limit=10)
         
         return jsonify({
             'success': True,
-            'results': results[:10]  # Limit to 10 results
+            'results': results
         })
         
     except Exception as e:
@@ -199,23 +181,21 @@ def get_memory_stats():
     try:
         user_id = request.args.get('user_id', 'default')
         
-        # Calculate stats
-        user_contexts = [k for k in context_store.keys() if user_id in k]
-        total_messages = sum(len(context_store[k].get('messages', [])) for k in user_contexts)
-        
-        relationships_key = f"relationships:{user_id}"
-        relationships = memory_store.get(relationships_key, {})
+        # Per-user and global counters are maintained on write
+        user_stats = context_store.get_user_stats(user_id)
+        totals = context_store.get_totals()
+        relationships = context_store.get_record('relationships', user_id, 'profile') or {}
         
         stats = {
-            'total_contexts': len(user_contexts),
-            'total_messages': total_messages,
+            'total_contexts': user_stats['contexts'],
+            'total_messages': user_stats['messages'],
             'relationship_strength': {
                 variant: data.get('trust_level', 0.5)
                 for variant, data in relationships.get('mama_bear_variants', {}).items()
             },
             'memory_usage': {
-                'contexts': len(context_store),
-                'relationships': len([k for k in memory_store.keys() if k.startswith('relationships:')])
+                'contexts': totals.get('contexts', 0),
+                'relationships': totals.get('relationships', 0)
             }
         }
         
@@ -235,13 +215,15 @@ def get_memory_stats():
 def memory_health():
     """Health check endpoint for memory system"""
     try:
+        totals = context_store.get_totals()
         return jsonify({
             'success': True,
             'status': 'healthy',
             'service': 'memory',
             'timestamp': datetime.utcnow().isoformat(),
-            'store_count': len(memory_store),
-            'context_count': len(context_store)
+            'storage_engine': type(context_store).__name__,
+            'store_count': totals.get('memories', 0) + totals.get('relationships', 0),
+            'context_count': totals.get('contexts', 0)
         })
     except Exception as e:
         return jsonify({
@@ -254,13 +236,15 @@ def memory_health():
 def get_memory_store():
     """Get current memory store statistics"""
     try:
+        totals = context_store.get_totals()
+        preview = context_store.preview_keys(limit=10)  # First 10 keys for preview
         return jsonify({
             'success': True,
             'store': {
-                'total_memories': len(memory_store),
-                'total_contexts': len(context_store),
-                'memory_keys': list(memory_store.keys())[:10],  # First 10 keys for preview
-                'context_keys': list(context_store.keys())[:10]
+                'total_memories': totals.get('memories', 0) + totals.get('relationships', 0),
+                'total_contexts': totals.get('contexts', 0),
+                'memory_keys': preview['memory_keys'],
+                'context_keys': preview['context_keys']
             }
         })
     except Exception as e:
@@ -278,14 +262,13 @@ def store_memory():
         user_id = data.get('user_id', 'default')
         content = data.get('content', '')
         
-        memory_key = f"{user_id}:{memory_id}"
-        memory_store[memory_key] = {
+        context_store.put_record('memories', user_id, memory_id, {
             'id': memory_id,
             'user_id': user_id,
             'content': content,
             'created_at': datetime.utcnow().isoformat(),
             'metadata': data.get('metadata', {})
-        }
+        })
         
         return jsonify({
             'success': True,
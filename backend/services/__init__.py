@@ -1,102 +1,158 @@
 """
 🐻 Podplay Sanctuary Services - Initialization Module
 Provides all core services for the Mama Bear sanctuary
+
+Services are registered with a factory and constructed on first use, so a
+worker only pays for the services its requests actually touch. Startup can
+still warm a chosen set up front, in parallel (see ``initialize_all_services``).
 """
 
 import logging
 import asyncio
-from typing import Dict, Any, Optional
+import threading
+import time
+from typing import Dict, Any, Optional, Callable, Iterable
 
 logger = logging.getLogger(__name__)
 
-# Global service instances
-_services = {}
-_initialized = False
-
 class MockService:
     """Mock service for development"""
     def __init__(self, name: str):
         self.name = name
         self.initialized = True
-    
+
     async def health_check(self):
         return {"status": "healthy", "service": self.name}
 
+# === SERVICE REGISTRY ===
+
+class ServiceRegistry:
+    """
+    Lazily constructed, process-wide service instances.
+
+    Each service is built at most once, under its own lock, so independent
+    services can be constructed concurrently and a factory may ``get`` the
+    services it depends on. A factory that fails falls back to a MockService.
+    """
+
+    def __init__(self):
+        self._factories: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self.init_timings_ms: Dict[str, float] = {}
+
+    def register(self, name: str, factory: Callable[[], Any]):
+        self._factories[name] = factory
+        self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str) -> Any:
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+        if name not in self._factories:
+            return MockService(name.replace('_', ' ').title())
+
+        with self._locks[name]:
+            instance = self._instances.get(name)
+            if instance is None:
+                start = time.perf_counter()
+                try:
+                    instance = self._factories[name]()
+                except Exception as e:
+                    logger.warning(f"⚠️ {name} unavailable, using mock service: {e}")
+                    instance = MockService(name.replace('_', ' ').title())
+                self.init_timings_ms[name] = round((time.perf_counter() - start) * 1000, 2)
+                self._instances[name] = instance
+        return instance
+
+    def is_built(self, name: str) -> bool:
+        return name in self._instances
+
+    async def warm(self, names: Optional[Iterable[str]] = None):
+        """Construct ``names`` (default: all registered) concurrently in worker threads"""
+        names = list(self._factories) if names is None else [n for n in names if n in self._factories]
+        await asyncio.gather(*(asyncio.to_thread(self.get, name) for name in names))
+
+    def clear(self):
+        self._instances.clear()
+        self.init_timings_ms.clear()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            'services': {
+                name: getattr(service, 'initialized', True)
+                for name, service in self._instances.items()
+            },
+            'lazy_pending': [name for name in self._factories if name not in self._instances],
+            'init_timings_ms': dict(self.init_timings_ms),
+            'total_services': len(self._factories)
+        }
+
+_registry = ServiceRegistry()
+_initialized = False
+
+def _create_memory_manager():
+    from .mama_bear_memory_system import MemoryManager
+    return MemoryManager()
+
+def _create_model_manager():
+    from .mama_bear_model_manager import ModelManager
+    return ModelManager()
+
+def _create_scrapybara_manager():
+    from .enhanced_scrapybara_integration import ScrapybaraManager
+    return ScrapybaraManager()
+
+def _create_mama_bear_agent():
+    from .mama_bear_orchestration import AgentOrchestrator
+    dependencies = [_registry.get(name) for name in ('memory_manager', 'model_manager', 'scrapybara_manager')]
+    if any(isinstance(service, MockService) for service in dependencies):
+        raise RuntimeError("orchestrator dependencies are not available")
+    return AgentOrchestrator(*dependencies)
+
+_registry.register('memory_manager', _create_memory_manager)
+_registry.register('model_manager', _create_model_manager)
+_registry.register('scrapybara_manager', _create_scrapybara_manager)
+_registry.register('mama_bear_agent', _create_mama_bear_agent)
+_registry.register('theme_manager', lambda: MockService('Theme Manager'))  # Keep as mock for now
+
+def get_service_registry() -> ServiceRegistry:
+    return _registry
+
 # === SERVICE INITIALIZATION ===
 
-async def initialize_all_services():
-    """Initialize all sanctuary services"""
-    global _services, _initialized
-    
+async def initialize_all_services(eager: Optional[Iterable[str]] = None):
+    """
+    Initialize all sanctuary services.
+
+    Services are constructed lazily on first use; ``eager`` names the ones to
+    build now (in parallel). ``None`` builds every registered service.
+    """
+    global _initialized
+
     try:
         logger.info("🚀 Initializing Podplay Sanctuary services...")
-        
-        # Try to import and initialize real service implementations
-        try:
-            from .mama_bear_orchestration import AgentOrchestrator
-            from .mama_bear_memory_system import MemoryManager
-            from .enhanced_scrapybara_integration import ScrapybaraManager
-            from .mama_bear_model_manager import ModelManager
-            
-            # Initialize real services
-            memory_manager = MemoryManager()
-            model_manager = ModelManager()
-            scrapybara_manager = ScrapybaraManager()
-            
-            # Initialize orchestrator with all services
-            orchestrator = AgentOrchestrator(memory_manager, model_manager, scrapybara_manager)
-            
-            _services = {
-                'mama_bear_agent': orchestrator,
-                'memory_manager': memory_manager,
-                'scrapybara_manager': scrapybara_manager,
-                'theme_manager': MockService('Theme Manager'),  # Keep as mock for now
-                'model_manager': model_manager
-            }
-            
-            logger.info("✅ All services initialized successfully with REAL implementations!")
-            logger.info("🐻 Mama Bear agents are now fully aware and capable!")
-            
-        except ImportError as e:
-            logger.warning(f"Some services not available, using available implementations: {e}")
-            # Try to initialize what we can
-            try:
-                from .mama_bear_memory_system import initialize_memory_manager
-                memory_manager = initialize_memory_manager()
-                logger.info("✅ Real MemoryManager initialized successfully")
-            except Exception as mem_error:
-                logger.warning(f"MemoryManager initialization failed: {mem_error}")
-                memory_manager = MockService('Memory Manager')
-            
-            _services = {
-                'mama_bear_agent': MockService('Mama Bear Agent'),
-                'memory_manager': memory_manager,
-                'scrapybara_manager': MockService('Scrapybara Manager'),
-                'theme_manager': MockService('Theme Manager')
-            }
-            
-            if isinstance(memory_manager, MockService):
-                logger.warning("⚠️ Running with some mock services - some features have limited capabilities")
-            else:
-                logger.info("✅ Memory system operational - persistent conversations enabled")
-        
+        await _registry.warm(eager)
         _initialized = True
-        logger.info("✅ Service initialization completed")
-        
+
+        if _registry.is_built('memory_manager') and isinstance(_registry.get('memory_manager'), MockService):
+            logger.warning("⚠️ Running with some mock services - some features have limited capabilities")
+        logger.info(f"✅ Service initialization completed ({len(_registry.status()['lazy_pending'])} deferred to first use)")
+
     except Exception as e:
         logger.error(f"❌ Failed to initialize services: {e}")
         raise
 
 async def shutdown_all_services():
     """Shutdown all services"""
-    global _services, _initialized
-    
+    global _initialized
+
     try:
         logger.info("🛑 Shutting down all services...")
-        _services.clear()
+        _registry.clear()
         _initialized = False
         logger.info("✅ All services shut down successfully")
-        
+
     except Exception as e:
         logger.error(f"❌ Error shutting down services: {e}")
 
@@ -104,29 +160,25 @@ async def shutdown_all_services():
 
 def get_mama_bear_agent():
     """Get Mama Bear agent instance"""
-    return _services.get('mama_bear_agent', MockService('Mama Bear Agent'))
+    return _registry.get('mama_bear_agent')
 
 def get_memory_manager():
     """Get memory manager instance"""
-    return _services.get('memory_manager', MockService('Memory Manager'))
+    return _registry.get('memory_manager')
 
 def get_scrapybara_manager():
     """Get Scrapybara manager instance"""
-    return _services.get('scrapybara_manager', MockService('Scrapybara Manager'))
+    return _registry.get('scrapybara_manager')
 
 def get_theme_manager():
     """Get theme manager instance"""
-    return _services.get('theme_manager', MockService('Theme Manager'))
+    return _registry.get('theme_manager')
 
 def get_service_status():
     """Get status of all services"""
     return {
         'initialized': _initialized,
-        'services': {
-            name: service.initialized if hasattr(service, 'initialized') else True
-            for name, service in _services.items()
-        },
-        'total_services': len(_services)
+        **_registry.status()
     }
 
 # === ASYNC HELPER ===
@@ -143,10 +195,3 @@ def run_async(coro):
     except RuntimeError:
         # No event loop, create one
         return asyncio.run(coro)
-
-# Initialize on import
-if not _initialized:
-    try:
-        run_async(initialize_all_services())
-    except Exception as e:
-        logger.warning(f"Could not initialize services on import: {e}")
\ No newline at end of file
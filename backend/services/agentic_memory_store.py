@@ -0,0 +1,330 @@
+# backend/services/agentic_memory_store.py
+"""
+🧠 Tiered Short-Term Memory Store for Mama Bear Agentic Superpowers
+Per-user ring buffers with a global budget, recency/importance eviction
+into a compact SQLite long-term tier, and indexed retrieval.
+"""
+
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from collections import OrderedDict, defaultdict
+from typing import Dict, Any, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+# Baseline importance per memory type when the caller does not provide one
+DEFAULT_TYPE_IMPORTANCE = {
+    "user_profile": 0.9,
+    "preference": 0.8,
+    "decision": 0.7,
+    "general": 0.5,
+    "interaction": 0.4
+}
+
+
+def _tokenize(text: str) -> Set[str]:
+    return set(_TOKEN_PATTERN.findall(text.lower()))
+
+
+def _whole_query_tokens(query: str) -> Set[str]:
+    """Tokens bounded by non-word characters on both sides inside the query.
+
+    Only these are guaranteed to appear as whole words in any content that
+    contains the query as a substring, so only these can drive the index.
+    """
+    return {
+        match.group(0) for match in _TOKEN_PATTERN.finditer(query)
+        if match.start() > 0 and match.end() < len(query)
+    }
+
+
+class TieredMemoryStore:
+    """
+    Bounded local memory used when Mem0 is unavailable.
+
+    - Short-term tier: one ring buffer per user (``per_user_capacity``) plus a
+      global ``max_total_entries`` budget shared by all users.
+    - Eviction: within the oldest ``eviction_window`` entries of a buffer, the
+      entry with the lowest importance × recency score is moved out.
+    - Long-term tier: evicted entries are zlib-compressed into SQLite, indexed
+      by user, and searched only when the short-term tier can't fill a query.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        per_user_capacity: int = 200,
+        max_total_entries: int = 5000,
+        eviction_window: int = 8,
+        recency_half_life_seconds: float = 6 * 3600,
+        long_term_max_per_user: int = 10000
+    ):
+        self.per_user_capacity = per_user_capacity
+        self.max_total_entries = max_total_entries
+        self.eviction_window = eviction_window
+        self.recency_half_life_seconds = recency_half_life_seconds
+        self.long_term_max_per_user = long_term_max_per_user
+
+        # user_id -> OrderedDict(memory_id -> entry), oldest first
+        self._buffers: Dict[str, "OrderedDict[str, Dict[str, Any]]"] = defaultdict(OrderedDict)
+        # user_id -> token -> memory ids in the short-term tier
+        self._index: Dict[str, Dict[str, Set[str]]] = defaultdict(lambda: defaultdict(set))
+        self._total_entries = 0
+        self._lock = threading.RLock()
+
+        self.stats = {
+            "stored": 0,
+            "evicted_to_long_term": 0,
+            "long_term_pruned": 0,
+            "short_term_hits": 0,
+            "long_term_hits": 0
+        }
+
+        self.db_path = db_path or os.path.join(
+            os.getenv('STORAGE_PATH', './storage'), 'agentic_long_term_memory.db'
+        )
+        self._db = self._open_long_term_tier(self.db_path)
+
+    def _open_long_term_tier(self, db_path: str) -> Optional[sqlite3.Connection]:
+        """Open (or create) the SQLite long-term tier; fall back to discarding evictions"""
+        try:
+            if db_path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            db = sqlite3.connect(db_path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS long_term_memories (
+                    memory_id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    memory_type TEXT NOT NULL,
+                    importance REAL NOT NULL,
+                    created_at REAL NOT NULL,
+                    search_text TEXT NOT NULL,
+                    payload BLOB NOT NULL
+                )
+                """
+            )
+            db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_ltm_user_created "
+                "ON long_term_memories (user_id, created_at)"
+            )
+            db.commit()
+            return db
+        except Exception as e:
+            logger.warning(f"⚠️ Long-term memory tier unavailable ({db_path}): {e}")
+            return None
+
+    # === WRITE PATH ===
+
+    def add(
+        self,
+        user_id: str,
+        content: str,
+        memory_type: str = "general",
+        metadata: Optional[Dict[str, Any]] = None,
+        timestamp: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Store a memory in the user's ring buffer, evicting if over budget"""
+        metadata = metadata or {}
+        importance = metadata.get("importance", DEFAULT_TYPE_IMPORTANCE.get(memory_type, 0.5))
+        entry = {
+            "id": str(uuid.uuid4()),
+            "content": content,
+            "type": memory_type,
+            "metadata": metadata,
+            "timestamp": timestamp or time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "user_id": user_id,
+            "importance": float(importance),
+            "_created": time.time()
+        }
+
+        with self._lock:
+            buffer = self._buffers[user_id]
+            buffer[entry["id"]] = entry
+            for token in _tokenize(content):
+                self._index[user_id][token].add(entry["id"])
+            self._total_entries += 1
+            self.stats["stored"] += 1
+
+            if len(buffer) > self.per_user_capacity:
+                self._evict_from(user_id)
+            while self._total_entries > self.max_total_entries:
+                self._evict_from(self._pick_global_victim_user())
+
+        return entry
+
+    def _score(self, entry: Dict[str, Any], now: float) -> float:
+        age = max(now - entry["_created"], 0.0)
+        recency = math.pow(0.5, age / self.recency_half_life_seconds)
+        return entry["importance"] * recency
+
+    def _pick_global_victim_user(self) -> str:
+        """Choose the user whose oldest entry is least valuable"""
+        now = time.time()
+        victim_user, victim_score = None, float("inf")
+        for user_id, buffer in self._buffers.items():
+            if not buffer:
+                continue
+            oldest = next(iter(buffer.values()))
+            score = self._score(oldest, now)
+            if score < victim_score:
+                victim_user, victim_score = user_id, score
+        return victim_user
+
+    def _evict_from(self, user_id: str):
+        """Move the lowest-scoring of the oldest entries to the long-term tier"""
+        buffer = self._buffers[user_id]
+        now = time.time()
+        window = []
+        for memory_id, entry in buffer.items():
+            window.append(entry)
+            if len(window) >= self.eviction_window:
+                break
+        victim = min(window, key=lambda e: self._score(e, now))
+
+        del buffer[victim["id"]]
+        user_index = self._index[user_id]
+        for token in _tokenize(victim["content"]):
+            ids = user_index.get(token)
+            if ids is not None:
+                ids.discard(victim["id"])
+                if not ids:
+                    del user_index[token]
+        if not buffer:
+            del self._buffers[user_id]
+            self._index.pop(user_id, None)
+        self._total_entries -= 1
+
+        self._spill_to_long_term(victim)
+
+    def _spill_to_long_term(self, entry: Dict[str, Any]):
+        if self._db is None:
+            return
+        payload = {k: v for k, v in entry.items() if not k.startswith("_")}
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO long_term_memories VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (
+                    entry["id"],
+                    entry["user_id"],
+                    entry["type"],
+                    entry["importance"],
+                    entry["_created"],
+                    entry["content"].lower(),
+                    zlib.compress(json.dumps(payload, default=str).encode("utf-8"))
+                )
+            )
+            self._prune_long_term(entry["user_id"])
+            self._db.commit()
+            self.stats["evicted_to_long_term"] += 1
+        except Exception as e:
+            logger.error(f"Failed to spill memory to long-term tier: {e}")
+
+    def _prune_long_term(self, user_id: str):
+        """Keep the long-term tier bounded per user by dropping the oldest rows"""
+        cursor = self._db.execute(
+            """
+            DELETE FROM long_term_memories WHERE memory_id IN (
+                SELECT memory_id FROM long_term_memories WHERE user_id = ?
+                ORDER BY created_at DESC LIMIT -1 OFFSET ?
+            )
+            """,
+            (user_id, self.long_term_max_per_user)
+        )
+        if cursor.rowcount and cursor.rowcount > 0:
+            self.stats["long_term_pruned"] += cursor.rowcount
+
+    # === READ PATH ===
+
+    def search(self, user_id: str, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        Return up to ``limit`` memories containing ``query`` (most recent matches,
+        in chronological order). Short-term candidates come from the token index
+        when the query has whole words, otherwise from the user's bounded buffer;
+        the long-term tier is only consulted when short-term can't fill the limit.
+        """
+        needle = query.lower()
+        with self._lock:
+            buffer = self._buffers.get(user_id)
+            matches: List[Dict[str, Any]] = []
+            if buffer:
+                tokens = _whole_query_tokens(needle)
+                if tokens:
+                    user_index = self._index.get(user_id, {})
+                    candidate_sets = sorted(
+                        (user_index.get(token, set()) for token in tokens), key=len
+                    )
+                    candidates = set.intersection(*candidate_sets) if candidate_sets else set()
+                    entries = [buffer[mid] for mid in candidates]
+                    entries.sort(key=lambda e: e["_created"])
+                else:
+                    entries = list(buffer.values())
+                matches = [e for e in entries if needle in e["content"].lower()][-limit:]
+
+            results = [self._public(e) for e in matches]
+            self.stats["short_term_hits"] += len(results)
+
+            if len(results) < limit and self._db is not None:
+                older = self._search_long_term(user_id, needle, limit - len(results))
+                self.stats["long_term_hits"] += len(older)
+                results = older + results
+
+        return results
+
+    def _search_long_term(self, user_id: str, needle: str, limit: int) -> List[Dict[str, Any]]:
+        try:
+            pattern = "%" + needle.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+            rows = self._db.execute(
+                """
+                SELECT payload FROM long_term_memories
+                WHERE user_id = ? AND search_text LIKE ? ESCAPE '\\'
+                ORDER BY created_at DESC LIMIT ?
+                """,
+                (user_id, pattern, limit)
+            ).fetchall()
+        except Exception as e:
+            logger.error(f"Long-term memory search failed: {e}")
+            return []
+        return [json.loads(zlib.decompress(row[0]).decode("utf-8")) for row in reversed(rows)]
+
+    @staticmethod
+    def _public(entry: Dict[str, Any]) -> Dict[str, Any]:
+        return {k: v for k, v in entry.items() if not k.startswith("_")}
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            long_term_count = 0
+            if self._db is not None:
+                try:
+                    long_term_count = self._db.execute(
+                        "SELECT COUNT(*) FROM long_term_memories"
+                    ).fetchone()[0]
+                except Exception:
+                    pass
+            return {
+                **self.stats,
+                "short_term_entries": self._total_entries,
+                "short_term_users": len(self._buffers),
+                "long_term_entries": long_term_count,
+                "max_total_entries": self.max_total_entries,
+                "per_user_capacity": self.per_user_capacity
+            }
+
+    def __len__(self) -> int:
+        return self._total_entries
+
+    def close(self):
+        if self._db is not None:
+            self._db.close()
+            self._db = None
@@ -0,0 +1,177 @@
+"""
+🛡️ Computer Action Pipeline Helpers
+Shared pieces of the batched computer-use path: a TTL + LRU cache for safety
+verdicts and permission grants, so repeated clicks/types on the same target
+skip re-analysis, and a buffered audit log that appends records to a JSONL
+file in batches instead of one write per action.
+"""
+
+import asyncio
+import atexit
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+VERDICT_TTL_SECONDS = float(os.getenv('COMPUTER_ACTION_VERDICT_TTL', 300))
+AUDIT_BATCH_SIZE = int(os.getenv('COMPUTER_ACTION_AUDIT_BATCH_SIZE', 50))
+AUDIT_FLUSH_INTERVAL = float(os.getenv('COMPUTER_ACTION_AUDIT_FLUSH_INTERVAL', 2.0))
+AUDIT_MAX_PENDING = int(os.getenv('COMPUTER_ACTION_AUDIT_MAX_PENDING', 10000))
+
+
+def target_key(target: Dict[str, Any], parameters: Optional[Dict[str, Any]] = None) -> str:
+    """Digest of an action's target (and the parameters its safety depends on)"""
+    payload = json.dumps([target, parameters or {}], sort_keys=True, default=str).encode('utf-8')
+    return hashlib.blake2b(payload, digest_size=12).hexdigest()
+
+
+class VerdictCache:
+    """In-memory LRU of verdicts with a time-to-live per entry"""
+
+    def __init__(self, max_entries: int = 5000, ttl_seconds: float = VERDICT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Tuple, verdict: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (time.time(), verdict)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            'size': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0
+        }
+
+
+class BatchedAuditLog:
+    """
+    Append-only JSONL audit sink. Records are buffered and written together
+    once ``batch_size`` are pending or ``flush_interval`` has passed since the
+    last write; ``flush()`` forces a write. A background thread writes records
+    still pending after ``flush_interval`` even when no further append comes,
+    and whatever is left is written at interpreter exit. A batch whose write
+    fails goes back to the front of the queue and is retried on the next
+    flush; at most ``max_pending`` records are held, the oldest dropped first.
+    Without a path records are only counted (the caller keeps its in-memory
+    trail).
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        batch_size: int = AUDIT_BATCH_SIZE,
+        flush_interval: float = AUDIT_FLUSH_INTERVAL,
+        max_pending: int = AUDIT_MAX_PENDING
+    ):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self._pending: List[Dict[str, Any]] = []
+        self._last_flush = time.time()
+        self._pending_lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._flusher: Optional[threading.Thread] = None
+        self.metrics = {'records': 0, 'writes': 0, 'write_failures': 0, 'dropped': 0}
+        if path:
+            atexit.register(self.flush_sync)
+
+    def append(self, records: List[Dict[str, Any]]) -> bool:
+        """Buffer records; True when a flush is due"""
+        with self._pending_lock:
+            self._pending.extend(records)
+            self.metrics['records'] += len(records)
+            self._trim_pending()
+            due = len(self._pending) >= self.batch_size or time.time() - self._last_flush >= self.flush_interval
+        self._ensure_flusher()
+        return due
+
+    async def flush(self):
+        if self._pending:
+            await asyncio.to_thread(self.flush_sync)
+
+    def flush_sync(self):
+        """Write pending records from the calling thread (timer and exit flushes)"""
+        # Taken under the write lock so batches reach the file in append order
+        with self._write_lock:
+            with self._pending_lock:
+                records, self._pending = self._pending, []
+                self._last_flush = time.time()
+            if records and self.path:
+                self._write_records(records)
+
+    def _ensure_flusher(self):
+        if self._flusher is not None or not self.path or self.flush_interval <= 0:
+            return
+        with self._pending_lock:
+            if self._flusher is None:
+                self._flusher = threading.Thread(target=self._flush_periodically, name="audit-flush", daemon=True)
+                self._flusher.start()
+
+    def _flush_periodically(self):
+        while True:
+            time.sleep(self.flush_interval)
+            if self._pending and time.time() - self._last_flush >= self.flush_interval:
+                self.flush_sync()
+
+    def _write_records(self, records: List[Dict[str, Any]]):
+        try:
+            self._write(records)
+            self.metrics['writes'] += 1
+        except OSError as e:
+            self.metrics['write_failures'] += 1
+            logger.error(f"Failed to write {len(records)} audit record(s) to {self.path}, will retry: {e}")
+            with self._pending_lock:
+                self._pending[:0] = records
+                self._trim_pending()
+
+    def _trim_pending(self):
+        """Drop the oldest pending records beyond ``max_pending`` (pending lock held)"""
+        excess = len(self._pending) - self.max_pending
+        if excess > 0:
+            del self._pending[:excess]
+            self.metrics['dropped'] += excess
+            logger.error(f"Dropped {excess} audit record(s): more than {self.max_pending} pending")
+
+    def _write(self, records: List[Dict[str, Any]]):
+        lines = ''.join(json.dumps(record, default=str) + '\n' for record in records)
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(lines)
+
+    def pending(self) -> int:
+        return len(self._pending)
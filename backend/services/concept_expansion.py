@@ -0,0 +1,209 @@
+"""
+🕸️ Concept Expansion Cache and Graph
+Memoizes related-concept expansions for the agentic RAG pipeline: a TTL + LRU
+cache keyed by normalized query, and a persistent SQLite concept graph built up
+from past expansions so common queries are answered without an LLM call.
+"""
+
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_TERM_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.-]{2,}")
+
+# Words that carry no topical signal for the concept graph
+_STOP_WORDS = {
+    "the", "and", "for", "with", "this", "that", "what", "how", "why", "can", "you",
+    "please", "help", "about", "from", "into", "are", "was", "have", "has", "does",
+    "should", "would", "could", "tell", "explain", "show", "give", "need", "want"
+}
+
+
+def normalize_query(query: str, scope: str = "medium") -> str:
+    """Cache key: lowercased, whitespace-collapsed query plus expansion scope"""
+    return f"{scope}|{' '.join(query.lower().split())}"
+
+
+def query_terms(query: str) -> List[str]:
+    """Topical terms of a query, in order of first appearance"""
+    seen = []
+    for term in _TERM_PATTERN.findall(query.lower()):
+        term = term.rstrip(".")
+        if term not in _STOP_WORDS and term not in seen:
+            seen.append(term)
+    return seen
+
+
+class ConceptExpansionCache:
+    """In-memory LRU of expansions with a time-to-live per entry"""
+
+    def __init__(self, max_entries: int = 2000, ttl_seconds: float = 6 * 3600):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, Tuple[float, List[Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[Dict[str, Any]]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            stored_at, concepts = entry
+            if time.time() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return concepts
+
+    def put(self, key: str, concepts: List[Dict[str, Any]]):
+        with self._lock:
+            self._entries[key] = (time.time(), concepts)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class ConceptGraph:
+    """
+    Persistent term → concept edges learned from LLM expansions.
+
+    Each expansion adds its concepts to every topical term of the query; an
+    edge's weight is the running mean relevance and ``hits`` counts how often
+    it was observed. A query is answerable locally when enough of its terms
+    have been seen and they yield at least ``min_concepts`` concepts.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        min_concepts: int = 3,
+        min_term_coverage: float = 0.5,
+        max_edges_per_term: int = 25
+    ):
+        self.min_concepts = min_concepts
+        self.min_term_coverage = min_term_coverage
+        self.max_edges_per_term = max_edges_per_term
+        self._lock = threading.Lock()
+
+        self.db_path = db_path or os.path.join(
+            os.getenv('STORAGE_PATH', './storage'), 'concept_graph.db'
+        )
+        self._db = self._open(self.db_path)
+
+    def _open(self, db_path: str) -> Optional[sqlite3.Connection]:
+        try:
+            if db_path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            db = sqlite3.connect(db_path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS concept_edges (
+                    term TEXT NOT NULL,
+                    concept TEXT NOT NULL,
+                    weight REAL NOT NULL,
+                    hits INTEGER NOT NULL,
+                    updated_at REAL NOT NULL,
+                    PRIMARY KEY (term, concept)
+                )
+                """
+            )
+            db.commit()
+            return db
+        except Exception as e:
+            logger.warning(f"⚠️ Concept graph unavailable ({db_path}): {e}")
+            return None
+
+    def learn(self, query: str, concepts: List[Dict[str, Any]]):
+        """Fold one expansion into the graph"""
+        terms = query_terms(query)
+        if self._db is None or not terms or not concepts:
+            return
+        now = time.time()
+        rows = [
+            (term, c["concept"].strip().lower(), float(c.get("relevance", 0.5)), now)
+            for term in terms for c in concepts if c.get("concept", "").strip()
+        ]
+        try:
+            with self._lock:
+                self._db.executemany(
+                    """
+                    INSERT INTO concept_edges (term, concept, weight, hits, updated_at)
+                    VALUES (?, ?, ?, 1, ?)
+                    ON CONFLICT (term, concept) DO UPDATE SET
+                        weight = weight + (excluded.weight - weight) / (hits + 1),
+                        hits = hits + 1,
+                        updated_at = excluded.updated_at
+                    """,
+                    rows
+                )
+                for term in terms:
+                    self._db.execute(
+                        """
+                        DELETE FROM concept_edges WHERE term = ? AND concept NOT IN (
+                            SELECT concept FROM concept_edges WHERE term = ?
+                            ORDER BY hits * weight DESC LIMIT ?
+                        )
+                        """,
+                        (term, term, self.max_edges_per_term)
+                    )
+                self._db.commit()
+        except Exception as e:
+            logger.error(f"Failed to update concept graph: {e}")
+
+    def expand(self, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        """Concepts for ``query`` from the graph, or [] when coverage is too thin"""
+        terms = query_terms(query)
+        if self._db is None or not terms:
+            return []
+        placeholders = ",".join("?" for _ in terms)
+        try:
+            with self._lock:
+                rows = self._db.execute(
+                    f"SELECT term, concept, weight, hits FROM concept_edges WHERE term IN ({placeholders})",
+                    terms
+                ).fetchall()
+        except Exception as e:
+            logger.error(f"Concept graph lookup failed: {e}")
+            return []
+
+        covered = {row[0] for row in rows}
+        if len(covered) < max(1, self.min_term_coverage * len(terms)):
+            return []
+
+        scores: Dict[str, List[float]] = {}
+        for _, concept, weight, hits in rows:
+            if concept in terms:
+                continue
+            score = scores.setdefault(concept, [0.0, 0])
+            score[0] += weight
+            score[1] += hits
+        ranked = sorted(scores.items(), key=lambda item: (item[1][0], item[1][1]), reverse=True)
+        if len(ranked) < self.min_concepts:
+            return []
+        return [
+            {"concept": concept, "relevance": round(min(total / len(covered), 1.0), 3), "source": "concept_graph"}
+            for concept, (total, _) in ranked[:limit]
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        if self._db is None:
+            return {"persistent": False}
+        try:
+            with self._lock:
+                terms, edges = self._db.execute(
+                    "SELECT COUNT(DISTINCT term), COUNT(*) FROM concept_edges"
+                ).fetchone()
+            return {"persistent": True, "terms": terms, "edges": edges}
+        except Exception:
+            return {"persistent": True}
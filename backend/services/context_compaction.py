@@ -0,0 +1,308 @@
+"""
+🗜️ Context Window Compaction
+Keeps the conversation history sent to providers within a per-model token budget:
+a sliding window of recent turns, a rolling summary of older turns (computed once
+and cached per session), and retrieval of only the older turns relevant to the
+latest request.
+"""
+
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Tuple
+
+from .token_estimator import token_estimator, message_text as _message_text
+
+logger = logging.getLogger(__name__)
+
+_WORD_PATTERN = re.compile(r"[a-zA-Z0-9_]{4,}")
+
+# Context windows for models that are not in the Gemini registry
+PROVIDER_CONTEXT_WINDOWS = {
+    "claude": 200000,
+    "gpt-4o": 128000,
+    "gemini": 1048576
+}
+DEFAULT_CONTEXT_WINDOW = 32768
+
+
+def _keywords(text: str) -> set:
+    return set(word.lower() for word in _WORD_PATTERN.findall(text))
+
+
+@dataclass
+class CompactionResult:
+    """Compacted messages plus the accounting reported back to callers"""
+    messages: List[Dict[str, Any]]
+    original_tokens: int
+    compacted_tokens: int
+    budget_tokens: int
+    dropped_turns: int = 0
+    retrieved_turns: int = 0
+    summary_tokens: int = 0
+    summary_cached: bool = False
+
+    @property
+    def tokens_saved(self) -> int:
+        return max(self.original_tokens - self.compacted_tokens, 0)
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "original_tokens": self.original_tokens,
+            "compacted_tokens": self.compacted_tokens,
+            "tokens_saved": self.tokens_saved,
+            "budget_tokens": self.budget_tokens,
+            "dropped_turns": self.dropped_turns,
+            "retrieved_turns": self.retrieved_turns,
+            "summary_tokens": self.summary_tokens,
+            "summary_cached": self.summary_cached
+        }
+
+
+@dataclass
+class _SessionSummary:
+    summarized_upto: int = 0
+    lines: List[str] = field(default_factory=list)
+
+
+class ContextCompactor:
+    """
+    Compacts message histories before they are sent to a model.
+
+    The budget for a model is ``history_fraction`` of its context window (from
+    ``model_registry`` where known), capped at ``max_history_tokens`` so long
+    conversations stay cheap even on 1M-token models.
+    """
+
+    def __init__(
+        self,
+        max_history_tokens: Optional[int] = None,
+        history_fraction: float = 0.5,
+        summary_share: float = 0.15,
+        retrieval_share: float = 0.15,
+        max_summary_lines: int = 200,
+        max_sessions: int = 1000
+    ):
+        self.max_history_tokens = max_history_tokens or int(os.getenv('CONTEXT_MAX_HISTORY_TOKENS', 16000))
+        self.history_fraction = history_fraction
+        self.summary_share = summary_share
+        self.retrieval_share = retrieval_share
+        self.max_summary_lines = max_summary_lines
+        self.max_sessions = max_sessions
+
+        self._summaries: "OrderedDict[str, _SessionSummary]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.metrics = {
+            "requests": 0,
+            "compacted_requests": 0,
+            "tokens_saved_total": 0,
+            "summary_cache_hits": 0
+        }
+
+    # === BUDGETS ===
+
+    def get_context_window(self, model: str) -> int:
+        """Context window for a registry key, registry model id or chat model id"""
+        try:
+            from .orchestration.model_registry import GEMINI_REGISTRY
+        except ImportError:
+            GEMINI_REGISTRY = {}
+
+        if model in GEMINI_REGISTRY:
+            return GEMINI_REGISTRY[model].context_window
+        for registry_model in GEMINI_REGISTRY.values():
+            if registry_model.id == model or registry_model.id.endswith(f"/{model}"):
+                return registry_model.context_window
+        for prefix, window in PROVIDER_CONTEXT_WINDOWS.items():
+            if model.startswith(prefix):
+                return window
+        return DEFAULT_CONTEXT_WINDOW
+
+    def get_budget(self, model: str) -> int:
+        return min(int(self.get_context_window(model) * self.history_fraction), self.max_history_tokens)
+
+    # === COMPACTION ===
+
+    def compact(
+        self,
+        messages: List[Dict[str, Any]],
+        model: str,
+        session_id: Optional[str] = None,
+        query: Optional[str] = None,
+        budget_tokens: Optional[int] = None
+    ) -> CompactionResult:
+        """Return ``messages`` trimmed to the model's budget (unchanged if it already fits)"""
+        budget = budget_tokens or self.get_budget(model)
+        token_counts = [token_estimator.count_message(m, model) for m in messages]
+        original_tokens = sum(token_counts)
+        self.metrics["requests"] += 1
+
+        if original_tokens <= budget:
+            return CompactionResult(list(messages), original_tokens, original_tokens, budget)
+
+        system_indexes = [i for i, m in enumerate(messages) if m.get("role") == "system"]
+        turn_indexes = [i for i, m in enumerate(messages) if m.get("role") != "system"]
+        system_tokens = sum(token_counts[i] for i in system_indexes)
+        available = max(budget - system_tokens, 0)
+
+        # Sliding window of the most recent turns
+        window_budget = int(available * (1 - self.summary_share - self.retrieval_share))
+        window_start = len(turn_indexes)
+        used = 0
+        while window_start > 0:
+            cost = token_counts[turn_indexes[window_start - 1]]
+            if used + cost > window_budget and window_start < len(turn_indexes):
+                break
+            used += cost
+            window_start -= 1
+        # Providers expect the visible conversation to open with a user turn
+        while window_start < len(turn_indexes) - 1 and messages[turn_indexes[window_start]].get("role") != "user":
+            used -= token_counts[turn_indexes[window_start]]
+            window_start += 1
+
+        dropped = [messages[i] for i in turn_indexes[:window_start]]
+        window = [messages[i] for i in turn_indexes[window_start:]]
+
+        # Rolling summary of everything outside the window
+        summary_text, summary_cached = self._rolling_summary(session_id, dropped)
+        summary_text = self._trim_to_tokens(summary_text, int(available * self.summary_share), model)
+        summary_tokens = token_estimator.count(summary_text, model)
+
+        # Older turns relevant to the latest request, kept verbatim
+        if query is None:
+            query = next((_message_text(m) for m in reversed(window) if m.get("role") == "user"), "")
+        retrieval_budget = available - used - summary_tokens
+        retrieved_positions = self._retrieve_relevant(
+            dropped, [token_counts[i] for i in turn_indexes[:window_start]], query, retrieval_budget
+        )
+        retrieved = [dropped[p] for p in retrieved_positions]
+
+        compacted = self._assemble(
+            [messages[i] for i in system_indexes], summary_text, retrieved, window
+        )
+        compacted_tokens = sum(token_estimator.count_message(m, model) for m in compacted)
+
+        result = CompactionResult(
+            messages=compacted,
+            original_tokens=original_tokens,
+            compacted_tokens=compacted_tokens,
+            budget_tokens=budget,
+            dropped_turns=len(dropped) - len(retrieved),
+            retrieved_turns=len(retrieved),
+            summary_tokens=summary_tokens,
+            summary_cached=summary_cached
+        )
+        self.metrics["compacted_requests"] += 1
+        self.metrics["tokens_saved_total"] += result.tokens_saved
+        logger.debug(f"🗜️ Compacted context for {model}: {result.report()}")
+        return result
+
+    def _rolling_summary(self, session_id: Optional[str], dropped: List[Dict[str, Any]]) -> Tuple[str, bool]:
+        """Extend the session's cached summary with turns that left the window since last time"""
+        if not dropped:
+            return "", False
+        if session_id is None:
+            return "\n".join(self._summarize_turn(m) for m in dropped[-self.max_summary_lines:]), False
+
+        with self._lock:
+            summary = self._summaries.get(session_id)
+            cached = summary is not None and summary.summarized_upto <= len(dropped)
+            if not cached:
+                # New session, or the client rewrote its history: start over
+                summary = _SessionSummary()
+            for message in dropped[summary.summarized_upto:]:
+                summary.lines.append(self._summarize_turn(message))
+            summary.lines = summary.lines[-self.max_summary_lines:]
+            summary.summarized_upto = len(dropped)
+
+            self._summaries[session_id] = summary
+            self._summaries.move_to_end(session_id)
+            while len(self._summaries) > self.max_sessions:
+                self._summaries.popitem(last=False)
+
+        if cached:
+            self.metrics["summary_cache_hits"] += 1
+        return "\n".join(summary.lines), cached
+
+    @staticmethod
+    def _summarize_turn(message: Dict[str, Any], max_chars: int = 200) -> str:
+        text = " ".join(_message_text(message).split())
+        first_sentence = re.split(r"(?<=[.!?])\s", text, maxsplit=1)[0]
+        if len(first_sentence) > max_chars:
+            first_sentence = first_sentence[:max_chars].rstrip() + "…"
+        return f"- {message.get('role', 'user')}: {first_sentence}"
+
+    @staticmethod
+    def _trim_to_tokens(text: str, max_tokens: int, model: Optional[str] = None) -> str:
+        """Keep the most recent summary lines that fit in ``max_tokens``"""
+        if token_estimator.count(text, model) <= max_tokens:
+            return text
+        kept, used = [], 0
+        for line in reversed(text.split("\n")):
+            cost = token_estimator.count(line, model) + 1
+            if used + cost > max_tokens:
+                break
+            kept.append(line)
+            used += cost
+        return "\n".join(reversed(kept))
+
+    @staticmethod
+    def _retrieve_relevant(
+        dropped: List[Dict[str, Any]],
+        dropped_tokens: List[int],
+        query: str,
+        budget: int,
+        max_turns: int = 4
+    ) -> List[int]:
+        """Positions (in conversation order) of dropped turns sharing keywords with the query"""
+        query_words = _keywords(query)
+        if not query_words or budget <= 0:
+            return []
+        scored = []
+        for position, message in enumerate(dropped):
+            overlap = len(query_words & _keywords(_message_text(message)))
+            if overlap:
+                scored.append((overlap, position))
+        scored.sort(key=lambda item: (-item[0], -item[1]))
+
+        selected, used = [], 0
+        for _, position in scored[:max_turns]:
+            if used + dropped_tokens[position] <= budget:
+                selected.append(position)
+                used += dropped_tokens[position]
+        return sorted(selected)
+
+    @staticmethod
+    def _assemble(
+        system_messages: List[Dict[str, Any]],
+        summary_text: str,
+        retrieved: List[Dict[str, Any]],
+        window: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        summary_block = (
+            f"\n\nSummary of earlier conversation:\n{summary_text}" if summary_text else ""
+        )
+        compacted = [dict(m) for m in system_messages]
+        if summary_block:
+            if compacted:
+                compacted[-1]["content"] = _message_text(compacted[-1]) + summary_block
+            else:
+                compacted.append({"role": "user", "content": summary_block.strip()})
+        return compacted + list(retrieved) + list(window)
+
+    def render_history(self, messages: List[Dict[str, Any]]) -> str:
+        """Plain-text rendering for prompt-style (non-chat) model calls"""
+        return "\n".join(
+            f"{m.get('role', 'user')}: {_message_text(m)}" for m in messages
+        )
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {**self.metrics, "cached_sessions": len(self._summaries)}
+
+
+# Shared instance for routes and orchestration
+context_compactor = ContextCompactor()
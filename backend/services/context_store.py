@@ -0,0 +1,453 @@
+"""
+🗄️ Conversation Context Storage Engines
+Durable, per-user partitioned storage for conversation contexts and memory records.
+SQLite (WAL) is the default engine; an in-memory engine is available for tests.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_FIELDS_EXCLUDED = ('messages',)
+
+
+def _split_context(context: Dict[str, Any]) -> Tuple[Dict[str, Any], List[Dict[str, Any]]]:
+    """Separate the append-only message array from the rest of the context"""
+    meta = {k: v for k, v in context.items() if k not in CONTEXT_FIELDS_EXCLUDED}
+    return meta, list(context.get('messages') or [])
+
+
+def _history_digest(messages: List[Dict[str, Any]], upto: int) -> str:
+    """Digest of ``messages[:upto]``, used to tell an extended history from an edited one"""
+    digest = hashlib.blake2b(digest_size=16)
+    for message in messages[:upto]:
+        digest.update(json.dumps(message, sort_keys=True, default=str).encode('utf-8'))
+        digest.update(b'\n')
+    return digest.hexdigest()
+
+
+class ContextStorageEngine(ABC):
+    """
+    Interface shared by all context storage engines.
+
+    Contexts are partitioned by ``user_id`` and addressed by ``session_id``.
+    Messages are stored append-only: when the stored messages are an unchanged
+    prefix of the saved history, ``save_context`` only writes the messages past
+    them; an edited, replaced or shortened history is rewritten in full.
+    Memory records (relationships, stored memories) live in named namespaces.
+    """
+
+    @abstractmethod
+    def get_context(self, user_id: str, session_id: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def save_context(self, user_id: str, session_id: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        pass
+
+    @abstractmethod
+    def search_messages(self, user_id: str, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def get_user_stats(self, user_id: str) -> Dict[str, int]:
+        pass
+
+    @abstractmethod
+    def get_record(self, namespace: str, user_id: str, key: str) -> Optional[Dict[str, Any]]:
+        pass
+
+    @abstractmethod
+    def put_record(self, namespace: str, user_id: str, key: str, value: Dict[str, Any]):
+        pass
+
+    @abstractmethod
+    def get_totals(self) -> Dict[str, int]:
+        pass
+
+    @abstractmethod
+    def preview_keys(self, limit: int = 10) -> Dict[str, List[str]]:
+        pass
+
+
+class InMemoryContextStore(ContextStorageEngine):
+    """Process-local engine with the same semantics as the SQLite engine (for tests)"""
+
+    def __init__(self):
+        self._contexts: Dict[str, Dict[str, Dict[str, Any]]] = defaultdict(dict)
+        self._messages: Dict[str, Dict[str, List[Dict[str, Any]]]] = defaultdict(lambda: defaultdict(list))
+        self._records: Dict[str, Dict[str, Dict[str, Dict[str, Any]]]] = defaultdict(lambda: defaultdict(dict))
+        self._user_counters: Dict[str, Dict[str, int]] = defaultdict(lambda: {'contexts': 0, 'messages': 0})
+        self._totals: Dict[str, int] = defaultdict(int)
+        self._lock = threading.RLock()
+
+    def get_context(self, user_id: str, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            meta = self._contexts.get(user_id, {}).get(session_id)
+            if meta is None:
+                return None
+            context = dict(meta)
+            context['messages'] = list(self._messages[user_id][session_id])
+            return context
+
+    def save_context(self, user_id: str, session_id: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        meta, messages = _split_context(context)
+        with self._lock:
+            counters = self._user_counters[user_id]
+            if session_id not in self._contexts[user_id]:
+                counters['contexts'] += 1
+                self._totals['contexts'] += 1
+            self._contexts[user_id][session_id] = meta
+
+            stored = self._messages[user_id][session_id]
+            if len(messages) >= len(stored) and messages[:len(stored)] == stored:
+                new_messages = messages[len(stored):]
+                stored.extend(new_messages)
+                counters['messages'] += len(new_messages)
+                appended = len(new_messages)
+            else:
+                counters['messages'] += len(messages) - len(stored)
+                self._messages[user_id][session_id] = messages
+                appended = len(messages)
+        return {'appended_messages': appended, 'total_messages': len(messages)}
+
+    def search_messages(self, user_id: str, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        needle = query.lower()
+        results = []
+        with self._lock:
+            for session_id, messages in self._messages.get(user_id, {}).items():
+                for message in messages:
+                    if needle in str(message.get('content', '')).lower():
+                        results.append({
+                            'type': 'message',
+                            'content': message.get('content', ''),
+                            'timestamp': message.get('timestamp'),
+                            'context_id': f"{user_id}:{session_id}"
+                        })
+                        if len(results) >= limit:
+                            return results
+        return results
+
+    def get_user_stats(self, user_id: str) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._user_counters.get(user_id, {'contexts': 0, 'messages': 0}))
+
+    def get_record(self, namespace: str, user_id: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._records[namespace].get(user_id, {}).get(key)
+
+    def put_record(self, namespace: str, user_id: str, key: str, value: Dict[str, Any]):
+        with self._lock:
+            if key not in self._records[namespace][user_id]:
+                self._totals[namespace] += 1
+            self._records[namespace][user_id][key] = value
+
+    def get_totals(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self._totals)
+
+    def preview_keys(self, limit: int = 10) -> Dict[str, List[str]]:
+        with self._lock:
+            context_keys = [
+                f"{user_id}:{session_id}"
+                for user_id, sessions in self._contexts.items() for session_id in sessions
+            ][:limit]
+            record_keys = [
+                f"{namespace}:{user_id}:{key}"
+                for namespace, users in self._records.items()
+                for user_id, records in users.items() for key in records
+            ][:limit]
+        return {'context_keys': context_keys, 'memory_keys': record_keys}
+
+
+class SQLiteContextStore(ContextStorageEngine):
+    """
+    SQLite engine in WAL mode so several workers can share one database file.
+    Per-user and global counters are maintained in the same transaction as the
+    writes, so stats never need to scan contexts or messages.
+    """
+
+    SCHEMA = (
+        """
+        CREATE TABLE IF NOT EXISTS contexts (
+            user_id TEXT NOT NULL,
+            session_id TEXT NOT NULL,
+            meta TEXT NOT NULL,
+            message_count INTEGER NOT NULL DEFAULT 0,
+            history_digest TEXT,
+            PRIMARY KEY (user_id, session_id)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS context_messages (
+            user_id TEXT NOT NULL,
+            session_id TEXT NOT NULL,
+            seq INTEGER NOT NULL,
+            content TEXT NOT NULL,
+            message TEXT NOT NULL,
+            PRIMARY KEY (user_id, session_id, seq)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS memory_records (
+            namespace TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            record_key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            PRIMARY KEY (namespace, user_id, record_key)
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS user_counters (
+            user_id TEXT PRIMARY KEY,
+            contexts INTEGER NOT NULL DEFAULT 0,
+            messages INTEGER NOT NULL DEFAULT 0
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS store_counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        if db_path != ':memory:':
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+        self._local = threading.local()
+        self._shared_conn = (
+            sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+            if db_path == ':memory:' else None
+        )
+        self._lock = threading.RLock()
+        with self._transaction() as conn:
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+            columns = {row[1] for row in conn.execute('PRAGMA table_info(contexts)')}
+            if 'history_digest' not in columns:
+                # Databases created before the digest existed; their histories are rewritten on next save
+                conn.execute('ALTER TABLE contexts ADD COLUMN history_digest TEXT')
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._shared_conn is not None:
+            return self._shared_conn
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    class _Transaction:
+        def __init__(self, store: 'SQLiteContextStore', begin: str = 'BEGIN IMMEDIATE'):
+            self.store = store
+            self.begin = begin
+
+        def __enter__(self) -> sqlite3.Connection:
+            self.store._lock.acquire()
+            self.conn = self.store._connection()
+            self.conn.execute(self.begin)
+            return self.conn
+
+        def __exit__(self, exc_type, exc, tb):
+            try:
+                self.conn.execute('ROLLBACK' if exc_type else 'COMMIT')
+            finally:
+                self.store._lock.release()
+            return False
+
+    def _transaction(self) -> '_Transaction':
+        return self._Transaction(self)
+
+    def _read_transaction(self) -> '_Transaction':
+        """Deferred transaction: its SELECTs all see one snapshot of the database"""
+        return self._Transaction(self, 'BEGIN')
+
+    @staticmethod
+    def _bump(conn: sqlite3.Connection, name: str, delta: int):
+        conn.execute(
+            'INSERT INTO store_counters (name, value) VALUES (?, ?) '
+            'ON CONFLICT(name) DO UPDATE SET value = value + excluded.value',
+            (name, delta)
+        )
+
+    @staticmethod
+    def _bump_user(conn: sqlite3.Connection, user_id: str, contexts: int, messages: int):
+        conn.execute(
+            'INSERT INTO user_counters (user_id, contexts, messages) VALUES (?, ?, ?) '
+            'ON CONFLICT(user_id) DO UPDATE SET contexts = contexts + excluded.contexts, '
+            'messages = messages + excluded.messages',
+            (user_id, contexts, messages)
+        )
+
+    def get_context(self, user_id: str, session_id: str) -> Optional[Dict[str, Any]]:
+        # Meta and messages are read from the same snapshot, never across a concurrent save
+        with self._read_transaction() as conn:
+            row = conn.execute(
+                'SELECT meta FROM contexts WHERE user_id = ? AND session_id = ?',
+                (user_id, session_id)
+            ).fetchone()
+            if row is None:
+                return None
+            messages = conn.execute(
+                'SELECT message FROM context_messages WHERE user_id = ? AND session_id = ? ORDER BY seq',
+                (user_id, session_id)
+            ).fetchall()
+        context = json.loads(row[0])
+        context['messages'] = [json.loads(m[0]) for m in messages]
+        return context
+
+    def save_context(self, user_id: str, session_id: str, context: Dict[str, Any]) -> Dict[str, Any]:
+        meta, messages = _split_context(context)
+        with self._transaction() as conn:
+            row = conn.execute(
+                'SELECT message_count, history_digest FROM contexts WHERE user_id = ? AND session_id = ?',
+                (user_id, session_id)
+            ).fetchone()
+            is_new = row is None
+            stored_count, stored_digest = (0, None) if is_new else row
+
+            if is_new or (
+                len(messages) >= stored_count and _history_digest(messages, stored_count) == stored_digest
+            ):
+                start = stored_count
+            else:
+                # History was edited or rewritten client-side: replace instead of appending
+                conn.execute(
+                    'DELETE FROM context_messages WHERE user_id = ? AND session_id = ?',
+                    (user_id, session_id)
+                )
+                start = 0
+
+            conn.executemany(
+                'INSERT INTO context_messages (user_id, session_id, seq, content, message) VALUES (?, ?, ?, ?, ?)',
+                [
+                    (user_id, session_id, seq, str(message.get('content', '')).lower(), json.dumps(message, default=str))
+                    for seq, message in enumerate(messages[start:], start=start)
+                ]
+            )
+            conn.execute(
+                'INSERT INTO contexts (user_id, session_id, meta, message_count, history_digest) '
+                'VALUES (?, ?, ?, ?, ?) '
+                'ON CONFLICT(user_id, session_id) DO UPDATE SET meta = excluded.meta, '
+                'message_count = excluded.message_count, history_digest = excluded.history_digest',
+                (user_id, session_id, json.dumps(meta, default=str), len(messages),
+                 _history_digest(messages, len(messages)))
+            )
+            self._bump_user(conn, user_id, 1 if is_new else 0, len(messages) - stored_count)
+            if is_new:
+                self._bump(conn, 'contexts', 1)
+
+        return {'appended_messages': len(messages) - start, 'total_messages': len(messages)}
+
+    def search_messages(self, user_id: str, query: str, limit: int = 10) -> List[Dict[str, Any]]:
+        pattern = '%' + query.lower().replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT session_id, message FROM context_messages "
+                "WHERE user_id = ? AND content LIKE ? ESCAPE '\\' LIMIT ?",
+                (user_id, pattern, limit)
+            ).fetchall()
+        results = []
+        for session_id, raw in rows:
+            message = json.loads(raw)
+            results.append({
+                'type': 'message',
+                'content': message.get('content', ''),
+                'timestamp': message.get('timestamp'),
+                'context_id': f"{user_id}:{session_id}"
+            })
+        return results
+
+    def get_user_stats(self, user_id: str) -> Dict[str, int]:
+        with self._lock:
+            row = self._connection().execute(
+                'SELECT contexts, messages FROM user_counters WHERE user_id = ?', (user_id,)
+            ).fetchone()
+        return {'contexts': row[0], 'messages': row[1]} if row else {'contexts': 0, 'messages': 0}
+
+    def get_record(self, namespace: str, user_id: str, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._connection().execute(
+                'SELECT value FROM memory_records WHERE namespace = ? AND user_id = ? AND record_key = ?',
+                (namespace, user_id, key)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_record(self, namespace: str, user_id: str, key: str, value: Dict[str, Any]):
+        with self._transaction() as conn:
+            exists = conn.execute(
+                'SELECT 1 FROM memory_records WHERE namespace = ? AND user_id = ? AND record_key = ?',
+                (namespace, user_id, key)
+            ).fetchone()
+            conn.execute(
+                'INSERT OR REPLACE INTO memory_records (namespace, user_id, record_key, value) VALUES (?, ?, ?, ?)',
+                (namespace, user_id, key, json.dumps(value, default=str))
+            )
+            if not exists:
+                self._bump(conn, namespace, 1)
+
+    def get_totals(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._connection().execute('SELECT name, value FROM store_counters').fetchall()
+        return {name: value for name, value in rows}
+
+    def preview_keys(self, limit: int = 10) -> Dict[str, List[str]]:
+        conn = self._connection()
+        with self._lock:
+            contexts = conn.execute(
+                'SELECT user_id, session_id FROM contexts LIMIT ?', (limit,)
+            ).fetchall()
+            records = conn.execute(
+                'SELECT namespace, user_id, record_key FROM memory_records LIMIT ?', (limit,)
+            ).fetchall()
+        return {
+            'context_keys': [f"{u}:{s}" for u, s in contexts],
+            'memory_keys': [f"{n}:{u}:{k}" for n, u, k in records]
+        }
+
+
+def create_context_store(backend: Optional[str] = None, db_path: Optional[str] = None) -> ContextStorageEngine:
+    """
+    Build the configured context storage engine.
+
+    ``CONTEXT_STORE_BACKEND`` selects ``sqlite`` (default) or ``memory``;
+    ``CONTEXT_STORE_PATH`` overrides the SQLite file location.
+    """
+    backend = (backend or os.getenv('CONTEXT_STORE_BACKEND', 'sqlite')).lower()
+    if backend == 'memory':
+        return InMemoryContextStore()
+
+    db_path = db_path or os.getenv(
+        'CONTEXT_STORE_PATH',
+        os.path.join(os.getenv('STORAGE_PATH', './storage'), 'conversation_contexts.db')
+    )
+    try:
+        return SQLiteContextStore(db_path)
+    except Exception as e:
+        logger.warning(f"⚠️ SQLite context store unavailable ({db_path}), using in-memory store: {e}")
+        return InMemoryContextStore()
+
+
+def new_context(now: Optional[str] = None) -> Dict[str, Any]:
+    """Empty context returned for sessions that have never been saved"""
+    now = now or datetime.utcnow().isoformat()
+    return {
+        'messages': [],
+        'relationships': {},
+        'preferences': {},
+        'created_at': now,
+        'updated_at': now
+    }
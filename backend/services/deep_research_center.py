@@ -9,8 +9,10 @@ from typing import Dict, Any, List, Optional, Tuple
 from datetime import datetime
 from enum import Enum
 import json
-import anthropic
-import google.generativeai as genai
+from .lazy_import import lazy_import
+
+anthropic = lazy_import("anthropic")
+genai = lazy_import("google.generativeai")
 
 logger = logging.getLogger(__name__)
 
@@ -1,10 +1,32 @@
 # Enhanced Mama Bear Code Execution with E2B Integration
 import asyncio
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Awaitable, Callable, Optional, List
 import logging
-from e2b_code_interpreter import Sandbox
 import os
+import threading
 from dataclasses import dataclass
+from .lazy_import import lazy_import, ensure_loaded
+from .output_limiter import OutputLimiter
+from .sandbox_pool import SandboxPool, SandboxFactory, FakeSandbox
+
+# E2B is optional so the pool can run offline against FakeSandbox
+try:
+    e2b_code_interpreter = lazy_import("e2b_code_interpreter")
+    E2B_AVAILABLE = True
+except ImportError:
+    e2b_code_interpreter = None
+    E2B_AVAILABLE = False
+
+# E2B template per language; everything else runs in the python template
+SANDBOX_TEMPLATES = {"python": "python"}
+
+def _parse_pool_sizes(spec: str) -> Dict[str, int]:
+    """'python:2,node:1' -> {'python': 2, 'node': 1}"""
+    sizes = {}
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        template, _, count = item.partition(':')
+        sizes[template] = int(count or 1)
+    return sizes
 
 @dataclass
 class CodeExecutionResult:
@@ -17,15 +39,44 @@ class CodeExecutionResult:
 class EnhancedMamaBearCodeExecution:
     """🐻 Enhanced Mama Bear Code Execution with E2B Secure Sandboxing"""
     
-    def __init__(self):
+    def __init__(self, sandbox_factory: Optional[SandboxFactory] = None):
         self.logger = logging.getLogger(__name__)
         # E2B API key should be set in environment
         self.api_key = os.getenv('E2B_API_KEY')
-        if not self.api_key:
+        use_fake = os.getenv('E2B_FAKE_SANDBOX', 'false').lower() == 'true'
+        if not self.api_key and not use_fake and sandbox_factory is None:
             self.logger.warning("E2B_API_KEY not found, code execution will be limited")
         
-        # Track execution sessions for better performance
-        self.active_sessions = {}
+        if sandbox_factory is None:
+            sandbox_factory = FakeSandbox.factory() if use_fake else self._create_e2b_sandbox
+        
+        # Pre-warmed sandboxes per template, assigned to user sessions on demand
+        default_warm = 'python:1' if (self.api_key or use_fake) else ''
+        self.pool = SandboxPool(
+            sandbox_factory,
+            warm_per_template=_parse_pool_sizes(os.getenv('E2B_POOL_WARM', default_warm)),
+            max_total=int(os.getenv('E2B_POOL_MAX_TOTAL', 20)),
+            idle_timeout_seconds=float(os.getenv('E2B_SANDBOX_IDLE_TIMEOUT', 600)),
+            min_session_idle_seconds=float(os.getenv('E2B_POOL_MIN_EVICT_IDLE_SECONDS', 60))
+        )
+    
+    @property
+    def active_sessions(self) -> Dict[str, Any]:
+        """Sandboxes currently assigned to user sessions, by session key"""
+        return {key: self.pool.get_session(key) for key in self.pool.session_keys()}
+    
+    async def _create_e2b_sandbox(self, template: str):
+        if not E2B_AVAILABLE:
+            raise RuntimeError("e2b_code_interpreter is not installed")
+        try:
+            ensure_loaded("e2b_code_interpreter")
+        except ImportError as e:
+            raise RuntimeError(str(e)) from e
+        # Create new E2B sandbox using v1.5+ API; it is ready after create()
+        return await e2b_code_interpreter.Sandbox.create(
+            template=template,
+            api_key=self.api_key
+        )
         
     async def execute_code_safely(self, 
                                 code: str, 
@@ -38,14 +89,13 @@ class EnhancedMamaBearCodeExecution:
         start_time = asyncio.get_event_loop().time()
         
         try:
-            # Get or create sandbox session for user
-            sandbox = await self._get_or_create_sandbox(user_id, language)
-            
-            # Execute the code with E2B v1.5+ API
+            # Execute the code with E2B v1.5+ API in the user's session sandbox
             try:
-                execution = sandbox.run_code(code)
                 # Use asyncio.wait_for on the execution result, not the execution object
-                result = await asyncio.wait_for(execution.wait(), timeout=timeout)
+                result = await self._run_in_session(
+                    user_id, language,
+                    lambda sandbox: asyncio.wait_for(sandbox.run_code(code).wait(), timeout=timeout)
+                )
                 
                 execution_time = asyncio.get_event_loop().time() - start_time
                 
@@ -71,38 +121,111 @@ class EnhancedMamaBearCodeExecution:
                 execution_time=asyncio.get_event_loop().time() - start_time
             )
     
-    async def _get_or_create_sandbox(self, user_id: str, language: str) -> Sandbox:
-        """Get existing sandbox or create new one for user session"""
-        session_key = f"{user_id}_{language}"
+    async def execute_code_streaming(self,
+                                   code: str,
+                                   user_id: str,
+                                   language: str = "python",
+                                   timeout: int = 30,
+                                   on_output: Optional[Callable[[str, str], None]] = None,
+                                   cancel_event: Optional[threading.Event] = None,
+                                   max_output_bytes: Optional[int] = None) -> CodeExecutionResult:
+        """
+        Execute code in the user's sandbox, passing stdout/stderr chunks to
+        ``on_output(stream, text)`` as they are produced
         
-        if session_key not in self.active_sessions:
-            try:
-                # Create new E2B sandbox using v1.5+ API
-                sandbox = await Sandbox.create(
-                    template="python",  # or "node", "bash", etc.
-                    api_key=self.api_key
-                )
-                # No need to call start() in v1.5+, sandbox is ready after create()
-                self.active_sessions[session_key] = sandbox
-                self.logger.info(f"Created new E2B sandbox for session {session_key}")
-                
-            except Exception as e:
-                self.logger.error(f"Failed to create E2B sandbox: {str(e)}")
-                raise e
+        Output beyond ``max_output_bytes`` is dropped behind a truncation marker.
+        Setting ``cancel_event`` (from any thread) or hitting the timeout closes
+        the session's sandbox, which kills the running code; the next execution
+        gets a fresh sandbox from the pool.
+        """
+        loop = asyncio.get_running_loop()
+        start_time = loop.time()
+        limiter = OutputLimiter(max_output_bytes) if max_output_bytes else OutputLimiter()
+        
+        def forward(stream: str):
+            def callback(message):
+                text = getattr(message, 'line', message)
+                chunk = limiter.feed(stream, text if isinstance(text, str) else str(text))
+                if chunk and on_output is not None:
+                    on_output(stream, chunk)
+            return callback
+        
+        try:
+            # Callbacks fire on the pool loop's thread; the limiter is only read once it's done
+            waiter = asyncio.ensure_future(self._run_in_session(
+                user_id, language,
+                lambda sandbox: sandbox.run_code(
+                    code, on_stdout=forward('stdout'), on_stderr=forward('stderr')
+                ).wait()
+            ))
+            
+            stopped = None
+            deadline = start_time + timeout
+            while not waiter.done():
+                await asyncio.wait({waiter}, timeout=0.1)
+                if waiter.done():
+                    break
+                if cancel_event is not None and cancel_event.is_set():
+                    stopped = "Execution cancelled"
+                elif loop.time() >= deadline:
+                    stopped = f"Code execution timed out after {timeout} seconds"
+                if stopped:
+                    waiter.cancel()
+                    await self.cleanup_session(user_id, language)
+                    return CodeExecutionResult(
+                        success=False,
+                        output=limiter.text('stdout'),
+                        error=stopped,
+                        execution_time=loop.time() - start_time,
+                        logs=[f"output_truncated={limiter.truncated}"]
+                    )
+            
+            result = waiter.result()
+            output = limiter.text('stdout')
+            if not output:
+                # Nothing streamed (e.g. only a final expression value): report the result text
+                output = getattr(result, 'text', None) or ''
+            return CodeExecutionResult(
+                success=True,
+                output=output,
+                error=limiter.text('stderr') or None,
+                execution_time=loop.time() - start_time,
+                logs=[f"output_truncated={limiter.truncated}"]
+            )
+        except Exception as e:
+            self.logger.error(f"Streaming execution failed for user {user_id}: {str(e)}")
+            return CodeExecutionResult(
+                success=False,
+                output=limiter.text('stdout'),
+                error=str(e),
+                execution_time=loop.time() - start_time
+            )
+    
+    async def _get_or_create_sandbox(self, user_id: str, language: str) -> "e2b_code_interpreter.Sandbox":
+        """Get the user's session sandbox, assigning a pre-warmed (or new) one if needed"""
+        session_key = f"{user_id}_{language}"
         
-        return self.active_sessions[session_key]
+        try:
+            return await self.pool.acquire(session_key, SANDBOX_TEMPLATES.get(language, "python"))
+        except Exception as e:
+            self.logger.error(f"Failed to create E2B sandbox: {str(e)}")
+            raise e
+    
+    async def _run_in_session(self, user_id: str, language: str, operation: Callable[[Any], Awaitable[Any]]) -> Any:
+        """
+        Run ``operation(sandbox)`` against the user's session sandbox on the
+        pool loop, where the sandbox's client was created (E2B's async client
+        keeps its HTTP connections on that loop)
+        """
+        session_key = f"{user_id}_{language}"
+        return await self.pool.run(session_key, SANDBOX_TEMPLATES.get(language, "python"), operation)
     
     async def cleanup_session(self, user_id: str, language: str = "python"):
         """Clean up sandbox session for user"""
         session_key = f"{user_id}_{language}"
         
-        if session_key in self.active_sessions:
-            try:
-                await self.active_sessions[session_key].close()
-                del self.active_sessions[session_key]
-                self.logger.info(f"Cleaned up session {session_key}")
-            except Exception as e:
-                self.logger.error(f"Error cleaning up session {session_key}: {str(e)}")
+        if await self.pool.release(session_key):
+            self.logger.info(f"Cleaned up session {session_key}")
     
     async def install_packages(self, 
                              user_id: str, 
@@ -136,11 +259,10 @@ class EnhancedMamaBearCodeExecution:
         """Get information about active session"""
         session_key = f"{user_id}_{language}"
         
-        if session_key not in self.active_sessions:
+        sandbox = self.pool.get_session(session_key)
+        if sandbox is None:
             return {"active": False, "session_key": session_key}
         
-        sandbox = self.active_sessions[session_key]
-        
         try:
             # Get basic session info
             return {
@@ -155,14 +277,13 @@ class EnhancedMamaBearCodeExecution:
             return {"active": False, "error": str(e)}
     
     async def cleanup_all_sessions(self):
-        """Clean up all active sessions"""
-        for session_key in list(self.active_sessions.keys()):
-            try:
-                await self.active_sessions[session_key].close()
-                del self.active_sessions[session_key]
-                self.logger.info(f"Cleaned up session {session_key}")
-            except Exception as e:
-                self.logger.error(f"Error cleaning up session {session_key}: {str(e)}")
+        """Clean up all active sessions and pre-warmed sandboxes"""
+        await self.pool.close_all()
+        self.logger.info("Cleaned up all sandbox sessions")
+    
+    def get_pool_metrics(self) -> Dict[str, Any]:
+        """Sandbox pool hits, boot latency and idle counts"""
+        return self.pool.get_metrics()
 
 # Global instance for the application
 mama_bear_code_executor = EnhancedMamaBearCodeExecution()
\ No newline at end of file
@@ -12,8 +12,10 @@ from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 import json
-import google.generativeai as genai
 from collections import defaultdict, deque
+from .lazy_import import lazy_import
+
+genai = lazy_import("google.generativeai")
 
 logger = logging.getLogger(__name__)
 
@@ -7,6 +7,7 @@ Implements next-level browser control, shared sessions, and CUA capabilities
 import asyncio
 import json
 import logging
+import os
 import aiohttp
 import uuid
 from typing import Dict, List, Optional, Any, Callable
@@ -16,8 +17,17 @@ from enum import Enum
 import base64
 import hashlib
 
+from .instance_pool import InstancePool, FakeInstanceProvider, Lease, parse_warm_profiles, profile_config
+from .research_batching import ResearchSynthesis, dedupe_queries
+from .computer_action_pipeline import VerdictCache, BatchedAuditLog, target_key
+
 logger = logging.getLogger(__name__)
 
+AUTHENTICATED_SESSION_HOURS = 8
+
+RESEARCH_MAX_CONCURRENCY = int(os.getenv('RESEARCH_MAX_CONCURRENCY', 4))
+RESEARCH_QUERY_TIMEOUT = float(os.getenv('RESEARCH_QUERY_TIMEOUT', 120))
+
 class SessionType(Enum):
     BROWSER = "browser"
     UBUNTU = "ubuntu"
@@ -33,6 +43,9 @@ class ComputerAction(Enum):
     FORM_FILL = "form_fill"
     EXTRACT_DATA = "extract_data"
 
+# Actions that don't change page state, so consecutive ones can be in flight together
+READ_ONLY_ACTIONS = frozenset({ComputerAction.SCREENSHOT, ComputerAction.EXTRACT_DATA})
+
 @dataclass
 class SharedBrowserSession:
     """Represents a shared browser session between user and Mama Bear"""
@@ -72,10 +85,53 @@ class AuthenticationFlow:
     auto_refresh: bool = True
     security_level: str = "high"
 
+class ScrapybaraInstanceProvider:
+    """
+    Instance provider for InstancePool backed by the Scrapybara REST API.
+    It keeps its own HTTP session, because the pool calls it from the pool's loop.
+    """
+
+    def __init__(self, manager: 'EnhancedScrapybaraManager'):
+        self.manager = manager
+        self.session: Optional[aiohttp.ClientSession] = None
+
+    async def _session(self) -> aiohttp.ClientSession:
+        if self.session is None:
+            self.session = aiohttp.ClientSession(
+                headers={'Authorization': f'Bearer {self.manager.api_key}'},
+                timeout=aiohttp.ClientTimeout(total=60)
+            )
+        return self.session
+
+    async def start(self, kind: str, config: Dict[str, Any]) -> Dict[str, Any]:
+        session = await self._session()
+        response = await session.post(
+            f"{self.manager.base_url}/instances",
+            json={"type": kind, "config": config}
+        )
+        if response.status != 200:
+            error_text = await response.text()
+            raise RuntimeError(f'Failed to start {kind} instance: {error_text}')
+        return await response.json()
+
+    async def stop(self, instance_id: str):
+        session = await self._session()
+        response = await session.delete(f"{self.manager.base_url}/instances/{instance_id}")
+        if response.status not in (200, 204, 404):
+            raise RuntimeError(f'Failed to stop instance {instance_id}: {await response.text()}')
+
+    async def is_healthy(self, instance_id: str) -> bool:
+        session = await self._session()
+        response = await session.get(f"{self.manager.base_url}/instances/{instance_id}")
+        if response.status != 200:
+            return False
+        return (await response.json()).get('status', 'running') == 'running'
+
+
 class EnhancedScrapybaraManager:
     """Enhanced Scrapybara manager with CUA and collaboration features"""
     
-    def __init__(self, config: Optional[Dict[str, Any]] = None):
+    def __init__(self, config: Optional[Dict[str, Any]] = None, instance_provider: Optional[Any] = None):
         if config is None:
             config = {
                 'scrapybara_api_key': None,
@@ -86,15 +142,32 @@ class EnhancedScrapybaraManager:
         self.api_key = config.get('scrapybara_api_key')
         self.base_url = config.get('scrapybara_base_url', 'https://api.scrapybara.com/v1')
         
-        # Instance management
+        # Instance management: instances are leased from a warm pool keyed by
+        # (type, configuration) and returned to it when a flow is done
         self.instances = {}
         self.shared_sessions = {}
         self.authenticated_sessions = {}
+        self.research_environments = {}
+        use_fake = os.getenv('SCRAPYBARA_FAKE_INSTANCES', 'false').lower() == 'true'
+        if instance_provider is None:
+            instance_provider = FakeInstanceProvider() if use_fake else ScrapybaraInstanceProvider(self)
+        # Warm spares per instance profile (see instance_pool.INSTANCE_PROFILES)
+        default_warm = 'ubuntu:1,shared_browser:1' if (self.api_key or use_fake) else ''
+        self.instance_pool = InstancePool(
+            instance_provider,
+            warm=parse_warm_profiles(os.getenv('SCRAPYBARA_POOL_WARM', default_warm)),
+            max_total=int(os.getenv('SCRAPYBARA_POOL_MAX_TOTAL', 10)),
+            idle_timeout_seconds=float(os.getenv('SCRAPYBARA_INSTANCE_IDLE_TIMEOUT', 300)),
+            max_lease_seconds=float(os.getenv('SCRAPYBARA_LEASE_MAX_SECONDS', 3600)),
+            health_check_interval=float(os.getenv('SCRAPYBARA_HEALTH_CHECK_INTERVAL', 30)),
+            on_lease_expired=self._forget_lease
+        )
         
         # Computer Use Agent integration
         self.cua_enabled = config.get('enable_cua', True)
         self.permission_manager = PermissionManager()
         self.action_auditor = ActionAuditor()
+        self.safety_verdicts = VerdictCache()
         
         # Collaboration features
         self.collaboration_sessions = {}
@@ -117,6 +190,7 @@ class EnhancedScrapybaraManager:
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
+        await self.action_auditor.sink.flush()
         if self.session:
             await self.session.close()
     
@@ -158,31 +232,26 @@ class EnhancedScrapybaraManager:
         
         try:
             # Primary research instance
-            research_instance = await self.start_ubuntu(
-                environment_config={
-                    'name': f'research_{research_topic}',
-                    'packages': ['python3', 'nodejs', 'curl', 'wget'],
-                    'user_id': user_id
-                }
+            research_instance = await self._lease_profile(
+                'research', name=f'research_{research_topic}', user_id=user_id
             )
             instances.append(research_instance)
             
             # Dedicated data collection instance  
-            data_instance = await self.start_browser(
-                browser_config={
-                    'name': f'data_collection_{research_topic}',
-                    'extensions': ['ublock_origin', 'json_viewer'],
-                    'user_id': user_id
-                }
+            data_instance = await self._lease_profile(
+                'data_browser', name=f'data_collection_{research_topic}', user_id=user_id
             )
             instances.append(data_instance)
             
             # Configure each instance for specific research tasks
             await self._configure_research_tools(instances, research_topic)
             
+            environment_id = f'research_{uuid.uuid4().hex[:8]}'
+            self.research_environments[environment_id] = [inst['instance_id'] for inst in instances]
+            
             return {
                 'success': True,
-                'research_environment_id': f'research_{uuid.uuid4().hex[:8]}',
+                'research_environment_id': environment_id,
                 'instances': [inst['instance_id'] for inst in instances],
                 'primary_instance': research_instance['instance_id'],
                 'data_instance': data_instance['instance_id'],
@@ -192,18 +261,28 @@ class EnhancedScrapybaraManager:
             
         except Exception as e:
             logger.error(f"Error creating research environment: {e}")
+            for instance in instances:
+                if 'instance_id' in instance:
+                    await self.release_instance(instance['instance_id'])
             return {'success': False, 'error': str(e)}
     
+    async def close_research_environment(self, environment_id: str) -> bool:
+        """Return a research environment's instances to the pool"""
+        instance_ids = self.research_environments.pop(environment_id, None)
+        if instance_ids is None:
+            return False
+        for instance_id in instance_ids:
+            await self.release_instance(instance_id)
+        return True
+    
     async def start_shared_browser_session(self, user_id: str, agent_id: str) -> SharedBrowserSession:
         """Start a shared browser session between user and Mama Bear"""
         try:
             # Create browser instance
-            instance_result = await self.start_browser({
-                'shared_mode': True,
-                'user_id': user_id,
-                'collaboration_enabled': True
-            })
+            instance_result = await self._lease_profile('shared_browser', user_id=user_id)
             
+            if 'error' in instance_result:
+                raise RuntimeError(instance_result['error'])
             instance_id = instance_result['instance_id']
             
             # Generate session details
@@ -241,12 +320,20 @@ class EnhancedScrapybaraManager:
             logger.error(f"Error starting shared browser session: {e}")
             raise
     
+    async def end_shared_browser_session(self, session_id: str) -> bool:
+        """End a shared session and return its browser to the pool"""
+        session = self.shared_sessions.pop(session_id, None)
+        if session is None:
+            return False
+        await self.release_instance(session.instance_id)
+        return True
+    
     async def execute_computer_action(self, action_request: ComputerActionRequest) -> Dict[str, Any]:
         """Execute computer control action with safety checks"""
         try:
             # Safety analysis
             if not action_request.safety_checked:
-                safety_result = await self._analyze_action_safety(action_request)
+                safety_result = await self._cached_action_safety(action_request)
                 if not safety_result['safe']:
                     return {
                         'success': False,
@@ -280,6 +367,102 @@ class EnhancedScrapybaraManager:
             logger.error(f"Error executing computer action: {e}")
             return {'success': False, 'error': str(e)}
     
+    async def execute_computer_actions(self, action_requests: List[ComputerActionRequest],
+                                       stop_on_failure: bool = True) -> Dict[str, Any]:
+        """
+        Execute a sequence of computer control actions as one batch.
+        
+        The whole sequence is validated (safety and permissions, both cached)
+        before anything runs, so a blocked step stops the batch up front
+        instead of halfway. Consecutive read-only actions are dispatched
+        together; audit records for the batch are written in one go.
+        """
+        try:
+            validation = await self._validate_action_sequence(action_requests)
+            if not validation['valid']:
+                return {
+                    'success': False,
+                    'error': 'Action sequence blocked',
+                    'blocked': validation['blocked'],
+                    'actions_executed': 0,
+                    'results': []
+                }
+            
+            executed: List[ComputerActionRequest] = []
+            results: List[Dict[str, Any]] = []
+            for group in self._pipeline_groups(action_requests):
+                group_results = await asyncio.gather(*(self._execute_cua_action(a) for a in group))
+                executed.extend(group)
+                results.extend(group_results)
+                if stop_on_failure and not all(r.get('success') for r in group_results):
+                    break
+            
+            await self.action_auditor.log_actions(list(zip(executed, results)), flush=True)
+            
+            return {
+                'success': len(results) == len(action_requests) and all(r.get('success') for r in results),
+                'actions_executed': len(results),
+                'total_actions': len(action_requests),
+                'results': results
+            }
+            
+        except Exception as e:
+            logger.error(f"Error executing computer action batch: {e}")
+            return {'success': False, 'error': str(e)}
+    
+    async def _validate_action_sequence(self, action_requests: List[ComputerActionRequest]) -> Dict[str, Any]:
+        """Safety and permission verdicts for every action in a sequence"""
+        blocked = []
+        for position, action_request in enumerate(action_requests):
+            if not action_request.safety_checked:
+                safety_result = await self._cached_action_safety(action_request)
+                if not safety_result['safe']:
+                    blocked.append({
+                        'position': position,
+                        'action_id': action_request.action_id,
+                        'error': 'Action blocked by safety analysis',
+                        'safety_concerns': safety_result['concerns']
+                    })
+                    continue
+                action_request.safety_checked = True
+            
+            permission_result = await self.permission_manager.check_permission(
+                action_request.user_id,
+                action_request.action_type,
+                action_request.permission_level
+            )
+            if not permission_result['granted']:
+                blocked.append({
+                    'position': position,
+                    'action_id': action_request.action_id,
+                    'error': 'Insufficient permissions',
+                    'required_permission': permission_result['required']
+                })
+        return {'valid': not blocked, 'blocked': blocked}
+    
+    async def _cached_action_safety(self, action_request: ComputerActionRequest) -> Dict[str, Any]:
+        """``_analyze_action_safety`` memoized per (user, action type, target)"""
+        # Typed text is part of what makes a TYPE action (un)safe
+        parameters = action_request.parameters if action_request.action_type == ComputerAction.TYPE else None
+        key = (action_request.user_id, action_request.action_type, target_key(action_request.target, parameters))
+        verdict = self.safety_verdicts.get(key)
+        if verdict is None:
+            verdict = await self._analyze_action_safety(action_request)
+            self.safety_verdicts.put(key, verdict)
+        return verdict
+    
+    @staticmethod
+    def _pipeline_groups(action_requests: List[ComputerActionRequest]) -> List[List[ComputerActionRequest]]:
+        """Split a sequence into runs of read-only actions and single state-changing actions"""
+        groups: List[List[ComputerActionRequest]] = []
+        for action_request in action_requests:
+            if (action_request.action_type in READ_ONLY_ACTIONS and groups
+                    and all(a.action_type in READ_ONLY_ACTIONS for a in groups[-1])):
+                groups[-1].append(action_request)
+            else:
+                groups.append([action_request])
+        return groups
+    
     async def login_to_service(self, service_name: str, user_id: str, 
                              credentials_vault_key: str) -> Dict[str, Any]:
         """Securely log into services using saved credentials"""
@@ -289,12 +472,16 @@ class EnhancedScrapybaraManager:
             
             auth_flow = self.auth_flows[service_name]
             
-            # Create browser instance for authentication
-            instance = await self.start_browser({
-                'purpose': 'authentication',
-                'service': service_name,
-                'user_id': user_id
-            })
+            # Lease a browser for authentication; it is held for as long as the session is valid
+            instance = await self._lease_profile(
+                'browser',
+                max_lifetime=AUTHENTICATED_SESSION_HOURS * 3600,
+                purpose='authentication',
+                service=service_name,
+                user_id=user_id
+            )
+            if 'error' in instance:
+                return {'success': False, 'error': instance['error']}
             
             instance_id = instance['instance_id']
             
@@ -316,7 +503,7 @@ class EnhancedScrapybaraManager:
                     'service': service_name,
                     'user_id': user_id,
                     'authenticated_at': datetime.now(),
-                    'expires_at': datetime.now() + timedelta(hours=8),
+                    'expires_at': datetime.now() + timedelta(hours=AUTHENTICATED_SESSION_HOURS),
                     'session_data': auth_result.get('session_data', {})
                 }
                 
@@ -330,6 +517,8 @@ class EnhancedScrapybaraManager:
                     'expires_at': self.authenticated_sessions[session_key]['expires_at'].isoformat()
                 }
             else:
+                # A half-finished login must not be handed to a later lease
+                await self.release_instance(instance_id, reusable=False)
                 return {'success': False, 'error': auth_result.get('error', 'Authentication failed')}
                 
         except Exception as e:
@@ -337,39 +526,81 @@ class EnhancedScrapybaraManager:
             return {'success': False, 'error': str(e)}
     
     async def execute_collaborative_research(self, research_queries: List[str], 
-                                           user_id: str) -> Dict[str, Any]:
-        """Execute multiple research tasks in parallel"""
+                                           user_id: str,
+                                           max_concurrency: Optional[int] = None,
+                                           query_timeout: Optional[float] = None,
+                                           on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Execute research queries in parallel on pooled instances.
+        
+        Duplicate queries run once. At most ``max_concurrency`` instances are
+        leased; each works through queries until none are left, and a query
+        that exceeds ``query_timeout`` fails alone (its instance is discarded
+        and replaced). ``on_result`` is called as each query finishes with
+        the query, its result and the synthesis so far.
+        """
         try:
-            tasks = []
-            instances = []
-            
-            for i, query in enumerate(research_queries):
-                # Create instance for this query
-                instance = await self.start_ubuntu({
-                    'name': f'research_task_{i}',
-                    'user_id': user_id,
-                    'query': query
-                })
-                instances.append(instance)
-                
-                # Create research task
-                task = self._execute_research_task(instance['instance_id'], query)
-                tasks.append(task)
-            
-            # Execute all tasks in parallel
-            results = await asyncio.gather(*tasks, return_exceptions=True)
-            
-            # Synthesize results
-            synthesized_results = await self._synthesize_research_results(
-                research_queries, 
-                results
-            )
+            unique_queries, mapping = dedupe_queries(research_queries)
+            max_concurrency = max_concurrency or RESEARCH_MAX_CONCURRENCY
+            query_timeout = query_timeout or RESEARCH_QUERY_TIMEOUT
+            
+            pending: asyncio.Queue = asyncio.Queue()
+            for index, query in enumerate(unique_queries):
+                pending.put_nowait((index, query))
+            results: List[Any] = [None] * len(unique_queries)
+            synthesis = ResearchSynthesis(len(unique_queries))
+            instances_used: List[str] = []
+            
+            async def worker(slot: int):
+                instance_id = None
+                try:
+                    while not pending.empty():
+                        index, query = pending.get_nowait()
+                        if instance_id is None:
+                            instance = await self.start_ubuntu({
+                                'name': f'research_task_{slot}',
+                                'user_id': user_id,
+                                'query': query
+                            })
+                            if 'error' in instance:
+                                results[index] = {'success': False, 'error': instance['error']}
+                                synthesis.add(results[index])
+                                continue
+                            instance_id = instance['instance_id']
+                            instances_used.append(instance_id)
+                        
+                        try:
+                            result = await asyncio.wait_for(
+                                self._execute_research_task(instance_id, query), query_timeout
+                            )
+                        except asyncio.TimeoutError:
+                            result = {'success': False, 'instance_id': instance_id,
+                                      'error': f'Research query timed out after {query_timeout}s'}
+                            # The instance may still be busy with the abandoned query
+                            await self.release_instance(instance_id, reusable=False)
+                            instance_id = None
+                        except Exception as e:
+                            result = {'success': False, 'instance_id': instance_id, 'error': str(e)}
+                        
+                        results[index] = result
+                        synthesis.add(result)
+                        if on_result is not None:
+                            on_result({'query': query, 'result': result, 'synthesis': synthesis.summary()})
+                finally:
+                    if instance_id is not None:
+                        await self.release_instance(instance_id)
+            
+            await asyncio.gather(*(
+                worker(slot) for slot in range(min(max_concurrency, len(unique_queries)))
+            ))
             
             return {
                 'success': True,
                 'query_count': len(research_queries),
-                'instances_used': [inst['instance_id'] for inst in instances],
-                'results': synthesized_results,
+                'unique_query_count': len(unique_queries),
+                'instances_used': instances_used,
+                'query_results': [results[index] for index in mapping],
+                'results': synthesis.summary(),
                 'execution_time': datetime.now().isoformat()
             }
             
@@ -384,30 +615,35 @@ class EnhancedScrapybaraManager:
             # Parse workflow description into actions
             workflow_actions = await self._parse_workflow_description(workflow_description)
             
+            # Validate every step once, before an instance is leased
+            validation = await self._validate_action_sequence(
+                self._workflow_action_requests(workflow_actions, user_id)
+            )
+            if not validation['valid']:
+                return {'success': False, 'error': 'Workflow blocked', 'blocked': validation['blocked']}
+            
             # Create execution environment
-            instance = await self.start_ubuntu({
-                'name': 'workflow_execution',
-                'user_id': user_id,
-                'workflow': True,
-                'packages': ['python3', 'selenium', 'playwright']
-            })
+            instance = await self._lease_profile('workflow', name='workflow_execution', user_id=user_id)
             
             instance_id = instance['instance_id']
             
             # Execute workflow step by step
             workflow_results = []
             
-            for step, action in enumerate(workflow_actions):
-                step_result = await self._execute_workflow_step(
-                    instance_id, 
-                    action, 
-                    step
-                )
-                workflow_results.append(step_result)
-                
-                # Check if step failed
-                if not step_result.get('success', False):
-                    break
+            try:
+                for action in workflow_actions:
+                    step_result = await self._execute_workflow_step(
+                        instance_id, 
+                        action, 
+                        {}
+                    )
+                    workflow_results.append(step_result)
+                    
+                    # Check if step failed
+                    if step_result.get('status') == 'failed':
+                        break
+            finally:
+                await self.release_instance(instance_id)
             
             return {
                 'success': True,
@@ -416,7 +652,7 @@ class EnhancedScrapybaraManager:
                 'steps_completed': len(workflow_results),
                 'total_steps': len(workflow_actions),
                 'results': workflow_results,
-                'execution_summary': self._create_workflow_summary(workflow_results)
+                'execution_summary': await self._create_workflow_summary(workflow_results)
             }
             
         except Exception as e:
@@ -425,6 +661,31 @@ class EnhancedScrapybaraManager:
     
     # Helper methods
     
+    @staticmethod
+    def _workflow_action_requests(workflow_actions: List[Dict[str, Any]], user_id: str) -> List[ComputerActionRequest]:
+        """Computer actions a parsed workflow will perform, for up-front validation"""
+        requests = []
+        for step in workflow_actions:
+            step_type = step.get('type')
+            if step_type == 'navigate':
+                action_type, target = ComputerAction.NAVIGATE, {'url': step.get('url', '')}
+            elif step_type == 'click':
+                action_type, target = ComputerAction.CLICK, {'selector': step.get('selector', 'body')}
+            elif step_type == 'type':
+                action_type, target = ComputerAction.TYPE, {'selector': step.get('selector', 'input')}
+            else:
+                continue
+            requests.append(ComputerActionRequest(
+                action_id=f"workflow_step_{step.get('id')}",
+                action_type=action_type,
+                target=target,
+                parameters={'text': step.get('text', step.get('description', ''))} if step_type == 'type' else {},
+                user_id=user_id,
+                # The user asked for this workflow, so its typing steps aren't held to the restricted level
+                permission_level='standard'
+            ))
+        return requests
+    
     async def _configure_research_tools(self, instances: List[Dict], research_topic: str):
         """Configure instances with research-specific tools"""
         for instance in instances:
@@ -610,102 +871,67 @@ class EnhancedScrapybaraManager:
     async def _synthesize_research_results(self, queries: List[str], 
                                          results: List[Any]) -> Dict[str, Any]:
         """Synthesize multiple research results"""
-        successful_results = [r for r in results if isinstance(r, dict) and r.get('success')]
-        
-        synthesis = {
-            'total_queries': len(queries),
-            'successful_queries': len(successful_results),
-            'combined_findings': [],
-            'data_quality_score': 0.0,
-            'synthesis_confidence': 0.0
-        }
-        
-        # Combine findings from all successful results
-        for result in successful_results:
-            if 'result' in result and 'key_findings' in result['result']:
-                synthesis['combined_findings'].extend(result['result']['key_findings'])
-        
-        # Calculate aggregate scores
-        if successful_results:
-            avg_confidence = sum(r['result']['confidence_score'] for r in successful_results) / len(successful_results)
-            synthesis['synthesis_confidence'] = avg_confidence
-            synthesis['data_quality_score'] = len(successful_results) / len(queries)
-        
-        return synthesis
+        synthesis = ResearchSynthesis(len(queries))
+        for result in results:
+            synthesis.add(result)
+        return synthesis.summary()
     
     async def start_ubuntu(self, config: Dict[str, Any]) -> Dict[str, Any]:
-        """Start an Ubuntu instance for computer use"""
-        try:
-            if not self.session:
-                await self.__aenter__()
-            
-            response = await self.session.post(
-                f"{self.base_url}/instances",
-                json={
-                    "type": "ubuntu",
-                    "config": config
-                }
-            )
-            
-            if response.status == 200:
-                instance_data = await response.json()
-                instance_id = instance_data.get('instance_id')
-                
-                if instance_id:
-                    self.instances[instance_id] = {
-                        'type': 'ubuntu',
-                        'config': config,
-                        'created_at': datetime.now(),
-                        'status': 'running'
-                    }
-                
-                logger.info(f"🐧 Started Ubuntu instance: {instance_id}")
-                return instance_data
-            else:
-                error_text = await response.text()
-                logger.error(f"Failed to start Ubuntu instance: {error_text}")
-                return {'error': f'Failed to start Ubuntu instance: {error_text}'}
-                
-        except Exception as e:
-            logger.error(f"Error starting Ubuntu instance: {e}")
-            return {'error': str(e)}
+        """Lease an Ubuntu instance for computer use (return it with ``release_instance``)"""
+        return await self._lease_instance('ubuntu', config)
     
     async def start_browser(self, config: Dict[str, Any]) -> Dict[str, Any]:
-        """Start a browser instance"""
+        """Lease a browser instance (return it with ``release_instance``)"""
+        return await self._lease_instance('browser', config)
+    
+    async def _lease_profile(self, profile: str, max_lifetime: Optional[float] = None, **per_lease: Any) -> Dict[str, Any]:
+        """Lease an instance of a named profile, so warm spares of that profile can serve it"""
+        kind, config = profile_config(profile, **per_lease)
+        return await self._lease_instance(kind, config, max_lifetime)
+    
+    async def _lease_instance(self, kind: str, config: Dict[str, Any], max_lifetime: Optional[float] = None) -> Dict[str, Any]:
+        label = 'Ubuntu' if kind == 'ubuntu' else kind
         try:
-            if not self.session:
-                await self.__aenter__()
-            
-            response = await self.session.post(
-                f"{self.base_url}/instances",
-                json={
-                    "type": "browser",
-                    "config": config
-                }
+            lease = await self.instance_pool.lease(
+                kind, config, config.get('user_id') or 'anonymous', max_lifetime=max_lifetime
             )
-            
-            if response.status == 200:
-                instance_data = await response.json()
-                instance_id = instance_data.get('instance_id')
-                
-                if instance_id:
-                    self.instances[instance_id] = {
-                        'type': 'browser',
-                        'config': config,
-                        'created_at': datetime.now(),
-                        'status': 'running'
-                    }
-                
-                logger.info(f"🌐 Started browser instance: {instance_id}")
-                return instance_data
-            else:
-                error_text = await response.text()
-                logger.error(f"Failed to start browser instance: {error_text}")
-                return {'error': f'Failed to start browser instance: {error_text}'}
-                
         except Exception as e:
-            logger.error(f"Error starting browser instance: {e}")
+            logger.error(f"Error starting {label} instance: {e}")
             return {'error': str(e)}
+        
+        instance_id = lease.instance_id
+        self.instances[instance_id] = {
+            'type': kind,
+            'config': config,
+            'lease_id': lease.lease_id,
+            'created_at': datetime.now(),
+            'status': 'running'
+        }
+        
+        icon = '🐧' if kind == 'ubuntu' else '🌐'
+        logger.info(f"{icon} {'Reused warm' if lease.reused else 'Started'} {label} instance: {instance_id}")
+        return {**lease.instance, 'lease_id': lease.lease_id, 'reused': lease.reused}
+    
+    async def release_instance(self, instance_id: str, reusable: bool = True) -> bool:
+        """Return a leased instance to the pool; ``reusable=False`` shuts it down instead"""
+        record = self.instances.pop(instance_id, None)
+        if record is None:
+            return False
+        return await self.instance_pool.release(record['lease_id'], reusable=reusable)
+    
+    def _forget_lease(self, lease: Lease):
+        """Drop everything that refers to an instance whose lease the pool reclaimed"""
+        instance_id = lease.instance_id
+        self.instances.pop(instance_id, None)
+        for session_id, session in list(self.shared_sessions.items()):
+            if session.instance_id == instance_id:
+                del self.shared_sessions[session_id]
+        for environment_id, instance_ids in list(self.research_environments.items()):
+            if instance_id in instance_ids:
+                del self.research_environments[environment_id]
+        for session_key, session in list(self.authenticated_sessions.items()):
+            if session['instance_id'] == instance_id:
+                del self.authenticated_sessions[session_key]
     
     async def _parse_workflow_description(self, description: str) -> List[Dict[str, Any]]:
         """Parse workflow description into actionable steps"""
@@ -932,47 +1158,69 @@ class PermissionManager:
     
     def __init__(self):
         self.user_permissions = {}
-        self.permission_cache = {}
+        # Grants depend on (user, action type, permission level), not on the target
+        self.permission_cache = VerdictCache()
     
     async def check_permission(self, user_id: str, action_type: ComputerAction, 
                              permission_level: str) -> Dict[str, Any]:
         """Check if user has permission for action"""
+        key = (user_id, action_type, permission_level)
+        cached = self.permission_cache.get(key)
+        if cached is not None:
+            return cached
+        
         # Mock permission checking
         high_risk_actions = [ComputerAction.FORM_FILL, ComputerAction.TYPE]
         
         if action_type in high_risk_actions and permission_level == 'restricted':
-            return {
+            result = {
                 'granted': False,
                 'required': 'elevated',
                 'reason': 'High-risk action requires elevated permissions'
             }
+        else:
+            result = {'granted': True, 'level': permission_level}
         
-        return {'granted': True, 'level': permission_level}
+        self.permission_cache.put(key, result)
+        return result
 
 
 class ActionAuditor:
     """Audits computer control actions for security and compliance"""
     
-    def __init__(self):
+    def __init__(self, log_path: Optional[str] = None):
         self.audit_log = []
+        if log_path is None:
+            log_path = os.getenv(
+                'COMPUTER_ACTION_AUDIT_LOG',
+                os.path.join(os.getenv('STORAGE_PATH', './storage'), 'computer_action_audit.jsonl')
+            )
+        self.sink = BatchedAuditLog(log_path)
     
     async def log_action(self, action_request: ComputerActionRequest, 
                         execution_result: Dict[str, Any]):
         """Log action for audit trail"""
-        audit_entry = {
-            'timestamp': datetime.now().isoformat(),
-            'user_id': action_request.user_id,
-            'action_type': action_request.action_type.value,
-            'action_id': action_request.action_id,
-            'success': execution_result.get('success', False),
-            'permission_level': action_request.permission_level,
-            'safety_checked': action_request.safety_checked
-        }
-        
-        self.audit_log.append(audit_entry)
+        await self.log_actions([(action_request, execution_result)])
+    
+    async def log_actions(self, entries: List[tuple], flush: bool = False):
+        """Log a batch of (request, result) pairs; written to the audit file in batches"""
+        audit_entries = [
+            {
+                'timestamp': datetime.now().isoformat(),
+                'user_id': action_request.user_id,
+                'action_type': action_request.action_type.value,
+                'action_id': action_request.action_id,
+                'success': execution_result.get('success', False),
+                'permission_level': action_request.permission_level,
+                'safety_checked': action_request.safety_checked
+            }
+            for action_request, execution_result in entries
+        ]
+        self.audit_log.extend(audit_entries)
         
-        # In production, persist to secure audit database
-        logger.info(f"🔍 Audited action: {audit_entry}")
+        if self.sink.append(audit_entries) or flush:
+            await self.sink.flush()
+        logger.info(f"🔍 Audited {len(audit_entries)} action(s)")
 
 
 # Integration helper functions
@@ -1002,6 +1250,9 @@ async def integrate_with_mama_bear_agents(scrapybara_manager: EnhancedScrapybara
         
         scout.start_shared_browser = lambda user_id: \
             scrapybara_manager.start_shared_browser_session(user_id, scout.id)
+        
+        scout.end_shared_browser = lambda session_id: \
+            scrapybara_manager.end_shared_browser_session(session_id)
     
     # Add research capabilities to Research Specialist
     if 'research_specialist' in orchestrator.agents:
@@ -1011,6 +1262,9 @@ async def integrate_with_mama_bear_agents(scrapybara_manager: EnhancedScrapybara
         researcher.create_research_environment = lambda topic, user_id: \
             scrapybara_manager.create_research_environment(topic, user_id)
         
+        researcher.close_research_environment = lambda environment_id: \
+            scrapybara_manager.close_research_environment(environment_id)
+        
         researcher.execute_parallel_research = lambda queries, user_id: \
             scrapybara_manager.execute_collaborative_research(queries, user_id)
     
@@ -0,0 +1,202 @@
+"""
+🗂️ Execution Rollups and Listing Index
+Time-bucketed execution counters (per minute and per hour, keyed by user and
+route) maintained as executions are recorded, so metrics queries sum a few
+buckets instead of scanning history; and a created_at-sorted index with opaque
+cursors, so execution listings page without copying and sorting every record.
+"""
+
+import base64
+import bisect
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, List, Optional, Tuple
+
+# Bucket width and how long buckets are kept, per granularity
+GRANULARITIES = {
+    "minute": (60, 3 * 3600),
+    "hour": (3600, 35 * 24 * 3600)
+}
+
+
+@dataclass
+class Rollup:
+    count: int = 0
+    completed: int = 0
+    successes: int = 0
+    duration_sum: float = 0.0
+    cost_sum: float = 0.0
+    complexity_sum: float = 0.0
+
+    def add(self, other: "Rollup"):
+        self.count += other.count
+        self.completed += other.completed
+        self.successes += other.successes
+        self.duration_sum += other.duration_sum
+        self.cost_sum += other.cost_sum
+        self.complexity_sum += other.complexity_sum
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "success_rate": self.successes / self.completed if self.completed else None,
+            "avg_duration": self.duration_sum / self.completed if self.completed else None,
+            "avg_complexity": self.complexity_sum / self.count if self.count else None,
+            "total_cost": self.cost_sum
+        }
+
+
+class TimeBucketedRollups:
+    """
+    Per-minute and per-hour rollups of routing decisions and execution
+    outcomes by (user, route).
+
+    ``query`` uses minute buckets when the range fits in their retention and
+    hour buckets otherwise, so the cost of a query depends on the range, not
+    on how many executions were recorded.
+    """
+
+    def __init__(self, granularities: Optional[Dict[str, Tuple[int, int]]] = None):
+        self.granularities = granularities or GRANULARITIES
+        # granularity -> bucket start -> (user, route) -> Rollup
+        self._buckets: Dict[str, Dict[int, Dict[Tuple[str, str], Rollup]]] = {
+            name: {} for name in self.granularities
+        }
+        self._lock = threading.Lock()
+
+    def record_decision(
+        self,
+        user_id: str,
+        route: str,
+        complexity: float = 0.0,
+        estimated_cost: float = 0.0,
+        timestamp: Optional[float] = None
+    ):
+        """Count one routing decision"""
+        self._add(user_id, route, timestamp, Rollup(count=1, cost_sum=estimated_cost, complexity_sum=complexity))
+
+    def record_outcome(
+        self,
+        user_id: str,
+        route: str,
+        success: bool,
+        duration: float,
+        timestamp: Optional[float] = None
+    ):
+        """Add a finished execution's result to its route's success rate and duration"""
+        self._add(user_id, route, timestamp, Rollup(completed=1, successes=int(success), duration_sum=duration))
+
+    def _add(self, user_id: str, route: str, timestamp: Optional[float], entry: Rollup):
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            for name, (width, retention) in self.granularities.items():
+                buckets = self._buckets[name]
+                start = int(timestamp // width * width)
+                buckets.setdefault(start, {}).setdefault((user_id, route), Rollup()).add(entry)
+                self._expire(buckets, timestamp - retention)
+
+    @staticmethod
+    def _expire(buckets: Dict[int, Any], cutoff: float):
+        # Buckets are created in (nearly) time order, so the oldest sit at the front
+        while buckets:
+            oldest = next(iter(buckets))
+            if oldest >= cutoff:
+                break
+            del buckets[oldest]
+
+    def query(
+        self,
+        since: float,
+        until: Optional[float] = None,
+        user_id: Optional[str] = None,
+        route: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Totals and per-route rollups for executions recorded in [since, until)"""
+        until = time.time() if until is None else until
+        name = self._granularity_for(until - since)
+        width = self.granularities[name][0]
+        first_bucket = int(since // width * width)
+
+        total = Rollup()
+        by_route: Dict[str, Rollup] = {}
+        with self._lock:
+            for start, rollups in self._buckets[name].items():
+                if start < first_bucket or start >= until:
+                    continue
+                for (bucket_user, bucket_route), rollup in rollups.items():
+                    if (user_id is not None and bucket_user != user_id) or (route is not None and bucket_route != route):
+                        continue
+                    total.add(rollup)
+                    by_route.setdefault(bucket_route, Rollup()).add(rollup)
+        return {
+            "granularity": name,
+            "total": total.summary(),
+            "by_route": {key: rollup.summary() for key, rollup in by_route.items()}
+        }
+
+    def _granularity_for(self, span_seconds: float) -> str:
+        # Finest granularity whose retention covers the range
+        for name, (_, retention) in sorted(self.granularities.items(), key=lambda item: item[1][0]):
+            if span_seconds <= retention:
+                return name
+        return max(self.granularities, key=lambda name: self.granularities[name][0])
+
+
+class CreatedAtIndex:
+    """
+    Item ids sorted by (created_at, id) for newest-first, cursor-paginated listings.
+
+    Cursors encode the last returned key, so pages stay stable while new items
+    are inserted ahead of them.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[str, str]] = []
+        self._lock = threading.Lock()
+
+    def add(self, item_id: str, created_at: str):
+        with self._lock:
+            bisect.insort(self._keys, (created_at, item_id))
+
+    def remove(self, item_id: str, created_at: str):
+        with self._lock:
+            position = bisect.bisect_left(self._keys, (created_at, item_id))
+            if position < len(self._keys) and self._keys[position] == (created_at, item_id):
+                del self._keys[position]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @staticmethod
+    def encode_cursor(key: Tuple[str, str]) -> str:
+        return base64.urlsafe_b64encode(f"{key[0]}|{key[1]}".encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, str]:
+        """Raises ValueError for a malformed cursor"""
+        try:
+            created_at, item_id = base64.urlsafe_b64decode(cursor.encode("ascii")).decode("utf-8").split("|", 1)
+        except Exception as e:
+            raise ValueError("Invalid cursor") from e
+        return created_at, item_id
+
+    def page(
+        self,
+        limit: int,
+        cursor: Optional[str] = None,
+        include: Optional[Callable[[str], bool]] = None
+    ) -> Tuple[List[str], Optional[str]]:
+        """Up to ``limit`` ids, newest first, after ``cursor``; returns (ids, next cursor or None)"""
+        with self._lock:
+            end = bisect.bisect_left(self._keys, self.decode_cursor(cursor)) if cursor else len(self._keys)
+            ids: List[str] = []
+            position = end - 1
+            while position >= 0 and len(ids) < limit:
+                item_id = self._keys[position][1]
+                if include is None or include(item_id):
+                    ids.append(item_id)
+                position -= 1
+            # More may follow only if we stopped early; the next page starts below the last key examined
+            next_cursor = self.encode_cursor(self._keys[position + 1]) if position >= 0 and ids else None
+        return ids, next_cursor
@@ -15,10 +15,15 @@ from dataclasses import dataclass, field
 from enum import Enum
 
 import aiohttp
-from google.cloud import aiplatform
 from google.auth import default
 import google.auth.transport.requests
 
+from .token_estimator import estimate_tokens
+from .single_flight import SingleFlight, coalescing_key
+from .lazy_import import lazy_import
+
+aiplatform = lazy_import("google.cloud.aiplatform")
+
 logger = logging.getLogger(__name__)
 
 class ExecutionMode(Enum):
@@ -116,6 +121,9 @@ class ExpressModeVertexIntegration:
         self.model_performance_cache = {}
         self.response_cache = {}
         
+        # Concurrent identical requests share one provider call
+        self.single_flight = SingleFlight("express_mode")
+        
         # Agentic control state
         self.autonomous_mode = False
         self.agent_creation_requests = []
@@ -200,14 +208,10 @@ class ExpressModeVertexIntegration:
             # Step 1: Analyze request for optimal routing
             routing_decision = await self._analyze_for_routing(message, context, execution_mode)
             
-            # Step 2: Execute via optimal model/provider
-            if routing_decision["provider"] == ModelProvider.VERTEX_CLAUDE:
-                response = await self._execute_claude_request(message, routing_decision, context)
-            elif routing_decision["provider"] == ModelProvider.VERTEX_GEMINI:
-                response = await self._execute_vertex_gemini_request(message, routing_decision, context)
-            else:
-                # Fallback to existing Gemini API
-                response = await self._execute_gemini_api_fallback(message, context)
+            # Step 2: Execute via optimal model/provider, sharing identical in-flight calls
+            response = await self._execute_routed_request(
+                message, routing_decision, context, coalesce=request.get("coalesce", False)
+            )
             
             # Step 3: Apply Express Mode optimizations
             if execution_mode == ExecutionMode.EXPRESS:
@@ -253,6 +257,27 @@ class ExpressModeVertexIntegration:
                 confidence_score=0.5
             )
     
+    async def _execute_routed_request(self, message: str, routing_decision: Dict[str, Any],
+                                      context: Dict[str, Any], coalesce: bool = False) -> Dict[str, Any]:
+        """Run the routed provider call through the single-flight layer (shared only if ``coalesce``)"""
+        
+        if routing_decision["provider"] == ModelProvider.VERTEX_CLAUDE:
+            execute = lambda: self._execute_claude_request(message, routing_decision, context)
+        elif routing_decision["provider"] == ModelProvider.VERTEX_GEMINI:
+            execute = lambda: self._execute_vertex_gemini_request(message, routing_decision, context)
+        else:
+            # Fallback to existing Gemini API
+            execute = lambda: self._execute_gemini_api_fallback(message, context)
+        
+        model_config = self.vertex_models.get(routing_decision["model"])
+        temperature = model_config.temperature if model_config else None
+        key = coalescing_key(
+            routing_decision["model"],
+            message,
+            {"provider": routing_decision["provider"].value, "temperature": temperature, "context": context}
+        )
+        return await self.single_flight.do(key, execute, enabled=coalesce)
+    
     async def _analyze_for_routing(self, message: str, context: Dict[str, Any], 
                                   mode: ExecutionMode) -> Dict[str, Any]:
         """
@@ -416,7 +441,7 @@ class ExpressModeVertexIntegration:
             
             # Parse response
             content = self._extract_claude_content(response)
-            tokens = self._calculate_tokens(message, content)
+            tokens = self._calculate_tokens(message, content, model_config.model_name)
             cost = self._calculate_cost(tokens, model_config.cost_per_1k_tokens)
             
             return {
@@ -481,7 +506,7 @@ class ExpressModeVertexIntegration:
             
             # Parse response
             content = self._extract_gemini_content(response)
-            tokens = self._calculate_tokens(message, content)
+            tokens = self._calculate_tokens(message, content, model_config.model_name)
             cost = self._calculate_cost(tokens, model_config.cost_per_1k_tokens)
             
             return {
@@ -626,11 +651,10 @@ class ExpressModeVertexIntegration:
             logger.error(f"Error extracting Gemini content: {e}")
             return "Error parsing response"
     
-    def _calculate_tokens(self, input_text: str, output_text: str) -> Dict[str, int]:
-        """Estimate token usage (approximate)"""
-        # Rough estimation: ~4 characters per token
-        input_tokens = len(input_text) // 4
-        output_tokens = len(output_text) // 4
+    def _calculate_tokens(self, input_text: str, output_text: str, model_name: Optional[str] = None) -> Dict[str, int]:
+        """Estimate token usage with the shared per-family estimator"""
+        input_tokens = estimate_tokens(input_text, model_name)
+        output_tokens = estimate_tokens(output_text, model_name)
         
         return {
             "input": input_tokens,
@@ -778,6 +802,7 @@ Remember, this is your safe sanctuary space - technical bumps don't change that!
             "infrastructure_changes": len(self.infrastructure_changes),
             "performance_cache_size": len(self.model_performance_cache),
             "response_cache_size": len(self.response_cache),
+            "single_flight": self.single_flight.get_metrics(),
             "system_status": "operational"
         }
 
@@ -0,0 +1,284 @@
+"""
+🎨 Image Generation Queue
+Takes image generation off the request thread: requests enqueue a job and get
+an id back, background workers group compatible jobs (same model, size and
+style) into one bulk provider call, and results are written to disk so clients
+can poll for them by id.
+"""
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (model, style, size, [(prompt, num_images), ...]) -> one image list per prompt.
+# An image is a dict; raw bytes under "data" (with "mime_type") are written to disk.
+BatchGenerator = Callable[[str, str, str, List[Tuple[str, int]]], Awaitable[List[List[Dict[str, Any]]]]]
+
+_EXTENSIONS = {"image/png": "png", "image/jpeg": "jpg", "image/webp": "webp"}
+
+
+@dataclass
+class ImageGenerationJob:
+    prompt: str
+    model: str
+    style: str
+    size: str
+    num_images: int
+    job_id: str = field(default_factory=lambda: f"imggen_{uuid.uuid4().hex[:16]}")
+    status: str = "queued"  # queued, running, completed, failed
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    completed_at: Optional[float] = None
+    batch_size: int = 0
+    images: List[Dict[str, Any]] = field(default_factory=list)
+    error: Optional[str] = None
+    done: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def batch_key(self) -> Tuple[str, str, str]:
+        return (self.model, self.size, self.style)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "status": self.status,
+            "prompt": self.prompt,
+            "model": self.model,
+            "style": self.style,
+            "size": self.size,
+            "num_images": self.num_images,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "completed_at": self.completed_at,
+            "batch_size": self.batch_size,
+            "images": self.images,
+            "error": self.error
+        }
+
+
+class ImageGenerationQueue:
+    """
+    Batched image generation.
+
+    - Workers wait up to ``batch_window_seconds`` after the first job for more
+      compatible jobs, up to ``max_batch_images`` images per provider call.
+    - Jobs beyond ``max_queue`` are rejected rather than queued.
+    - Finished jobs are kept in memory for ``max_jobs_in_memory`` entries and on
+      disk under ``storage_dir`` indefinitely.
+    """
+
+    def __init__(
+        self,
+        generator: BatchGenerator,
+        storage_dir: Optional[str] = None,
+        workers: int = 2,
+        max_queue: int = 200,
+        max_batch_images: int = 8,
+        batch_window_seconds: float = 0.25,
+        max_jobs_in_memory: int = 1000
+    ):
+        self.generator = generator
+        self.storage_dir = storage_dir or os.path.join(
+            os.getenv('STORAGE_PATH', './storage'), 'generated_images'
+        )
+        self.workers = workers
+        self.max_queue = max_queue
+        self.max_batch_images = max_batch_images
+        self.batch_window_seconds = batch_window_seconds
+        self.max_jobs_in_memory = max_jobs_in_memory
+
+        # Pending jobs in arrival order; workers take compatible jobs out of the
+        # middle without reordering the rest, so the oldest job always leads the
+        # next batch.
+        self._pending: "deque[ImageGenerationJob]" = deque()
+        self._pending_ready = threading.Condition()
+        self._jobs: "OrderedDict[str, ImageGenerationJob]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._threads: List[threading.Thread] = []
+
+        self.metrics = {
+            "submitted": 0,
+            "rejected": 0,
+            "completed": 0,
+            "failed": 0,
+            "batches": 0,
+            "batched_jobs": 0
+        }
+
+    # === SUBMISSION ===
+
+    def _ensure_started(self):
+        with self._lock:
+            self._threads = [t for t in self._threads if t.is_alive()]
+            for i in range(len(self._threads), self.workers):
+                thread = threading.Thread(target=self._worker, name=f"image-generation-{i}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+    def submit(self, prompt: str, model: str, style: str, size: str, num_images: int) -> Optional[ImageGenerationJob]:
+        """Queue a job; returns None when the queue is full"""
+        if len(self._pending) >= self.max_queue:
+            self.metrics["rejected"] += 1
+            return None
+        self._ensure_started()
+        job = ImageGenerationJob(prompt, model, style, size, num_images)
+        self._remember(job)
+        with self._pending_ready:
+            self._pending.append(job)
+            self._pending_ready.notify_all()
+        self.metrics["submitted"] += 1
+        return job
+
+    def get(self, job_id: str, wait_seconds: float = 0) -> Optional[Dict[str, Any]]:
+        """Job state, optionally blocking up to ``wait_seconds`` for it to finish"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+        if job is None:
+            return self._load(job_id)
+        if wait_seconds > 0:
+            job.done.wait(wait_seconds)
+        return job.to_dict()
+
+    def image_path(self, job_id: str, index: int) -> Optional[str]:
+        """Path of a stored image file for a completed job"""
+        record = self.get(job_id)
+        if not record or index >= len(record["images"]):
+            return None
+        filename = record["images"][index].get("file")
+        return os.path.join(self._job_dir(job_id), filename) if filename else None
+
+    def _remember(self, job: ImageGenerationJob):
+        with self._lock:
+            self._jobs[job.job_id] = job
+            while len(self._jobs) > self.max_jobs_in_memory:
+                oldest_id, oldest = next(iter(self._jobs.items()))
+                if not oldest.done.is_set():
+                    break  # never drop a job that is still pending
+                del self._jobs[oldest_id]
+
+    # === WORKERS ===
+
+    def _next_batch(self) -> List[ImageGenerationJob]:
+        """Block for the oldest job, then gather compatible jobs for up to the batch window"""
+        with self._pending_ready:
+            while not self._pending:
+                self._pending_ready.wait()
+            first = self._pending.popleft()
+            batch, images = [first], first.num_images
+            deadline = time.time() + self.batch_window_seconds
+            while images < self.max_batch_images:
+                full = False
+                for candidate in list(self._pending):
+                    if candidate.batch_key != first.batch_key:
+                        continue  # stays where it is for the next batch
+                    if images + candidate.num_images > self.max_batch_images:
+                        full = True  # leads the next batch of this kind
+                        break
+                    self._pending.remove(candidate)
+                    batch.append(candidate)
+                    images += candidate.num_images
+                remaining = deadline - time.time()
+                if full or images >= self.max_batch_images or remaining <= 0:
+                    break
+                self._pending_ready.wait(remaining)
+        return batch
+
+    def _worker(self):
+        while True:
+            batch = self._next_batch()
+            try:
+                self._run_batch(batch)
+            except Exception as e:
+                logger.error(f"Image generation worker error: {e}")
+
+    def _run_batch(self, batch: List[ImageGenerationJob]):
+        model, size, style = batch[0].batch_key
+        started = time.time()
+        for job in batch:
+            job.status = "running"
+            job.started_at = started
+            job.batch_size = len(batch)
+        self.metrics["batches"] += 1
+        self.metrics["batched_jobs"] += len(batch)
+
+        try:
+            results = asyncio.run(self.generator(
+                model, style, size, [(job.prompt, job.num_images) for job in batch]
+            ))
+            if len(results) != len(batch):
+                raise RuntimeError(f"Generator returned {len(results)} results for {len(batch)} prompts")
+        except Exception as e:
+            logger.error(f"Image generation batch failed ({model}, {size}, {style}): {e}")
+            for job in batch:
+                self._finish(job, error=str(e))
+            return
+
+        for job, images in zip(batch, results):
+            try:
+                self._finish(job, images=self._store_images(job, images))
+            except Exception as e:
+                self._finish(job, error=f"Failed to store images: {e}")
+
+    def _finish(self, job: ImageGenerationJob, images: Optional[List[Dict[str, Any]]] = None, error: Optional[str] = None):
+        job.images = images or []
+        job.error = error
+        job.status = "failed" if error else "completed"
+        job.completed_at = time.time()
+        self.metrics["failed" if error else "completed"] += 1
+        try:
+            self._save(job)
+        except Exception as e:
+            logger.warning(f"⚠️ Could not persist image job {job.job_id}: {e}")
+        job.done.set()
+
+    # === STORAGE ===
+
+    def _job_dir(self, job_id: str) -> str:
+        return os.path.join(self.storage_dir, os.path.basename(job_id))
+
+    def _store_images(self, job: ImageGenerationJob, images: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Write raw image bytes to the job directory; keep only metadata in the record"""
+        job_dir = self._job_dir(job.job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        stored = []
+        for index, image in enumerate(images):
+            image = dict(image)
+            data = image.pop("data", None)
+            if data is not None:
+                filename = f"{index}.{_EXTENSIONS.get(image.get('mime_type'), 'bin')}"
+                with open(os.path.join(job_dir, filename), "wb") as f:
+                    f.write(data)
+                image["file"] = filename
+            stored.append(image)
+        return stored
+
+    def _save(self, job: ImageGenerationJob):
+        job_dir = self._job_dir(job.job_id)
+        os.makedirs(job_dir, exist_ok=True)
+        with open(os.path.join(job_dir, "job.json"), "w") as f:
+            json.dump(job.to_dict(), f)
+
+    def _load(self, job_id: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(os.path.join(self._job_dir(job_id), "job.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        batches = self.metrics["batches"]
+        return {
+            **self.metrics,
+            "queued": len(self._pending),
+            "avg_batch_size": self.metrics["batched_jobs"] / batches if batches else 0.0,
+            "workers": len([t for t in self._threads if t.is_alive()])
+        }
@@ -0,0 +1,261 @@
+"""
+🖼️ Image Payload Pipeline
+Prepares chat images for model providers exactly once: uploads (multipart bytes
+or base64/data-URL strings) are decoded a single time, content-hashed for
+dedup, downsized and re-encoded when larger than a configurable resolution, and
+kept per session so later turns can refer to an image by its digest instead of
+uploading it again.
+"""
+
+import base64
+import binascii
+import hashlib
+import io
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+# Pillow is optional: without it images are passed through at original size
+try:
+    from PIL import Image
+    PIL_AVAILABLE = True
+except ImportError:
+    Image = None
+    PIL_AVAILABLE = False
+    logger.warning("❌ Pillow not available - images will not be downsized")
+
+ImageSource = Union[bytes, bytearray, memoryview, str]
+
+_MAGIC_MIME_TYPES = (
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+)
+
+
+def _as_bytes(data: memoryview) -> bytes:
+    """The underlying bytes object when the view covers all of it, else a copy"""
+    if isinstance(data.obj, bytes) and data.nbytes == len(data.obj):
+        return data.obj
+    return data.tobytes()
+
+
+class ImagePayloadError(ValueError):
+    """Raised for image payloads that can't be decoded or referenced"""
+
+
+def sniff_mime_type(data: memoryview) -> str:
+    head = bytes(data[:12])
+    for magic, mime_type in _MAGIC_MIME_TYPES:
+        if head.startswith(magic):
+            return mime_type
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    return "application/octet-stream"
+
+
+def decode_image(source: ImageSource) -> Tuple[memoryview, Optional[str]]:
+    """
+    Raw image bytes as a memoryview, plus the mime type declared by a data URL.
+
+    Binary uploads are wrapped without copying; base64 strings are decoded once.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return memoryview(source), None
+    if not isinstance(source, str):
+        raise ImagePayloadError(f"Unsupported image payload type: {type(source).__name__}")
+
+    declared = None
+    payload = source
+    if source.startswith("data:"):
+        header, _, payload = source.partition(",")
+        declared = header[5:].split(";")[0] or None
+    try:
+        return memoryview(base64.b64decode(payload, validate=False)), declared
+    except (binascii.Error, ValueError) as e:
+        raise ImagePayloadError(f"Invalid base64 image data: {e}")
+
+
+@dataclass
+class PreparedImage:
+    digest: str
+    mime_type: str
+    data: bytes
+    original_bytes: int
+    width: Optional[int] = None
+    height: Optional[int] = None
+    resized: bool = False
+
+    def to_part(self) -> Dict[str, Any]:
+        """Inline image part in the shape the Gemini/Vertex SDKs accept"""
+        return {"mime_type": self.mime_type, "data": self.data}
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "image_ref": self.digest,
+            "mime_type": self.mime_type,
+            "bytes": len(self.data),
+            "original_bytes": self.original_bytes,
+            "width": self.width,
+            "height": self.height,
+            "resized": self.resized
+        }
+
+
+class ImagePayloadPipeline:
+    """
+    Decode → hash → (downsize) pipeline with a content-addressed LRU of
+    prepared images and a per-session index of digests.
+
+    - ``max_dimension``: longest side, in pixels, sent to providers
+    - ``max_cached_images``: prepared images kept across all sessions
+    - ``max_cached_bytes``: total size of those images; least recently used
+      images are evicted first, and an image larger than the whole budget is
+      returned but not cached
+    - ``session_ttl_seconds``: idle time after which a session's refs expire
+    """
+
+    def __init__(
+        self,
+        max_dimension: Optional[int] = None,
+        max_cached_images: int = 256,
+        max_cached_bytes: Optional[int] = None,
+        max_sessions: int = 1000,
+        session_ttl_seconds: float = 3600,
+        jpeg_quality: int = 85
+    ):
+        self.max_dimension = max_dimension or int(os.getenv('IMAGE_MAX_DIMENSION', 1568))
+        self.max_cached_images = max_cached_images
+        if max_cached_bytes is None:
+            max_cached_bytes = int(os.getenv('IMAGE_CACHE_MAX_BYTES', 64 * 1024 * 1024))
+        self.max_cached_bytes = max_cached_bytes
+        self.max_sessions = max_sessions
+        self.session_ttl_seconds = session_ttl_seconds
+        self.jpeg_quality = jpeg_quality
+
+        self._images: "OrderedDict[str, PreparedImage]" = OrderedDict()
+        self._sessions: "OrderedDict[str, Tuple[float, List[str]]]" = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+        self.metrics = {
+            "prepared": 0,
+            "deduplicated": 0,
+            "resized": 0,
+            "ref_hits": 0,
+            "bytes_in": 0,
+            "bytes_out": 0
+        }
+
+    # === PREPARATION ===
+
+    def prepare(self, source: ImageSource, session_id: Optional[str] = None) -> PreparedImage:
+        """Prepare one uploaded image (or reuse an identical one) and attach it to the session"""
+        data, declared_mime = decode_image(source)
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+
+        with self._lock:
+            image = self._images.get(digest)
+            if image is not None:
+                self._images.move_to_end(digest)
+                self.metrics["deduplicated"] += 1
+
+        if image is None:
+            image = self._downsize(digest, data, declared_mime or sniff_mime_type(data))
+            with self._lock:
+                self._cache(image)
+                self.metrics["prepared"] += 1
+                self.metrics["bytes_in"] += image.original_bytes
+                self.metrics["bytes_out"] += len(image.data)
+
+        if session_id:
+            self._attach(session_id, digest)
+        return image
+
+    def _cache(self, image: PreparedImage):
+        """Add ``image`` to the LRU and evict down to the count and byte budgets (lock held)"""
+        previous = self._images.pop(image.digest, None)
+        if previous is not None:
+            self._cached_bytes -= len(previous.data)
+        if len(image.data) > self.max_cached_bytes:
+            return
+        self._images[image.digest] = image
+        self._cached_bytes += len(image.data)
+        while len(self._images) > self.max_cached_images or self._cached_bytes > self.max_cached_bytes:
+            _, evicted = self._images.popitem(last=False)
+            self._cached_bytes -= len(evicted.data)
+
+    def _downsize(self, digest: str, data: memoryview, mime_type: str) -> PreparedImage:
+        if not PIL_AVAILABLE:
+            return PreparedImage(digest, mime_type, _as_bytes(data), data.nbytes)
+
+        try:
+            with Image.open(io.BytesIO(data)) as img:
+                width, height = img.size
+                if max(width, height) <= self.max_dimension:
+                    return PreparedImage(digest, mime_type, _as_bytes(data), data.nbytes, width, height)
+
+                img.thumbnail((self.max_dimension, self.max_dimension))
+                has_alpha = img.mode in ("RGBA", "LA", "P")
+                out = io.BytesIO()
+                if has_alpha:
+                    img.save(out, format="PNG", optimize=True)
+                    mime_type = "image/png"
+                else:
+                    img.convert("RGB").save(out, format="JPEG", quality=self.jpeg_quality)
+                    mime_type = "image/jpeg"
+                self.metrics["resized"] += 1
+                return PreparedImage(
+                    digest, mime_type, out.getvalue(), data.nbytes, img.width, img.height, resized=True
+                )
+        except Exception as e:
+            raise ImagePayloadError(f"Unreadable image: {e}")
+
+    # === SESSIONS ===
+
+    def _attach(self, session_id: str, digest: str):
+        with self._lock:
+            _, digests = self._sessions.get(session_id, (0.0, []))
+            if digest not in digests:
+                digests.append(digest)
+            self._sessions[session_id] = (time.time(), digests)
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+
+    def resolve(self, session_id: str, refs: List[str]) -> List[PreparedImage]:
+        """Prepared images previously uploaded in this session, by digest"""
+        with self._lock:
+            entry = self._sessions.get(session_id)
+            if entry is None or time.time() - entry[0] > self.session_ttl_seconds:
+                self._sessions.pop(session_id, None)
+                raise ImagePayloadError(f"No cached images for session {session_id}")
+            images = []
+            for ref in refs:
+                image = self._images.get(ref) if ref in entry[1] else None
+                if image is None:
+                    raise ImagePayloadError(f"Image {ref} is not cached for this session; upload it again")
+                self._images.move_to_end(ref)
+                images.append(image)
+            self._sessions[session_id] = (time.time(), entry[1])
+            self.metrics["ref_hits"] += len(images)
+            return images
+
+    def get_metrics(self) -> Dict[str, Any]:
+        bytes_in = self.metrics["bytes_in"]
+        return {
+            **self.metrics,
+            "cached_images": len(self._images),
+            "cached_bytes": self._cached_bytes,
+            "sessions": len(self._sessions),
+            "compression_ratio": self.metrics["bytes_out"] / bytes_in if bytes_in else 1.0,
+            "max_dimension": self.max_dimension,
+            "downsizing_available": PIL_AVAILABLE
+        }
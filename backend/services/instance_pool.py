@@ -0,0 +1,526 @@
+"""
+🧊 Scrapybara Instance Pool
+Leases Ubuntu/browser instances out of warm pools keyed by (type,
+configuration) instead of booting one per call, so research and computer-use
+flows skip instance boot when a ready instance exists.
+
+Isolation: never-used spares may go to anyone, but once an instance has been
+leased to a user it is only ever handed back to that same user; returned
+instances are shut down after ``idle_timeout_seconds``, and leases that are
+never returned are reclaimed after their lifetime. Reused instances are
+health-checked before they are leased out again.
+
+Flows lease through named profiles (``INSTANCE_PROFILES``), so the spares the
+pool keeps warm have exactly the configuration the flows ask for.
+
+The pool only needs a provider with async ``start(kind, config) -> dict``
+(containing ``instance_id``), ``stop(instance_id)`` and
+``is_healthy(instance_id)``; ``FakeInstanceProvider`` implements that locally
+for offline use.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Dict, Any, Awaitable, Callable, Deque, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Config fields that describe one use of an instance rather than the instance itself
+PER_LEASE_FIELDS = frozenset({'name', 'user_id', 'query', 'purpose', 'service'})
+
+PoolKey = Tuple[str, str]
+
+# Instance configurations the Scrapybara flows lease, by profile name:
+# name -> (type, instance-defining config)
+INSTANCE_PROFILES: Dict[str, Tuple[str, Dict[str, Any]]] = {
+    'ubuntu': ('ubuntu', {}),
+    'research': ('ubuntu', {'packages': ['python3', 'nodejs', 'curl', 'wget']}),
+    'workflow': ('ubuntu', {'workflow': True, 'packages': ['python3', 'selenium', 'playwright']}),
+    'browser': ('browser', {}),
+    'data_browser': ('browser', {'extensions': ['ublock_origin', 'json_viewer']}),
+    'shared_browser': ('browser', {'shared_mode': True, 'collaboration_enabled': True})
+}
+
+
+def profile_config(profile: str, **per_lease: Any) -> Tuple[str, Dict[str, Any]]:
+    """(type, config) for a lease of ``profile`` carrying per-use fields"""
+    kind, config = INSTANCE_PROFILES[profile]
+    return kind, {**config, **per_lease}
+
+
+def pool_key(kind: str, config: Optional[Dict[str, Any]]) -> PoolKey:
+    """(type, digest of the instance-defining part of ``config``)"""
+    defining = {k: v for k, v in (config or {}).items() if k not in PER_LEASE_FIELDS}
+    encoded = json.dumps(defining, sort_keys=True, default=str).encode('utf-8')
+    return kind, hashlib.blake2b(encoded, digest_size=8).hexdigest()
+
+
+class PoolExhaustedError(RuntimeError):
+    """Every instance under the cap is leased out"""
+
+
+def parse_warm_profiles(spec: str) -> List[Tuple[str, Dict[str, Any], int]]:
+    """'research:1,shared_browser:2' -> warm targets for those profiles"""
+    targets = []
+    for item in filter(None, (part.strip() for part in spec.split(','))):
+        name, _, count = item.partition(':')
+        if name not in INSTANCE_PROFILES:
+            logger.warning(f"Unknown instance profile in warm spec: {name}")
+            continue
+        kind, config = INSTANCE_PROFILES[name]
+        targets.append((kind, dict(config), int(count or 1)))
+    return targets
+
+
+# === OFFLINE FAKE ===
+
+class FakeInstanceProvider:
+    """Stand-in for the Scrapybara instance API: boots after ``boot_delay`` and tracks what is running"""
+
+    def __init__(self, boot_delay: float = 0.0):
+        self.boot_delay = boot_delay
+        self.running: Dict[str, Dict[str, Any]] = {}
+        self.unhealthy: Set[str] = set()
+        self.started = 0
+        self.stopped = 0
+
+    async def start(self, kind: str, config: Dict[str, Any]) -> Dict[str, Any]:
+        if self.boot_delay:
+            await asyncio.sleep(self.boot_delay)
+        self.started += 1
+        instance_id = f"fake-{kind}-{self.started}"
+        self.running[instance_id] = {'instance_id': instance_id, 'type': kind, 'config': dict(config)}
+        return dict(self.running[instance_id])
+
+    async def stop(self, instance_id: str):
+        if self.running.pop(instance_id, None) is not None:
+            self.stopped += 1
+        self.unhealthy.discard(instance_id)
+
+    async def is_healthy(self, instance_id: str) -> bool:
+        return instance_id in self.running and instance_id not in self.unhealthy
+
+
+# === POOL ===
+
+@dataclass
+class _PooledInstance:
+    instance: Dict[str, Any]
+    key: PoolKey
+    owner: Optional[str] = None  # first user it was leased to; None for untouched spares
+    last_used: float = field(default_factory=time.time)
+    last_checked: float = field(default_factory=time.time)
+
+    @property
+    def instance_id(self) -> str:
+        return self.instance['instance_id']
+
+
+@dataclass
+class Lease:
+    lease_id: str
+    user_id: str
+    kind: str
+    instance: Dict[str, Any]
+    reused: bool
+    expires_at: float
+    leased_at: float = field(default_factory=time.time)
+
+    @property
+    def instance_id(self) -> str:
+        return self.instance['instance_id']
+
+
+class InstancePool:
+    """
+    Warm, per-user-isolated instance pool with lease/return semantics.
+
+    - ``warm``: spares kept ready per (type, config), as ``(type, config, count)``,
+      e.g. ``[('ubuntu', {}, 2)]`` (see ``parse_warm_profiles``)
+    - ``max_total``: cap on spares + returned + leased + booting instances; at
+      the cap the least recently returned instance (then a spare) is shut down
+      to make room, and if everything is leased ``PoolExhaustedError`` is raised
+    - ``idle_timeout_seconds``: returned instances unused this long are shut down
+    - ``max_lease_seconds``: default lease lifetime; leases not returned by
+      then are reclaimed (the instance is shut down and ``on_lease_expired``
+      is called with the lease)
+    - ``health_check_interval``: reused instances idle at least this long are
+      checked with the provider before being leased out
+    - ``reap_interval``: how often the pool loop reaps idle instances and
+      expired leases on its own (they are also reaped on every lease)
+
+    Callers may await the pool from any event loop (each Flask request runs
+    its own). The pool's state, provider calls and background refills all
+    live on one long-lived loop in a daemon thread.
+    """
+
+    def __init__(
+        self,
+        provider: Any,
+        warm: Optional[List[Tuple[str, Dict[str, Any], int]]] = None,
+        max_total: int = 10,
+        idle_timeout_seconds: float = 300,
+        max_lease_seconds: float = 3600,
+        health_check_interval: float = 30,
+        reap_interval: float = 60,
+        on_lease_expired: Optional[Callable[[Lease], None]] = None
+    ):
+        self.provider = provider
+        self.max_total = max_total
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.max_lease_seconds = max_lease_seconds
+        self.health_check_interval = health_check_interval
+        self.reap_interval = reap_interval
+        self.on_lease_expired = on_lease_expired
+
+        self._warm_targets: Dict[PoolKey, Tuple[str, Dict[str, Any], int]] = {}
+        for kind, config, count in warm or []:
+            self.set_warm(kind, config, count)
+
+        self._spares: Dict[PoolKey, Deque[_PooledInstance]] = {}
+        # (user, key) -> instances that user returned, plus an LRU over all of them
+        self._returned: Dict[Tuple[str, PoolKey], Deque[_PooledInstance]] = {}
+        self._returned_order: "OrderedDict[str, Tuple[str, PoolKey]]" = OrderedDict()
+        self._leases: Dict[str, Tuple[Lease, _PooledInstance]] = {}
+        self._booting = 0
+        self._spares_booting: Dict[PoolKey, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._capacity: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._boot_latencies_ms: Deque[float] = deque(maxlen=200)
+
+        self.metrics = {
+            'leases': 0,
+            'user_hits': 0,
+            'spare_hits': 0,
+            'misses': 0,
+            'boots': 0,
+            'boot_failures': 0,
+            'health_check_failures': 0,
+            'evictions': 0,
+            'idle_shutdowns': 0,
+            'expired_leases': 0
+        }
+
+    def set_warm(self, kind: str, config: Dict[str, Any], count: int):
+        """Keep ``count`` unassigned spares of this (type, config) ready"""
+        self._warm_targets[pool_key(kind, config)] = (kind, dict(config), count)
+
+    # === POOL LOOP ===
+
+    def _pool_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="instance-pool", daemon=True).start()
+                asyncio.run_coroutine_threadsafe(self._reap_periodically(), self._loop)
+            return self._loop
+
+    async def _call(self, coro: Awaitable[Any]) -> Any:
+        """Run ``coro`` on the pool loop and await it from the caller's loop"""
+        loop = self._pool_loop()
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def _spawn(self, coro: Awaitable[Any]):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _notify_capacity(self):
+        if self._capacity is None:
+            self._capacity = asyncio.Condition()
+        async with self._capacity:
+            self._capacity.notify_all()
+
+    # === LEASING ===
+
+    async def lease(
+        self,
+        kind: str,
+        config: Dict[str, Any],
+        user_id: str,
+        max_lifetime: Optional[float] = None
+    ) -> Lease:
+        """
+        An instance for ``user_id``: one it returned earlier, a warm spare, or
+        a fresh boot. The lease is reclaimed after ``max_lifetime`` seconds
+        (default ``max_lease_seconds``) unless released first.
+        """
+        return await self._call(self._lease(kind, config, user_id, max_lifetime))
+
+    async def _lease(self, kind: str, config: Dict[str, Any], user_id: str, max_lifetime: Optional[float]) -> Lease:
+        await self._reap()
+        key = pool_key(kind, config)
+
+        reused = True
+        pooled = await self._take_healthy(self._returned.get((user_id, key)), returned=True)
+        if pooled is not None:
+            self.metrics['user_hits'] += 1
+        else:
+            pooled = await self._take_healthy(self._spares.get(key), returned=False)
+            if pooled is not None:
+                self.metrics['spare_hits'] += 1
+            else:
+                self.metrics['misses'] += 1
+                reused = False
+                await self._reserve()
+                pooled = _PooledInstance(await self._boot(kind, config), key)
+
+        pooled.owner = pooled.owner or user_id
+        pooled.last_used = time.time()
+        lifetime = self.max_lease_seconds if max_lifetime is None else max_lifetime
+        lease = Lease(f"lease_{uuid.uuid4().hex[:12]}", user_id, kind, pooled.instance, reused, time.time() + lifetime)
+        self._leases[lease.lease_id] = (lease, pooled)
+        self.metrics['leases'] += 1
+        self._replenish(key)
+        return lease
+
+    async def release(self, lease_id: str, reusable: bool = True) -> bool:
+        """
+        Return a leased instance. Reusable instances stay warm for the same
+        user; pass ``reusable=False`` for instances left in a state no later
+        lease should see, which shuts them down.
+        """
+        return await self._call(self._release(lease_id, reusable))
+
+    async def _release(self, lease_id: str, reusable: bool) -> bool:
+        entry = self._leases.pop(lease_id, None)
+        if entry is None:
+            return False
+        _, pooled = entry
+        if not reusable or self.idle_timeout_seconds <= 0:
+            await self._stop(pooled)
+        else:
+            pooled.last_used = time.time()
+            slot = (pooled.owner, pooled.key)
+            self._returned.setdefault(slot, deque()).append(pooled)
+            self._returned_order[pooled.instance_id] = slot
+        await self._notify_capacity()
+        return True
+
+    async def _take_healthy(self, instances: Optional[Deque[_PooledInstance]], returned: bool) -> Optional[_PooledInstance]:
+        while instances:
+            pooled = instances.pop() if returned else instances.popleft()  # warmest returned instance first
+            if returned:
+                self._returned_order.pop(pooled.instance_id, None)
+            if time.time() - pooled.last_checked >= self.health_check_interval:
+                # Counted as booting while it is checked, so the slot stays claimed
+                self._booting += 1
+                try:
+                    healthy = await self.provider.is_healthy(pooled.instance_id)
+                except Exception as e:
+                    logger.warning(f"Health check for instance {pooled.instance_id} failed: {e}")
+                    healthy = False
+                finally:
+                    self._booting -= 1
+                    self._spawn(self._notify_capacity())
+                if not healthy:
+                    self.metrics['health_check_failures'] += 1
+                    await self._stop(pooled)
+                    continue
+                pooled.last_checked = time.time()
+            return pooled
+        return None
+
+    def active_leases(self) -> List[Lease]:
+        return [lease for lease, _ in self._leases.copy().values()]
+
+    # === CAPACITY ===
+
+    def total(self) -> int:
+        return (
+            sum(len(spares) for spares in self._spares.values())
+            + len(self._returned_order) + len(self._leases) + self._booting
+        )
+
+    async def _reserve(self):
+        """Claim one boot slot under the cap, evicting or waiting for booting instances as needed"""
+        while True:
+            # Claim before any await so concurrent leases can't all pass the check
+            evicted = self._evict_for_room()
+            for pooled in evicted:
+                self._spawn(self._stop(pooled))
+            if self.total() < self.max_total:
+                self._booting += 1
+                return
+            if not self._booting:
+                raise PoolExhaustedError(f"All {self.max_total} instances are leased")
+            if self._capacity is None:
+                self._capacity = asyncio.Condition()
+            async with self._capacity:
+                await self._capacity.wait()
+
+    def _evict_for_room(self) -> List[_PooledInstance]:
+        """Pop least recently returned instances, then spares, until one more fits"""
+        evicted = []
+        while self.total() >= self.max_total:
+            if self._returned_order:
+                instance_id, slot = self._returned_order.popitem(last=False)
+                pooled = self._pop_returned(slot, instance_id)
+            else:
+                spares = next((spares for spares in self._spares.values() if spares), None)
+                if spares is None:
+                    break
+                pooled = spares.popleft()
+            self.metrics['evictions'] += 1
+            if pooled is not None:
+                logger.info(f"Shutting down idle instance {pooled.instance_id} (pool at capacity)")
+                evicted.append(pooled)
+        return evicted
+
+    async def reap(self) -> int:
+        """
+        Shut down returned instances idle for longer than
+        ``idle_timeout_seconds`` and reclaim expired leases
+        """
+        return await self._call(self._reap())
+
+    async def _reap(self) -> int:
+        now = time.time()
+        cutoff = now - self.idle_timeout_seconds
+        idle = []
+        for slot, instances in list(self._returned.items()):
+            for pooled in [p for p in instances if p.last_used < cutoff]:
+                instances.remove(pooled)
+                self._returned_order.pop(pooled.instance_id, None)
+                idle.append(pooled)
+            if not instances:
+                del self._returned[slot]
+
+        expired = [lease_id for lease_id, (lease, _) in self._leases.items() if lease.expires_at <= now]
+        reclaimed = []
+        for lease_id in expired:
+            lease, pooled = self._leases.pop(lease_id)
+            logger.warning(f"Reclaiming instance {lease.instance_id}: lease {lease_id} outlived its lifetime")
+            reclaimed.append(pooled)
+            if self.on_lease_expired is not None:
+                try:
+                    self.on_lease_expired(lease)
+                except Exception as e:
+                    logger.error(f"Error in lease expiry callback: {e}")
+
+        for pooled in idle + reclaimed:
+            await self._stop(pooled)
+        self.metrics['idle_shutdowns'] += len(idle)
+        self.metrics['expired_leases'] += len(reclaimed)
+        if idle or reclaimed:
+            await self._notify_capacity()
+        return len(idle) + len(reclaimed)
+
+    async def _reap_periodically(self):
+        while True:
+            await asyncio.sleep(self.reap_interval)
+            try:
+                await self._reap()
+            except Exception as e:
+                logger.error(f"Error reaping instance pool: {e}")
+
+    def _pop_returned(self, slot: Tuple[str, PoolKey], instance_id: str) -> Optional[_PooledInstance]:
+        instances = self._returned.get(slot)
+        if not instances:
+            return None
+        for pooled in instances:
+            if pooled.instance_id == instance_id:
+                instances.remove(pooled)
+                if not instances:
+                    del self._returned[slot]
+                return pooled
+        return None
+
+    # === BOOTING ===
+
+    async def _boot(self, kind: str, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Boot into a slot already claimed in ``_booting``"""
+        start = time.perf_counter()
+        try:
+            instance = await self.provider.start(kind, config)
+            if not instance.get('instance_id'):
+                raise RuntimeError(instance.get('error') or f"Failed to start {kind} instance")
+        except Exception:
+            self.metrics['boot_failures'] += 1
+            raise
+        finally:
+            self._booting -= 1
+            self._spawn(self._notify_capacity())
+        self._boot_latencies_ms.append((time.perf_counter() - start) * 1000)
+        self.metrics['boots'] += 1
+        return instance
+
+    async def _boot_spare(self, key: PoolKey):
+        kind, config, _ = self._warm_targets[key]
+        try:
+            instance = await self._boot(kind, config)
+        except Exception as e:
+            logger.warning(f"Failed to pre-warm {kind} instance: {e}")
+            return
+        finally:
+            self._spares_booting[key] -= 1
+        self._spares.setdefault(key, deque()).append(_PooledInstance(instance, key))
+
+    def _replenish(self, key: PoolKey):
+        """Top the key's spares back up in the background, within the cap"""
+        target = self._warm_targets.get(key)
+        if target is None:
+            return
+        wanted = target[2] - len(self._spares.get(key, ())) - self._spares_booting.get(key, 0)
+        for _ in range(max(0, min(wanted, self.max_total - self.total()))):
+            self._booting += 1
+            self._spares_booting[key] = self._spares_booting.get(key, 0) + 1
+            self._spawn(self._boot_spare(key))
+
+    async def prewarm(self):
+        """Boot every configured spare now (e.g. during start-up warm-up)"""
+        await self._call(self._prewarm())
+
+    async def _prewarm(self):
+        for key in self._warm_targets:
+            self._replenish(key)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _stop(self, pooled: _PooledInstance):
+        try:
+            await self.provider.stop(pooled.instance_id)
+        except Exception as e:
+            logger.error(f"Error stopping instance {pooled.instance_id}: {e}")
+
+    async def close_all(self):
+        await self._call(self._close_all())
+
+    async def _close_all(self):
+        for task in list(self._tasks):
+            task.cancel()
+        for lease_id in list(self._leases):
+            await self._release(lease_id, reusable=False)
+        for instances in list(self._spares.values()) + list(self._returned.values()):
+            while instances:
+                await self._stop(instances.popleft())
+        self._returned.clear()
+        self._returned_order.clear()
+
+    def get_metrics(self) -> Dict[str, Any]:
+        latencies = sorted(self._boot_latencies_ms)
+        reused = self.metrics['user_hits'] + self.metrics['spare_hits']
+        return {
+            **self.metrics,
+            'reuse_rate': reused / self.metrics['leases'] if self.metrics['leases'] else 0.0,
+            'spares': {f"{kind}:{digest}": len(spares) for (kind, digest), spares in self._spares.copy().items()},
+            'returned': len(self._returned_order),
+            'leased': len(self._leases),
+            'booting': self._booting,
+            'max_total': self.max_total,
+            'boot_latency_ms': {
+                'avg': round(sum(latencies) / len(latencies), 2) if latencies else None,
+                'p95': round(latencies[int(0.95 * (len(latencies) - 1))], 2) if latencies else None
+            }
+        }
@@ -1,14 +1,19 @@
 # backend/services/intelligent_execution_router.py
 """
 🧠 Intelligent Execution Router - Mama Bear's Decision Engine
-Routes tasks between E2B (quick/cheap) and Scrapybara (full/robust) based on complexity analysis
+Routes tasks between a local resource-limited subprocess (trivial, safe snippets),
+E2B (quick/cheap) and Scrapybara (full/robust) based on complexity analysis
 """
 
 import asyncio
 import ast
+import hashlib
+import os
 import re
 import logging
-from typing import Dict, Any, List, Optional, Tuple
+import threading
+from collections import OrderedDict, deque
+from typing import Dict, Any, Callable, List, Optional, Tuple
 from dataclasses import dataclass
 from enum import Enum
 import time
@@ -17,10 +22,91 @@ from datetime import datetime, timedelta
 from .enhanced_gemini_scout_orchestration import EnhancedGeminiScoutOrchestrator
 from .enhanced_code_execution import EnhancedMamaBearCodeExecution, CodeExecutionResult
 from .enhanced_scrapybara_integration import EnhancedScrapybaraManager
+from .execution_rollups import TimeBucketedRollups
+from .local_executor import LocalSubprocessExecutor, LOCAL_EXECUTION_AVAILABLE, local_blocker
+from .route_cost_model import RouteCostModel, route_features
+from .snippet_batching import plan_snippet_groups, reads_session_state
+from .token_estimator import estimate_tokens
 
 logger = logging.getLogger(__name__)
 
+# Snippets longer than this are analyzed in a worker thread to keep the event loop responsive
+SNIPPET_ANALYSIS_THREAD_THRESHOLD = int(os.getenv('SNIPPET_ANALYSIS_THREAD_THRESHOLD', 20000))
+SNIPPET_ANALYSIS_CACHE_SIZE = int(os.getenv('SNIPPET_ANALYSIS_CACHE_SIZE', 2048))
+
+# Independent snippet groups run at most this many at a time per batch
+BATCH_MAX_CONCURRENCY = int(os.getenv('BATCH_MAX_CONCURRENCY', 4))
+
+# How many seconds of latency one USD of execution cost is worth when comparing routes
+ROUTE_COST_WEIGHT_SECONDS_PER_USD = float(os.getenv('ROUTE_COST_WEIGHT_SECONDS_PER_USD', 1000))
+
+# System-operation patterns for code that isn't Python, compiled once and grouped by language
+_SYSTEM_PATTERNS = {
+    'python': [re.compile(r'os\.system\('), re.compile(r'subprocess\.')],
+    'php': [re.compile(r'shell_exec\(')],
+    'c': [re.compile(r'system\(')],
+    'javascript': [re.compile(r'exec\(')],
+    'java': [re.compile(r'Runtime\.getRuntime\(\)\.exec\(')]
+}
+_DEPENDENCY_PATTERN = re.compile(r'(?:import|require|include)\s+')
+
+_SYSTEM_CALL_ATTRS = frozenset({'system', 'run', 'call', 'Popen'})
+_DYNAMIC_EXEC_NAMES = frozenset({'exec', 'eval', 'compile'})
+_NESTING_NODES = (
+    ast.For, ast.AsyncFor, ast.While, ast.If, ast.With, ast.AsyncWith, ast.Try,
+    ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef
+)
+_LOOP_NODES = (ast.For, ast.AsyncFor, ast.While, ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+class _SnippetVisitor(ast.NodeVisitor):
+    """Collects imports, calls, loops, nesting depth and local-execution blockers in one tree walk"""
+    
+    def __init__(self):
+        self.dependencies = 0
+        self.loops = 0
+        self.max_depth = 0
+        self.system_ops: List[str] = []
+        self.risk_factors: List[str] = []
+        self.local_blockers: List[str] = []
+        self._depth = 0
+    
+    def visit(self, node: ast.AST):
+        blocker = local_blocker(node)
+        if blocker:
+            self.local_blockers.append(blocker)
+        return super().visit(node)
+    
+    def generic_visit(self, node: ast.AST):
+        if isinstance(node, _LOOP_NODES):
+            self.loops += 1
+        if isinstance(node, _NESTING_NODES):
+            self._depth += 1
+            self.max_depth = max(self.max_depth, self._depth)
+            super().generic_visit(node)
+            self._depth -= 1
+        else:
+            super().generic_visit(node)
+    
+    def visit_Import(self, node: ast.Import):
+        self.dependencies += 1
+        self.generic_visit(node)
+    
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        self.dependencies += 1
+        self.generic_visit(node)
+    
+    def visit_Call(self, node: ast.Call):
+        func = node.func
+        if isinstance(func, ast.Attribute) and func.attr in _SYSTEM_CALL_ATTRS:
+            self.system_ops.append(f"subprocess.{func.attr}")
+            self.risk_factors.append("System command execution detected")
+        if isinstance(func, ast.Name) and func.id in _DYNAMIC_EXEC_NAMES:
+            self.risk_factors.append(f"Dynamic code execution: {func.id}")
+        self.generic_visit(node)
+    
+
 class ExecutionRoute(Enum):
+    LOCAL = "local"  # Resource-limited subprocess on this host
     E2B = "e2b"
     SCRAPYBARA = "scrapybara"
     HYBRID = "hybrid"  # Use both for validation pipeline
@@ -52,26 +138,43 @@ class IntelligentExecutionRouter:
     def __init__(self, 
                  scout_orchestrator: Optional[EnhancedGeminiScoutOrchestrator],
                  e2b_execution: EnhancedMamaBearCodeExecution,
-                 scrapybara_manager: EnhancedScrapybaraManager):
+                 scrapybara_manager: EnhancedScrapybaraManager,
+                 local_executor: Optional[LocalSubprocessExecutor] = None):
         self.scout = scout_orchestrator
         self.e2b = e2b_execution
         self.scrapybara = scrapybara_manager
+        self.local = local_executor
         
         # Routing metrics
         self.routing_history = []
         self.performance_cache = {}
+        self.route_latencies: Dict[str, deque] = {}  # route -> recent (seconds, success)
+        self.rollups = TimeBucketedRollups()  # per-minute/hour counts for metrics queries
+        
+        # Snippet analysis memo (content hash -> analysis), shared with worker threads
+        self._snippet_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._snippet_cache_lock = threading.Lock()
+        self.snippet_cache_stats = {'hits': 0, 'misses': 0}
+        
+        # Learned duration model per route, trained from observed executions
+        self.cost_model = RouteCostModel()
         
         # Cost constants (per hour)
+        self.LOCAL_COST_PER_HOUR = 0.0
         self.E2B_COST_PER_HOUR = 0.10
         self.SCRAPYBARA_COST_PER_HOUR = 2.50
         
+        # Scout analysis model cost (per 1k tokens)
+        self.ANALYSIS_COST_PER_1K_TOKENS = 0.000075
+        
         logger.info("🧠 Intelligent Execution Router initialized")
     
     async def analyze_task_complexity(self, 
                                     task_description: str,
                                     code_snippets: Optional[List[str]] = None,
                                     file_paths: Optional[List[str]] = None,
-                                    user_context: Optional[Dict[str, Any]] = None) -> TaskComplexityAnalysis:
+                                    user_context: Optional[Dict[str, Any]] = None,
+                                    user_id: Optional[str] = None) -> TaskComplexityAnalysis:
         """
         🔍 Comprehensive task complexity analysis using Mama Bear intelligence
         """
@@ -86,21 +189,25 @@ class IntelligentExecutionRouter:
         complexity_factors = []
         risk_factors = []
         system_operations = []
+        local_blockers = []
         
         # Default values
         code_lines = 0
+        code_tokens = 0
         file_count = len(file_paths) if file_paths else len(code_snippets) if code_snippets else 1
         dependency_count = 0
         
         # 1. Analyze code snippets
         if code_snippets:
             for snippet in code_snippets:
-                analysis = self._analyze_code_snippet(snippet)
+                analysis = await self._analyze_code_snippet_async(snippet)
                 code_lines += analysis['lines']
+                code_tokens += estimate_tokens(snippet)
                 dependency_count += analysis['dependencies']
                 system_operations.extend(analysis['system_ops'])
                 complexity_factors.extend(analysis['complexity_factors'])
                 risk_factors.extend(analysis['risk_factors'])
+                local_blockers.extend(analysis['local_blockers'])
         
         # 2. Mama Bear NLP analysis of task description
         mama_bear_assessment = await self._mama_bear_task_analysis(task_description, user_context)
@@ -116,13 +223,19 @@ class IntelligentExecutionRouter:
         )
         
         # 5. Determine routing recommendation
+        local_eligible = (
+            self.local is not None and bool(code_snippets)
+            and not local_blockers and not system_operations and not risk_factors
+        )
+        features = route_features(final_score, code_lines, dependency_count, len(system_operations))
         route, confidence = self._determine_optimal_route(
-            final_score, complexity_factors, risk_factors
+            final_score, complexity_factors, risk_factors, local_eligible, features
         )
         
         # 6. Cost and duration estimation
+        analysis_tokens = code_tokens + estimate_tokens(task_description)
         estimated_duration, estimated_cost = self._estimate_execution_metrics(
-            route, final_score, code_lines
+            route, final_score, code_tokens, analysis_tokens, features
         )
         
         # 7. Generate reasoning
@@ -149,75 +262,104 @@ class IntelligentExecutionRouter:
         # Store for learning
         self.routing_history.append({
             'timestamp': datetime.now(),
+            'user_id': user_id,
             'analysis': analysis,
             'task_description': task_description,
             'processing_time': time.time() - start_time
         })
+        self.rollups.record_decision(user_id or 'default', route.value, final_score, estimated_cost)
         
         logger.info(f"🧠 Task complexity analysis completed: Score={final_score:.2f}, Route={route.value}, Confidence={confidence:.2f}")
         
         return analysis
     
+    async def _analyze_code_snippet_async(self, code: str) -> Dict[str, Any]:
+        """Cached snippet analysis; large uncached snippets are parsed in a worker thread"""
+        
+        if len(code) > SNIPPET_ANALYSIS_THREAD_THRESHOLD and self._cached_snippet_analysis(code) is None:
+            return await asyncio.to_thread(self._analyze_code_snippet, code)
+        return self._analyze_code_snippet(code)
+    
+    @staticmethod
+    def _snippet_key(code: str) -> str:
+        return hashlib.blake2b(code.encode('utf-8', errors='surrogatepass'), digest_size=16).hexdigest()
+    
+    def _cached_snippet_analysis(self, code: str, key: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        key = key or self._snippet_key(code)
+        with self._snippet_cache_lock:
+            cached = self._snippet_cache.get(key)
+            if cached is not None:
+                self._snippet_cache.move_to_end(key)
+        return cached
+    
     def _analyze_code_snippet(self, code: str) -> Dict[str, Any]:
-        """Analyze individual code snippet for complexity indicators"""
+        """Analyze individual code snippet for complexity indicators (memoized by content hash)"""
+        
+        key = self._snippet_key(code)
+        cached = self._cached_snippet_analysis(code, key)
+        if cached is None:
+            self.snippet_cache_stats['misses'] += 1
+            cached = self._compute_snippet_analysis(code)
+            with self._snippet_cache_lock:
+                self._snippet_cache[key] = cached
+                while len(self._snippet_cache) > SNIPPET_ANALYSIS_CACHE_SIZE:
+                    self._snippet_cache.popitem(last=False)
+        else:
+            self.snippet_cache_stats['hits'] += 1
         
+        # Callers extend their own lists from these; hand out copies so the memo stays intact
+        return {name: list(value) if isinstance(value, list) else value for name, value in cached.items()}
+    
+    def _compute_snippet_analysis(self, code: str) -> Dict[str, Any]:
         lines = len([line for line in code.split('\n') if line.strip()])
         complexity_factors = []
         risk_factors = []
         system_ops = []
+        local_blockers = []  # Reasons the snippet can't run in the local subprocess
         dependencies = 0
+        loops = 0
+        max_depth = 0
         
         try:
-            # Parse Python AST for detailed analysis
-            tree = ast.parse(code)
-            
-            # Count imports (dependencies)
-            for node in ast.walk(tree):
-                if isinstance(node, (ast.Import, ast.ImportFrom)):
-                    dependencies += 1
-                    
-                # Check for system operations
-                if isinstance(node, ast.Call):
-                    if hasattr(node.func, 'attr'):
-                        if node.func.attr in ['system', 'run', 'call', 'Popen']:
-                            system_ops.append(f"subprocess.{node.func.attr}")
-                            risk_factors.append("System command execution detected")
-                    
-                    if hasattr(node.func, 'id'):
-                        if node.func.id in ['exec', 'eval', 'compile']:
-                            risk_factors.append(f"Dynamic code execution: {node.func.id}")
+            # Parse Python AST and collect everything in a single walk
+            visitor = _SnippetVisitor()
+            visitor.visit(ast.parse(code))
+            dependencies = visitor.dependencies
+            loops = visitor.loops
+            max_depth = visitor.max_depth
+            system_ops = visitor.system_ops
+            risk_factors = visitor.risk_factors
+            local_blockers = visitor.local_blockers
             
             # Complexity indicators
             if lines > 50:
                 complexity_factors.append("High line count")
             if dependencies > 5:
                 complexity_factors.append("Many dependencies")
+            if max_depth > 4:
+                complexity_factors.append("Deeply nested control flow")
                 
         except SyntaxError:
             # Not Python code, use regex analysis
-            dependencies = len(re.findall(r'(?:import|require|include)\s+', code))
+            local_blockers.append("Not Python code")
+            dependencies = len(_DEPENDENCY_PATTERN.findall(code))
             
             # Check for system operations in other languages
-            system_patterns = [
-                r'os\.system\(',
-                r'subprocess\.',
-                r'exec\(',
-                r'shell_exec\(',
-                r'system\(',
-                r'Runtime\.getRuntime\(\)\.exec\(',
-            ]
-            
-            for pattern in system_patterns:
-                if re.search(pattern, code):
-                    system_ops.append("System operation detected")
-                    risk_factors.append("System operation in non-Python code")
+            for patterns in _SYSTEM_PATTERNS.values():
+                for pattern in patterns:
+                    if pattern.search(code):
+                        system_ops.append("System operation detected")
+                        risk_factors.append("System operation in non-Python code")
         
         return {
             'lines': lines,
             'dependencies': dependencies,
+            'loops': loops,
+            'max_depth': max_depth,
             'system_ops': system_ops,
             'complexity_factors': complexity_factors,
-            'risk_factors': risk_factors
+            'risk_factors': risk_factors,
+            'local_blockers': local_blockers
         }
     
     async def _mama_bear_task_analysis(self, 
@@ -425,14 +567,25 @@ class IntelligentExecutionRouter:
     def _determine_optimal_route(self, 
                                complexity_score: float,
                                complexity_factors: List[str],
-                               risk_factors: List[str]) -> Tuple[ExecutionRoute, float]:
-        """Determine optimal execution route with confidence score"""
+                               risk_factors: List[str],
+                               local_eligible: bool = False,
+                               features: Optional[Any] = None) -> Tuple[ExecutionRoute, float]:
+        """
+        Determine optimal execution route with confidence score
+        
+        The rules below decide which routes can run the task; once the learned
+        model has data for every one of them, the route with the lowest
+        expected latency/cost among them is chosen.
+        """
         
         confidence = 0.8  # Base confidence
+        candidates = None
         
         # Simple routing logic
         if complexity_score <= 3.0:
-            route = ExecutionRoute.E2B
+            # Safe, low-complexity snippets skip the sandbox boot entirely
+            route = ExecutionRoute.LOCAL if local_eligible else ExecutionRoute.E2B
+            candidates = [ExecutionRoute.LOCAL, ExecutionRoute.E2B] if local_eligible else None
             confidence += 0.1
         elif complexity_score >= 7.0:
             route = ExecutionRoute.SCRAPYBARA
@@ -440,6 +593,7 @@ class IntelligentExecutionRouter:
         else:
             # Medium complexity - need more analysis
             route = ExecutionRoute.E2B  # Default to cheaper option
+            candidates = [ExecutionRoute.E2B, ExecutionRoute.SCRAPYBARA]
             confidence -= 0.2
             
             # Check for specific factors requiring Scrapybara
@@ -451,28 +605,69 @@ class IntelligentExecutionRouter:
             all_factors = ' '.join(complexity_factors + risk_factors).lower()
             if any(indicator in all_factors for indicator in scrapybara_indicators):
                 route = ExecutionRoute.SCRAPYBARA
+                candidates = None
                 confidence += 0.3
         
+        if candidates and features is not None:
+            learned = self._lowest_expected_cost_route(candidates, features)
+            if learned is not None and learned != route:
+                logger.info(f"📐 Learned cost model prefers {learned.value} over {route.value}")
+                route = learned
+        
         return route, min(confidence, 1.0)
     
+    def _lowest_expected_cost_route(self, candidates: List[ExecutionRoute], features: Any) -> Optional[ExecutionRoute]:
+        """Candidate minimizing predicted latency plus weighted cost, retries included; None until all are trained"""
+        
+        best_route, best_objective = None, None
+        for candidate in candidates:
+            duration = self.cost_model.predict_duration(candidate.value, features)
+            if duration is None:
+                return None
+            cost = (duration / 3600) * self._cost_per_hour(candidate)
+            # Failed runs get retried, so expected spend scales with 1 / success rate
+            objective = (duration + cost * ROUTE_COST_WEIGHT_SECONDS_PER_USD) / self.cost_model.success_rate(candidate.value)
+            if best_objective is None or objective < best_objective:
+                best_route, best_objective = candidate, objective
+        return best_route
+    
     def _estimate_execution_metrics(self, 
                                   route: ExecutionRoute,
                                   complexity_score: float,
-                                  code_lines: int) -> Tuple[int, float]:
-        """Estimate execution duration and cost"""
+                                  code_tokens: int,
+                                  analysis_tokens: int = 0,
+                                  features: Optional[Any] = None) -> Tuple[int, float]:
+        """
+        Estimate execution duration and cost (code size measured in tokens, ~10 per line)
+        
+        Uses the learned per-route model once it has enough observations, and
+        the fixed heuristics below until then.
+        """
+        
+        duration = self.cost_model.predict_duration(route.value, features) if features is not None else None
+        if duration is None:
+            duration = self._heuristic_duration(route, complexity_score, code_tokens)
+        cost = (duration / 3600) * self._cost_per_hour(route)
         
+        # Include the scout analysis call itself
+        cost += (analysis_tokens / 1000) * self.ANALYSIS_COST_PER_1K_TOKENS
+        
+        return int(duration), cost
+    
+    def _heuristic_duration(self, route: ExecutionRoute, complexity_score: float, code_tokens: int) -> float:
+        """Fixed per-route duration formulas (seconds), used before the route's model is trained"""
+        
+        if route == ExecutionRoute.LOCAL:
+            # Local: warm interpreter, no sandbox boot, no metered cost
+            base_duration = 1  # seconds
+            return base_duration + (complexity_score * 0.5) + (code_tokens * 0.001)
         if route == ExecutionRoute.E2B:
             # E2B: Fast startup, limited by code complexity
             base_duration = 5  # seconds
-            duration = base_duration + (complexity_score * 2) + (code_lines * 0.1)
-            cost = (duration / 3600) * self.E2B_COST_PER_HOUR
-        else:
-            # Scrapybara: Slower startup, scales better
-            base_duration = 60  # seconds
-            duration = base_duration + (complexity_score * 10) + (code_lines * 0.5)
-            cost = (duration / 3600) * self.SCRAPYBARA_COST_PER_HOUR
-        
-        return int(duration), cost
+            return base_duration + (complexity_score * 2) + (code_tokens * 0.01)
+        # Scrapybara: Slower startup, scales better
+        base_duration = 60  # seconds
+        return base_duration + (complexity_score * 10) + (code_tokens * 0.05)
     
     def _generate_routing_reasoning(self, 
                                   complexity_score: float,
@@ -492,7 +687,10 @@ class IntelligentExecutionRouter:
             reasoning.append(f"Medium complexity score ({complexity_score:.1f}/10) analyzed for optimal routing")
         
         # Route-specific reasoning
-        if route == ExecutionRoute.E2B:
+        if route == ExecutionRoute.LOCAL:
+            reasoning.append("Local subprocess selected: no system operations, risky calls or non-stdlib imports")
+            reasoning.append("Runs under CPU, memory and time limits without a sandbox boot")
+        elif route == ExecutionRoute.E2B:
             reasoning.append("E2B selected for fast, cost-effective execution")
             reasoning.append("Task suitable for isolated sandbox environment")
         else:
@@ -520,25 +718,24 @@ class IntelligentExecutionRouter:
         
         # 1. Analyze task complexity
         analysis = await self.analyze_task_complexity(
-            task_description, code_snippets, user_context=user_context
+            task_description, code_snippets, user_context=user_context, user_id=user_id
         )
         
         # 2. Execute using recommended route
         execution_start = time.time()
         
-        if analysis.route_recommendation == ExecutionRoute.E2B:
+        if analysis.route_recommendation == ExecutionRoute.LOCAL:
+            result = await self._execute_via_local(code_snippets, user_id, analysis)
+        elif analysis.route_recommendation == ExecutionRoute.E2B:
             result = await self._execute_via_e2b(code_snippets, user_id, analysis)
         else:
             result = await self._execute_via_scrapybara(code_snippets, user_id, analysis)
         
         execution_time = time.time() - execution_start
-        actual_cost = (execution_time / 3600) * (
-            self.E2B_COST_PER_HOUR if analysis.route_recommendation == ExecutionRoute.E2B 
-            else self.SCRAPYBARA_COST_PER_HOUR
-        )
+        actual_cost = (execution_time / 3600) * self._cost_per_hour(analysis.route_recommendation)
         
         # 3. Update learning metrics
-        self._update_routing_performance(analysis, result, execution_time, actual_cost)
+        self._update_routing_performance(analysis, result, execution_time, actual_cost, user_id)
         
         return {
             'success': result.success,
@@ -551,6 +748,187 @@ class IntelligentExecutionRouter:
             'cost_savings': max(0, analysis.estimated_cost - actual_cost)
         }
     
+    async def execute_batch_with_optimal_routing(self,
+                                               task_description: str,
+                                               code_snippets: List[str],
+                                               user_id: str = "default",
+                                               user_context: Dict[str, Any] = None,
+                                               max_concurrency: Optional[int] = None,
+                                               on_result: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        🧩 Execute independent snippets in parallel on the optimal route
+        
+        Snippets are grouped by data dependency (see ``plan_snippet_groups``);
+        groups run on up to ``max_concurrency`` workers (capped at
+        ``BATCH_MAX_CONCURRENCY``), each with its own local process per group
+        or its own pooled sandbox session. The first worker uses the user's
+        own session, so groups reading names the batch doesn't bind (state
+        from earlier executions, see ``reads_session_state``) run there and
+        see that state, and any changes they make persist. The other workers
+        use per-user batch sessions ("<user>:batch-<n>") that start without
+        the user's state and stay parked after the batch for the user's next
+        one, until the pool reaps or evicts them.
+        ``on_result`` is called with each group's result as it finishes.
+        """
+        
+        analysis = await self.analyze_task_complexity(
+            task_description, code_snippets, user_context=user_context, user_id=user_id
+        )
+        route = analysis.route_recommendation
+        groups = plan_snippet_groups(code_snippets)
+        
+        # One Scrapybara VM per task; local workers and E2B sandboxes are pooled
+        concurrency = min(max_concurrency or BATCH_MAX_CONCURRENCY, BATCH_MAX_CONCURRENCY)
+        if route not in (ExecutionRoute.LOCAL, ExecutionRoute.E2B):
+            concurrency = 1
+        concurrency = max(1, min(concurrency, len(groups)))
+        
+        # Groups that need the user's session state only run on worker 0, which uses that session
+        session_state = reads_session_state(code_snippets)
+        in_session: asyncio.Queue = asyncio.Queue()
+        anywhere: asyncio.Queue = asyncio.Queue()
+        for group_index, group in enumerate(groups):
+            queue = in_session if any(session_state[index] for index in group) else anywhere
+            queue.put_nowait((group_index, group))
+        results: List[Dict[str, Any]] = []
+        batch_start = time.perf_counter()
+        
+        async def worker(slot: int):
+            # Workers never share a sandbox session; slot sessions are kept for the user's next batch
+            if slot == 0:
+                await run_groups(user_id, in_session)
+                await run_groups(user_id, anywhere)
+            else:
+                await run_groups(f"{user_id}:batch-{slot}", anywhere)
+        
+        async def run_groups(session_user: str, pending: asyncio.Queue):
+            while not pending.empty():
+                group_index, group = pending.get_nowait()
+                snippets = [code_snippets[index] for index in group]
+                group_start = time.perf_counter()
+                if route == ExecutionRoute.LOCAL:
+                    result = await self._execute_via_local(snippets, session_user, analysis)
+                elif route == ExecutionRoute.E2B:
+                    result = await self._execute_via_e2b(snippets, session_user, analysis)
+                else:
+                    result = await self._execute_via_scrapybara(snippets, user_id, analysis)
+                finished = time.perf_counter()
+                group_result = {
+                    'group': group_index,
+                    'snippet_indexes': group,
+                    'success': result.success,
+                    'output': result.output,
+                    'error': result.error,
+                    'execution_time': finished - group_start,
+                    'finished_after': finished - batch_start
+                }
+                results.append(group_result)
+                if on_result is not None:
+                    on_result(group_result)
+        
+        await asyncio.gather(*(worker(slot) for slot in range(concurrency)))
+        
+        wall_time = time.perf_counter() - batch_start
+        serial_time = sum(r['execution_time'] for r in results)
+        results.sort(key=lambda r: r['group'])
+        success = all(r['success'] for r in results)
+        # Parallel sandboxes are each billed for their own run time
+        actual_cost = (serial_time / 3600) * self._cost_per_hour(route)
+        
+        self._update_routing_performance(
+            analysis,
+            CodeExecutionResult(success=success, output="", execution_time=wall_time),
+            wall_time,
+            actual_cost,
+            user_id
+        )
+        
+        return {
+            'success': success,
+            'results': results,
+            'analysis': analysis,
+            'route_used': route.value,
+            'groups': len(groups),
+            'concurrency': concurrency,
+            'execution_time': wall_time,
+            'serial_execution_time': serial_time,
+            'speedup': serial_time / wall_time if wall_time > 0 else 1.0,
+            'actual_cost': actual_cost
+        }
+    
+    async def execute_with_streaming(self,
+                                   task_description: str,
+                                   code: str,
+                                   user_id: str = "default",
+                                   user_context: Dict[str, Any] = None,
+                                   on_output: Optional[Callable[[str, str], None]] = None,
+                                   cancel_event: Optional[threading.Event] = None) -> Dict[str, Any]:
+        """
+        📡 Execute on the optimal route, streaming stdout/stderr chunks to
+        ``on_output(stream, text)`` as they are produced
+        
+        ``on_output`` may be called from worker threads. Setting
+        ``cancel_event`` kills the execution. Scrapybara runs don't stream;
+        their output arrives as one chunk at the end.
+        """
+        
+        analysis = await self.analyze_task_complexity(
+            task_description, [code], user_context=user_context, user_id=user_id
+        )
+        route = analysis.route_recommendation
+        execution_start = time.time()
+        
+        if route == ExecutionRoute.LOCAL:
+            result = await self.local.execute(code, on_output=on_output, cancel_event=cancel_event)
+        elif route == ExecutionRoute.E2B:
+            result = await self.e2b.execute_code_streaming(
+                code=code,
+                user_id=user_id,
+                timeout=max(30, analysis.estimated_duration + 10),
+                on_output=on_output,
+                cancel_event=cancel_event
+            )
+        else:
+            result = await self._execute_via_scrapybara([code], user_id, analysis)
+            if on_output is not None and result.output:
+                on_output('stdout', result.output)
+        
+        execution_time = time.time() - execution_start
+        actual_cost = (execution_time / 3600) * self._cost_per_hour(route)
+        cancelled = cancel_event is not None and cancel_event.is_set()
+        if not cancelled:
+            self._update_routing_performance(analysis, result, execution_time, actual_cost, user_id)
+        
+        return {
+            'success': result.success,
+            'output': result.output,
+            'error': result.error,
+            'cancelled': cancelled,
+            'execution_time': execution_time,
+            'actual_cost': actual_cost,
+            'route_used': route.value,
+            'complexity_score': analysis.score
+        }
+    
+    def _cost_per_hour(self, route: ExecutionRoute) -> float:
+        if route == ExecutionRoute.LOCAL:
+            return self.LOCAL_COST_PER_HOUR
+        if route == ExecutionRoute.E2B:
+            return self.E2B_COST_PER_HOUR
+        return self.SCRAPYBARA_COST_PER_HOUR
+    
+    async def _execute_via_local(self, 
+                               code_snippets: List[str],
+                               user_id: str,
+                               analysis: TaskComplexityAnalysis) -> CodeExecutionResult:
+        """Execute via the local resource-limited subprocess, falling back to E2B if it can't start"""
+        
+        try:
+            return await self.local.execute('\n\n'.join(code_snippets))
+        except OSError as e:
+            logger.warning(f"Local execution unavailable, falling back to E2B: {e}")
+            return await self._execute_via_e2b(code_snippets, user_id, analysis)
+    
     async def _execute_via_e2b(self, 
                              code_snippets: List[str],
                              user_id: str,
@@ -610,7 +988,8 @@ class IntelligentExecutionRouter:
         analysis = await self.analyze_task_complexity(
             task_description=task_description,
             code_snippets=code_snippets or [],
-            user_context=user_context or {}
+            user_context=user_context or {},
+            user_id=user_id
         )
         
         # Return routing decision
@@ -626,26 +1005,44 @@ class IntelligentExecutionRouter:
     
     async def log_execution_result(self,
                                  routing_decision: Dict[str, Any],
-                                 execution_result: Dict[str, Any],
-                                 user_id: str) -> None:
+                                 execution_result: Any,
+                                 user_id: str,
+                                 latency_seconds: Optional[float] = None) -> None:
         """
         📊 Log execution results for learning and optimization
+        
+        ``execution_result`` may be a result dict or a CodeExecutionResult;
+        ``latency_seconds`` is the measured wall time of the execution.
         """
         
+        def result_field(name: str, default: Any) -> Any:
+            if isinstance(execution_result, dict):
+                return execution_result.get(name, default)
+            return getattr(execution_result, name, default)
+        
+        success = bool(result_field('success', False))
+        execution_time = result_field('execution_time', 0) or 0
         log_entry = {
             'timestamp': datetime.now(),
             'user_id': user_id,
             'routing_decision': routing_decision,
             'execution_result': execution_result,
-            'success': execution_result.get('success', False),
-            'execution_time': execution_result.get('execution_time', 0),
-            'actual_cost': execution_result.get('cost', 0)
+            'success': success,
+            'execution_time': execution_time,
+            'actual_cost': result_field('cost', 0)
         }
         
         # Store in performance cache for learning
         self.performance_cache[f"{user_id}_{datetime.now().isoformat()}"] = log_entry
+        self._observe_execution(
+            routing_decision.get('platform', 'unknown'),
+            routing_decision.get('analysis'),
+            latency_seconds if latency_seconds is not None else execution_time,
+            success,
+            user_id
+        )
         
-        logger.info(f"📊 Logged execution result for user {user_id}: {execution_result.get('success', False)}")
+        logger.info(f"📊 Logged execution result for user {user_id}: {success}")
     
     async def get_execution_metrics(self,
                                   user_id: Optional[str] = None,
@@ -654,49 +1051,44 @@ class IntelligentExecutionRouter:
         📈 Get execution metrics and analytics
         """
         
-        # Parse time range
-        if time_range == "24h":
-            hours = 24
-        elif time_range == "7d":
-            hours = 24 * 7
+        # Parse time range ("30m", "24h", "7d"; anything else means 24h)
+        match = re.fullmatch(r'(\d+)([mhd])', time_range or '')
+        if match:
+            unit = {'m': 'minutes', 'h': 'hours', 'd': 'days'}[match.group(2)]
+            window = timedelta(**{unit: int(match.group(1))})
         else:
-            hours = 24
+            window = timedelta(hours=24)
         
-        cutoff_time = datetime.now() - timedelta(hours=hours)
+        # Sum the pre-aggregated time buckets instead of scanning routing history
+        rollup = self.rollups.query(since=time.time() - window.total_seconds(), user_id=user_id)
+        total_tasks = rollup['total']['count']
         
-        # Filter relevant entries
-        relevant_entries = []
-        for entry in self.routing_history:
-            if entry['timestamp'] >= cutoff_time:
-                if user_id is None or entry.get('user_id') == user_id:
-                    relevant_entries.append(entry)
-        
-        if not relevant_entries:
+        if not total_tasks:
             return {
                 'message': 'No metrics available for the specified time range',
                 'time_range': time_range,
                 'user_id': user_id
             }
         
-        # Calculate metrics
-        total_tasks = len(relevant_entries)
-        e2b_tasks = sum(1 for e in relevant_entries 
-                       if e['analysis'].route_recommendation == ExecutionRoute.E2B)
-        scrapybara_tasks = total_tasks - e2b_tasks
-        
-        avg_complexity = sum(e['analysis'].score for e in relevant_entries) / total_tasks
-        total_cost = sum(e['analysis'].estimated_cost for e in relevant_entries)
+        routing_distribution = {}
+        for route in ExecutionRoute:
+            route_rollup = rollup['by_route'].get(route.value, {})
+            count = route_rollup.get('count', 0)
+            routing_distribution[route.value] = {
+                'count': count,
+                'percentage': (count / total_tasks) * 100,
+                'success_rate': route_rollup.get('success_rate'),
+                'average_duration': route_rollup.get('avg_duration')
+            }
         
         return {
             'time_range': time_range,
             'user_id': user_id,
             'total_tasks': total_tasks,
-            'routing_distribution': {
-                'e2b': {'count': e2b_tasks, 'percentage': (e2b_tasks / total_tasks) * 100},
-                'scrapybara': {'count': scrapybara_tasks, 'percentage': (scrapybara_tasks / total_tasks) * 100}
-            },
-            'average_complexity': avg_complexity,
-            'total_estimated_cost': total_cost,
+            'routing_distribution': routing_distribution,
+            'average_complexity': rollup['total']['avg_complexity'],
+            'total_estimated_cost': rollup['total']['total_cost'],
+            'rollup_granularity': rollup['granularity'],
             'cost_optimization': self._calculate_cost_savings()
         }
     
@@ -704,7 +1096,8 @@ class IntelligentExecutionRouter:
                                   analysis: TaskComplexityAnalysis,
                                   result: CodeExecutionResult,
                                   actual_execution_time: float,
-                                  actual_cost: float):
+                                  actual_cost: float,
+                                  user_id: str = "default"):
         """Update performance metrics for learning"""
         
         performance_data = {
@@ -729,9 +1122,43 @@ class IntelligentExecutionRouter:
         # Keep only recent performance data
         if len(self.performance_cache[route_key]) > 1000:
             self.performance_cache[route_key] = self.performance_cache[route_key][-500:]
+        self._observe_execution(route_key, analysis, actual_execution_time, result.success, user_id)
         
         logger.info(f"📊 Performance updated: Predicted={analysis.estimated_duration}s, Actual={actual_execution_time:.1f}s")
     
+    def _observe_execution(self,
+                           route: str,
+                           analysis: Optional[TaskComplexityAnalysis],
+                           seconds: float,
+                           success: bool,
+                           user_id: str = "default"):
+        """Record an execution's latency and outcome, and train the route's duration model on it"""
+        
+        self.route_latencies.setdefault(route, deque(maxlen=500)).append((seconds, success))
+        self.rollups.record_outcome(user_id, route, success, seconds)
+        if isinstance(analysis, TaskComplexityAnalysis):
+            features = route_features(
+                analysis.score, analysis.code_lines, analysis.dependency_count, len(analysis.system_operations)
+            )
+            self.cost_model.observe(route, features, seconds, success, analysis.estimated_duration)
+    
+    def _latency_comparison(self) -> Dict[str, Any]:
+        """Observed execution latency and success rate per route (recent runs)"""
+        
+        comparison = {}
+        for route, samples in self.route_latencies.items():
+            if not samples:
+                continue
+            durations = sorted(seconds for seconds, _ in samples)
+            comparison[route] = {
+                'executions': len(samples),
+                'avg_seconds': round(sum(durations) / len(durations), 4),
+                'p50_seconds': round(durations[len(durations) // 2], 4),
+                'p95_seconds': round(durations[int(0.95 * (len(durations) - 1))], 4),
+                'success_rate': sum(1 for _, ok in samples if ok) / len(samples)
+            }
+        return comparison
+    
     def get_routing_analytics(self) -> Dict[str, Any]:
         """Get comprehensive routing analytics"""
         
@@ -740,14 +1167,19 @@ class IntelligentExecutionRouter:
             return {'message': 'No routing data available'}
         
         # Calculate metrics
+        local_routes = sum(1 for r in self.routing_history if r['analysis'].route_recommendation == ExecutionRoute.LOCAL)
         e2b_routes = sum(1 for r in self.routing_history if r['analysis'].route_recommendation == ExecutionRoute.E2B)
-        scrapybara_routes = total_routes - e2b_routes
+        scrapybara_routes = total_routes - e2b_routes - local_routes
         
         avg_complexity = sum(r['analysis'].score for r in self.routing_history) / total_routes
         avg_confidence = sum(r['analysis'].confidence for r in self.routing_history) / total_routes
         
         return {
             'total_routes': total_routes,
+            'local_usage': {
+                'count': local_routes,
+                'percentage': (local_routes / total_routes) * 100
+            },
             'e2b_usage': {
                 'count': e2b_routes,
                 'percentage': (e2b_routes / total_routes) * 100
@@ -758,6 +1190,11 @@ class IntelligentExecutionRouter:
             },
             'average_complexity': avg_complexity,
             'average_confidence': avg_confidence,
+            'latency_comparison': self._latency_comparison(),
+            'prediction_error': self.cost_model.get_metrics(),
+            'snippet_analysis_cache': {**self.snippet_cache_stats, 'size': len(self._snippet_cache)},
+            'local_executor': self.local.get_metrics() if self.local else None,
+            'scrapybara_instance_pool': self.scrapybara.instance_pool.get_metrics(),
             'cost_optimization': self._calculate_cost_savings()
         }
     
@@ -801,9 +1238,23 @@ def get_intelligent_router():
         else:
             scout_orchestrator = enhanced_scout_orchestrator
         
+        # Opt-in: the local route shares the host filesystem, see local_executor
+        local_executor = None
+        if LOCAL_EXECUTION_AVAILABLE and os.getenv('LOCAL_EXECUTION_ENABLED', 'false').lower() == 'true':
+            try:
+                local_executor = LocalSubprocessExecutor(
+                    warm_interpreters=int(os.getenv('LOCAL_EXECUTION_WARM_INTERPRETERS', 2)),
+                    cpu_seconds=int(os.getenv('LOCAL_EXECUTION_CPU_SECONDS', 5)),
+                    memory_mb=int(os.getenv('LOCAL_EXECUTION_MEMORY_MB', 256)),
+                    timeout_seconds=float(os.getenv('LOCAL_EXECUTION_TIMEOUT_SECONDS', 10))
+                )
+            except RuntimeError as e:
+                logger.warning(f"⚠️ Local execution route disabled: {e}")
+        
         intelligent_router = IntelligentExecutionRouter(
             scout_orchestrator=scout_orchestrator,
             e2b_execution=mama_bear_code_executor,
-            scrapybara_manager=enhanced_scrapybara_service
+            scrapybara_manager=enhanced_scrapybara_service,
+            local_executor=local_executor
         )
     return intelligent_router
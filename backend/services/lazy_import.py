@@ -0,0 +1,61 @@
+"""
+💤 Lazy SDK Imports
+Heavy provider SDKs (google.generativeai, anthropic, openai, e2b, Vertex AI)
+take seconds to import. ``lazy_import`` checks that a module is installed but
+defers executing it until one of its attributes is first used, so importing a
+service module no longer pays for SDKs that request path never touches.
+"""
+
+import importlib.util
+import sys
+import threading
+from types import ModuleType
+
+# Serializes the check-then-register in lazy_import across startup threads
+_import_lock = threading.RLock()
+
+
+def lazy_import(name: str) -> ModuleType:
+    """
+    Module ``name``, loaded on first attribute access.
+
+    Raises ImportError immediately if the module isn't installed, so callers'
+    ``try: ... except ImportError`` availability checks keep working.
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+
+    with _import_lock:
+        module = sys.modules.get(name)
+        if module is not None:
+            return module
+        spec = importlib.util.find_spec(name)
+        if spec is None:
+            raise ImportError(f"No module named '{name}'", name=name)
+        loader = importlib.util.LazyLoader(spec.loader)
+        spec.loader = loader
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[name] = module
+        loader.exec_module(module)
+        return module
+
+
+def ensure_loaded(name: str) -> ModuleType:
+    """
+    Import ``name`` and execute it now if it was lazily imported (e.g. during warm-up).
+
+    An SDK that is installed but fails while executing raises ImportError here,
+    the same as a missing one, instead of surfacing on a request's first
+    attribute access. The broken module is dropped from ``sys.modules`` so a
+    later import retries it.
+    """
+    module = lazy_import(name)
+    try:
+        dir(module)  # any attribute access runs a pending LazyLoader
+    except Exception as e:
+        with _import_lock:
+            if sys.modules.get(name) is module:
+                del sys.modules[name]
+        raise ImportError(f"Module '{name}' failed to load: {e}", name=name) from e
+    return module
@@ -0,0 +1,202 @@
+"""
+📈 Incremental Learning Aggregates
+Per-user, per-request-type counters and exponentially decayed success statistics,
+updated in O(1) per interaction and persisted as one compact SQLite row per key,
+so agentic decisions read learned patterns without re-scanning history.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass, field, asdict
+from typing import Dict, Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+GLOBAL_USER = "*"
+
+
+@dataclass
+class PatternStats:
+    """Decayed statistics for one (user, request type) pair"""
+    count: int = 0
+    successes: int = 0
+    weight: float = 0.0
+    decayed_successes: float = 0.0
+    decayed_satisfaction: float = 0.0
+    avg_processing_time_ms: float = 0.0
+    last_seen: float = 0.0
+    # model -> [decayed uses, decayed successes]
+    models: Dict[str, List[float]] = field(default_factory=dict)
+
+    @property
+    def success_rate(self) -> float:
+        return self.decayed_successes / self.weight if self.weight else 0.0
+
+    @property
+    def satisfaction(self) -> float:
+        return self.decayed_satisfaction / self.weight if self.weight else 0.0
+
+    def update(
+        self,
+        success: bool,
+        satisfaction: float,
+        models_used: List[str],
+        processing_time_ms: float,
+        now: float,
+        half_life_seconds: float,
+        max_models: int
+    ):
+        decay = 0.5 ** ((now - self.last_seen) / half_life_seconds) if self.last_seen else 1.0
+        self.count += 1
+        self.successes += int(success)
+        self.weight = self.weight * decay + 1.0
+        self.decayed_successes = self.decayed_successes * decay + float(success)
+        self.decayed_satisfaction = self.decayed_satisfaction * decay + satisfaction
+        self.avg_processing_time_ms += (processing_time_ms - self.avg_processing_time_ms) / self.count
+        self.last_seen = now
+
+        for model in models_used:
+            uses, wins = self.models.get(model, (0.0, 0.0))
+            self.models[model] = [uses * decay + 1.0, wins * decay + float(success)]
+        if len(self.models) > max_models:
+            # Drop the least-used models to keep each row small
+            keep = sorted(self.models.items(), key=lambda item: item[1][0], reverse=True)[:max_models]
+            self.models = dict(keep)
+
+    def model_success_rates(self) -> Dict[str, float]:
+        return {model: wins / uses for model, (uses, wins) in self.models.items() if uses}
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "successes": self.successes,
+            "success_rate": round(self.success_rate, 4),
+            "satisfaction": round(self.satisfaction, 4),
+            "avg_processing_time_ms": round(self.avg_processing_time_ms, 2),
+            "last_seen": self.last_seen,
+            "model_success_rates": {m: round(r, 4) for m, r in self.model_success_rates().items()}
+        }
+
+
+class LearningAggregateStore:
+    """
+    In-memory aggregates backed by SQLite (one upserted row per key).
+
+    Every interaction updates the user's row and the global row for its request
+    type; reads are dictionary lookups.
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        half_life_seconds: float = 7 * 24 * 3600,
+        max_models_per_pattern: int = 12
+    ):
+        self.half_life_seconds = half_life_seconds
+        self.max_models_per_pattern = max_models_per_pattern
+        self._stats: Dict[Tuple[str, str], PatternStats] = {}
+        # user_id -> request_type -> raw count (for "common request types")
+        self._user_request_types: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.RLock()
+
+        self.db_path = db_path or os.path.join(
+            os.getenv('STORAGE_PATH', './storage'), 'learning_aggregates.db'
+        )
+        self._db = self._open(self.db_path)
+        self._load()
+
+    def _open(self, db_path: str) -> Optional[sqlite3.Connection]:
+        try:
+            if db_path != ":memory:":
+                os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            db = sqlite3.connect(db_path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pattern_aggregates (
+                    user_id TEXT NOT NULL,
+                    request_type TEXT NOT NULL,
+                    stats TEXT NOT NULL,
+                    PRIMARY KEY (user_id, request_type)
+                )
+                """
+            )
+            db.commit()
+            return db
+        except Exception as e:
+            logger.warning(f"⚠️ Learning aggregates will not persist ({db_path}): {e}")
+            return None
+
+    def _load(self):
+        if self._db is None:
+            return
+        try:
+            for user_id, request_type, raw in self._db.execute(
+                "SELECT user_id, request_type, stats FROM pattern_aggregates"
+            ):
+                stats = PatternStats(**json.loads(raw))
+                self._stats[(user_id, request_type)] = stats
+                if user_id != GLOBAL_USER:
+                    self._user_request_types.setdefault(user_id, {})[request_type] = stats.count
+        except Exception as e:
+            logger.error(f"Failed to load learning aggregates: {e}")
+
+    def _persist(self, keys: List[Tuple[str, str]]):
+        if self._db is None:
+            return
+        try:
+            self._db.executemany(
+                "INSERT OR REPLACE INTO pattern_aggregates (user_id, request_type, stats) VALUES (?, ?, ?)",
+                [
+                    (user_id, request_type, json.dumps(asdict(self._stats[(user_id, request_type)]), separators=(",", ":")))
+                    for user_id, request_type in keys
+                ]
+            )
+            self._db.commit()
+        except Exception as e:
+            logger.error(f"Failed to persist learning aggregates: {e}")
+
+    def record(
+        self,
+        user_id: str,
+        request_type: str,
+        success: bool,
+        satisfaction: float = 0.0,
+        models_used: Optional[List[str]] = None,
+        processing_time_ms: float = 0.0
+    ):
+        """Fold one interaction into the user and global aggregates"""
+        now = time.time()
+        keys = [(user_id, request_type), (GLOBAL_USER, request_type)]
+        with self._lock:
+            for key in keys:
+                stats = self._stats.get(key)
+                if stats is None:
+                    stats = self._stats[key] = PatternStats()
+                stats.update(
+                    success, satisfaction, models_used or [], processing_time_ms,
+                    now, self.half_life_seconds, self.max_models_per_pattern
+                )
+            type_counts = self._user_request_types.setdefault(user_id, {})
+            type_counts[request_type] = type_counts.get(request_type, 0) + 1
+            self._persist(keys)
+
+    def get(self, user_id: str, request_type: str) -> Optional[PatternStats]:
+        return self._stats.get((user_id, request_type))
+
+    def get_global(self, request_type: str) -> Optional[PatternStats]:
+        return self._stats.get((GLOBAL_USER, request_type))
+
+    def get_user_request_types(self, user_id: str) -> Dict[str, int]:
+        return dict(self._user_request_types.get(user_id, {}))
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "patterns_tracked": len(self._stats),
+            "users_tracked": len(self._user_request_types),
+            "persistent": self._db is not None
+        }
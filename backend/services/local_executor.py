@@ -0,0 +1,424 @@
+"""
+⚡ Local Subprocess Executor
+Runs small, low-risk Python snippets in a local, resource-limited subprocess
+instead of a remote sandbox, with a pool of pre-started interpreters so a run
+doesn't pay for interpreter boot. Output can be streamed as it is produced, and
+a run can be cancelled, which kills its process group.
+
+Isolation does not rest on inspecting the code. Each interpreter runs in fresh
+unprivileged user, network, mount, PID and IPC namespaces (via ``unshare``)
+and, before reading any code:
+
+- applies CPU, memory, file-size and process rlimits
+- refuses to run if any network interface besides loopback is visible
+- chroots into a tmpfs holding read-only binds of the interpreter and system
+  libraries only, so host files (the app, its ``.env``, home directories,
+  ``/etc``, ``/proc``) don't exist and the tmpfs is the only writable place
+- runs the snippet with restricted builtins (no ``open``, ``exec``,
+  ``getattr``...) whose ``__import__`` only allows ``LOCAL_SAFE_MODULES``
+
+The executor refuses to start on hosts where this can't be set up, and each
+interpreter exits instead of running code if any step fails. ``local_blocker``
+is the router's static pre-check: it keeps snippets that reach for the
+interpreter's internals off the local route. The route is off unless
+LOCAL_EXECUTION_ENABLED is set.
+"""
+
+import ast
+import asyncio
+import codecs
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from typing import Dict, Any, Callable, Deque, List, Optional, Tuple
+
+from .enhanced_code_execution import CodeExecutionResult
+from .output_limiter import OutputLimiter
+
+OutputCallback = Callable[[str, str], None]  # (stream, text)
+
+try:
+    import resource
+    LOCAL_EXECUTION_AVAILABLE = os.name == "posix"
+except ImportError:
+    resource = None
+    LOCAL_EXECUTION_AVAILABLE = False
+
+# Standard-library modules a snippet may import
+LOCAL_SAFE_MODULES = frozenset({
+    'math', 'cmath', 'json', 're', 'string', 'itertools', 'functools', 'collections',
+    'datetime', 'time', 'statistics', 'random', 'decimal', 'fractions', 'typing',
+    'dataclasses', 'enum', 'heapq', 'bisect', 'operator', 'textwrap', 'pprint', 'copy'
+})
+# Builtins removed from the snippet's namespace (and rejected by the pre-check)
+LOCAL_BLOCKED_NAMES = frozenset({
+    'open', 'exec', 'eval', 'compile', 'input', 'breakpoint', 'help', 'exit', 'quit',
+    'globals', 'locals', 'vars', 'getattr', 'setattr', 'delattr'
+})
+# Attributes through which a "safe" module leaks the interpreter or unsafe modules
+# (e.g. typing.sys, collections._sys.modules), or that look attributes up by string
+# (attrgetter('_sys'), Formatter().get_field, get_type_hints evaluating annotations);
+# any _-prefixed attribute is blocked too
+LOCAL_BLOCKED_ATTRIBUTES = frozenset({
+    'sys', 'os', 'modules', 'builtins', 'importlib', 'io', 'socket', 'subprocess', 'posix',
+    'shutil', 'ctypes', 'gc', 'inspect', 'types', 'weakref', 'loader', 'spec', 'mro',
+    'f_globals', 'f_locals', 'f_back', 'f_builtins', 'gi_frame', 'cr_frame', 'ag_frame', 'tb_frame',
+    'attrgetter', 'methodcaller', 'Formatter', 'get_field', 'get_type_hints', 'ForwardRef'
+})
+
+# Runs each pooled interpreter in fresh user, network, mount, PID and IPC namespaces
+ISOLATION_COMMAND = ("unshare", "--user", "--map-root-user", "--net", "--mount", "--pid", "--fork", "--ipc")
+
+# Host paths visible (read-only) inside the interpreter's root: system libraries and the interpreter
+READ_ONLY_PATHS = tuple(sorted({
+    "/usr", "/lib", "/lib32", "/lib64", "/bin", "/sbin",
+    sys.prefix, sys.base_prefix, sys.exec_prefix
+}))
+
+# Exit status of an interpreter that couldn't isolate itself
+ISOLATION_FAILED_EXIT = 97
+
+# Exit status of an interpreter that ran out of CPU time
+RESOURCE_LIMIT_EXIT = 98
+
+# Executed by each pooled interpreter (argv: cpu seconds, memory bytes, file bytes,
+# comma-separated importable modules, read-only paths); see the module docstring
+_RUNNER = """
+import builtins, ctypes, os, resource, signal, socket, sys
+
+def _refuse(reason):
+    sys.stderr.write(reason + "; refusing to run\\n")
+    sys.exit(%d)
+
+cpu, memory, file_size = (int(arg) for arg in sys.argv[1:4])
+allowed = frozenset(sys.argv[4].split(","))
+def _cpu_exceeded(signum, frame, write=sys.stderr.write, exit_now=os._exit):
+    write("CPU time limit exceeded\\n")
+    exit_now(%d)
+signal.signal(signal.SIGXCPU, _cpu_exceeded)
+resource.setrlimit(resource.RLIMIT_CPU, (cpu, cpu + 1))
+resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+resource.setrlimit(resource.RLIMIT_FSIZE, (file_size, file_size))
+resource.setrlimit(resource.RLIMIT_NPROC, (64, 64))
+if any(name != "lo" for _, name in socket.if_nameindex()):
+    _refuse("network isolation unavailable")
+
+MS_RDONLY, MS_NOSUID, MS_NODEV, MS_NOEXEC = 1, 2, 4, 8
+MS_REMOUNT, MS_BIND, MS_REC, MS_PRIVATE = 32, 4096, 16384, 1 << 18
+libc = ctypes.CDLL(None, use_errno=True)
+
+def _mount(source, target, fstype, flags, data=None):
+    encode = lambda value: value.encode() if value is not None else None
+    if libc.mount(encode(source), encode(target), encode(fstype), flags, encode(data)) != 0:
+        _refuse(f"mount on {target} failed: {os.strerror(ctypes.get_errno())}")
+
+try:
+    root = os.getcwd()
+    _mount(None, "/", None, MS_REC | MS_PRIVATE)
+    _mount("tmpfs", root, "tmpfs", MS_NOSUID | MS_NODEV, f"size={file_size},mode=0755")
+    for path in sys.argv[5:]:
+        target = root + path
+        if os.path.islink(path):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            os.symlink(os.readlink(path), target)
+        elif os.path.isdir(path) and not os.path.exists(target):
+            os.makedirs(target)
+            _mount(path, target, None, MS_BIND)
+            # statvfs reports these flags with the same bits; locked ones must be kept
+            kept = os.statvfs(path).f_flag & (MS_NOSUID | MS_NODEV | MS_NOEXEC)
+            _mount(None, target, None, MS_REMOUNT | MS_BIND | MS_RDONLY | kept)
+    os.chdir(root)
+    os.chroot(".")
+    os.makedirs("/work")
+    os.chdir("/work")
+except OSError as e:
+    _refuse(f"filesystem isolation unavailable: {e}")
+
+def _blocked(*args, **kwargs):
+    raise PermissionError("network access is disabled for local execution")
+socket.socket = _blocked
+socket.create_connection = _blocked
+socket.getaddrinfo = _blocked
+
+_real_import = builtins.__import__
+def _import(name, globals=None, locals=None, fromlist=(), level=0):
+    if level or name.split(".")[0] not in allowed:
+        raise ImportError(f"import of {name} is not allowed in local execution")
+    return _real_import(name, globals, locals, fromlist, level)
+
+safe_builtins = {
+    key: value for key, value in vars(builtins).items()
+    if key not in {%s} and not (key.startswith("__") and key != "__build_class__")
+}
+safe_builtins["__import__"] = _import
+code = sys.stdin.read()
+namespace = {"__name__": "__main__", "__builtins__": safe_builtins}
+del builtins, ctypes, os, resource, signal, socket, libc
+exec(compile(code, "<snippet>", "exec"), namespace)
+""" % (ISOLATION_FAILED_EXIT, RESOURCE_LIMIT_EXIT, ", ".join(repr(name) for name in sorted(LOCAL_BLOCKED_NAMES)))
+
+
+def _runner_command(cpu_seconds: int, memory_bytes: int, file_bytes: int) -> List[str]:
+    return [
+        *ISOLATION_COMMAND, sys.executable, "-I", "-u", "-c", _RUNNER,
+        str(cpu_seconds), str(memory_bytes), str(file_bytes),
+        ",".join(sorted(LOCAL_SAFE_MODULES)), *READ_ONLY_PATHS
+    ]
+
+
+def isolation_available() -> bool:
+    """Whether this host can isolate a run: an empty snippet must get through every runner step"""
+    if shutil.which(ISOLATION_COMMAND[0]) is None:
+        return False
+    workdir = tempfile.mkdtemp(prefix="mama_bear_local_probe_")
+    try:
+        return subprocess.run(
+            _runner_command(5, 256 * 1024 * 1024, 1024 * 1024),
+            input=b"", stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            cwd=workdir, env={"PATH": "/usr/bin:/bin"}, timeout=10
+        ).returncode == 0
+    except (OSError, subprocess.SubprocessError):
+        return False
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def local_blocker(node: ast.AST) -> Optional[str]:
+    """
+    Why ``node`` keeps its snippet off the local route, or None. A pre-check
+    only: the runner's namespaces and restricted builtins are the boundary.
+    """
+    if isinstance(node, ast.Name):
+        if node.id.startswith('__'):
+            return f"Use of {node.id}"
+        if node.id in LOCAL_BLOCKED_NAMES:
+            return f"Use of {node.id}"
+    elif isinstance(node, ast.Attribute):
+        if node.attr.startswith('_'):
+            return f"Private attribute access: {node.attr}"
+        if node.attr in LOCAL_BLOCKED_ATTRIBUTES:
+            return f"Module internals access: {node.attr}"
+    elif isinstance(node, ast.Import):
+        for alias in node.names:
+            if alias.name.split('.')[0] not in LOCAL_SAFE_MODULES:
+                return f"Import of {alias.name}"
+    elif isinstance(node, ast.ImportFrom):
+        if node.level or (node.module or '').split('.')[0] not in LOCAL_SAFE_MODULES:
+            return f"Import of {node.module or 'relative module'}"
+        for alias in node.names:
+            if alias.name.startswith('_') or alias.name in LOCAL_BLOCKED_ATTRIBUTES:
+                return f"Import of {node.module}.{alias.name}"
+    return None
+
+
+def local_blockers(code: str) -> List[str]:
+    """Every ``local_blocker`` reason in ``code``"""
+    return [reason for reason in map(local_blocker, ast.walk(ast.parse(code))) if reason]
+
+
+class LocalSubprocessExecutor:
+    """
+    Pool of ready interpreters, each used for exactly one snippet.
+
+    - ``warm_interpreters``: interpreters kept started and waiting for code
+    - ``cpu_seconds`` / ``memory_mb`` / ``max_file_mb``: per-run rlimits
+    - ``timeout_seconds``: wall-clock limit (the process is killed after it)
+    """
+
+    def __init__(
+        self,
+        warm_interpreters: int = 2,
+        cpu_seconds: int = 5,
+        memory_mb: int = 256,
+        max_file_mb: int = 10,
+        timeout_seconds: float = 10,
+        max_output_bytes: int = 64 * 1024
+    ):
+        self.warm_interpreters = warm_interpreters
+        self.cpu_seconds = cpu_seconds
+        self.memory_mb = memory_mb
+        self.max_file_mb = max_file_mb
+        self.timeout_seconds = timeout_seconds
+        self.max_output_bytes = max_output_bytes
+        if not isolation_available():
+            raise RuntimeError("Local execution needs unprivileged user, network and mount namespaces")
+
+        self._pool: Deque[Tuple[subprocess.Popen, str]] = deque()
+        self._lock = threading.Lock()
+
+        self.metrics = {
+            "runs": 0,
+            "warm_hits": 0,
+            "timeouts": 0,
+            "cancelled": 0,
+            "failures": 0
+        }
+
+    # === INTERPRETER POOL ===
+
+    def _spawn(self) -> Tuple[subprocess.Popen, str]:
+        workdir = tempfile.mkdtemp(prefix="mama_bear_local_")
+        # Limits are applied by the runner itself: no preexec_fn in a threaded server.
+        # unshare leads the new session, so killing its process group takes the interpreter too.
+        process = subprocess.Popen(
+            _runner_command(self.cpu_seconds, self.memory_mb * 1024 * 1024, self.max_file_mb * 1024 * 1024),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            cwd=workdir,
+            env={"PATH": "/usr/bin:/bin", "HOME": workdir, "PYTHONDONTWRITEBYTECODE": "1"},
+            start_new_session=True,
+            close_fds=True
+        )
+        return process, workdir
+
+    def _take(self) -> Tuple[subprocess.Popen, str, bool]:
+        """A ready interpreter (warm if available), replenishing the pool behind it"""
+        with self._lock:
+            while self._pool:
+                process, workdir = self._pool.popleft()
+                if process.poll() is None:
+                    self._refill()
+                    return process, workdir, True
+                shutil.rmtree(workdir, ignore_errors=True)
+            self._refill()
+        process, workdir = self._spawn()
+        return process, workdir, False
+
+    def _refill(self):
+        # Popen returns once the child is exec'd; the interpreter boots in parallel
+        while len(self._pool) < self.warm_interpreters:
+            self._pool.append(self._spawn())
+
+    def prewarm(self):
+        with self._lock:
+            self._refill()
+
+    # === EXECUTION ===
+
+    @staticmethod
+    def _kill(process: subprocess.Popen):
+        # The child leads its own session, so this also takes down anything it forked
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            process.kill()
+        process.wait()
+
+    def _run(
+        self,
+        code: str,
+        on_output: Optional[OutputCallback] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> CodeExecutionResult:
+        start = time.perf_counter()
+        process, workdir, warm = self._take()
+        self.metrics["runs"] += 1
+        self.metrics["warm_hits"] += int(warm)
+        limiter = OutputLimiter(self.max_output_bytes)
+
+        def pump(pipe, stream: str):
+            decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+            for data in iter(lambda: pipe.read1(4096), b""):
+                chunk = limiter.feed(stream, decoder.decode(data))
+                if chunk and on_output is not None:
+                    on_output(stream, chunk)
+
+        readers = [
+            threading.Thread(target=pump, args=(process.stdout, "stdout"), daemon=True),
+            threading.Thread(target=pump, args=(process.stderr, "stderr"), daemon=True)
+        ]
+        for reader in readers:
+            reader.start()
+
+        stopped = None
+        try:
+            try:
+                process.stdin.write(code.encode("utf-8"))
+                process.stdin.close()
+            except BrokenPipeError:
+                pass  # the interpreter already died; its stderr says why
+            deadline = time.monotonic() + self.timeout_seconds
+            while stopped is None:
+                try:
+                    process.wait(timeout=0.05)
+                    break
+                except subprocess.TimeoutExpired:
+                    if cancel_event is not None and cancel_event.is_set():
+                        stopped = "cancelled"
+                    elif time.monotonic() >= deadline:
+                        stopped = "timeout"
+            if stopped:
+                self._kill(process)
+            for reader in readers:
+                reader.join(timeout=1)
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+        output = limiter.text("stdout")
+        error = limiter.text("stderr")
+        execution_time = time.perf_counter() - start
+        if stopped == "timeout":
+            self.metrics["timeouts"] += 1
+            error = f"Local execution timed out after {self.timeout_seconds} seconds"
+        elif stopped == "cancelled":
+            self.metrics["cancelled"] += 1
+            error = "Execution cancelled"
+        elif process.returncode == ISOLATION_FAILED_EXIT:
+            self.metrics["failures"] += 1
+            error = "Local execution refused: " + (error.strip() or "isolation unavailable")
+        elif process.returncode != 0:
+            self.metrics["failures"] += 1
+            if process.returncode < 0:
+                error = error or f"Process killed by signal {-process.returncode} (resource limit exceeded)"
+            elif error.startswith("unshare:"):
+                # unshare can't re-raise a SIGKILL its child died of, so it only reports that
+                error = "Process killed (resource limit exceeded)"
+        return CodeExecutionResult(
+            success=stopped is None and process.returncode == 0,
+            output=output,
+            error=error or None,
+            execution_time=execution_time,
+            logs=[f"warm_interpreter={warm}", f"output_truncated={limiter.truncated}"]
+        )
+
+    async def execute(
+        self,
+        code: str,
+        on_output: Optional[OutputCallback] = None,
+        cancel_event: Optional[threading.Event] = None
+    ) -> CodeExecutionResult:
+        """
+        Run a Python snippet locally (in a worker thread, so any event loop can await it)
+
+        ``on_output(stream, text)`` receives stdout/stderr chunks as they are
+        produced, from reader threads; setting ``cancel_event`` kills the run.
+        """
+        return await asyncio.to_thread(self._run, code, on_output, cancel_event)
+
+    def shutdown(self):
+        with self._lock:
+            while self._pool:
+                process, workdir = self._pool.popleft()
+                process.kill()
+                process.communicate()
+                shutil.rmtree(workdir, ignore_errors=True)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        runs = self.metrics["runs"]
+        return {
+            **self.metrics,
+            "warm_hit_rate": self.metrics["warm_hits"] / runs if runs else 0.0,
+            "warm_interpreters": len(self._pool),
+            "limits": {
+                "cpu_seconds": self.cpu_seconds,
+                "memory_mb": self.memory_mb,
+                "timeout_seconds": self.timeout_seconds
+            }
+        }
@@ -21,6 +21,7 @@ from .express_mode_vertex_integration import ExpressModeVertexIntegration
 from .intelligent_execution_router import IntelligentExecutionRouter
 from .enhanced_scrapybara_integration import EnhancedScrapybaraManager
 from .enhanced_code_execution import EnhancedMamaBearCodeExecution
+from .agentic_memory_store import TieredMemoryStore
 
 logger = logging.getLogger(__name__)
 
@@ -261,7 +262,8 @@ class MamaBearAgenticSuperpowersV3:
                 "variant": "agentic_analyzer",
                 "context": {"analysis_type": "intent_analysis"},
                 "user_id": user_id,
-                "mode": "express"
+                "mode": "express",
+                "coalesce": True  # templated analysis; identical concurrent prompts may share a call
             }
 
             result = await self.express_mode.process_express_request(request)
@@ -326,7 +328,8 @@ class MamaBearAgenticSuperpowersV3:
                 "variant": "future_predictor",
                 "context": {"prediction_type": "user_needs"},
                 "user_id": user_id,
-                "mode": "express"
+                "mode": "express",
+                "coalesce": True
             }
 
             result = await self.express_mode.process_express_request(request)
@@ -555,8 +558,13 @@ class MamaBearAgenticSuperpowersV3:
 
     def _initialize_memory_manager(self):
         """Initialize enhanced memory management system"""
+        memory_config = self.config.get('memory_store', {})
         return {
-            "short_term": deque(maxlen=100),
+            "short_term": TieredMemoryStore(
+                db_path=memory_config.get('db_path'),
+                per_user_capacity=memory_config.get('per_user_capacity', 200),
+                max_total_entries=memory_config.get('max_total_entries', 5000)
+            ),
             "episodic": {},  # Event-based memories
             "semantic": {},  # Knowledge-based memories
             "procedural": {},  # Skill-based memories
@@ -570,16 +578,15 @@ class MamaBearAgenticSuperpowersV3:
         """🧠 Store memory using Mem0 with enhanced categorization"""
         try:
             if not self.mem0_client:
-                # Fallback to local memory
-                memory_entry = {
-                    "content": content,
-                    "type": memory_type,
-                    "metadata": metadata or {},
-                    "timestamp": datetime.now().isoformat(),
-                    "user_id": user_id
-                }
-                self.memory_manager["short_term"].append(memory_entry)
-                return {"status": "stored_locally", "id": str(uuid.uuid4())}
+                # Fallback to the bounded local memory store
+                memory_entry = self.memory_manager["short_term"].add(
+                    user_id,
+                    content,
+                    memory_type=memory_type,
+                    metadata=metadata,
+                    timestamp=datetime.now().isoformat()
+                )
+                return {"status": "stored_locally", "id": memory_entry["id"]}
 
             # Store in mem0
             memory_data = {
@@ -615,12 +622,8 @@ class MamaBearAgenticSuperpowersV3:
         """🧠 Retrieve relevant memories using Mem0"""
         try:
             if not self.mem0_client:
-                # Fallback to local memory search
-                local_memories = [
-                    mem for mem in self.memory_manager["short_term"]
-                    if mem.get("user_id") == user_id and query.lower() in mem.get("content", "").lower()
-                ]
-                return local_memories[:limit]
+                # Fallback to indexed local memory search
+                return self.memory_manager["short_term"].search(user_id, query, limit=limit)
 
             # Search mem0
             search_results = self.mem0_client.search(
@@ -705,7 +708,8 @@ class MamaBearAgenticSuperpowersV3:
                 "variant": "memory_analyst",
                 "context": {"analysis_type": "memory_insights"},
                 "user_id": user_id,
-                "mode": "express"
+                "mode": "express",
+                "coalesce": True
             }
 
             result = await self.express_mode.process_express_request(request)
@@ -739,5 +743,6 @@ class MamaBearAgenticSuperpowersV3:
             "metrics": self.metrics,
             "express_mode_enabled": True,
             "learning_active": True,
-            "memory_size": len(self.working_memory)
+            "memory_size": len(self.working_memory),
+            "local_memory": self.memory_manager["short_term"].get_stats()
         }
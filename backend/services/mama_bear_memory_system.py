@@ -1,3 +1,4 @@
+import asyncio
 import json
 import os
 import logging
@@ -253,6 +254,32 @@ class MemoryManager:
             print(f"Error searching memories: {e}")
             return []
     
+    async def search_user_memories(self, user_id: str, query: str, confidence_threshold: float = 0.0,
+                                   limit: int = 10, deadline=None) -> list:
+        """
+        Async memory search bounded by an optional request deadline
+        (``services.request_deadline.RequestDeadline``); returns no memories
+        rather than stalling the request when the budget runs out.
+        """
+        if deadline is not None and deadline.expired:
+            deadline.degrade("memory_search", "skipped")
+            return []
+        try:
+            memories = await asyncio.wait_for(
+                asyncio.to_thread(self.search_memories, user_id, query),
+                timeout=deadline.remaining() if deadline is not None else None
+            )
+        except asyncio.TimeoutError:
+            if deadline is not None:
+                deadline.degrade("memory_search", "timed_out")
+            return []
+        if isinstance(memories, dict):
+            memories = memories.get("results", [])
+        return [
+            m for m in memories
+            if not isinstance(m, dict) or m.get("score", 1.0) >= confidence_threshold
+        ][:limit]
+
     def update_relationship(self, user_id: str, variant: str, interaction_data: dict):
         """Update Mama Bear relationship data"""
         try:
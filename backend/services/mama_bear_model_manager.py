@@ -5,9 +5,11 @@ import logging
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field
 from enum import Enum
-import google.generativeai as genai
 from datetime import datetime, timedelta
 import json
+from .lazy_import import lazy_import
+
+genai = lazy_import("google.generativeai")
 
 # Import specialized variants
 try:
@@ -85,8 +87,11 @@ class MamaBearModelManager:
         self.max_fallback_delay = 30.0
         self.health_check_interval = 300  # 5 minutes
         
-        # Start background health monitoring
-        asyncio.create_task(self._background_health_monitor())
+        # Start background health monitoring (services may be built outside an event loop)
+        try:
+            asyncio.get_running_loop().create_task(self._background_health_monitor())
+        except RuntimeError:
+            self.logger.debug("No running event loop - background health monitor not started")
     
     def _initialize_models(self) -> Dict[str, ModelConfig]:
         """Initialize all available Gemini 2.5 models with quota settings"""
@@ -251,6 +256,9 @@ class MamaBearModelManager:
             
             # Prepare the message content
             message_content = messages[-1].get('content', '') if messages else ''
+            if kwargs.get('images'):
+                # Prepared inline image parts ({'mime_type', 'data'}) go alongside the text
+                message_content = [message_content, *kwargs['images']]
             
             # Set generation config
             generation_config = {
@@ -415,19 +423,40 @@ class MamaBearModelManager:
         
         return status
     
-    async def warm_up_models(self):
-        """Warm up all models with test requests to check availability"""
+    async def warm_up_models(self, probe_timeout: float = 10.0) -> Dict[str, bool]:
+        """
+        Warm up all models with tiny probe requests to check availability
+
+        ``genai.configure`` sets a process-global API key, so probes run
+        concurrently only among models sharing a key; keys are probed one
+        after another.
+        """
         self.logger.info("Starting model warm-up...")
         
-        test_message = [{'role': 'user', 'content': 'Hello, this is a test. Please respond with "Ready".'}]
+        test_message = [{'role': 'user', 'content': 'Reply with "Ready".'}]
         
-        for model_id, config in self.models.items():
+        async def probe(config: ModelConfig) -> bool:
             try:
-                await self._make_api_call(config, test_message)
+                await asyncio.wait_for(
+                    self._make_api_call(config, test_message, max_tokens=5),
+                    timeout=probe_timeout
+                )
                 self.logger.info(f"✓ {config.name} is ready")
+                return True
             except Exception as e:
                 self.logger.warning(f"✗ {config.name} failed warm-up: {e}")
                 config.is_healthy = False
+                return False
+        
+        by_key: Dict[str, List[str]] = {}
+        for model_id, config in self.models.items():
+            by_key.setdefault(config.api_key, []).append(model_id)
+        
+        results: Dict[str, bool] = {}
+        for model_ids in by_key.values():
+            ready = await asyncio.gather(*(probe(self.models[model_id]) for model_id in model_ids))
+            results.update(zip(model_ids, ready))
+        return {model_id: results[model_id] for model_id in self.models}
 
 # Custom exceptions
 class QuotaExceededException(Exception):
@@ -8,11 +8,10 @@ import asyncio
 import json
 import logging
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, Any, List, Optional, Set, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
-import google.generativeai as genai
 from collections import defaultdict, deque
 
 # Import your existing services
@@ -22,6 +21,13 @@ from .orchestration.model_registry import GEMINI_REGISTRY, ModelCapability
 from .mama_bear_memory_system import MemoryManager
 from .enhanced_scrapybara_integration import EnhancedScrapybaraManager
 from .intelligent_execution_router import IntelligentExecutionRouter
+from .learning_aggregates import LearningAggregateStore
+from .request_deadline import RequestDeadline
+from .concept_expansion import ConceptExpansionCache, ConceptGraph, normalize_query
+from .prefetch_scheduler import PrefetchScheduler
+from .lazy_import import lazy_import
+
+genai = lazy_import("google.generativeai")
 
 logger = logging.getLogger(__name__)
 
@@ -72,6 +78,34 @@ class ContextualMemory:
     last_accessed: datetime
     access_count: int = 0
 
+# Per-stage timeouts (seconds); a stage that misses its deadline contributes no results
+DEFAULT_STAGE_TIMEOUTS = {
+    "decisions": 8.0,
+    "memory_search": 6.0,
+    "context_expansion": 8.0,
+    "cross_session_learning": 3.0,
+    "tool_routing": 3.0,
+    "memory_subsearch": 4.0,
+    "expansion_action": 6.0
+}
+
+# Remaining budget (seconds) a request must still have for optional work to run
+DEFAULT_REQUEST_BUDGET_SECONDS = 30.0
+DEGRADATION_THRESHOLDS = {
+    "memory_strategy_analysis": 20.0,
+    "context_expansion": 18.0,
+    "expanded_search": 18.0,
+    "concept_llm_expansion": 12.0,
+    "predictive_context": 5.0
+}
+
+# Keywords that mark a request as the follow-up a prefetch scenario predicted
+FOLLOWUP_SCENARIO_KEYWORDS = {
+    "modify": ["change", "modify", "update", "adjust", "tweak", "instead"],
+    "example": ["example", "sample", "show me", "demo"],
+    "detailed_explanation": ["explain", "detail", "more about", "why", "elaborate"]
+}
+
 class MCPAgenticRAGOrchestrator:
     """
     🎼 MCP + Agentic RAG Orchestrator for Gemini Orchestra
@@ -94,13 +128,25 @@ class MCPAgenticRAGOrchestrator:
 
         # Agentic decision system
         self.intelligence_level = RAGIntelligenceLevel.AUTONOMOUS
+        self.stage_timeouts = {**DEFAULT_STAGE_TIMEOUTS, **config.get("stage_timeouts", {})}
+        self.request_budget_seconds = config.get("request_budget_seconds", DEFAULT_REQUEST_BUDGET_SECONDS)
+        self.degradation_thresholds = {**DEGRADATION_THRESHOLDS, **config.get("degradation_thresholds", {})}
         self.decision_history: deque = deque(maxlen=1000)
         self.learning_patterns: Dict[str, Dict[str, Any]] = defaultdict(dict)
 
         # Context analysis and prediction
         self.context_analyzer = ContextAnalyzer(self.orchestra)
         self.predictive_engine = PredictiveContextEngine()
-        self.cross_session_learner = CrossSessionLearner()
+        self.cross_session_learner = CrossSessionLearner(
+            LearningAggregateStore(**config.get("learning_store", {}))
+        )
+
+        # Bounded background prefetching of predicted follow-up context
+        self.prefetch_scheduler = PrefetchScheduler(**config.get("prefetch", {}))
+
+        # Memoized related-concept expansion
+        self.concept_cache = ConceptExpansionCache(**config.get("concept_cache", {}))
+        self.concept_graph = ConceptGraph(**config.get("concept_graph", {}))
 
         # Performance metrics
         self.rag_metrics = {
@@ -108,7 +154,8 @@ class MCPAgenticRAGOrchestrator:
             "successful_predictions": 0,
             "context_cache_hits": 0,
             "average_response_improvement": 0.0,
-            "user_satisfaction_scores": deque(maxlen=100)
+            "user_satisfaction_scores": deque(maxlen=100),
+            "concept_expansions": {"cache_hits": 0, "graph_hits": 0, "llm_calls": 0, "basic_fallbacks": 0}
         }
 
         # Integration with existing services
@@ -130,21 +177,42 @@ class MCPAgenticRAGOrchestrator:
     async def process_agentic_request(self,
                                     user_request: str,
                                     user_id: str,
-                                    session_context: Dict[str, Any] = None) -> Dict[str, Any]:
+                                    session_context: Dict[str, Any] = None,
+                                    deadline: Optional[RequestDeadline] = None) -> Dict[str, Any]:
         """
         🚀 Main entry point for agentic RAG-enhanced request processing
+
+        ``deadline`` bounds the whole request (``request_budget_seconds`` by
+        default); stages skip optional work when the remaining budget is short.
+        Background prefetches hold back while foreground requests are busy.
         """
 
+        async with self.prefetch_scheduler.foreground():
+            return await self._process_agentic_request(user_request, user_id, session_context, deadline)
+
+    async def _process_agentic_request(self,
+                                     user_request: str,
+                                     user_id: str,
+                                     session_context: Optional[Dict[str, Any]],
+                                     deadline: Optional[RequestDeadline]) -> Dict[str, Any]:
         start_time = datetime.now()
         request_id = str(uuid.uuid4())
+        stage_timings: Dict[str, Dict[str, Any]] = {}
+        deadline = deadline or RequestDeadline(self.request_budget_seconds)
+
+        # Use whatever was prefetched for this follow-up, then stop the user's stale prefetches
+        prefetched_context = self._consume_prefetched_context(user_request, user_id)
+        self.prefetch_scheduler.cancel_user(user_id)
 
-        # Step 1: Analyze request and make agentic decisions
+        # Step 1: Analyze request and make agentic decisions (concurrently)
         rag_decisions = await self._make_agentic_rag_decisions(
-            user_request, user_id, session_context or {}
+            user_request, user_id, session_context or {}, stage_timings, deadline
         )
 
-        # Step 2: Execute RAG decisions to gather enhanced context
-        enhanced_context = await self._execute_rag_decisions(rag_decisions, user_id)
+        # Step 2: Execute RAG decisions to gather enhanced context (concurrently)
+        enhanced_context = await self._execute_rag_decisions(rag_decisions, user_id, stage_timings, deadline)
+        if prefetched_context:
+            enhanced_context["prefetched_context"] = prefetched_context
 
         # Step 3: Select optimal Gemini models based on context
         optimal_models = await self._select_optimal_models_with_context(
@@ -155,20 +223,28 @@ class MCPAgenticRAGOrchestrator:
         orchestra_request = {
             "message": user_request,
             "user_id": user_id,
+            "session_id": (session_context or {}).get("session_id"),
+            "conversation_history": (session_context or {}).get("conversation_history", []),
             "enhanced_context": enhanced_context,
             "rag_decisions": rag_decisions,
             "optimal_models": optimal_models,
-            "request_id": request_id
+            "request_id": request_id,
+            "deadline": deadline
         }
 
         result = await self.orchestra.process_request(orchestra_request)
 
         # Step 5: Learn from the interaction
-        await self._learn_from_interaction(rag_decisions, result, user_id)
+        await self._learn_from_interaction(
+            rag_decisions, result, user_id, self._classify_request_type(user_request)
+        )
 
         # Step 6: Proactively prepare for likely follow-up requests
         if self.intelligence_level.value >= RAGIntelligenceLevel.PREDICTIVE.value:
-            asyncio.create_task(self._prepare_predictive_context(user_request, result, user_id))
+            if not deadline.has_at_least(self.degradation_thresholds["predictive_context"]):
+                deadline.degrade("predictive_context", "skipped")
+            else:
+                await self._prepare_predictive_context(user_request, result, user_id)
 
         processing_time = (datetime.now() - start_time).total_seconds() * 1000
 
@@ -179,42 +255,105 @@ class MCPAgenticRAGOrchestrator:
                 "context_sources_used": len(enhanced_context),
                 "models_optimized": optimal_models,
                 "processing_time_ms": processing_time,
-                "intelligence_level": self.intelligence_level.name
+                "intelligence_level": self.intelligence_level.name,
+                "stage_latency_ms": {
+                    stage: timing["latency_ms"] for stage, timing in stage_timings.items()
+                },
+                "partial_stages": sorted(
+                    stage for stage, timing in stage_timings.items() if timing["status"] != "ok"
+                ),
+                "deadline": deadline.report(),
+                "prefetch_hits": sorted(prefetched_context)
             }
         }
 
+    async def _run_stage(self,
+                         stage: str,
+                         awaitable,
+                         fallback: Any = None,
+                         timings: Optional[Dict[str, Dict[str, Any]]] = None,
+                         timeout_key: Optional[str] = None,
+                         deadline: Optional[RequestDeadline] = None) -> Any:
+        """
+        Await one pipeline stage under its timeout, recording latency; return
+        ``fallback`` on timeout/error. ``awaitable`` may be a zero-argument
+        callable so errors raised while building the call are contained too.
+        """
+
+        timeout = self.stage_timeouts.get(timeout_key or stage)
+        if deadline is not None:
+            timeout = deadline.cap(timeout)
+        started = asyncio.get_running_loop().time()
+        status = "ok"
+        try:
+            if deadline is not None and deadline.expired:
+                if not callable(awaitable):
+                    awaitable.close()
+                raise asyncio.TimeoutError()
+            if callable(awaitable):
+                awaitable = awaitable()
+            result = await asyncio.wait_for(awaitable, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ RAG stage '{stage}' missed its {timeout}s deadline; continuing with partial results")
+            status, result = "timeout", fallback
+        except Exception as e:
+            logger.error(f"RAG stage '{stage}' failed: {e}")
+            status, result = "error", fallback
+
+        if timings is not None:
+            timings[stage] = {
+                "latency_ms": round((asyncio.get_running_loop().time() - started) * 1000, 2),
+                "status": status
+            }
+        return result
+
     async def _make_agentic_rag_decisions(self,
                                         user_request: str,
                                         user_id: str,
-                                        session_context: Dict[str, Any]) -> List[AgenticRAGDecision]:
+                                        session_context: Dict[str, Any],
+                                        timings: Optional[Dict[str, Dict[str, Any]]] = None,
+                                        deadline: Optional[RequestDeadline] = None) -> List[AgenticRAGDecision]:
         """
         🧠 Make autonomous decisions about what context to retrieve and how
-        """
 
-        decisions = []
-
-        # Decision 1: Memory Search Strategy
-        memory_decision = await self._decide_memory_search_strategy(user_request, user_id)
-        decisions.append(memory_decision)
+        The decisions are independent, so they run concurrently; a decision that
+        misses the "decisions" deadline is dropped (memory search falls back to
+        a standard personal search).
+        """
 
-        # Decision 2: Context Expansion Needs
-        expansion_decision = await self._decide_context_expansion(user_request, session_context)
-        decisions.append(expansion_decision)
+        stages = [
+            # Decision 1: Memory Search Strategy
+            ("decide_memory_search", self._decide_memory_search_strategy(user_request, user_id, deadline),
+             self._fallback_memory_decision(user_request, user_id)),
+            # Decision 2: Context Expansion Needs
+            ("decide_context_expansion", self._decide_context_expansion(user_request, session_context, deadline), None)
+        ]
 
         # Decision 3: Cross-Session Learning Application
         if self.intelligence_level.value >= RAGIntelligenceLevel.AUTONOMOUS.value:
-            learning_decision = await self._decide_cross_session_learning(user_request, user_id)
-            decisions.append(learning_decision)
+            stages.append((
+                "decide_cross_session_learning", self._decide_cross_session_learning(user_request, user_id), None
+            ))
 
         # Decision 4: Proactive Tool Routing
-        tool_decision = await self._decide_tool_routing(user_request, session_context)
-        decisions.append(tool_decision)
-
-        return decisions
-
-    async def _decide_memory_search_strategy(self, user_request: str, user_id: str) -> AgenticRAGDecision:
+        stages.append(("decide_tool_routing", self._decide_tool_routing(user_request, session_context), None))
+
+        decisions = await asyncio.gather(*(
+            self._run_stage(stage, awaitable, fallback, timings, timeout_key="decisions", deadline=deadline)
+            for stage, awaitable, fallback in stages
+        ))
+        return [decision for decision in decisions if decision is not None]
+
+    async def _decide_memory_search_strategy(self,
+                                           user_request: str,
+                                           user_id: str,
+                                           deadline: Optional[RequestDeadline] = None) -> AgenticRAGDecision:
         """Decide how to search memory most effectively"""
 
+        if deadline is not None and not deadline.has_at_least(self.degradation_thresholds["memory_strategy_analysis"]):
+            deadline.degrade("memory_strategy_analysis", "fallback_personal_search")
+            return self._fallback_memory_decision(user_request, user_id)
+
         # Use your conductor to analyze the request
         analysis_prompt = f"""
         Analyze this user request for optimal memory search strategy:
@@ -260,22 +399,28 @@ class MCPAgenticRAGOrchestrator:
 
         except Exception as e:
             logger.error(f"Memory search decision failed: {e}")
-            # Fallback decision
-            return AgenticRAGDecision(
-                decision_id=str(uuid.uuid4()),
-                decision_type=AgenticRAGDecisionType.MEMORY_SEARCH,
-                trigger_context={"user_request": user_request, "user_id": user_id},
-                reasoning="Fallback: Standard personal memory search",
-                confidence_score=0.6,
-                selected_models=["conductor"],
-                retrieved_context={},
-                execution_plan=[{
-                    "action": "memory_search",
-                    "strategy": {"personal_search": True, "confidence_threshold": 0.5}
-                }]
-            )
+            return self._fallback_memory_decision(user_request, user_id)
 
-    async def _decide_context_expansion(self, user_request: str, session_context: Dict[str, Any]) -> AgenticRAGDecision:
+    def _fallback_memory_decision(self, user_request: str, user_id: str) -> AgenticRAGDecision:
+        """Standard personal memory search, used when the conductor can't decide in time"""
+        return AgenticRAGDecision(
+            decision_id=str(uuid.uuid4()),
+            decision_type=AgenticRAGDecisionType.MEMORY_SEARCH,
+            trigger_context={"user_request": user_request, "user_id": user_id},
+            reasoning="Fallback: Standard personal memory search",
+            confidence_score=0.6,
+            selected_models=["conductor"],
+            retrieved_context={},
+            execution_plan=[{
+                "action": "memory_search",
+                "strategy": {"personal_search": True, "confidence_threshold": 0.5}
+            }]
+        )
+
+    async def _decide_context_expansion(self,
+                                      user_request: str,
+                                      session_context: Dict[str, Any],
+                                      deadline: Optional[RequestDeadline] = None) -> AgenticRAGDecision:
         """Decide if we need to expand context beyond immediate request"""
 
         # Analyze request complexity and session history
@@ -290,6 +435,10 @@ class MCPAgenticRAGOrchestrator:
             "additionally" in user_request.lower()
         )
 
+        if should_expand and deadline is not None and not deadline.has_at_least(self.degradation_thresholds["context_expansion"]):
+            deadline.degrade("context_expansion", "skipped")
+            should_expand = False
+
         expansion_plan = []
         if should_expand:
             expansion_plan = [
@@ -363,8 +512,12 @@ class MCPAgenticRAGOrchestrator:
             execution_plan=routing_plan
         )
 
-    async def _execute_rag_decisions(self, decisions: List[AgenticRAGDecision], user_id: str) -> Dict[str, Any]:
-        """Execute all RAG decisions to gather enhanced context"""
+    async def _execute_rag_decisions(self,
+                                   decisions: List[AgenticRAGDecision],
+                                   user_id: str,
+                                   timings: Optional[Dict[str, Dict[str, Any]]] = None,
+                                   deadline: Optional[RequestDeadline] = None) -> Dict[str, Any]:
+        """Execute all RAG decisions concurrently to gather enhanced context"""
 
         enhanced_context = {
             "memories": [],
@@ -373,98 +526,131 @@ class MCPAgenticRAGOrchestrator:
             "tool_preparations": {}
         }
 
-        for decision in decisions:
-            try:
-                if decision.decision_type == AgenticRAGDecisionType.MEMORY_SEARCH:
-                    memories = await self._execute_memory_search(decision, user_id)
-                    enhanced_context["memories"].extend(memories)
-
-                elif decision.decision_type == AgenticRAGDecisionType.CONTEXT_EXPANSION:
-                    expanded = await self._execute_context_expansion(decision, user_id)
-                    enhanced_context["expanded_context"].update(expanded)
-
-                elif decision.decision_type == AgenticRAGDecisionType.CROSS_SESSION_LEARNING:
-                    patterns = await self._execute_cross_session_learning(decision, user_id)
-                    enhanced_context["learned_patterns"].update(patterns)
-
-                elif decision.decision_type == AgenticRAGDecisionType.TOOL_ROUTING:
-                    tools = await self._execute_tool_preparation(decision, user_id)
-                    enhanced_context["tool_preparations"].update(tools)
-
-                # Mark decision as executed
-                decision.execution_time_ms = (datetime.now() - decision.timestamp).total_seconds() * 1000
-                decision.success = True
+        executors = {
+            AgenticRAGDecisionType.MEMORY_SEARCH: ("memory_search", self._execute_memory_search),
+            AgenticRAGDecisionType.CONTEXT_EXPANSION: ("context_expansion", self._execute_context_expansion),
+            AgenticRAGDecisionType.CROSS_SESSION_LEARNING: ("cross_session_learning", self._execute_cross_session_learning),
+            AgenticRAGDecisionType.TOOL_ROUTING: ("tool_routing", self._execute_tool_preparation)
+        }
+        _missed = object()
 
-            except Exception as e:
-                logger.error(f"Failed to execute RAG decision {decision.decision_id}: {e}")
-                decision.success = False
-                decision.execution_time_ms = (datetime.now() - decision.timestamp).total_seconds() * 1000
+        async def execute(decision: AgenticRAGDecision):
+            stage, executor = executors[decision.decision_type]
+            result = await self._run_stage(
+                stage, executor(decision, user_id, timings, deadline), _missed, timings, deadline=deadline
+            )
+            # Mark decision as executed
+            decision.execution_time_ms = (datetime.now() - decision.timestamp).total_seconds() * 1000
+            decision.success = result is not _missed
+            return result
+
+        runnable = [d for d in decisions if d.decision_type in executors]
+        results = await asyncio.gather(*(execute(d) for d in runnable))
+
+        for decision, result in zip(runnable, results):
+            if result is _missed:
+                continue
+            if decision.decision_type == AgenticRAGDecisionType.MEMORY_SEARCH:
+                enhanced_context["memories"].extend(result)
+            elif decision.decision_type == AgenticRAGDecisionType.CONTEXT_EXPANSION:
+                enhanced_context["expanded_context"].update(result)
+            elif decision.decision_type == AgenticRAGDecisionType.CROSS_SESSION_LEARNING:
+                enhanced_context["learned_patterns"].update(result)
+            elif decision.decision_type == AgenticRAGDecisionType.TOOL_ROUTING:
+                enhanced_context["tool_preparations"].update(result)
 
         return enhanced_context
 
-    async def _execute_memory_search(self, decision: AgenticRAGDecision, user_id: str) -> List[Dict[str, Any]]:
-        """Execute memory search based on decision"""
+    async def _execute_memory_search(self,
+                                   decision: AgenticRAGDecision,
+                                   user_id: str,
+                                   timings: Optional[Dict[str, Dict[str, Any]]] = None,
+                                   deadline: Optional[RequestDeadline] = None) -> List[Dict[str, Any]]:
+        """Execute memory search based on decision; sub-searches run concurrently"""
 
-        memories = []
+        query = decision.trigger_context.get("user_request", "")
+        searches = []
         for plan_item in decision.execution_plan:
             if plan_item["action"] == "memory_search":
                 strategy = plan_item.get("strategy", {})
 
                 # Personal memory search
                 if strategy.get("personal_search", False):
-                    personal_memories = await self.memory_manager.search_user_memories(
+                    threshold = strategy.get("confidence_threshold", 0.5)
+                    searches.append(("memory_search.personal", lambda threshold=threshold: self.memory_manager.search_user_memories(
                         user_id,
-                        decision.trigger_context.get("user_request", ""),
-                        confidence_threshold=strategy.get("confidence_threshold", 0.5)
-                    )
-                    memories.extend(personal_memories)
+                        query,
+                        confidence_threshold=threshold,
+                        deadline=deadline
+                    )))
 
                 # System-wide pattern search
                 if strategy.get("system_search", False):
-                    system_memories = await self.memory_manager.search_system_patterns(
-                        decision.trigger_context.get("user_request", ""),
+                    searches.append(("memory_search.system", lambda: self.memory_manager.search_system_patterns(
+                        query,
                         limit=10
-                    )
-                    memories.extend(system_memories)
+                    )))
 
                 # Expanded conceptual search
                 if strategy.get("expanded_search", False):
-                    expanded_memories = await self._search_related_concepts(
-                        decision.trigger_context.get("user_request", ""),
-                        user_id
-                    )
-                    memories.extend(expanded_memories)
+                    if deadline is not None and not deadline.has_at_least(self.degradation_thresholds["expanded_search"]):
+                        deadline.degrade("expanded_search", "skipped")
+                        continue
+                    searches.append((
+                        "memory_search.expanded",
+                        lambda: self._search_related_concepts(query, user_id, deadline=deadline)
+                    ))
+
+        results = await asyncio.gather(*(
+            self._run_stage(stage, awaitable, [], timings, timeout_key="memory_subsearch", deadline=deadline)
+            for stage, awaitable in searches
+        ))
 
+        memories = []
+        for result in results:
+            memories.extend(result or [])
         return memories
 
-    async def _execute_context_expansion(self, decision: AgenticRAGDecision, user_id: str) -> Dict[str, Any]:
-        """Execute context expansion based on decision"""
+    async def _execute_context_expansion(self,
+                                       decision: AgenticRAGDecision,
+                                       user_id: str,
+                                       timings: Optional[Dict[str, Dict[str, Any]]] = None,
+                                       deadline: Optional[RequestDeadline] = None) -> Dict[str, Any]:
+        """Execute context expansion based on decision; independent actions run concurrently"""
 
-        expanded_context = {}
+        actions = []
         for plan_item in decision.execution_plan:
-            try:
-                if plan_item["action"] == "search_related_concepts":
-                    scope = plan_item.get("scope", "narrow")
-                    related_concepts = await self._search_related_concepts(
-                        decision.trigger_context.get("user_request", ""), user_id, scope
-                    )
-                    expanded_context["related_concepts"] = related_concepts
-
-                elif plan_item["action"] == "fetch_user_preferences":
-                    user_prefs = await self.memory_manager.get_user_preferences(user_id)
-                    expanded_context["user_preferences"] = user_prefs
-
-                elif plan_item["action"] == "analyze_session_patterns":
-                    session_data = plan_item.get("session_data", {})
-                    patterns = await self._analyze_session_patterns(session_data)
-                    expanded_context["session_patterns"] = patterns
-
-            except Exception as e:
-                logger.error(f"Context expansion action failed: {plan_item['action']}: {e}")
+            if plan_item["action"] == "search_related_concepts":
+                scope = plan_item.get("scope", "narrow")
+                actions.append(("related_concepts", self._search_related_concepts(
+                    decision.trigger_context.get("user_request", ""), user_id, scope, deadline
+                )))
+
+            elif plan_item["action"] == "fetch_user_preferences":
+                actions.append(("user_preferences", lambda: asyncio.to_thread(self.memory_manager.get_user_preferences, user_id)))
+
+            elif plan_item["action"] == "analyze_session_patterns":
+                session_data = plan_item.get("session_data", {})
+                actions.append(("session_patterns", self._analyze_session_patterns(session_data)))
+
+        _missed = object()
+        results = await asyncio.gather(*(
+            self._run_stage(
+                f"context_expansion.{key}", awaitable, _missed, timings,
+                timeout_key="expansion_action", deadline=deadline
+            )
+            for key, awaitable in actions
+        ))
 
-        return expanded_context
+        return {
+            key: result for (key, _), result in zip(actions, results) if result is not _missed
+        }
 
-    async def _execute_cross_session_learning(self, decision: AgenticRAGDecision, user_id: str) -> Dict[str, Any]:
+    async def _execute_cross_session_learning(self,
+                                            decision: AgenticRAGDecision,
+                                            user_id: str,
+                                            timings: Optional[Dict[str, Dict[str, Any]]] = None,
+                                            deadline: Optional[RequestDeadline] = None) -> Dict[str, Any]:
         """Execute cross-session learning based on decision"""
 
         learned_patterns = {}
@@ -490,7 +676,11 @@ class MCPAgenticRAGOrchestrator:
 
         return learned_patterns
 
-    async def _execute_tool_preparation(self, decision: AgenticRAGDecision, user_id: str) -> Dict[str, Any]:
+    async def _execute_tool_preparation(self,
+                                      decision: AgenticRAGDecision,
+                                      user_id: str,
+                                      timings: Optional[Dict[str, Dict[str, Any]]] = None,
+                                      deadline: Optional[RequestDeadline] = None) -> Dict[str, Any]:
         """Execute tool preparation based on decision"""
 
         tool_preparations = {}
@@ -520,7 +710,8 @@ class MCPAgenticRAGOrchestrator:
     async def _learn_from_interaction(self,
                                     rag_decisions: List[AgenticRAGDecision],
                                     result: Dict[str, Any],
-                                    user_id: str) -> None:
+                                    user_id: str,
+                                    request_type: str = "general") -> None:
         """Learn from the interaction for future improvements"""
 
         try:
@@ -562,9 +753,11 @@ class MCPAgenticRAGOrchestrator:
                 (pattern["average_processing_time"] * (pattern["usage_count"] - 1) + processing_time)
                 / pattern["usage_count"]
             )
-            pattern["success_rate"] = (
+            interaction_success_rate = (
                 learning_record["successful_decisions"] / learning_record["decisions_made"]
+                if learning_record["decisions_made"] else 0.0
             )
+            pattern["success_rate"] += (interaction_success_rate - pattern["success_rate"]) / pattern["usage_count"]
 
             # Update global metrics
             self.rag_metrics["total_decisions"] += len(rag_decisions)
@@ -574,8 +767,12 @@ class MCPAgenticRAGOrchestrator:
             # Store learning record for cross-session learning
             await self.cross_session_learner.learn_from_session({
                 "type": "agentic_rag",
-                "success_indicators": {"user_satisfaction": user_satisfaction},
-                "context_used": learning_record,
+                "user_id": user_id,
+                "request_type": request_type,
+                "success_indicators": {
+                    "user_satisfaction": user_satisfaction,
+                    "success": interaction_success_rate >= 0.5 and result.get("success", True)
+                },
                 "models_used": learning_record["models_used"],
                 "response_time": processing_time
             })
@@ -587,7 +784,7 @@ class MCPAgenticRAGOrchestrator:
                                         user_request: str,
                                         result: Dict[str, Any],
                                         user_id: str) -> None:
-        """Prepare context for likely follow-up requests"""
+        """Queue background prefetches for likely follow-up requests"""
 
         try:
             # Predict likely follow-ups
@@ -595,19 +792,39 @@ class MCPAgenticRAGOrchestrator:
                 user_request, user_id
             )
 
-            # Cache predicted context for quick access
-            cache_key = f"predicted_{user_id}_{hash(user_request)}"
-            self.predictive_engine.context_cache[cache_key] = {
-                "predicted_context": predicted_context,
-                "timestamp": datetime.now(),
-                "ttl": timedelta(hours=1)  # Cache for 1 hour
-            }
+            # Prefetch on the bounded scheduler; results are read by the next request
+            queued = 0
+            for followup in predicted_context:
+                queued += self.prefetch_scheduler.submit(
+                    self._prefetch_key(user_id, followup.get("type", "general")),
+                    user_id,
+                    lambda followup=followup: self._prefetch_context_for_scenario(followup, user_id),
+                    probability=followup.get("probability", 0.5)
+                )
 
-            logger.info(f"Cached predictive context for user {user_id}")
+            logger.debug(f"Queued {queued} predictive prefetches for user {user_id}")
 
         except Exception as e:
             logger.error(f"Predictive context preparation failed: {e}")
 
+    @staticmethod
+    def _prefetch_key(user_id: str, scenario_type: str) -> str:
+        return f"{user_id}:{scenario_type}"
+
+    def _consume_prefetched_context(self, user_request: str, user_id: str) -> Dict[str, Any]:
+        """Prefetched context for every predicted scenario this request turns out to be"""
+
+        request_lower = user_request.lower()
+        prefetched = {}
+        for scenario_type, keywords in FOLLOWUP_SCENARIO_KEYWORDS.items():
+            if any(keyword in request_lower for keyword in keywords):
+                context = self.prefetch_scheduler.get(self._prefetch_key(user_id, scenario_type))
+                if context is not None:
+                    prefetched[scenario_type] = context
+
+        self.rag_metrics["context_cache_hits"] += len(prefetched)
+        return prefetched
+
     async def _find_similar_request_patterns(self, user_request: str, user_id: str) -> Dict[str, Any]:
         """Find patterns from similar requests"""
 
@@ -626,10 +843,46 @@ class MCPAgenticRAGOrchestrator:
             logger.error(f"Finding similar patterns failed: {e}")
             return {}
 
-    async def _search_related_concepts(self, query: str, user_id: str, scope: str = "medium") -> List[Dict[str, Any]]:
-        """Search for related concepts to expand context"""
+    async def _search_related_concepts(self,
+                                       query: str,
+                                       user_id: str,
+                                       scope: str = "medium",
+                                       deadline: Optional[RequestDeadline] = None) -> List[Dict[str, Any]]:
+        """
+        Search for related concepts to expand context.
+
+        Answered from the expansion cache, then the learned concept graph; the
+        conductor LLM is only called on a miss, and under a tight deadline the
+        local keyword expansion is used instead.
+        """
+
+        metrics = self.rag_metrics["concept_expansions"]
+        cache_key = normalize_query(query, scope)
+
+        cached = self.concept_cache.get(cache_key)
+        if cached is not None:
+            metrics["cache_hits"] += 1
+            return cached
 
         try:
+            concepts = await asyncio.to_thread(self.concept_graph.expand, query)
+            if concepts:
+                metrics["graph_hits"] += 1
+                self.concept_cache.put(cache_key, concepts)
+                return concepts
+
+            has_conductor = hasattr(self.orchestra, 'conductor') and hasattr(self.orchestra.conductor, 'conductor_model')
+            if has_conductor and deadline is not None and not deadline.has_at_least(
+                self.degradation_thresholds["concept_llm_expansion"]
+            ):
+                deadline.degrade("concept_expansion", "basic_keyword_expansion")
+                has_conductor = False
+
+            if not has_conductor:
+                # Fallback: basic keyword expansion (not cached, so a later LLM call can improve it)
+                metrics["basic_fallbacks"] += 1
+                return await self._basic_concept_expansion(query)
+
             # Use conductor to find related concepts
             concept_prompt = f"""
             Find related concepts for this query: "{query}"
@@ -644,42 +897,41 @@ class MCPAgenticRAGOrchestrator:
             Format as concept: relevance_score pairs.
             """
 
-            if hasattr(self.orchestra, 'conductor') and hasattr(self.orchestra.conductor, 'conductor_model'):
-                concept_response = await self.orchestra.conductor.conductor_model.generate_content_async(
-                    concept_prompt
-                )
+            metrics["llm_calls"] += 1
+            concept_response = await self.orchestra.conductor.conductor_model.generate_content_async(
+                concept_prompt
+            )
+            concepts = self._parse_concept_response(concept_response.text)[:10]  # Limit to top 10
 
-                # Parse concepts (simplified - could be enhanced)
-                concepts = []
-                lines = concept_response.text.split('\n')
-                for line in lines:
-                    if ':' in line and any(char.isdigit() for char in line):
-                        parts = line.split(':')
-                        if len(parts) >= 2:
-                            concept = parts[0].strip()
-                            try:
-                                relevance = float(parts[1].strip().split()[0])
-                                concepts.append({
-                                    "concept": concept,
-                                    "relevance": relevance,
-                                    "source": "conductor_analysis"
-                                })
-                            except:
-                                concepts.append({
-                                    "concept": concept,
-                                    "relevance": 0.5,
-                                    "source": "conductor_analysis"
-                                })
-
-                return concepts[:10]  # Limit to top 10
-
-            # Fallback: basic keyword expansion
-            return await self._basic_concept_expansion(query)
+            self.concept_cache.put(cache_key, concepts)
+            await asyncio.to_thread(self.concept_graph.learn, query, concepts)
+            return concepts
 
         except Exception as e:
             logger.error(f"Related concept search failed: {e}")
             return []
 
+    @staticmethod
+    def _parse_concept_response(text: str) -> List[Dict[str, Any]]:
+        """Parse "concept: relevance" lines from the conductor's reply"""
+
+        concepts = []
+        for line in text.split('\n'):
+            if ':' in line and any(char.isdigit() for char in line):
+                parts = line.split(':')
+                if len(parts) >= 2:
+                    concept = parts[0].strip().lstrip('-*• ').strip()
+                    try:
+                        relevance = float(parts[1].strip().split()[0])
+                    except (ValueError, IndexError):
+                        relevance = 0.5
+                    concepts.append({
+                        "concept": concept,
+                        "relevance": relevance,
+                        "source": "conductor_analysis"
+                    })
+        return concepts
+
     async def _preload_context_patterns(self) -> None:
         """Preload common context patterns for faster access"""
 
@@ -862,25 +1114,21 @@ class MCPAgenticRAGOrchestrator:
         """Get patterns specific to this user"""
 
         try:
-            # Get user's historical interactions
-            user_history = await self.memory_manager.get_user_interaction_history(user_id, limit=50)
+            # Read the incrementally maintained aggregates instead of re-scanning history
+            aggregates = self.cross_session_learner.aggregates
+            stats = aggregates.get(user_id, request_type)
 
-            # Analyze patterns
             patterns = {
-                "common_request_types": {},
+                "common_request_types": aggregates.get_user_request_types(user_id),
                 "preferred_response_styles": {},
                 "successful_model_combinations": {}
             }
 
-            for interaction in user_history:
-                if interaction.get("request_type") == request_type:
-                    # Track successful patterns
-                    if interaction.get("satisfaction_score", 0) > 0.7:
-                        models_used = interaction.get("models_used", [])
-                        for model in models_used:
-                            if model not in patterns["successful_model_combinations"]:
-                                patterns["successful_model_combinations"][model] = 0
-                            patterns["successful_model_combinations"][model] += 1
+            if stats is not None:
+                patterns["successful_model_combinations"] = {
+                    model: round(rate, 4) for model, rate in stats.model_success_rates().items()
+                    if rate > 0.7
+                }
 
             return patterns
 
@@ -1065,9 +1313,6 @@ class ContextAnalyzer:
 
 class PredictiveContextEngine:
     """Predictive context engine for proactive RAG"""
-    def __init__(self):
-        self.context_cache = {}
-
     async def predict_next_context_needs(self, user_request: str, user_id: str):
         """Predict likely follow-up context needs"""
         # Simple prediction based on request patterns
@@ -1095,19 +1340,64 @@ class PredictiveContextEngine:
         return predictions
 
 class CrossSessionLearner:
-    """Cross-session learning for pattern recognition"""
-    def __init__(self):
-        self.session_patterns = {}
-        self.global_patterns = {}
+    """Cross-session learning for pattern recognition, backed by incremental aggregates"""
+    def __init__(self, aggregate_store: Optional[LearningAggregateStore] = None,
+                 min_success_rate: float = 0.6, max_failure_rate: float = 0.5):
+        self.aggregates = aggregate_store or LearningAggregateStore()
+        self.min_success_rate = min_success_rate
+        self.max_failure_rate = max_failure_rate
 
     async def learn_from_session(self, session_data: Dict[str, Any]):
-        """Learn from session interactions"""
-        session_type = session_data.get("type", "general")
+        """Fold one session outcome into the per-user and global aggregates (O(1))"""
         success_indicators = session_data.get("success_indicators", {})
+        satisfaction = success_indicators.get("user_satisfaction", 0.0)
+        self.aggregates.record(
+            user_id=session_data.get("user_id", "anonymous"),
+            request_type=session_data.get("request_type") or session_data.get("type", "general"),
+            success=success_indicators.get("success", satisfaction > 0.7),
+            satisfaction=satisfaction,
+            models_used=session_data.get("models_used", []),
+            processing_time_ms=session_data.get("response_time", 0.0)
+        )
 
-        if session_type not in self.session_patterns:
-            self.session_patterns[session_type] = {
-                "successful_approaches": [],
-                "failed_approaches": [],
-                "user_preferences": {}
+    async def get_applicable_patterns(self, request_type: str, user_id: str) -> Dict[str, Any]:
+        """Successful approaches, failures and stats for a request type (empty when unseen)"""
+        user_stats = self.aggregates.get(user_id, request_type)
+        global_stats = self.aggregates.get_global(request_type)
+        stats = user_stats or global_stats
+        if stats is None:
+            return {}
+
+        model_rates = stats.model_success_rates()
+        good_models = sorted(
+            (m for m, rate in model_rates.items() if rate >= self.min_success_rate),
+            key=lambda m: model_rates[m], reverse=True
+        )
+        poor_models = [m for m, rate in model_rates.items() if rate < 1 - self.max_failure_rate]
+
+        patterns: Dict[str, Any] = {
+            "successful_approaches": [],
+            "failures": [],
+            "preferences": {},
+            "stats": {
+                "user": user_stats.summary() if user_stats else None,
+                "global": global_stats.summary() if global_stats else None
             }
+        }
+        if stats.success_rate >= self.min_success_rate and good_models:
+            patterns["successful_approaches"].append({
+                "type": request_type,
+                "context_used": {"source": "user" if user_stats else "global"},
+                "models_used": good_models,
+                "user_feedback": {
+                    "success_rate": round(stats.success_rate, 4),
+                    "satisfaction": round(stats.satisfaction, 4)
+                }
+            })
+        if poor_models:
+            patterns["failures"].append({
+                "models_used": poor_models,
+                "context_used": {"source": "user" if user_stats else "global"},
+                "error_indicators": {"poor_quality": True}
+            })
+        return patterns
@@ -11,9 +11,13 @@ import os
 from typing import Dict, List, Optional, Any, Union
 from dataclasses import dataclass, field
 from enum import Enum
-import google.generativeai as genai
-from anthropic import Anthropic
-from openai import OpenAI
+
+from .single_flight import SingleFlight, coalescing_key
+from .lazy_import import lazy_import
+
+genai = lazy_import("google.generativeai")
+anthropic = lazy_import("anthropic")
+openai = lazy_import("openai")
 
 logger = logging.getLogger(__name__)
 
@@ -61,6 +65,9 @@ class MultiModelOrchestrator:
         self.clients: Dict[ModelProvider, Any] = {}
         self.function_registry: Dict[str, FunctionDefinition] = {}
         
+        # Concurrent identical requests share one provider call
+        self.single_flight = SingleFlight("multi_model_orchestrator")
+        
         # Initialize model configurations
         self._initialize_models()
         
@@ -88,7 +95,7 @@ class MultiModelOrchestrator:
                 supports_cua=True,
                 function_calling_format="anthropic"
             )
-            self.clients[ModelProvider.CLAUDE] = Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
+            self.clients[ModelProvider.CLAUDE] = anthropic.Anthropic(api_key=os.getenv('ANTHROPIC_API_KEY'))
             logger.info("✅ Claude 3.5 Sonnet initialized with Computer Use API support")
         
         # Gemini 2.5 Pro (Advanced Function Calling Specialist)
@@ -127,7 +134,7 @@ class MultiModelOrchestrator:
                 supports_cua=False,
                 function_calling_format="openai"
             )
-            self.clients[ModelProvider.OPENAI] = OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
+            self.clients[ModelProvider.OPENAI] = openai.OpenAI(api_key=os.getenv('OPENAI_API_KEY'))
             logger.info("✅ OpenAI GPT-4 initialized")
     
     def _register_sanctuary_functions(self):
@@ -203,9 +210,11 @@ class MultiModelOrchestrator:
                           prompt: str, 
                           user_id: str,
                           capabilities_needed: List[CapabilityType],
-                          preferred_provider: Optional[ModelProvider] = None) -> Dict[str, Any]:
+                          preferred_provider: Optional[ModelProvider] = None,
+                          coalesce: bool = False) -> Dict[str, Any]:
         """
-        Intelligently route requests to the best model based on capabilities needed
+        Intelligently route requests to the best model based on capabilities needed.
+        Identical concurrent requests share one provider call when ``coalesce`` is set.
         """
         
         # Determine best model for the request
@@ -224,12 +233,27 @@ class MultiModelOrchestrator:
                 logger.info(f"🔄 Routing Computer Use request from {best_provider.value} to Claude 3.5")
                 best_provider = ModelProvider.CLAUDE
         
-        # Execute request with selected model
-        return await self._execute_with_provider(
-            provider=best_provider,
-            prompt=prompt,
-            user_id=user_id,
-            capabilities_needed=capabilities_needed
+        # Execute request with selected model (the provider prompt embeds user_id, so it is part of the key)
+        model_config = self.models[best_provider]
+        key = coalescing_key(
+            model_config.model_name,
+            prompt,
+            {
+                "user_id": user_id,
+                "capabilities": sorted(cap.value for cap in capabilities_needed),
+                "temperature": model_config.temperature,
+                "max_tokens": model_config.max_tokens
+            }
+        )
+        return await self.single_flight.do(
+            key,
+            lambda: self._execute_with_provider(
+                provider=best_provider,
+                prompt=prompt,
+                user_id=user_id,
+                capabilities_needed=capabilities_needed
+            ),
+            enabled=coalesce
         )
     
     def _select_best_provider(self, 
@@ -480,7 +504,8 @@ class MultiModelOrchestrator:
             "available_models": models_info,
             "total_models": len(self.models),
             "cua_capable_models": [p.value for p, c in self.models.items() if c.supports_cua],
-            "function_calling_models": [p.value for p, c in self.models.items() if CapabilityType.FUNCTION_CALLING in c.capabilities]
+            "function_calling_models": [p.value for p, c in self.models.items() if CapabilityType.FUNCTION_CALLING in c.capabilities],
+            "single_flight": self.single_flight.get_metrics()
         }
 
 # Factory function for easy initialization
@@ -15,7 +15,9 @@ import asyncio
 import vertexai
 from vertexai.generative_models import GenerativeModel
 from google.oauth2 import service_account
-from google.cloud import aiplatform
+from .lazy_import import lazy_import
+
+aiplatform = lazy_import("google.cloud.aiplatform")
 
 logger = logging.getLogger(__name__)
 
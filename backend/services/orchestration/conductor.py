@@ -3,7 +3,6 @@
 The maestro that analyzes requests and routes them to the perfect specialist
 """
 
-import google.generativeai as genai
 from typing import Dict, Any, List, Optional
 import json
 import asyncio
@@ -11,9 +10,18 @@ import logging
 from datetime import datetime
 
 from .model_registry import GEMINI_REGISTRY, ModelCapability, MAMA_BEAR_MODEL_PREFERENCES
+from ..request_deadline import RequestDeadline
+from ..lazy_import import lazy_import
+
+genai = lazy_import("google.generativeai")
 
 logger = logging.getLogger(__name__)
 
+# Below this much remaining request budget, skip the conductor call and route by rules
+MIN_ROUTING_BUDGET_SECONDS = 8.0
+# Upper bound on a conductor routing call when the request carries a deadline
+ROUTING_TIMEOUT_SECONDS = 5.0
+
 class GeminiConductor:
     """The maestro that orchestrates all other models"""
     
@@ -37,6 +45,11 @@ class GeminiConductor:
         require_creativity = request.get("require_creativity", False)
         require_reasoning = request.get("require_reasoning", False)
         max_tokens_needed = request.get("max_tokens_needed", 1000)
+        deadline = RequestDeadline.from_request(request)
+        
+        if deadline is not None and not deadline.has_at_least(MIN_ROUTING_BUDGET_SECONDS):
+            deadline.degrade("conductor_routing", "fallback_routing")
+            return self._fallback_routing(request)
         
         # Build the routing prompt
         routing_prompt = self._build_routing_prompt(
@@ -47,7 +60,10 @@ class GeminiConductor:
         
         try:
             # Get routing decision from conductor
-            response = await self.conductor_model.generate_content_async(routing_prompt)
+            response = await asyncio.wait_for(
+                self.conductor_model.generate_content_async(routing_prompt),
+                timeout=deadline.cap(ROUTING_TIMEOUT_SECONDS) if deadline is not None else None
+            )
             routing_decision = self._parse_routing_response(response.text)
             
             # Add metadata
@@ -64,6 +80,12 @@ class GeminiConductor:
             logger.info(f"Conductor routed request to: {routing_decision['primary_model']}")
             return routing_decision
             
+        except asyncio.TimeoutError:
+            logger.warning("Conductor routing timed out; using rule-based routing")
+            if deadline is not None:
+                deadline.degrade("conductor_routing", "fallback_routing")
+            return self._fallback_routing(request)
+            
         except Exception as e:
             logger.error(f"Conductor routing failed: {e}")
             # Fallback to simple rule-based routing
@@ -3,8 +3,6 @@
 The main orchestration system that coordinates all models and handles requests
 """
 
-import google.generativeai as genai
-import anthropic
 import asyncio
 import logging
 import uuid
@@ -16,6 +14,13 @@ import time
 from .conductor import GeminiConductor
 from .model_registry import GEMINI_REGISTRY, ModelCapability
 from .performance_tracker import PerformanceTracker
+from ..context_compaction import context_compactor
+from ..request_deadline import RequestDeadline
+from ..single_flight import SingleFlight, coalescing_key
+from ..lazy_import import lazy_import
+
+genai = lazy_import("google.generativeai")
+anthropic = lazy_import("anthropic")
 
 logger = logging.getLogger(__name__)
 
@@ -40,6 +45,9 @@ class GeminiOrchestra:
         self.request_queue = asyncio.Queue()
         self.is_running = False
         
+        # Concurrent identical model calls share one provider call
+        self.single_flight = SingleFlight("gemini_orchestra")
+        
         logger.info("🎭 Gemini Orchestra initialized with 50+ models!")
     
     def _initialize_gemini_models(self):
@@ -92,6 +100,10 @@ class GeminiOrchestra:
                 "timestamp": datetime.now().isoformat()
             }
             
+            deadline = RequestDeadline.from_request(request)
+            if deadline is not None:
+                result["orchestra_metadata"]["deadline"] = deadline.report()
+            
             logger.info(f"✅ Request {request_id} completed in {processing_time:.0f}ms")
             return result
             
@@ -281,8 +293,12 @@ Please provide a helpful, caring response that embodies the Podplay Sanctuary va
         except Exception as primary_error:
             logger.warning(f"Primary model {primary_model_key} failed: {primary_error}")
             
-            # Try fallback models
-            for fallback_key in fallback_models:
+            # Try fallback models; past the deadline only the first one is still tried
+            deadline = RequestDeadline.from_request(request)
+            for attempt, fallback_key in enumerate(fallback_models):
+                if attempt and deadline is not None and deadline.expired:
+                    deadline.degrade("model_fallback", "skipped_remaining_fallbacks")
+                    break
                 try:
                     logger.info(f"Trying fallback model: {fallback_key}")
                     result = await self._execute_gemini_request(fallback_key, request, routing)
@@ -306,8 +322,9 @@ Please provide a helpful, caring response that embodies the Podplay Sanctuary va
         model = self.gemini_models[model_key]
         model_config = GEMINI_REGISTRY[model_key]
         
-        # Build prompt for Gemini
-        prompt = self._build_gemini_prompt(request, routing, model_config)
+        # Compact conversation history to this model's budget, then build the prompt
+        conversation_context, compaction_report = self._compact_conversation_history(request, model_key)
+        prompt = self._build_gemini_prompt(request, routing, model_config, conversation_context)
         
         # Configure generation parameters
         generation_config = self._get_generation_config(request, model_config)
@@ -315,19 +332,50 @@ Please provide a helpful, caring response that embodies the Podplay Sanctuary va
         # Execute the request
         if ModelCapability.BIDIRECTIONAL in model_config.capabilities:
             # Use bidirectional generation for real-time models
-            response = await self._execute_bidirectional_request(model, prompt, generation_config)
+            generate = lambda: self._execute_bidirectional_request(model, prompt, generation_config)
         else:
             # Standard generation
-            response = await model.generate_content_async(prompt, generation_config=generation_config)
+            generate = lambda: model.generate_content_async(prompt, generation_config=generation_config)
+        
+        generation_params = {
+            name: getattr(generation_config, name, None)
+            for name in ("max_output_tokens", "temperature", "top_p", "top_k")
+        }
+        generation = self.single_flight.do(
+            coalescing_key(model_key, prompt, generation_params),
+            generate,
+            enabled=request.get("coalesce", False)
+        )
+        
+        # The answer itself isn't bounded by the request deadline; only optional enrichment is
+        response = await generation
         
         return {
             "response": response.text,
             "model_config": model_config.to_dict(),
             "generation_config": generation_config.__dict__ if hasattr(generation_config, '__dict__') else str(generation_config),
-            "routing_metadata": routing
+            "routing_metadata": routing,
+            "context_compaction": compaction_report
         }
     
-    def _build_gemini_prompt(self, request: Dict[str, Any], routing: Dict[str, Any], model_config) -> str:
+    def _compact_conversation_history(self, request: Dict[str, Any], model_key: str) -> tuple:
+        """Compact prior turns in the request to the model's context budget"""
+        
+        history = request.get("conversation_history") or []
+        if not history:
+            return "", None
+        
+        # Summaries are cached per session; without a session_id nothing is cached,
+        # so one user's separate conversations never share a summary
+        compaction = context_compactor.compact(
+            history,
+            model_key,
+            session_id=request.get("session_id"),
+            query=request.get("message", "")
+        )
+        return context_compactor.render_history(compaction.messages), compaction.report()
+    
+    def _build_gemini_prompt(self, request: Dict[str, Any], routing: Dict[str, Any], model_config, conversation_context: str = "") -> str:
         """Build an optimized prompt for Gemini models"""
         
         base_message = request.get("message", "")
@@ -369,6 +417,11 @@ You are part of Podplay Sanctuary - a neurodivergent-friendly AI development pla
         if mama_bear_variant:
             mama_bear_context = f"\n🎭 MAMA BEAR VARIANT: {mama_bear_variant}\n"
         
+        # Add compacted conversation history
+        history_context = ""
+        if conversation_context:
+            history_context = f"\n💬 CONVERSATION SO FAR:\n{conversation_context}\n"
+        
         # Combine all elements
         full_prompt = f"""
 {sanctuary_context}
@@ -378,7 +431,7 @@ You are part of Podplay Sanctuary - a neurodivergent-friendly AI development pla
 🎼 MODEL SPECIALIZATION: {model_config.specialty}
 🔧 OPTIMIZATION HINTS: {' '.join(optimization_hints)}
 📝 SPECIAL INSTRUCTIONS: {special_instructions}
-
+{history_context}
 👤 USER REQUEST:
 {base_message}
 
@@ -428,7 +481,7 @@ Please provide a helpful response optimized for this model's capabilities while
         
         logger.error(f"Request {request.get('request_id')} failed completely: {error}")
         
-        # Try Claude as final fallback if available
+        # Try Claude as final fallback if available (even past the deadline: it's the last answer left)
         if self.anthropic_client and not request.get("claude_attempted"):
             try:
                 request["claude_attempted"] = True
@@ -497,6 +550,7 @@ Please provide a helpful response optimized for this model's capabilities while
             "active_requests": len(self.active_requests),
             "performance_summary": performance_report,
             "conductor_analytics": conductor_analytics,
+            "single_flight": self.single_flight.get_metrics(),
             "model_sections": {
                 section: [model for model in models if model in available_models]
                 for section, models in {
@@ -10,6 +10,7 @@ from datetime import datetime
 import json
 
 from .model_registry import ModelCapability
+from ..token_estimator import estimate_tokens
 
 logger = logging.getLogger(__name__)
 
@@ -289,9 +290,11 @@ class TaskAnalyzer:
     def _estimate_token_requirements(self, message: str, request: Dict[str, Any]) -> Dict[str, int]:
         """Estimate token requirements for input and output"""
         
-        # Rough token estimation (1 token ≈ 4 characters for English)
-        input_chars = len(message) + len(str(request.get("context", "")))
-        estimated_input_tokens = input_chars // 4
+        # Shared calibrated estimator (cached by content hash)
+        model_hint = request.get("model")
+        estimated_input_tokens = estimate_tokens(message, model_hint)
+        if request.get("context"):
+            estimated_input_tokens += estimate_tokens(str(request["context"]), model_hint)
         
         # Estimate output tokens based on task type and complexity
         base_output = 500  # Base response length
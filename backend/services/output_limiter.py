@@ -0,0 +1,49 @@
+"""
+✂️ Output Limiter
+Bounds how much stdout/stderr an execution buffers and streams. Output past
+the limit is dropped and replaced by a single truncation marker, so runaway
+prints can't exhaust server memory or flood a client connection.
+"""
+
+import os
+import threading
+from typing import Dict, List, Optional
+
+DEFAULT_MAX_OUTPUT_BYTES = int(os.getenv('EXECUTION_MAX_OUTPUT_BYTES', 256 * 1024))
+
+
+class OutputLimiter:
+    """Shared byte budget across an execution's streams"""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_OUTPUT_BYTES):
+        self.max_bytes = max_bytes
+        self.used_bytes = 0
+        self.dropped_bytes = 0
+        self.truncated = False
+        self._chunks: Dict[str, List[str]] = {"stdout": [], "stderr": []}
+        self._lock = threading.Lock()  # stdout and stderr may be fed from different threads
+
+    def feed(self, stream: str, text: str) -> Optional[str]:
+        """The part of ``text`` to emit (with a marker when the budget runs out), or None"""
+        size = len(text.encode("utf-8"))
+        with self._lock:
+            if self.truncated:
+                self.dropped_bytes += size
+                return None
+            if self.used_bytes + size <= self.max_bytes:
+                self.used_bytes += size
+                self._chunks.setdefault(stream, []).append(text)
+                return text
+
+            room = self.max_bytes - self.used_bytes
+            head = text.encode("utf-8")[:room].decode("utf-8", errors="ignore")
+            self.used_bytes = self.max_bytes
+            self.dropped_bytes += size - len(head.encode("utf-8"))
+            self.truncated = True
+            chunk = head + f"\n[... output truncated after {self.max_bytes} bytes ...]\n"
+            self._chunks.setdefault(stream, []).append(chunk)
+            return chunk
+
+    def text(self, stream: str) -> str:
+        with self._lock:
+            return "".join(self._chunks.get(stream, ()))
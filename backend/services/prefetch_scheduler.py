@@ -0,0 +1,246 @@
+"""
+🔮 Predictive Prefetch Scheduler
+Runs speculative context prefetches on a small, bounded worker pool that yields
+to foreground requests, deduplicates identical jobs, cancels a user's pending
+prefetches when their next request arrives, and keeps completed results in a
+TTL-bounded cache so the next request can actually use them.
+"""
+
+import asyncio
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, Awaitable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(order=True)
+class _PrefetchJob:
+    sort_key: Tuple[float, int]
+    key: str = field(compare=False)
+    user_id: str = field(compare=False)
+    factory: Callable[[], Awaitable[Any]] = field(compare=False)
+    cancelled: bool = field(default=False, compare=False)
+
+
+class PrefetchScheduler:
+    """
+    Bounded background prefetching.
+
+    - ``max_workers`` workers drain a priority queue (highest probability first)
+      of at most ``max_queue`` jobs; extra submissions are dropped.
+    - Workers only start a job while fewer than ``max_foreground`` foreground
+      requests are in flight (see :meth:`foreground`).
+    - A key that is queued, running or freshly cached is not submitted again.
+    - Results live for ``result_ttl_seconds`` in an LRU of ``max_results``.
+
+    Requests may submit from any event loop (each Flask request runs its own).
+    Workers and prefetches run on one long-lived loop in a daemon thread, so
+    queued work outlives the request that submitted it; bookkeeping shared
+    with request threads is guarded by a lock.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_queue: int = 100,
+        max_foreground: int = 4,
+        result_ttl_seconds: float = 3600,
+        max_results: int = 2000
+    ):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_foreground = max_foreground
+        self.result_ttl_seconds = result_ttl_seconds
+        self.max_results = max_results
+
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._workers: Set[asyncio.Task] = set()
+        self._pending: Dict[str, _PrefetchJob] = {}
+        self._running: Dict[str, Tuple[_PrefetchJob, asyncio.Task]] = {}
+        self._results: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._sequence = itertools.count()
+        self._foreground_active = 0
+        self._foreground_idle: Optional[asyncio.Event] = None
+
+        self.metrics = {
+            "submitted": 0,
+            "deduplicated": 0,
+            "dropped": 0,
+            "completed": 0,
+            "failed": 0,
+            "cancelled": 0,
+            "hits": 0,
+            "misses": 0
+        }
+
+    # === SCHEDULER LOOP ===
+
+    def _scheduler_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._loop.call_soon(self._start_workers)
+                threading.Thread(target=self._run_loop, name="prefetch-scheduler", daemon=True).start()
+            return self._loop
+
+    def _run_loop(self):
+        # The thread keeps the scheduler, and so its parked workers, alive
+        self._loop.run_forever()
+
+    def _start_workers(self):
+        self._queue = asyncio.PriorityQueue()
+        self._foreground_idle = asyncio.Event()
+        self._update_foreground_idle()
+        while len(self._workers) < self.max_workers:
+            worker = asyncio.ensure_future(self._worker())
+            self._workers.add(worker)
+            worker.add_done_callback(self._workers.discard)
+
+    def _update_foreground_idle(self):
+        if self._foreground_active < self.max_foreground:
+            self._foreground_idle.set()
+        else:
+            self._foreground_idle.clear()
+
+    # === FOREGROUND PRIORITY ===
+
+    @asynccontextmanager
+    async def foreground(self):
+        """Mark a foreground request in flight; prefetch workers hold back while busy"""
+        loop = self._scheduler_loop()
+        with self._lock:
+            self._foreground_active += 1
+        loop.call_soon_threadsafe(self._update_foreground_idle)
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._foreground_active -= 1
+            loop.call_soon_threadsafe(self._update_foreground_idle)
+
+    # === SUBMISSION ===
+
+    def submit(
+        self,
+        key: str,
+        user_id: str,
+        factory: Callable[[], Awaitable[Any]],
+        probability: float = 0.5
+    ) -> bool:
+        """Queue a prefetch; returns False if it was deduplicated or dropped"""
+        loop = self._scheduler_loop()
+        with self._lock:
+            if key in self._pending or key in self._running or self._fresh(key):
+                self.metrics["deduplicated"] += 1
+                return False
+            if len(self._pending) >= self.max_queue:
+                self.metrics["dropped"] += 1
+                return False
+
+            job = _PrefetchJob((-probability, next(self._sequence)), key, user_id, factory)
+            self._pending[key] = job
+            self.metrics["submitted"] += 1
+        loop.call_soon_threadsafe(self._enqueue, job)
+        return True
+
+    def _enqueue(self, job: _PrefetchJob):
+        self._queue.put_nowait(job)
+
+    def cancel_user(self, user_id: str) -> int:
+        """Cancel a user's queued and running prefetches (their next request has arrived)"""
+        cancelled = 0
+        with self._lock:
+            for key, job in list(self._pending.items()):
+                if job.user_id == user_id:
+                    job.cancelled = True
+                    del self._pending[key]
+                    cancelled += 1
+            for key, (job, task) in list(self._running.items()):
+                if job.user_id == user_id:
+                    job.cancelled = True
+                    self._loop.call_soon_threadsafe(task.cancel)
+                    cancelled += 1
+            self.metrics["cancelled"] += cancelled
+        return cancelled
+
+    # === WORKERS ===
+
+    async def _worker(self):
+        while True:
+            job = await self._queue.get()
+            try:
+                if job.cancelled:
+                    continue
+                await self._foreground_idle.wait()
+                with self._lock:
+                    if job.cancelled:
+                        continue
+                    del self._pending[job.key]
+                    task = asyncio.ensure_future(job.factory())
+                    self._running[job.key] = (job, task)
+                try:
+                    result = await task
+                    with self._lock:
+                        self._store(job.key, result)
+                        self.metrics["completed"] += 1
+                except asyncio.CancelledError:
+                    if not job.cancelled:
+                        raise  # the worker itself is being cancelled
+                except Exception as e:
+                    self.metrics["failed"] += 1
+                    logger.debug(f"Prefetch {job.key} failed: {e}")
+                finally:
+                    with self._lock:
+                        self._running.pop(job.key, None)
+            finally:
+                self._queue.task_done()
+
+    # === RESULTS ===
+
+    def _store(self, key: str, value: Any):
+        self._results[key] = (time.time(), value)
+        self._results.move_to_end(key)
+        while len(self._results) > self.max_results:
+            self._results.popitem(last=False)
+
+    def _fresh(self, key: str) -> bool:
+        entry = self._results.get(key)
+        if entry is None:
+            return False
+        if time.time() - entry[0] > self.result_ttl_seconds:
+            del self._results[key]
+            return False
+        return True
+
+    def get(self, key: str) -> Optional[Any]:
+        """Prefetched result for ``key`` (counted as a hit or miss)"""
+        with self._lock:
+            if self._fresh(key):
+                self._results.move_to_end(key)
+                self.metrics["hits"] += 1
+                return self._results[key][1]
+            self.metrics["misses"] += 1
+            return None
+
+    def get_metrics(self) -> Dict[str, Any]:
+        lookups = self.metrics["hits"] + self.metrics["misses"]
+        completed = self.metrics["completed"]
+        return {
+            **self.metrics,
+            "hit_rate": self.metrics["hits"] / lookups if lookups else 0.0,
+            # Share of completed prefetches that a later request actually used
+            "utilization": min(self.metrics["hits"] / completed, 1.0) if completed else 0.0,
+            "queued": len(self._pending),
+            "running": len(self._running),
+            "cached_results": len(self._results),
+            "foreground_active": self._foreground_active
+        }
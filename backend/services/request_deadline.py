@@ -0,0 +1,60 @@
+"""
+⏳ Request Deadlines
+A request-scoped latency budget passed through the agentic RAG pipeline, the
+Gemini orchestra, the conductor and the memory layer. Each stage checks the
+remaining budget, degrades (skips optional work, uses fallback routing) when it
+is short, and records which degradations fired.
+"""
+
+import time
+from typing import Dict, Any, List, Optional
+
+
+class RequestDeadline:
+    """Monotonic deadline plus a log of the degradations applied to meet it"""
+
+    def __init__(self, budget_seconds: float):
+        self.budget_seconds = budget_seconds
+        self.started_at = time.monotonic()
+        self.expires_at = self.started_at + budget_seconds
+        self.degradations: List[Dict[str, Any]] = []
+
+    @classmethod
+    def from_request(cls, request: Dict[str, Any]) -> Optional["RequestDeadline"]:
+        """Deadline carried in a request dict, if any"""
+        deadline = request.get("deadline")
+        return deadline if isinstance(deadline, cls) else None
+
+    def remaining(self) -> float:
+        return max(self.expires_at - time.monotonic(), 0.0)
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() <= 0.0
+
+    def has_at_least(self, seconds: float) -> bool:
+        return self.remaining() >= seconds
+
+    def cap(self, timeout: Optional[float]) -> float:
+        """``timeout`` shortened to what is left of the budget"""
+        remaining = self.remaining()
+        return remaining if timeout is None else min(timeout, remaining)
+
+    def degrade(self, stage: str, action: str):
+        """Record that ``stage`` fell back to ``action`` to stay within budget"""
+        self.degradations.append({
+            "stage": stage,
+            "action": action,
+            "remaining_ms": round(self.remaining() * 1000, 2)
+        })
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "budget_ms": round(self.budget_seconds * 1000, 2),
+            "elapsed_ms": round(self.elapsed() * 1000, 2),
+            "remaining_ms": round(self.remaining() * 1000, 2),
+            "degradations": list(self.degradations)
+        }
@@ -0,0 +1,90 @@
+"""
+🔎 Research Query Batching
+Dedups a research batch before it is fanned out (queries that differ only in
+case, whitespace or trailing punctuation, and URLs that differ only in scheme,
+``www.``, trailing slash or fragment, run once) and folds per-query results
+into a running synthesis as they arrive instead of after the whole batch.
+"""
+
+import re
+from typing import Dict, Any, List, Set, Tuple
+from urllib.parse import urlsplit
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_url(url: str) -> str:
+    parts = urlsplit(url.strip())
+    host = parts.netloc.lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    path = parts.path.rstrip('/')
+    return f"{host}{path}" + (f"?{parts.query}" if parts.query else '')
+
+
+def normalize_query(query: str) -> str:
+    text = query.strip()
+    if re.match(r'^https?://', text, re.IGNORECASE):
+        return normalize_url(text)
+    return _WHITESPACE.sub(' ', text).lower().rstrip('?.!')
+
+
+def dedupe_queries(queries: List[str]) -> Tuple[List[str], List[int]]:
+    """(unique queries in first-seen order, index into them for each input query)"""
+    unique: List[str] = []
+    seen: Dict[str, int] = {}
+    mapping: List[int] = []
+    for query in queries:
+        key = normalize_query(query)
+        if key not in seen:
+            seen[key] = len(unique)
+            unique.append(query)
+        mapping.append(seen[key])
+    return unique, mapping
+
+
+class ResearchSynthesis:
+    """Running synthesis of research results; ``summary()`` is valid after every ``add``"""
+
+    def __init__(self, total_queries: int):
+        self.total_queries = total_queries
+        self.successful = 0
+        self.failed = 0
+        self.confidence_sum = 0.0
+        self.findings: List[str] = []
+        self.sources: List[str] = []
+        self._seen_findings: Set[str] = set()
+        self._seen_sources: Set[str] = set()
+
+    def add(self, result: Any):
+        if not (isinstance(result, dict) and result.get('success')):
+            self.failed += 1
+            return
+        self.successful += 1
+        research = result.get('result', {})
+        self.confidence_sum += research.get('confidence_score', 0.0)
+        for finding in research.get('key_findings', []):
+            key = _WHITESPACE.sub(' ', finding).strip().lower()
+            if key not in self._seen_findings:
+                self._seen_findings.add(key)
+                self.findings.append(finding)
+        # The same page is often found by several queries in a batch
+        for source in research.get('sources', []):
+            url = source.get('url', '') if isinstance(source, dict) else str(source)
+            key = normalize_url(url) if url else None
+            if key and key not in self._seen_sources:
+                self._seen_sources.add(key)
+                self.sources.append(url)
+
+    def summary(self) -> Dict[str, Any]:
+        completed = self.successful + self.failed
+        return {
+            'total_queries': self.total_queries,
+            'completed_queries': completed,
+            'successful_queries': self.successful,
+            'combined_findings': list(self.findings),
+            'sources': list(self.sources),
+            'data_quality_score': self.successful / self.total_queries if self.total_queries else 0.0,
+            'synthesis_confidence': self.confidence_sum / self.successful if self.successful else 0.0,
+            'complete': completed >= self.total_queries
+        }
@@ -0,0 +1,140 @@
+"""
+📐 Learned Route Cost Model
+Per-route online regression of execution duration on task complexity features,
+fitted incrementally (recursive least squares with a forgetting factor, so the
+model tracks providers getting faster or slower) from the executions the
+router observes. Cost follows from predicted duration and the route's hourly
+rate. Until a route has enough observations the router keeps its heuristic
+estimates.
+"""
+
+import os
+from typing import Dict, Any, Optional
+
+import numpy as np
+
+MIN_SAMPLES = int(os.getenv('ROUTE_MODEL_MIN_SAMPLES', 20))
+FEATURE_NAMES = ('bias', 'complexity_score', 'code_lines_per_100', 'dependencies', 'system_operations')
+
+
+def route_features(complexity_score: float, code_lines: int, dependency_count: int, system_operations: int) -> np.ndarray:
+    return np.array(
+        [1.0, complexity_score, code_lines / 100.0, float(dependency_count), float(system_operations)],
+        dtype=np.float64
+    )
+
+
+class OnlineLinearRegression:
+    """
+    Recursive least squares: O(d²) per update, no stored history.
+
+    With forgetting, the covariance grows by 1/forgetting per update along
+    feature directions the data never excites (e.g. a feature that is always
+    0), so its trace is capped at the prior's trace to keep it finite.
+    """
+
+    def __init__(self, n_features: int, forgetting: float = 0.99, prior_variance: float = 100.0):
+        self.forgetting = forgetting
+        self.prior_variance = prior_variance
+        self.max_trace = prior_variance * n_features
+        self.weights = np.zeros(n_features)
+        self._p = np.eye(n_features) * prior_variance
+        self.samples = 0
+
+    def predict(self, x: np.ndarray) -> float:
+        return float(self.weights @ x)
+
+    def update(self, x: np.ndarray, y: float):
+        if not (np.all(np.isfinite(x)) and np.isfinite(y)):
+            return
+        px = self._p @ x
+        gain = px / (self.forgetting + x @ px)
+        self.weights += gain * (y - self.weights @ x)
+        p = (self._p - np.outer(gain, px)) / self.forgetting
+        p = (p + p.T) / 2
+        trace = np.trace(p)
+        if trace > self.max_trace:
+            p *= self.max_trace / trace
+        if not (np.isfinite(trace) and np.all(np.isfinite(self.weights))):
+            # Numerically broken: start over from the prior rather than predict NaN
+            self.weights = np.zeros_like(self.weights)
+            p = np.eye(len(self.weights)) * self.prior_variance
+        self._p = p
+        self.samples += 1
+
+
+class _RouteStats:
+    def __init__(self, n_features: int, forgetting: float):
+        self.model = OnlineLinearRegression(n_features, forgetting)
+        self.successes = 0
+        self.model_abs_error = 0.0  # prequential: error of each prediction before learning from it
+        self.model_errors = 0
+        self.estimate_abs_error = 0.0  # error of the estimate the router actually used
+        self.estimate_errors = 0
+
+
+class RouteCostModel:
+    """Learned duration / success-rate estimates per execution route"""
+
+    def __init__(self, min_samples: int = MIN_SAMPLES, forgetting: float = 0.99):
+        self.min_samples = min_samples
+        self.forgetting = forgetting
+        self._routes: Dict[str, _RouteStats] = {}
+
+    def _stats(self, route: str) -> _RouteStats:
+        stats = self._routes.get(route)
+        if stats is None:
+            stats = self._routes[route] = _RouteStats(len(FEATURE_NAMES), self.forgetting)
+        return stats
+
+    def is_trained(self, route: str) -> bool:
+        stats = self._routes.get(route)
+        return stats is not None and stats.model.samples >= self.min_samples
+
+    def predict_duration(self, route: str, features: np.ndarray) -> Optional[float]:
+        """Predicted seconds, or None while the route has too few observations (or no finite prediction)"""
+        if not self.is_trained(route):
+            return None
+        prediction = self._routes[route].model.predict(features)
+        if not np.isfinite(prediction):
+            return None
+        return max(0.0, prediction)
+
+    def success_rate(self, route: str) -> float:
+        stats = self._routes.get(route)
+        if stats is None or stats.model.samples == 0:
+            return 1.0
+        # Laplace-smoothed so a couple of early failures don't rule a route out
+        return (stats.successes + 1) / (stats.model.samples + 2)
+
+    def observe(
+        self,
+        route: str,
+        features: np.ndarray,
+        duration_seconds: float,
+        success: bool,
+        estimated_seconds: Optional[float] = None
+    ):
+        stats = self._stats(route)
+        prediction = self.predict_duration(route, features)
+        if prediction is not None:
+            stats.model_abs_error += abs(prediction - duration_seconds)
+            stats.model_errors += 1
+        if estimated_seconds is not None:
+            stats.estimate_abs_error += abs(estimated_seconds - duration_seconds)
+            stats.estimate_errors += 1
+        stats.model.update(features, duration_seconds)
+        stats.successes += int(success)
+
+    def get_metrics(self) -> Dict[str, Any]:
+        return {
+            route: {
+                'samples': stats.model.samples,
+                'trained': stats.model.samples >= self.min_samples,
+                'success_rate': round(self.success_rate(route), 4),
+                'model_mae_seconds': round(stats.model_abs_error / stats.model_errors, 3) if stats.model_errors else None,
+                'estimate_mae_seconds': round(stats.estimate_abs_error / stats.estimate_errors, 3) if stats.estimate_errors else None,
+                'weights': dict(zip(FEATURE_NAMES, np.round(stats.model.weights, 4).tolist()))
+            }
+            for route, stats in self._routes.items()
+        }
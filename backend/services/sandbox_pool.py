@@ -0,0 +1,408 @@
+"""
+🏊 Sandbox Pool
+Keeps pre-warmed, unassigned code-execution sandboxes per template so a new
+user's first execution doesn't wait for a full sandbox boot, and bounds the
+sandboxes held by user sessions with an idle timeout and a total cap (spare
+sandboxes are evicted first, then sessions that have sat idle for a while).
+
+The pool only needs an async factory ``template -> sandbox`` and sandboxes with
+an async ``close()``; ``FakeSandbox`` implements that locally for offline use.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Dict, Any, Callable, Awaitable, Deque, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+SandboxFactory = Callable[[str], Awaitable[Any]]
+
+
+# === OFFLINE FAKE ===
+
+@dataclass
+class FakeExecutionResult:
+    text: str
+    logs: List[str] = field(default_factory=list)
+
+
+class FakeExecution:
+    def __init__(self, result: FakeExecutionResult, on_stdout: Optional[Callable[[str], Any]] = None):
+        self._result = result
+        self._on_stdout = on_stdout
+
+    async def wait(self) -> FakeExecutionResult:
+        if self._on_stdout is not None:
+            self._on_stdout(self._result.text + "\n")
+        return self._result
+
+
+class FakeSandbox:
+    """Stand-in for an E2B sandbox: boots after ``boot_delay`` and echoes what it was asked to run"""
+
+    _ids = 0
+
+    def __init__(self, template: str):
+        FakeSandbox._ids += 1
+        self.id = f"fake-{template}-{FakeSandbox._ids}"
+        self.template = template
+        self.created_at = time.time()
+        self.executed: List[str] = []
+        self.closed = False
+
+    @classmethod
+    def factory(cls, boot_delay: float = 0.0) -> SandboxFactory:
+        async def create(template: str) -> "FakeSandbox":
+            if boot_delay:
+                await asyncio.sleep(boot_delay)
+            return cls(template)
+        return create
+
+    def run_code(self, code: str, on_stdout=None, on_stderr=None) -> FakeExecution:
+        self.executed.append(code)
+        lines = len(code.splitlines())
+        return FakeExecution(FakeExecutionResult(f"[{self.id}] ran {lines} line(s)"), on_stdout)
+
+    async def close(self):
+        self.closed = True
+
+
+# === POOL ===
+
+@dataclass
+class _Session:
+    sandbox: Any
+    template: str
+    last_used: float
+    busy: int = 0  # executions running in the sandbox right now
+
+
+class SandboxPool:
+    """
+    Pre-warmed sandbox pool with per-session assignment.
+
+    - ``warm_per_template``: idle sandboxes kept ready per template
+    - ``max_total``: cap on idle + assigned + booting sandboxes; at the cap an
+      unassigned spare is closed to make room, then the least recently used
+      session idle for at least ``min_session_idle_seconds``; otherwise the
+      caller waits until a sandbox frees up or a session becomes evictable
+    - ``idle_timeout_seconds``: sessions unused for this long are reaped
+
+    Callers may await the pool from any event loop (each Flask request runs
+    its own). The pool's state, boots, background refills and executions
+    (see :meth:`run`) all live on one long-lived loop in a daemon thread, so
+    refills survive the request that triggered them, concurrent requests
+    can't race on the bookkeeping, and sandbox clients are only ever used on
+    the loop that created them.
+    """
+
+    def __init__(
+        self,
+        factory: SandboxFactory,
+        warm_per_template: Optional[Dict[str, int]] = None,
+        max_total: int = 20,
+        idle_timeout_seconds: float = 600,
+        min_session_idle_seconds: float = 60
+    ):
+        self.factory = factory
+        self.warm_per_template = warm_per_template or {}
+        self.max_total = max_total
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.min_session_idle_seconds = min_session_idle_seconds
+
+        self._idle: Dict[str, Deque[Any]] = {}
+        self._sessions: "OrderedDict[str, _Session]" = OrderedDict()
+        self._pending_sessions: Dict[str, asyncio.Future] = {}  # session key -> sandbox being booted for it
+        self._booting = 0
+        self._idle_booting: Dict[str, int] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._capacity: Optional[asyncio.Condition] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_lock = threading.Lock()
+        self._boot_latencies_ms: Deque[float] = deque(maxlen=200)
+
+        self.metrics = {
+            "session_hits": 0,
+            "pool_hits": 0,
+            "pool_misses": 0,
+            "boots": 0,
+            "boot_failures": 0,
+            "evictions": 0,
+            "reaped": 0
+        }
+
+    # === POOL LOOP ===
+
+    def _pool_loop(self) -> asyncio.AbstractEventLoop:
+        with self._loop_lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                threading.Thread(target=self._loop.run_forever, name="sandbox-pool", daemon=True).start()
+            return self._loop
+
+    async def _call(self, coro: Awaitable[Any]) -> Any:
+        """Run ``coro`` on the pool loop and await it from the caller's loop"""
+        loop = self._pool_loop()
+        if asyncio.get_running_loop() is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def _spawn(self, coro: Awaitable[Any]):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _notify_capacity(self):
+        if self._capacity is None:
+            self._capacity = asyncio.Condition()
+        async with self._capacity:
+            self._capacity.notify_all()
+
+    # === ASSIGNMENT ===
+
+    async def acquire(self, session_key: str, template: str) -> Any:
+        """Sandbox for ``session_key``: its existing one, a pre-warmed one, or a fresh boot"""
+        return await self._call(self._acquire(session_key, template))
+
+    async def _acquire(self, session_key: str, template: str) -> Any:
+        await self._reap()
+
+        session = self._sessions.get(session_key)
+        if session is not None:
+            session.last_used = time.time()
+            self._sessions.move_to_end(session_key)
+            self.metrics["session_hits"] += 1
+            return session.sandbox
+
+        pending = self._pending_sessions.get(session_key)
+        if pending is not None:
+            # Another request for this session is already booting its sandbox
+            self.metrics["session_hits"] += 1
+            return await asyncio.shield(pending)
+
+        idle = self._idle.get(template)
+        if idle:
+            sandbox = idle.popleft()
+            self.metrics["pool_hits"] += 1
+            self._sessions[session_key] = _Session(sandbox, template, time.time())
+            self._replenish(template)
+            return sandbox
+
+        self.metrics["pool_misses"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._pending_sessions[session_key] = future
+        try:
+            await self._reserve()
+            sandbox = await self._boot(template)
+        except BaseException as e:
+            if isinstance(e, asyncio.CancelledError):
+                future.cancel()
+            else:
+                future.set_exception(e)
+                future.exception()  # mark retrieved; waiters re-raise it themselves
+            raise
+        finally:
+            del self._pending_sessions[session_key]
+
+        self._sessions[session_key] = _Session(sandbox, template, time.time())
+        future.set_result(sandbox)
+        self._replenish(template)
+        return sandbox
+
+    async def run(self, session_key: str, template: str, operation: Callable[[Any], Awaitable[Any]]) -> Any:
+        """
+        Acquire the session's sandbox and await ``operation(sandbox)`` on the
+        pool loop. The session counts as busy until it finishes, so it is
+        neither evicted nor reaped mid-execution.
+        """
+        return await self._call(self._run(session_key, template, operation))
+
+    async def _run(self, session_key: str, template: str, operation: Callable[[Any], Awaitable[Any]]) -> Any:
+        sandbox = await self._acquire(session_key, template)
+        session = self._sessions.get(session_key)
+        if session is not None:
+            session.busy += 1
+        try:
+            return await operation(sandbox)
+        finally:
+            if session is not None:
+                session.busy -= 1
+                session.last_used = time.time()
+                self._spawn(self._notify_capacity())
+
+    async def release(self, session_key: str) -> bool:
+        """Close and forget a session's sandbox"""
+        return await self._call(self._release(session_key))
+
+    async def _release(self, session_key: str) -> bool:
+        session = self._sessions.pop(session_key, None)
+        if session is None:
+            return False
+        await self._close(session.sandbox)
+        await self._notify_capacity()
+        return True
+
+    def get_session(self, session_key: str) -> Optional[Any]:
+        session = self._sessions.get(session_key)
+        return session.sandbox if session else None
+
+    def session_keys(self) -> List[str]:
+        return list(self._sessions.copy())
+
+    # === CAPACITY ===
+
+    def total(self) -> int:
+        return sum(len(idle) for idle in self._idle.values()) + len(self._sessions) + self._booting
+
+    async def _reserve(self):
+        """Claim one boot slot under the cap, evicting or waiting as needed"""
+        while True:
+            # Claim before any await so concurrent acquires can't all pass the check
+            evicted = self._evict_for_room()
+            if self.total() < self.max_total:
+                self._booting += 1
+                for sandbox in evicted:
+                    self._spawn(self._close(sandbox))
+                return
+            for sandbox in evicted:
+                self._spawn(self._close(sandbox))
+            if self._capacity is None:
+                self._capacity = asyncio.Condition()
+            async with self._capacity:
+                try:
+                    # Also wake when the next session becomes old enough to evict
+                    await asyncio.wait_for(self._capacity.wait(), timeout=self._next_evictable_in())
+                except asyncio.TimeoutError:
+                    pass
+
+    def _evict_for_room(self) -> List[Any]:
+        """Pop idle spares, then sessions idle past the minimum age (LRU first), until one more fits"""
+        evicted = []
+        while self.total() >= self.max_total:
+            idle = next((idle for idle in self._idle.values() if idle), None)
+            if idle is None:
+                break
+            self.metrics["evictions"] += 1
+            evicted.append(idle.popleft())
+        cutoff = time.time() - self.min_session_idle_seconds
+        for session_key, session in list(self._sessions.items()):
+            if self.total() < self.max_total:
+                break
+            if session.busy or session.last_used > cutoff:
+                continue
+            del self._sessions[session_key]
+            self.metrics["evictions"] += 1
+            logger.info(f"Evicting idle sandbox session {session_key} (pool at capacity)")
+            evicted.append(session.sandbox)
+        return evicted
+
+    def _next_evictable_in(self) -> Optional[float]:
+        """Seconds until the next non-busy session passes the minimum idle age, if any"""
+        ages = [session.last_used for session in self._sessions.values() if not session.busy]
+        if not ages:
+            return None
+        return max(min(ages) + self.min_session_idle_seconds - time.time(), 0.01)
+
+    async def reap(self) -> int:
+        """Close sessions idle for longer than ``idle_timeout_seconds``"""
+        return await self._call(self._reap())
+
+    async def _reap(self) -> int:
+        cutoff = time.time() - self.idle_timeout_seconds
+        expired = [
+            key for key, session in self._sessions.items()
+            if session.last_used < cutoff and not session.busy
+        ]
+        for key in expired:
+            await self._close(self._sessions.pop(key).sandbox)
+        self.metrics["reaped"] += len(expired)
+        if expired:
+            await self._notify_capacity()
+        return len(expired)
+
+    # === BOOTING ===
+
+    async def _boot(self, template: str) -> Any:
+        """Boot into a slot already claimed in ``_booting``"""
+        start = time.perf_counter()
+        try:
+            sandbox = await self.factory(template)
+        except Exception:
+            self.metrics["boot_failures"] += 1
+            raise
+        finally:
+            self._booting -= 1
+            self._spawn(self._notify_capacity())
+        self._boot_latencies_ms.append((time.perf_counter() - start) * 1000)
+        self.metrics["boots"] += 1
+        return sandbox
+
+    async def _boot_idle(self, template: str):
+        try:
+            sandbox = await self._boot(template)
+        except Exception as e:
+            logger.warning(f"Failed to pre-warm {template} sandbox: {e}")
+            return
+        finally:
+            self._idle_booting[template] -= 1
+        self._idle.setdefault(template, deque()).append(sandbox)
+
+    def _replenish(self, template: str):
+        """Top the template's idle pool back up in the background, within the cap"""
+        wanted = (
+            self.warm_per_template.get(template, 0)
+            - len(self._idle.get(template, ()))
+            - self._idle_booting.get(template, 0)
+        )
+        for _ in range(max(0, min(wanted, self.max_total - self.total()))):
+            self._booting += 1
+            self._idle_booting[template] = self._idle_booting.get(template, 0) + 1
+            self._spawn(self._boot_idle(template))
+
+    async def prewarm(self):
+        """Boot every template's idle sandboxes now (e.g. during start-up warm-up)"""
+        await self._call(self._prewarm())
+
+    async def _prewarm(self):
+        for template in self.warm_per_template:
+            self._replenish(template)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    async def _close(self, sandbox: Any):
+        try:
+            await sandbox.close()
+        except Exception as e:
+            logger.error(f"Error closing sandbox: {e}")
+
+    async def close_all(self):
+        await self._call(self._close_all())
+
+    async def _close_all(self):
+        for task in list(self._tasks):
+            task.cancel()
+        for key in list(self._sessions):
+            await self._release(key)
+        for idle in self._idle.values():
+            while idle:
+                await self._close(idle.popleft())
+
+    def get_metrics(self) -> Dict[str, Any]:
+        latencies = sorted(self._boot_latencies_ms)
+        lookups = self.metrics["pool_hits"] + self.metrics["pool_misses"]
+        return {
+            **self.metrics,
+            "pool_hit_rate": self.metrics["pool_hits"] / lookups if lookups else 0.0,
+            "idle": {template: len(idle) for template, idle in self._idle.copy().items()},
+            "active_sessions": len(self._sessions),
+            "booting": self._booting,
+            "max_total": self.max_total,
+            "boot_latency_ms": {
+                "avg": round(sum(latencies) / len(latencies), 2) if latencies else None,
+                "p95": round(latencies[int(0.95 * (len(latencies) - 1))], 2) if latencies else None
+            }
+        }
@@ -0,0 +1,231 @@
+"""
+🧲 Semantic Response Cache
+Serves answers to repeated (FAQ-style) prompts without a model call. By default
+only identical prompts (after normalization) are served. Near-duplicate matching
+needs a real embedding model: lexical similarity can't tell "sort ascending"
+from "sort descending", so semantic mode is only available when an ``embedder``
+is supplied, and its threshold should be validated against that model. Scopes
+are (model, mama-bear variant, extra key), so a cached answer is never served
+across models or personalities.
+"""
+
+import copy
+import hashlib
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Dict, Any, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_WORD_PATTERN = re.compile(r"\w+")
+
+CACHE_MODES = ("semantic", "exact")
+
+# Rows an index starts with before doubling towards its capacity
+_INITIAL_ROWS = 8
+
+
+def normalize_prompt(text: str) -> str:
+    """Lowercased words only, so case, spacing and punctuation don't defeat exact matches"""
+    return " ".join(_WORD_PATTERN.findall(text.lower()))
+
+
+@dataclass
+class CacheHit:
+    response: Dict[str, Any]
+    similarity: float
+    age_seconds: float
+    match: str  # "exact" or "semantic"
+
+    def info(self) -> Dict[str, Any]:
+        return {
+            "match": self.match,
+            "similarity": round(self.similarity, 4),
+            "age_seconds": round(self.age_seconds, 1)
+        }
+
+
+class _ScopeIndex:
+    """
+    Ring of up to ``capacity`` entries for one scope (oldest entry is
+    overwritten). Storage starts small and doubles as entries arrive, and
+    embeddings are only kept when the cache has an embedder.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.vectors: Optional[np.ndarray] = None
+        self.created_at = np.full(min(capacity, _INITIAL_ROWS), -np.inf)
+        self.responses: List[Optional[Dict[str, Any]]] = [None] * len(self.created_at)
+        self.hashes: List[Optional[str]] = [None] * len(self.created_at)
+        self.by_hash: Dict[str, int] = {}
+        self.next_slot = 0
+        self.newest = -np.inf
+
+    def _grow(self):
+        rows = min(self.capacity, len(self.responses) * 2)
+        extra = rows - len(self.responses)
+        self.created_at = np.concatenate([self.created_at, np.full(extra, -np.inf)])
+        self.responses.extend([None] * extra)
+        self.hashes.extend([None] * extra)
+        if self.vectors is not None:
+            self.vectors = np.concatenate(
+                [self.vectors, np.zeros((extra, self.vectors.shape[1]), dtype=np.float32)]
+            )
+
+    def put(self, prompt_hash: str, vector: Optional[np.ndarray], response: Dict[str, Any], now: float):
+        slot = self.by_hash.get(prompt_hash)
+        if slot is None:
+            if self.next_slot == len(self.responses) and len(self.responses) < self.capacity:
+                self._grow()
+            slot = self.next_slot % len(self.responses)
+            self.next_slot = slot + 1 if len(self.responses) < self.capacity else (slot + 1) % self.capacity
+            old_hash = self.hashes[slot]
+            if old_hash is not None:
+                self.by_hash.pop(old_hash, None)
+        if vector is not None:
+            if self.vectors is None:
+                self.vectors = np.zeros((len(self.responses), len(vector)), dtype=np.float32)
+            self.vectors[slot] = vector
+        self.created_at[slot] = now
+        self.responses[slot] = response
+        self.hashes[slot] = prompt_hash
+        self.by_hash[prompt_hash] = slot
+        self.newest = now
+
+
+class SemanticResponseCache:
+    """
+    Near-duplicate prompt cache.
+
+    ``mode="exact"`` only serves identical (normalized) prompts; ``"semantic"``
+    also serves the most similar fresh entry at or above
+    ``similarity_threshold``, using ``embedder`` (text -> L2-normalized
+    vector). Without an embedder every lookup is exact. Entries older than
+    ``max_age_seconds`` are stale and never served.
+    """
+
+    def __init__(
+        self,
+        similarity_threshold: Optional[float] = None,
+        max_age_seconds: Optional[float] = None,
+        mode: Optional[str] = None,
+        max_entries_per_scope: int = 500,
+        max_scopes: int = 200,
+        embedder: Optional[Callable[[str], np.ndarray]] = None
+    ):
+        if similarity_threshold is None:
+            similarity_threshold = float(os.getenv('SEMANTIC_CACHE_THRESHOLD', 0.97))
+        if max_age_seconds is None:
+            max_age_seconds = float(os.getenv('SEMANTIC_CACHE_MAX_AGE_SECONDS', 3600))
+        self.similarity_threshold = similarity_threshold
+        self.max_age_seconds = max_age_seconds
+        self.mode = mode or os.getenv('SEMANTIC_CACHE_MODE', 'exact')
+        if self.mode not in CACHE_MODES:
+            raise ValueError(f"Unknown semantic cache mode: {self.mode}")
+        if self.mode == "semantic" and embedder is None:
+            raise ValueError("Semantic cache mode needs an embedding model (embedder)")
+        self.max_entries_per_scope = max_entries_per_scope
+        self.max_scopes = max_scopes
+        self.embedder = embedder
+
+        # Least recently stored scope first
+        self._scopes: "OrderedDict[Tuple[str, ...], _ScopeIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.metrics = {
+            "lookups": 0,
+            "exact_hits": 0,
+            "semantic_hits": 0,
+            "stale_skips": 0,
+            "stores": 0
+        }
+
+    @staticmethod
+    def _prompt_hash(prompt: str) -> str:
+        return hashlib.blake2b(normalize_prompt(prompt).encode("utf-8"), digest_size=16).hexdigest()
+
+    def lookup(
+        self,
+        prompt: str,
+        model: str,
+        variant: str = "default",
+        scope_extra: str = "",
+        mode: Optional[str] = None
+    ) -> Optional[CacheHit]:
+        """Cached response for ``prompt`` in this scope, or None"""
+        mode = mode or self.mode
+        scope = (model, variant, scope_extra)
+        now = time.time()
+        self.metrics["lookups"] += 1
+
+        with self._lock:
+            index = self._scopes.get(scope)
+            if index is None:
+                return None
+
+            slot = index.by_hash.get(self._prompt_hash(prompt))
+            if slot is not None:
+                age = now - float(index.created_at[slot])
+                if age <= self.max_age_seconds:
+                    self.metrics["exact_hits"] += 1
+                    return CacheHit(copy.deepcopy(index.responses[slot]), 1.0, age, "exact")
+                self.metrics["stale_skips"] += 1
+
+            if mode != "semantic" or self.embedder is None or index.vectors is None:
+                return None
+
+            similarities = index.vectors @ self.embedder(prompt)
+            similarities[now - index.created_at > self.max_age_seconds] = -1.0
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.similarity_threshold:
+                return None
+            self.metrics["semantic_hits"] += 1
+            return CacheHit(
+                copy.deepcopy(index.responses[best]),
+                float(similarities[best]),
+                now - float(index.created_at[best]),
+                "semantic"
+            )
+
+    def store(
+        self,
+        prompt: str,
+        model: str,
+        variant: str,
+        response: Dict[str, Any],
+        scope_extra: str = ""
+    ):
+        scope = (model, variant, scope_extra)
+        vector = self.embedder(prompt) if self.embedder is not None else None
+        with self._lock:
+            index = self._scopes.get(scope)
+            if index is None:
+                if len(self._scopes) >= self.max_scopes:
+                    # Drop the scope stored to least recently
+                    self._scopes.popitem(last=False)
+                index = self._scopes[scope] = _ScopeIndex(self.max_entries_per_scope)
+            else:
+                self._scopes.move_to_end(scope)
+            index.put(self._prompt_hash(prompt), vector, copy.deepcopy(response), time.time())
+        self.metrics["stores"] += 1
+
+    def get_metrics(self) -> Dict[str, Any]:
+        lookups = self.metrics["lookups"]
+        hits = self.metrics["exact_hits"] + self.metrics["semantic_hits"]
+        return {
+            **self.metrics,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "scopes": len(self._scopes),
+            "mode": self.mode,
+            "embedder": self.embedder is not None,
+            "similarity_threshold": self.similarity_threshold,
+            "max_age_seconds": self.max_age_seconds
+        }
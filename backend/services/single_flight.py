@@ -0,0 +1,117 @@
+"""
+🪢 Single-Flight Request Coalescing
+Concurrent identical model calls — same model, normalized prompt and generation
+parameters — share one in-flight provider call and its result. Coalescing is
+opt-in per call site: a caller that enables it accepts a shared sample, which
+suits templated stages (analysis or scout prompts at a fixed temperature) but
+not chat turns whose users expect independent generations. Calls are shared
+across event loops, so Flask requests running under separate ``asyncio.run``
+loops coalesce too.
+"""
+
+import asyncio
+import concurrent.futures
+import copy
+import dataclasses
+import hashlib
+import json
+import logging
+import threading
+from typing import Dict, Any, Callable, Awaitable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def coalescing_key(model: str, prompt: Any, params: Optional[Dict[str, Any]] = None) -> str:
+    """Stable key for (model, whitespace-normalized prompt, generation params)"""
+    if isinstance(prompt, str):
+        prompt = " ".join(prompt.split())
+    payload = json.dumps(
+        {"model": model, "prompt": prompt, "params": params or {}},
+        sort_keys=True, default=str
+    )
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class SingleFlight:
+    """Shares one in-flight call among concurrent callers with the same key, on any loop"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._inflight: Dict[str, concurrent.futures.Future] = {}
+        self._lock = threading.Lock()
+
+        self.metrics = {
+            "calls": 0,
+            "provider_calls": 0,
+            "coalesced": 0,
+            "bypassed": 0
+        }
+
+    async def do(
+        self,
+        key: str,
+        factory: Callable[[], Awaitable[Any]],
+        enabled: bool = False
+    ) -> Any:
+        """
+        Await ``factory()``, or, when ``enabled``, join an identical call
+        already in flight on this or another event loop.
+
+        The shared call is shielded, so a caller that times out or is cancelled
+        does not cancel it for the others. If the leader's loop shuts down
+        before the call finishes, followers make their own call. Followers get
+        a shallow copy of dict and dataclass results so they can annotate them
+        independently.
+        """
+        self.metrics["calls"] += 1
+        if not enabled:
+            self.metrics["bypassed"] += 1
+            self.metrics["provider_calls"] += 1
+            return await factory()
+
+        with self._lock:
+            shared = self._inflight.get(key)
+            leader = shared is None
+            if leader:
+                shared = self._inflight[key] = concurrent.futures.Future()
+
+        if not leader:
+            self.metrics["coalesced"] += 1
+            try:
+                result = await asyncio.shield(asyncio.wrap_future(shared))
+            except asyncio.CancelledError:
+                if not shared.cancelled():
+                    raise
+                # The leader's loop went away mid-call
+                self.metrics["provider_calls"] += 1
+                return await factory()
+            if isinstance(result, dict) or dataclasses.is_dataclass(result):
+                return copy.copy(result)
+            return result
+
+        task = asyncio.ensure_future(factory())
+        task.add_done_callback(lambda _: self._settle(key, shared, task))
+        self.metrics["provider_calls"] += 1
+        return await asyncio.shield(task)
+
+    def _settle(self, key: str, shared: concurrent.futures.Future, task: asyncio.Future):
+        with self._lock:
+            if self._inflight.get(key) is shared:
+                del self._inflight[key]
+        if task.cancelled():
+            shared.cancel()
+        elif task.exception() is not None:
+            # Retrieved here so an error nobody awaited isn't logged as unhandled
+            logger.debug(f"Single-flight call for {self.name} failed: {task.exception()}")
+            shared.set_exception(task.exception())
+        else:
+            shared.set_result(task.result())
+
+    def get_metrics(self) -> Dict[str, Any]:
+        calls = self.metrics["calls"]
+        return {
+            **self.metrics,
+            "in_flight": len(self._inflight),
+            "coalesced_rate": self.metrics["coalesced"] / calls if calls else 0.0
+        }
@@ -0,0 +1,91 @@
+"""
+🧩 Snippet Dependency Batching
+Splits a task's code snippets into groups that can run independently: a
+snippet joins the group of any earlier snippet whose top-level names it uses
+(dependent snippets share one interpreter and run in order, as before), and
+unrelated groups can run in parallel. Anything the analysis can't see through
+(non-Python code, filesystem or process access) keeps all snippets together.
+Snippets that read names no snippet in the batch binds rely on state left in
+the user's session by earlier executions, and are flagged so they run there.
+"""
+
+import ast
+import builtins
+from typing import List, Set, Tuple
+
+# Names whose use means snippets may communicate through the filesystem or environment
+_SHARED_STATE_NAMES = frozenset({
+    'open', 'os', 'pathlib', 'Path', 'shutil', 'tempfile', 'glob', 'sqlite3', 'subprocess', 'sys'
+})
+
+_BUILTIN_NAMES = frozenset(dir(builtins))
+
+
+def _names(code: str) -> Tuple[Set[str], Set[str]]:
+    """
+    (names the snippet binds, names it may read from earlier snippets); raises
+    SyntaxError for non-Python code. Names a snippet imports or defines with
+    def/class itself don't count as reads; assigned names still do, to stay
+    on the safe side of ``x = x + 1``.
+    """
+    assigned: Set[str] = set()
+    declared: Set[str] = set()
+    used: Set[str] = set()
+    for node in ast.walk(ast.parse(code)):
+        if isinstance(node, ast.Name):
+            (assigned if isinstance(node.ctx, (ast.Store, ast.Del)) else used).add(node.id)
+        elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            declared.add(node.name)
+        elif isinstance(node, (ast.Import, ast.ImportFrom)):
+            for alias in node.names:
+                declared.add(alias.asname or alias.name.split('.')[0])
+    return assigned | declared, used - declared
+
+
+def plan_snippet_groups(snippets: List[str]) -> List[List[int]]:
+    """
+    Snippet indexes grouped by data dependency, each group in submission order
+    and groups ordered by their first snippet.
+    """
+    if len(snippets) <= 1:
+        return [list(range(len(snippets)))]
+
+    try:
+        names = [_names(snippet) for snippet in snippets]
+    except SyntaxError:
+        return [list(range(len(snippets)))]
+    if any(used & _SHARED_STATE_NAMES or defined & _SHARED_STATE_NAMES for defined, used in names):
+        return [list(range(len(snippets)))]
+
+    # Union-find over "later snippet reads a name an earlier one binds"
+    parent = list(range(len(snippets)))
+
+    def find(index: int) -> int:
+        while parent[index] != index:
+            parent[index] = parent[parent[index]]
+            index = parent[index]
+        return index
+
+    for later, (_, used) in enumerate(names):
+        for earlier in range(later):
+            if used & names[earlier][0]:
+                parent[find(later)] = find(earlier)
+
+    groups = {}
+    for index in range(len(snippets)):
+        groups.setdefault(find(index), []).append(index)
+    return sorted(groups.values(), key=lambda group: group[0])
+
+
+def reads_session_state(snippets: List[str]) -> List[bool]:
+    """
+    Per snippet: whether it reads a name that no snippet in the batch binds
+    and that isn't a builtin, i.e. one only the user's session can supply.
+    Non-Python batches are flagged throughout.
+    """
+    try:
+        names = [_names(snippet) for snippet in snippets]
+    except SyntaxError:
+        return [True] * len(snippets)
+    bound = set().union(*(defined for defined, _ in names)) if names else set()
+    return [bool(used - bound - _BUILTIN_NAMES) for _, used in names]
@@ -0,0 +1,237 @@
+"""
+🔢 Shared Token Estimator
+One fast, cached token-count estimate for routing, cost accounting and context
+compaction. Heuristics are calibrated per model family; when ``tiktoken`` is
+installed, OpenAI-family counts are exact.
+
+Run ``python -m services.token_estimator`` for an accuracy-vs-speed benchmark.
+"""
+
+import hashlib
+import logging
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Callable
+
+logger = logging.getLogger(__name__)
+
+# Word pieces, digit runs and individual punctuation marks roughly track BPE splits
+_PIECE_PATTERN = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+# Average characters per token for alphabetic runs, and per-message framing overhead
+FAMILY_CALIBRATION = {
+    "gpt": {"chars_per_token": 4.2, "digits_per_token": 3.0, "message_overhead": 4, "reply_priming": 3},
+    "claude": {"chars_per_token": 3.8, "digits_per_token": 3.0, "message_overhead": 5, "reply_priming": 3},
+    "gemini": {"chars_per_token": 4.4, "digits_per_token": 1.0, "message_overhead": 4, "reply_priming": 2},
+    "default": {"chars_per_token": 4.0, "digits_per_token": 3.0, "message_overhead": 4, "reply_priming": 3}
+}
+
+# Texts shorter than this are estimated directly; hashing them costs more than counting
+MIN_CACHED_LENGTH = 64
+
+
+def model_family(model: Optional[str]) -> str:
+    """Map a model name/id (any provider's naming) to a calibration family"""
+    if not model:
+        return "default"
+    name = model.lower()
+    if "claude" in name:
+        return "claude"
+    if "gemini" in name or name.startswith("models/"):
+        return "gemini"
+    if name.startswith(("gpt", "o1", "o3", "text-embedding")):
+        return "gpt"
+    return "default"
+
+
+class TokenEstimator:
+    """Estimates token counts for strings and chat message lists, memoized by content hash"""
+
+    def __init__(self, cache_size: int = 10000, use_exact: bool = True):
+        self.cache_size = cache_size
+        self.use_exact = use_exact
+        self._cache: "OrderedDict[tuple, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._exact_counters: Dict[str, Optional[Callable[[str], int]]] = {}
+
+        self.stats = {
+            "estimates": 0,
+            "cache_hits": 0,
+            "exact_counts": 0
+        }
+
+    # === EXACT TOKENIZERS (optional) ===
+
+    def _exact_counter(self, family: str) -> Optional[Callable[[str], int]]:
+        if not self.use_exact:
+            return None
+        if family not in self._exact_counters:
+            counter = None
+            if family == "gpt":
+                try:
+                    import tiktoken
+                    encoding = tiktoken.get_encoding("o200k_base")
+                    counter = lambda text: len(encoding.encode(text, disallowed_special=()))
+                except Exception:
+                    counter = None
+            self._exact_counters[family] = counter
+        return self._exact_counters[family]
+
+    # === HEURISTIC ===
+
+    @staticmethod
+    def heuristic_count(text: str, family: str = "default") -> int:
+        """Calibrated piece-based estimate without any caching"""
+        if not text:
+            return 0
+        calibration = FAMILY_CALIBRATION.get(family, FAMILY_CALIBRATION["default"])
+        chars_per_token = calibration["chars_per_token"]
+        digits_per_token = calibration["digits_per_token"]
+        tokens = 0
+        for piece in _PIECE_PATTERN.findall(text):
+            first = piece[0]
+            if first.isalpha():
+                tokens += math.ceil(len(piece) / chars_per_token)
+            elif first.isdigit():
+                tokens += math.ceil(len(piece) / digits_per_token)
+            else:
+                tokens += 1
+        return max(tokens, 1)
+
+    # === PUBLIC API ===
+
+    def count(self, text: str, model: Optional[str] = None) -> int:
+        """Token count for ``text`` as seen by ``model``"""
+        if not text:
+            return 0
+        if not isinstance(text, str):
+            text = str(text)
+        family = model_family(model)
+        self.stats["estimates"] += 1
+
+        key = None
+        if len(text) >= MIN_CACHED_LENGTH:
+            key = (family, hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest())
+            with self._lock:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    self.stats["cache_hits"] += 1
+                    return cached
+
+        exact = self._exact_counter(family)
+        if exact is not None:
+            tokens = exact(text)
+            self.stats["exact_counts"] += 1
+        else:
+            tokens = self.heuristic_count(text, family)
+
+        if key is not None:
+            with self._lock:
+                self._cache[key] = tokens
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return tokens
+
+    def count_message(self, message: Dict[str, Any], model: Optional[str] = None) -> int:
+        """Tokens for one chat message, including role/framing overhead"""
+        calibration = FAMILY_CALIBRATION[model_family(model)]
+        return calibration["message_overhead"] + self.count(message_text(message), model)
+
+    def count_messages(self, messages: List[Dict[str, Any]], model: Optional[str] = None) -> int:
+        """Tokens for a full chat request, including reply priming"""
+        if not messages:
+            return 0
+        calibration = FAMILY_CALIBRATION[model_family(model)]
+        return calibration["reply_priming"] + sum(self.count_message(m, model) for m in messages)
+
+    def get_stats(self) -> Dict[str, Any]:
+        estimates = self.stats["estimates"]
+        return {
+            **self.stats,
+            "cache_size": len(self._cache),
+            "cache_hit_rate": self.stats["cache_hits"] / estimates if estimates else 0.0,
+            "exact_tokenizers": [family for family, counter in self._exact_counters.items() if counter]
+        }
+
+
+def message_text(message: Dict[str, Any]) -> str:
+    """Text content of a chat message (plain string or list of parts)"""
+    content = message.get("content", "")
+    if isinstance(content, str):
+        return content
+    if isinstance(content, list):
+        return " ".join(
+            part.get("text", "") if isinstance(part, dict) else str(part) for part in content
+        )
+    return str(content)
+
+
+# Shared instance used by the router, cost accounting and compaction
+token_estimator = TokenEstimator()
+
+
+def estimate_tokens(text: str, model: Optional[str] = None) -> int:
+    return token_estimator.count(text, model)
+
+
+def estimate_message_tokens(messages: List[Dict[str, Any]], model: Optional[str] = None) -> int:
+    return token_estimator.count_messages(messages, model)
+
+
+# === BENCHMARK ===
+
+BENCHMARK_SAMPLES = [
+    "Hello Mama Bear, can you help me debug this function?",
+    "def fibonacci(n):\n    if n < 2:\n        return n\n    return fibonacci(n - 1) + fibonacci(n - 2)\n",
+    "Analyze the quarterly revenue of 2,345,678.90 USD versus 1,987,654.32 USD and explain the delta.",
+    "Please write a comprehensive, step-by-step tutorial on building a neurodivergent-friendly "
+    "React component library with accessible color themes, keyboard navigation and reduced motion.",
+    '{"user_id": "nathan_sanctuary", "session_id": "abc-123", "messages": [{"role": "user", "content": "hi"}]}',
+    "SELECT u.id, COUNT(o.id) FROM users u LEFT JOIN orders o ON o.user_id = u.id GROUP BY u.id;"
+]
+
+
+def benchmark(samples: Optional[List[str]] = None, model: str = "gpt-4o", rounds: int = 200) -> Dict[str, Any]:
+    """
+    Compare the naive ``len // 4`` rule, the calibrated heuristic, and cached
+    lookups against the exact tokenizer (when installed) for accuracy and speed.
+    """
+    samples = samples or BENCHMARK_SAMPLES
+    family = model_family(model)
+    exact_estimator = TokenEstimator(use_exact=True)
+    exact = exact_estimator._exact_counter(family)
+
+    def timed(fn: Callable[[str], int]) -> float:
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for sample in samples:
+                fn(sample)
+        return (time.perf_counter() - start) / (rounds * len(samples)) * 1e6
+
+    cached_estimator = TokenEstimator(use_exact=False)
+    candidates = {
+        "naive_len_div_4": lambda text: len(text) // 4,
+        "heuristic": lambda text: TokenEstimator.heuristic_count(text, family),
+        "cached_heuristic": lambda text: cached_estimator.count(text, model)
+    }
+    if exact is not None:
+        candidates["exact"] = exact
+
+    results = {"model": model, "family": family, "exact_available": exact is not None, "methods": {}}
+    for name, fn in candidates.items():
+        entry = {"us_per_call": round(timed(fn), 3)}
+        if exact is not None:
+            errors = [abs(fn(s) - exact(s)) / max(exact(s), 1) for s in samples]
+            entry["mean_abs_pct_error"] = round(100 * sum(errors) / len(errors), 2)
+        results["methods"][name] = entry
+    return results
+
+
+if __name__ == "__main__":
+    import json
+    for benchmark_model in ("gpt-4o", "claude-3-5-sonnet", "gemini-2.5-flash"):
+        print(json.dumps(benchmark(model=benchmark_model), indent=2))
@@ -0,0 +1,148 @@
+"""
+🔥 Warm-up and Readiness
+Runs start-up warm-up steps (pre-creating provider clients and pools, tiny
+probe calls, priming routing caches) concurrently in the background and tracks
+whether the process is ready for traffic. Liveness ("the process is up") and
+readiness ("critical warm-up steps have finished") are reported separately so
+load balancers only route requests to warm workers.
+"""
+
+import asyncio
+import inspect
+import logging
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STEP_TIMEOUT_SECONDS = float(os.getenv('WARMUP_STEP_TIMEOUT_SECONDS', 30))
+
+# Failed critical steps are retried this often (0 disables retries)
+DEFAULT_RETRY_SECONDS = float(os.getenv('WARMUP_RETRY_SECONDS', 30))
+
+
+@dataclass
+class WarmupStep:
+    name: str
+    action: Callable[[], Any]
+    critical: bool = True
+    timeout_seconds: float = DEFAULT_STEP_TIMEOUT_SECONDS
+    state: str = "pending"  # pending, running, ok, failed, timeout
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "critical": self.critical,
+            "latency_ms": self.latency_ms,
+            "error": self.error
+        }
+
+
+class WarmupManager:
+    """
+    Concurrent warm-up steps and the readiness they gate.
+
+    Steps are sync or async callables; sync ones run in worker threads. The
+    process is ready once every critical step has finished successfully (or,
+    with ``ready_on_failure``, once they have all finished at all). A critical
+    step that fails or times out is retried every ``retry_seconds``, so a
+    transient provider outage keeps the worker out of rotation only until the
+    step succeeds; anything that may fail for good should be registered with
+    ``critical=False``.
+    """
+
+    def __init__(self, ready_on_failure: bool = False, retry_seconds: Optional[float] = None):
+        self.ready_on_failure = ready_on_failure
+        self.retry_seconds = DEFAULT_RETRY_SECONDS if retry_seconds is None else retry_seconds
+        self._steps: Dict[str, WarmupStep] = {}
+        self._started_at = time.time()
+        self._warmup_started_at: Optional[float] = None
+        self._warmup_finished_at: Optional[float] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def register(
+        self,
+        name: str,
+        action: Callable[[], Any],
+        critical: bool = True,
+        timeout_seconds: Optional[float] = None
+    ):
+        self._steps[name] = WarmupStep(
+            name, action, critical, timeout_seconds or DEFAULT_STEP_TIMEOUT_SECONDS
+        )
+
+    # === RUNNING ===
+
+    async def _run_step(self, step: WarmupStep):
+        step.state = "running"
+        step.error = None
+        start = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(step.action):
+                awaitable = step.action()
+            else:
+                awaitable = asyncio.to_thread(step.action)
+            await asyncio.wait_for(awaitable, timeout=step.timeout_seconds)
+            step.state = "ok"
+        except asyncio.TimeoutError:
+            step.state = "timeout"
+            step.error = f"timed out after {step.timeout_seconds}s"
+        except Exception as e:
+            step.state = "failed"
+            step.error = str(e)
+        step.latency_ms = round((time.perf_counter() - start) * 1000, 2)
+        log = logger.info if step.state == "ok" else logger.warning
+        log(f"🔥 Warm-up step {step.name}: {step.state} ({step.latency_ms}ms)")
+
+    async def run(self):
+        """Run every registered step concurrently, then retry failed critical steps until they pass"""
+        self._warmup_started_at = time.time()
+        await asyncio.gather(*(self._run_step(step) for step in self._steps.values()))
+        self._warmup_finished_at = time.time()
+        logger.info(f"🔥 Warm-up finished - ready: {self.is_ready()}")
+
+        while self.retry_seconds > 0 and not self.ready_on_failure:
+            failed = [step for step in self._steps.values() if step.critical and step.state != "ok"]
+            if not failed:
+                break
+            await asyncio.sleep(self.retry_seconds)
+            await asyncio.gather(*(self._run_step(step) for step in failed))
+            logger.info(f"🔥 Retried {len(failed)} critical warm-up step(s) - ready: {self.is_ready()}")
+
+    def start_background(self):
+        """Run warm-up in a daemon thread so the server can accept liveness checks meanwhile"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(target=lambda: asyncio.run(self.run()), name="warmup", daemon=True)
+        self._thread.start()
+
+    # === STATUS ===
+
+    def is_ready(self) -> bool:
+        done_states = ("ok", "failed", "timeout") if self.ready_on_failure else ("ok",)
+        return all(step.state in done_states for step in self._steps.values() if step.critical)
+
+    def liveness(self) -> Dict[str, Any]:
+        return {
+            "status": "alive",
+            "uptime_seconds": round(time.time() - self._started_at, 1)
+        }
+
+    def readiness(self) -> Dict[str, Any]:
+        duration = None
+        if self._warmup_started_at and self._warmup_finished_at:
+            duration = round((self._warmup_finished_at - self._warmup_started_at) * 1000, 2)
+        return {
+            "ready": self.is_ready(),
+            "warmup_duration_ms": duration,
+            "pending": [name for name, step in self._steps.items() if step.state in ("pending", "running")],
+            "steps": {name: step.to_dict() for name, step in self._steps.items()}
+        }
+
+    def step_names(self) -> List[str]:
+        return list(self._steps)
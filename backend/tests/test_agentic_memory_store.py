@@ -0,0 +1,55 @@
+from services.agentic_memory_store import TieredMemoryStore, _whole_query_tokens
+
+
+def _store(**kwargs):
+    return TieredMemoryStore(db_path=":memory:", **kwargs)
+
+
+def test_only_interior_query_tokens_drive_the_index():
+    assert _whole_query_tokens("python") == set()
+    assert _whole_query_tokens(" likes python ") == {"likes", "python"}
+    assert _whole_query_tokens("user likes py") == {"likes"}
+
+
+def test_index_and_linear_scan_agree_with_substring_matching():
+    store = _store()
+    contents = [
+        "User likes Python for data work",
+        "user dislikes pythonic magic",
+        "Deploy with docker compose",
+        "likes: python, rust",
+        "the user likes python"
+    ]
+    for content in contents:
+        store.add("alice", content)
+
+    queries = ["user likes python", "python", "likes python", "s pyth", "er likes py", "docker", "nothing here"]
+    for query in queries:
+        expected = [c for c in contents if query.lower() in c.lower()]
+        assert [m["content"] for m in store.search("alice", query)] == expected, query
+
+
+def test_search_is_scoped_per_user_and_keeps_the_latest_matches():
+    store = _store()
+    for i in range(5):
+        store.add("alice", f"note {i} about caching")
+    store.add("bob", "bob note about caching")
+
+    results = store.search("alice", "about caching", limit=2)
+    assert [m["content"] for m in results] == ["note 3 about caching", "note 4 about caching"]
+    assert all(m["user_id"] == "alice" for m in store.search("alice", "caching"))
+
+
+def test_evicted_entries_leave_the_index_and_are_found_in_long_term():
+    store = _store(per_user_capacity=2, eviction_window=1)
+    store.add("alice", "first remembered fact")
+    store.add("alice", "second remembered fact")
+    store.add("alice", "third remembered fact")
+
+    assert len(store) == 2
+    assert "first" not in store._index["alice"]
+    results = store.search("alice", " remembered ")
+    assert [m["content"] for m in results] == [
+        "first remembered fact", "second remembered fact", "third remembered fact"
+    ]
+    assert store.get_stats()["long_term_hits"] == 1
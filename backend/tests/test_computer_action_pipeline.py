@@ -0,0 +1,71 @@
+import asyncio
+import json
+import time
+
+from services.computer_action_pipeline import BatchedAuditLog
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_pending_records_are_written_without_another_append(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    log = BatchedAuditLog(str(path), batch_size=100, flush_interval=0.05)
+
+    assert not log.append([{"action": 1}])
+    deadline = time.monotonic() + 2
+    while log.pending() and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+    assert _read(path) == [{"action": 1}]
+    assert log.metrics["writes"] == 1
+
+
+def test_flush_writes_batches_in_append_order(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    log = BatchedAuditLog(str(path), batch_size=2, flush_interval=60)
+
+    async def scenario():
+        for i in range(5):
+            if log.append([{"action": i}]):
+                await log.flush()
+
+    asyncio.run(scenario())
+    assert log.pending() == 1
+    log.flush_sync()  # what the exit hook runs
+
+    assert [record["action"] for record in _read(path)] == list(range(5))
+
+
+def test_failed_write_is_retried_on_the_next_flush(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    path.mkdir()  # opening a directory for append fails
+    log = BatchedAuditLog(str(path), batch_size=100, flush_interval=60)
+
+    log.append([{"action": 0}, {"action": 1}])
+    log.flush_sync()
+    log.append([{"action": 2}])
+    assert log.pending() == 3
+    assert log.metrics["write_failures"] == 1
+
+    path.rmdir()
+    log.flush_sync()
+    assert [record["action"] for record in _read(path)] == [0, 1, 2]
+    assert log.pending() == 0
+
+
+def test_pending_records_are_bounded_oldest_first(tmp_path):
+    path = tmp_path / "audit.jsonl"
+    path.mkdir()
+    log = BatchedAuditLog(str(path), batch_size=100, flush_interval=60, max_pending=3)
+
+    log.append([{"action": i} for i in range(2)])
+    log.flush_sync()
+    log.append([{"action": i} for i in range(2, 4)])
+
+    path.rmdir()
+    log.flush_sync()
+    assert [record["action"] for record in _read(path)] == [1, 2, 3]
+    assert log.metrics["dropped"] == 1
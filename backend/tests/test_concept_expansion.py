@@ -0,0 +1,51 @@
+from services.concept_expansion import ConceptExpansionCache, ConceptGraph, normalize_query, query_terms
+
+
+def _concepts(*names, relevance=0.8):
+    return [{"concept": name, "relevance": relevance} for name in names]
+
+
+def test_queries_normalize_to_one_key_per_scope():
+    assert normalize_query("  Vector   Databases\n") == normalize_query("vector databases")
+    assert normalize_query("vector databases", "broad") != normalize_query("vector databases")
+
+
+def test_query_terms_drop_stop_words_and_duplicates():
+    assert query_terms("How can you explain Python, python and C++ vs node.js.") == ["python", "c++", "node.js"]
+
+
+def test_cache_entries_expire_and_are_bounded_lru(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("services.concept_expansion.time.time", lambda: now[0])
+    cache = ConceptExpansionCache(max_entries=2, ttl_seconds=60)
+    cache.put("a", _concepts("x"))
+    cache.put("b", _concepts("y"))
+    assert cache.get("a") is not None
+    cache.put("c", _concepts("z"))
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    now[0] += 61
+    assert cache.get("a") is None
+    assert len(cache) == 1
+
+
+def test_graph_answers_once_enough_terms_are_covered():
+    graph = ConceptGraph(db_path=":memory:", min_concepts=2)
+    assert graph.expand("python asyncio") == []
+
+    graph.learn("python asyncio", _concepts("Event Loop", relevance=0.9) + _concepts("coroutines", "python"))
+    concepts = graph.expand("asyncio python tutorial")
+    assert [c["concept"] for c in concepts] == ["event loop", "coroutines"]
+    assert all(c["source"] == "concept_graph" for c in concepts)
+    # One known term out of three is below the default 50% coverage
+    assert graph.expand("asyncio rust tokio") == []
+
+
+def test_repeated_edges_keep_a_running_mean_weight():
+    graph = ConceptGraph(db_path=":memory:", min_concepts=1)
+    graph.learn("kubernetes", _concepts("pods", relevance=1.0))
+    graph.learn("kubernetes", _concepts("pods", relevance=0.5))
+
+    assert graph.expand("kubernetes") == [{"concept": "pods", "relevance": 0.75, "source": "concept_graph"}]
+    assert graph.get_stats() == {"persistent": True, "terms": 1, "edges": 1}
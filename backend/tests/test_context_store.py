@@ -0,0 +1,75 @@
+import sqlite3
+
+import pytest
+
+from services.context_store import ContextStorageEngine, InMemoryContextStore, SQLiteContextStore
+
+
+def _messages(*contents):
+    return [{"role": "user", "content": content} for content in contents]
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "memory":
+        return InMemoryContextStore()
+    return SQLiteContextStore(str(tmp_path / "contexts.db"))
+
+
+def test_extended_history_only_appends(store):
+    store.save_context("u1", "s1", {"messages": _messages("a", "b")})
+    result = store.save_context("u1", "s1", {"messages": _messages("a", "b", "c")})
+
+    assert result == {"appended_messages": 1, "total_messages": 3}
+    assert store.get_context("u1", "s1")["messages"] == _messages("a", "b", "c")
+    assert store.get_user_stats("u1") == {"contexts": 1, "messages": 3}
+
+
+@pytest.mark.parametrize("edited", [("a", "B"), ("a", "B", "c"), ("x",)])
+def test_edited_history_is_rewritten(store, edited):
+    store.save_context("u1", "s1", {"messages": _messages("a", "b")})
+    result = store.save_context("u1", "s1", {"messages": _messages(*edited)})
+
+    assert result == {"appended_messages": len(edited), "total_messages": len(edited)}
+    assert store.get_context("u1", "s1")["messages"] == _messages(*edited)
+    assert store.get_user_stats("u1")["messages"] == len(edited)
+    assert [m["content"] for m in store.search_messages("u1", "b")] == [c for c in edited if c.lower() == "b"]
+
+
+def test_sqlite_store_created_before_history_digest(tmp_path):
+    path = str(tmp_path / "contexts.db")
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE contexts (user_id TEXT NOT NULL, session_id TEXT NOT NULL, meta TEXT NOT NULL, "
+        "message_count INTEGER NOT NULL DEFAULT 0, PRIMARY KEY (user_id, session_id))"
+    )
+    conn.execute("INSERT INTO contexts VALUES ('u1', 's1', '{}', 0)")
+    conn.commit()
+    conn.close()
+
+    store = SQLiteContextStore(path)
+    store.save_context("u1", "s1", {"messages": _messages("a")})
+    assert store.save_context("u1", "s1", {"messages": _messages("a", "b")})["appended_messages"] == 1
+    assert store.get_context("u1", "s1")["messages"] == _messages("a", "b")
+
+
+def test_engine_interface_is_abstract():
+    with pytest.raises(TypeError):
+        ContextStorageEngine()
+
+    class Partial(ContextStorageEngine):
+        def get_context(self, user_id, session_id):
+            return None
+
+    with pytest.raises(TypeError):
+        Partial()
+
+
+def test_sqlite_get_context_reads_in_one_transaction(tmp_path):
+    store = SQLiteContextStore(str(tmp_path / "contexts.db"))
+    store.save_context("u1", "s1", {"title": "t", "messages": _messages("a")})
+    statements = []
+    store._connection().set_trace_callback(statements.append)
+
+    assert store.get_context("u1", "s1") == {"title": "t", "messages": _messages("a")}
+    assert [statement.split()[0] for statement in statements] == ["BEGIN", "SELECT", "SELECT", "COMMIT"]
@@ -0,0 +1,36 @@
+from services.image_generation_queue import ImageGenerationQueue
+
+
+async def _unused_generator(model, style, size, prompts):
+    raise AssertionError("workers are not started in these tests")
+
+
+def _queue(tmp_path, **kwargs):
+    return ImageGenerationQueue(_unused_generator, storage_dir=str(tmp_path), workers=0,
+                                batch_window_seconds=0, **kwargs)
+
+
+def test_incompatible_jobs_keep_their_place_in_line(tmp_path):
+    q = _queue(tmp_path)
+    a1 = q.submit("a1", "m", "photo", "1024", 1)
+    b1 = q.submit("b1", "m", "anime", "1024", 1)
+    a2 = q.submit("a2", "m", "photo", "1024", 1)
+    b2 = q.submit("b2", "m", "anime", "1024", 1)
+    c1 = q.submit("c1", "m", "sketch", "1024", 1)
+
+    assert q._next_batch() == [a1, a2]
+    assert q._next_batch() == [b1, b2]
+    assert q._next_batch() == [c1]
+
+
+def test_compatible_job_that_does_not_fit_leads_the_next_batch(tmp_path):
+    q = _queue(tmp_path, max_batch_images=4)
+    a1 = q.submit("a1", "m", "photo", "1024", 3)
+    a2 = q.submit("a2", "m", "photo", "1024", 2)
+    b1 = q.submit("b1", "m", "anime", "1024", 1)
+    a3 = q.submit("a3", "m", "photo", "1024", 1)
+
+    assert q._next_batch() == [a1]
+    assert q._next_batch() == [a2, a3]
+    assert q._next_batch() == [b1]
+    assert q.get_metrics()["queued"] == 0
@@ -0,0 +1,48 @@
+import pytest
+
+from services import image_payload
+from services.image_payload import ImagePayloadError, ImagePayloadPipeline
+
+
+@pytest.fixture(autouse=True)
+def pass_through(monkeypatch):
+    # Raw test bytes aren't decodable images; skip downsizing
+    monkeypatch.setattr(image_payload, "PIL_AVAILABLE", False)
+
+
+def _png(size, fill):
+    return b"\x89PNG\r\n\x1a\n" + bytes([fill]) * (size - 8)
+
+
+def test_cache_evicts_least_recently_used_images_by_size():
+    pipeline = ImagePayloadPipeline(max_cached_images=100, max_cached_bytes=2500)
+    first = pipeline.prepare(_png(1000, 1), "s1")
+    pipeline.prepare(_png(1000, 2), "s1")
+    pipeline.resolve("s1", [first.digest])
+    pipeline.prepare(_png(1000, 3), "s1")
+
+    metrics = pipeline.get_metrics()
+    assert metrics["cached_images"] == 2
+    assert metrics["cached_bytes"] == 2000
+    assert pipeline.resolve("s1", [first.digest])[0].data == first.data
+
+
+def test_image_larger_than_the_budget_is_returned_but_not_cached():
+    pipeline = ImagePayloadPipeline(max_cached_bytes=500)
+    kept = pipeline.prepare(_png(400, 1), "s1")
+    big = pipeline.prepare(_png(1000, 2), "s1")
+
+    assert big.mime_type == "image/png" and len(big.data) == 1000
+    assert pipeline.get_metrics()["cached_bytes"] == 400
+    assert pipeline.resolve("s1", [kept.digest])
+    with pytest.raises(ImagePayloadError):
+        pipeline.resolve("s1", [big.digest])
+
+
+def test_duplicate_upload_is_counted_once():
+    pipeline = ImagePayloadPipeline(max_cached_bytes=10_000)
+    pipeline.prepare(_png(1000, 1))
+    pipeline.prepare(_png(1000, 1))
+
+    assert pipeline.get_metrics()["cached_bytes"] == 1000
+    assert pipeline.metrics["deduplicated"] == 1
@@ -0,0 +1,132 @@
+import asyncio
+import time
+
+import pytest
+
+from services.instance_pool import (
+    FakeInstanceProvider,
+    InstancePool,
+    PoolExhaustedError,
+    parse_warm_profiles,
+    profile_config,
+)
+
+
+def _wait_until(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def _lease(pool, profile, user_id, **per_lease):
+    kind, config = profile_config(profile, user_id=user_id, **per_lease)
+    return asyncio.run(pool.lease(kind, config, user_id))
+
+
+def test_profile_spare_serves_a_flow_lease():
+    provider = FakeInstanceProvider(boot_delay=0.01)
+    pool = InstancePool(provider, warm=parse_warm_profiles("shared_browser:1"))
+    asyncio.run(pool.prewarm())
+
+    lease = _lease(pool, "shared_browser", "u1", name="shared")
+    assert lease.reused
+    assert pool.metrics["spare_hits"] == 1
+    assert pool.metrics["misses"] == 0
+
+
+def test_returned_instance_is_not_leased_to_another_user():
+    pool = InstancePool(FakeInstanceProvider())
+    first = _lease(pool, "research", "u1")
+    asyncio.run(pool.release(first.lease_id))
+
+    other = _lease(pool, "research", "u2")
+    again = _lease(pool, "research", "u1")
+    assert other.instance_id != first.instance_id
+    assert again.instance_id == first.instance_id
+    assert pool.metrics["user_hits"] == 1
+
+
+def test_unhealthy_returned_instance_is_replaced():
+    provider = FakeInstanceProvider()
+    pool = InstancePool(provider, health_check_interval=0)
+    first = _lease(pool, "ubuntu", "u1")
+    asyncio.run(pool.release(first.lease_id))
+    provider.unhealthy.add(first.instance_id)
+
+    again = _lease(pool, "ubuntu", "u1")
+    assert again.instance_id != first.instance_id
+    assert pool.metrics["health_check_failures"] == 1
+    assert first.instance_id not in provider.running
+
+
+def test_idle_returned_instances_are_shut_down():
+    provider = FakeInstanceProvider()
+    pool = InstancePool(provider, idle_timeout_seconds=0.05)
+    lease = _lease(pool, "ubuntu", "u1")
+    asyncio.run(pool.release(lease.lease_id))
+    time.sleep(0.1)
+
+    assert asyncio.run(pool.reap()) == 1
+    assert provider.running == {}
+    assert pool.total() == 0
+
+
+def test_expired_leases_are_reclaimed():
+    provider = FakeInstanceProvider()
+    expired = []
+    pool = InstancePool(provider, max_lease_seconds=0.05, on_lease_expired=expired.append)
+    lease = _lease(pool, "browser", "u1")
+    time.sleep(0.1)
+
+    assert asyncio.run(pool.reap()) == 1
+    assert [e.lease_id for e in expired] == [lease.lease_id]
+    assert provider.running == {}
+    assert pool.metrics["expired_leases"] == 1
+    assert not asyncio.run(pool.release(lease.lease_id))
+
+
+def test_cap_reached_only_while_leases_are_live():
+    pool = InstancePool(FakeInstanceProvider(), max_total=2, max_lease_seconds=0.05)
+    _lease(pool, "ubuntu", "u1")
+    _lease(pool, "ubuntu", "u2")
+    with pytest.raises(PoolExhaustedError):
+        _lease(pool, "ubuntu", "u3")
+
+    # Once the leases outlive their lifetime they no longer hold the cap
+    time.sleep(0.1)
+    assert _lease(pool, "ubuntu", "u3").user_id == "u3"
+    assert pool.total() == 1
+
+
+def test_cap_holds_under_concurrent_leases():
+    provider = FakeInstanceProvider(boot_delay=0.02)
+    pool = InstancePool(provider, max_total=2)
+
+    async def scenario():
+        kind, config = profile_config("ubuntu")
+        return await asyncio.gather(
+            *(pool.lease(kind, config, f"u{i}") for i in range(4)), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert sum(isinstance(result, PoolExhaustedError) for result in results) == 2
+    assert pool.total() == 2
+    assert provider.started == 2
+
+
+def test_spares_refill_after_request_loops_end():
+    provider = FakeInstanceProvider(boot_delay=0.02)
+    pool = InstancePool(provider, warm=parse_warm_profiles("research:1"))
+    asyncio.run(pool.prewarm())
+
+    def spares():
+        return sum(pool.get_metrics()["spares"].values())
+
+    # Each Flask request runs on its own short-lived loop
+    _lease(pool, "research", "u1")
+    _wait_until(lambda: spares() == 1)
+    _lease(pool, "research", "u2")
+    _wait_until(lambda: spares() == 1)
+    assert pool.metrics["spare_hits"] == 2
+    assert provider.started == 3
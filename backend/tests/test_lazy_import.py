@@ -0,0 +1,39 @@
+import builtins
+import sys
+
+import pytest
+
+from services.lazy_import import ensure_loaded, lazy_import
+
+
+def _write_module(tmp_path, monkeypatch, name, source):
+    (tmp_path / f"{name}.py").write_text(source)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, name, raising=False)
+
+
+def test_missing_module_fails_at_import_time():
+    with pytest.raises(ImportError):
+        lazy_import("definitely_not_an_installed_sdk")
+
+
+def test_module_executes_on_first_attribute_access(tmp_path, monkeypatch):
+    _write_module(tmp_path, monkeypatch, "lazy_sdk_ok", "import builtins\nbuiltins._lazy_sdk_ran = True\nVALUE = 1\n")
+    monkeypatch.setattr("builtins._lazy_sdk_ran", False, raising=False)
+
+    module = lazy_import("lazy_sdk_ok")
+    assert builtins._lazy_sdk_ran is False
+    assert ensure_loaded("lazy_sdk_ok").VALUE == 1
+    assert builtins._lazy_sdk_ran is True
+    assert module.VALUE == 1
+
+
+def test_broken_module_is_reported_as_import_error(tmp_path, monkeypatch):
+    _write_module(tmp_path, monkeypatch, "lazy_sdk_broken", "raise RuntimeError('bad build')\n")
+
+    lazy_import("lazy_sdk_broken")  # installed, so the availability check passes
+    with pytest.raises(ImportError, match="bad build"):
+        ensure_loaded("lazy_sdk_broken")
+    assert "lazy_sdk_broken" not in sys.modules
+    with pytest.raises(ImportError):
+        ensure_loaded("lazy_sdk_broken")
@@ -0,0 +1,98 @@
+import asyncio
+import os
+
+import pytest
+
+from services.local_executor import READ_ONLY_PATHS, LocalSubprocessExecutor, isolation_available, local_blockers
+
+BYPASSES = [
+    "print(__builtins__['__import__']('os').getcwd())",
+    "__builtins__['open']('/etc/hostname').read()",
+    "print(__import__('os').environ)",
+    "import collections\ncollections._sys.modules['os']",
+    "import typing\ntyping.sys.modules",
+    "from operator import attrgetter\nattrgetter('_sys')(__import__('json'))",
+    "print(().__class__.__base__.__subclasses__())",
+    "from . import secrets",
+]
+
+
+@pytest.mark.parametrize("code", BYPASSES)
+def test_precheck_keeps_interpreter_escapes_off_the_local_route(code):
+    assert local_blockers(code)
+
+
+@pytest.mark.parametrize("code", [
+    "import math\nprint(math.sqrt(16))",
+    "from collections import Counter\nprint(Counter('hello').most_common(1))",
+    "class Point:\n    def __init__(self, x):\n        self.x = x\nprint(Point(1).x)",
+])
+def test_precheck_allows_simple_snippets(code):
+    assert local_blockers(code) == []
+
+
+@pytest.fixture(scope="module")
+def executor():
+    if not isolation_available():
+        pytest.skip("host can't create user/mount/network namespaces")
+    executor = LocalSubprocessExecutor(warm_interpreters=0)
+    yield executor
+    executor.shutdown()
+
+
+def _run(executor, code):
+    return asyncio.run(executor.execute(code))
+
+
+def test_simple_snippet_runs(executor):
+    result = _run(executor, "import math\nwith_sqrt = math.sqrt(16)\nprint(with_sqrt)")
+    assert result.success, result.error
+    assert result.output.strip() == "4.0"
+
+
+@pytest.mark.parametrize("code", [
+    "print(__builtins__['__import__']('os').getcwd())",
+    "__builtins__['open']('/etc/hostname').read()",
+    "import os",
+    "open('/etc/hostname')",
+    "getattr(print, '__self__')",
+])
+def test_restricted_builtins_stop_bypasses_at_runtime(executor, code):
+    result = _run(executor, code)
+    assert not result.success
+    assert "Error" in result.error
+
+
+def test_host_filesystem_is_not_visible_even_after_an_interpreter_escape(executor):
+    # A classic escape the pre-check rejects; here it reaches os, but os only sees the private root
+    escape = (
+        "os_ = [c for c in ().__class__.__base__.__subclasses__() if c.__name__ == '_wrap_close'][0]"
+        ".__init__.__globals__\n"
+        "print(sorted(os_['listdir']('/')))\n"
+        "print(os_['path'].exists(%r), os_['path'].exists('/etc/hostname'))\n"
+        "fd = os_['open']('/work/scratch', os_['O_WRONLY'] | os_['O_CREAT'])\n"
+        "print(os_['write'](fd, b'ok'))\n"
+        "try:\n"
+        "    os_['open']('/usr/evil', os_['O_WRONLY'] | os_['O_CREAT'])\n"
+        "except OSError as e:\n"
+        "    print(type(e).__name__)\n"
+    ) % os.path.abspath(__file__)
+    result = _run(executor, escape)
+    assert result.success, result.error
+    listing, exists, written, denied = result.output.strip().splitlines()
+    visible = {path.split("/")[1] for path in READ_ONLY_PATHS if os.path.lexists(path)} | {"work"}
+    assert set(eval(listing)) <= visible
+    assert exists == "False False"
+    assert written == "2"
+    assert denied == "OSError"
+
+
+def test_network_is_unreachable(executor):
+    result = _run(executor, "import json\nprint(json.dumps(1))")
+    assert result.success
+    escape = (
+        "s = [c for c in ().__class__.__base__.__subclasses__() if c.__name__ == '_wrap_close'][0]"
+        ".__init__.__globals__['sys'].modules['socket']\n"
+        "s.socket()\n"
+    )
+    assert not _run(executor, escape).success
@@ -0,0 +1,56 @@
+import asyncio
+import importlib
+import sys
+import types
+
+
+class _FakeModel:
+    calls = []
+
+    def __init__(self, name):
+        self.name = name
+
+    async def generate_content_async(self, content, generation_config=None):
+        self.calls.append((self.name, content, generation_config))
+        return types.SimpleNamespace(text="a cat")
+
+
+def _model_manager_module(monkeypatch):
+    # The provider SDK is replaced so the test sees exactly what would be sent to it
+    fake_genai = types.SimpleNamespace(configure=lambda api_key: None, GenerativeModel=_FakeModel)
+    monkeypatch.setitem(sys.modules, "google.generativeai", fake_genai)
+    monkeypatch.delitem(sys.modules, "services.mama_bear_model_manager", raising=False)
+    module = importlib.import_module("services.mama_bear_model_manager")
+    monkeypatch.delitem(sys.modules, "services.mama_bear_model_manager")
+    return module
+
+
+def test_provider_call_receives_image_parts(monkeypatch):
+    module = _model_manager_module(monkeypatch)
+    _FakeModel.calls.clear()
+    part = {"mime_type": "image/png", "data": b"\x89PNG\r\n\x1a\n"}
+
+    manager = module.MamaBearModelManager()
+    response = asyncio.run(manager.generate_response(
+        messages=[{"role": "user", "content": "What is in this picture?"}],
+        mama_bear_context={"variant": "multi_modal"},
+        images=[part],
+        max_tokens=256
+    ))
+
+    assert response.content == "a cat"
+    (_, content, config), = _FakeModel.calls
+    assert content == ["What is in this picture?", part]
+    assert config["max_output_tokens"] == 256
+
+
+def test_text_only_call_sends_plain_text(monkeypatch):
+    module = _model_manager_module(monkeypatch)
+    _FakeModel.calls.clear()
+
+    asyncio.run(module.MamaBearModelManager().generate_response(
+        messages=[{"role": "user", "content": "hello"}],
+        mama_bear_context={}
+    ))
+
+    assert _FakeModel.calls[0][1] == "hello"
@@ -0,0 +1,75 @@
+import asyncio
+import threading
+import time
+
+from services.prefetch_scheduler import PrefetchScheduler
+
+
+def _wait_until(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def _value(result, delay=0.0):
+    async def factory():
+        await asyncio.sleep(delay)
+        return result
+    return factory
+
+
+def test_prefetch_outlives_the_request_loop_that_queued_it():
+    scheduler = PrefetchScheduler()
+
+    async def request():
+        # Each Flask request runs on its own short-lived loop
+        async with scheduler.foreground():
+            assert scheduler.submit("u1:code", "u1", _value("ctx", delay=0.05))
+
+    asyncio.run(request())
+    _wait_until(lambda: scheduler.metrics["completed"] == 1)
+    assert scheduler.get("u1:code") == "ctx"
+    assert scheduler.get_metrics()["foreground_active"] == 0
+
+
+def test_workers_hold_back_while_foreground_is_busy():
+    scheduler = PrefetchScheduler(max_foreground=1)
+    inside = threading.Event()
+    leave = threading.Event()
+
+    async def busy_request():
+        async with scheduler.foreground():
+            inside.set()
+            while not leave.is_set():
+                await asyncio.sleep(0.005)
+
+    request = threading.Thread(target=asyncio.run, args=(busy_request(),))
+    request.start()
+    assert inside.wait(2)
+    scheduler.submit("u1:docs", "u1", _value("ctx"))
+    time.sleep(0.05)
+    assert scheduler.metrics["completed"] == 0
+
+    leave.set()
+    request.join(2)
+    _wait_until(lambda: scheduler.metrics["completed"] == 1)
+
+
+def test_duplicate_and_cancelled_prefetches():
+    scheduler = PrefetchScheduler(max_workers=1)
+    started = threading.Event()
+
+    async def slow():
+        started.set()
+        await asyncio.sleep(10)
+
+    assert scheduler.submit("u1:a", "u1", slow)
+    assert not scheduler.submit("u1:a", "u1", slow)
+    assert scheduler.submit("u1:b", "u1", _value("b"))
+    assert started.wait(2)
+
+    assert scheduler.cancel_user("u1") == 2
+    _wait_until(lambda: scheduler.get_metrics()["running"] == 0)
+    assert scheduler.metrics["deduplicated"] == 1
+    assert scheduler.get("u1:b") is None
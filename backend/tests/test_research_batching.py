@@ -0,0 +1,47 @@
+from services.research_batching import ResearchSynthesis, dedupe_queries, normalize_query, normalize_url
+
+
+def _result(findings, sources, confidence=0.8):
+    return {"success": True, "result": {"key_findings": findings, "sources": sources, "confidence_score": confidence}}
+
+
+def test_urls_differing_only_in_scheme_www_slash_or_fragment_match():
+    expected = "example.com/docs?page=2"
+    assert normalize_url("https://www.Example.com/docs/?page=2#intro") == expected
+    assert normalize_url("http://example.com/docs?page=2") == expected
+    assert normalize_url("https://example.com/docs?page=3") != expected
+
+
+def test_queries_ignore_case_whitespace_and_trailing_punctuation():
+    assert normalize_query("  What is   RAG? ") == normalize_query("what is rag")
+    assert normalize_query("HTTPS://www.example.com/a/") == "example.com/a"
+
+
+def test_dedupe_keeps_first_seen_order_and_maps_every_query():
+    queries = ["What is RAG?", "https://example.com/a", "what is  rag", "Vector DBs", "http://www.example.com/a/"]
+    unique, mapping = dedupe_queries(queries)
+    assert unique == ["What is RAG?", "https://example.com/a", "Vector DBs"]
+    assert mapping == [0, 1, 0, 2, 1]
+
+
+def test_synthesis_is_valid_after_each_result():
+    synthesis = ResearchSynthesis(total_queries=3)
+    synthesis.add(_result(["RAG grounds answers"], ["https://example.com/rag"], confidence=0.6))
+    partial = synthesis.summary()
+    assert partial["complete"] is False
+    assert partial["completed_queries"] == 1
+    assert partial["combined_findings"] == ["RAG grounds answers"]
+
+    synthesis.add({"success": False, "error": "timeout"})
+    synthesis.add(_result(
+        ["rag  grounds answers", "Embeddings index text"],
+        [{"url": "http://www.example.com/rag/"}, {"url": "https://example.com/embeddings"}],
+        confidence=1.0
+    ))
+    summary = synthesis.summary()
+    assert summary["complete"] is True
+    assert summary["successful_queries"] == 2
+    assert summary["combined_findings"] == ["RAG grounds answers", "Embeddings index text"]
+    assert summary["sources"] == ["https://example.com/rag", "https://example.com/embeddings"]
+    assert summary["synthesis_confidence"] == 0.8
+    assert summary["data_quality_score"] == 2 / 3
@@ -0,0 +1,42 @@
+import numpy as np
+
+from services.route_cost_model import OnlineLinearRegression, RouteCostModel, route_features
+
+
+def test_covariance_stays_bounded_when_features_never_vary():
+    model = RouteCostModel(min_samples=5)
+    features = route_features(0.4, 120, 0, 0)  # dependencies and system operations always 0
+
+    for _ in range(80_000):
+        model.observe("e2b", features, 6.0, True)
+
+    assert np.all(np.isfinite(model._routes["e2b"].model._p))
+    assert abs(model.predict_duration("e2b", features) - 6.0) < 0.01
+
+
+def test_fits_a_linear_duration_model():
+    rng = np.random.default_rng(0)
+    model = RouteCostModel(min_samples=20)
+    for _ in range(500):
+        complexity, lines = rng.uniform(0, 1), int(rng.integers(1, 500))
+        duration = 2.0 + 10.0 * complexity + 3.0 * lines / 100
+        model.observe("local", route_features(complexity, lines, 0, 0), duration, True)
+
+    assert abs(model.predict_duration("local", route_features(0.5, 200, 0, 0)) - 13.0) < 0.1
+
+
+def test_non_finite_predictions_are_rejected():
+    model = RouteCostModel(min_samples=1)
+    model.observe("local", route_features(0.5, 10, 0, 0), 1.0, True)
+    model._routes["local"].model.weights[:] = np.nan
+
+    assert model.predict_duration("local", route_features(0.5, 10, 0, 0)) is None
+
+
+def test_non_finite_observations_are_ignored():
+    model = OnlineLinearRegression(2)
+    model.update(np.array([1.0, np.inf]), 1.0)
+    model.update(np.array([1.0, 0.0]), float("nan"))
+
+    assert model.samples == 0
+    assert np.all(model.weights == 0)
@@ -0,0 +1,146 @@
+import asyncio
+import time
+
+from services.sandbox_pool import FakeSandbox, SandboxPool
+
+
+def _wait_until(condition, timeout: float = 2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+
+def test_miss_then_session_hit():
+    pool = SandboxPool(FakeSandbox.factory(boot_delay=0.01))
+
+    async def scenario():
+        first = await pool.acquire("u1", "python")
+        again = await pool.acquire("u1", "python")
+        return first, again
+
+    first, again = asyncio.run(scenario())
+    assert first is again
+    assert pool.metrics["pool_misses"] == 1
+    assert pool.metrics["session_hits"] == 1
+    assert pool.metrics["boots"] == 1
+
+
+def test_prewarmed_sandbox_is_a_pool_hit():
+    pool = SandboxPool(FakeSandbox.factory(boot_delay=0.01), warm_per_template={"python": 1})
+    asyncio.run(pool.prewarm())
+    assert pool.get_metrics()["idle"] == {"python": 1}
+
+    asyncio.run(pool.acquire("u1", "python"))
+    assert pool.metrics["pool_hits"] == 1
+    assert pool.metrics["pool_misses"] == 0
+
+
+def test_concurrent_acquires_for_one_session_share_a_boot():
+    pool = SandboxPool(FakeSandbox.factory(boot_delay=0.05))
+
+    async def scenario():
+        return await asyncio.gather(pool.acquire("u1", "python"), pool.acquire("u1", "python"))
+
+    first, second = asyncio.run(scenario())
+    assert first is second
+    assert pool.metrics["boots"] == 1
+    assert pool.session_keys() == ["u1"]
+
+
+def test_cap_holds_under_concurrent_acquires():
+    pool = SandboxPool(FakeSandbox.factory(boot_delay=0.02), max_total=1, min_session_idle_seconds=0)
+
+    async def scenario():
+        return await asyncio.gather(*(pool.acquire(f"u{i}", "python") for i in range(4)))
+
+    sandboxes = asyncio.run(scenario())
+    assert pool.total() == 1
+    assert pool.metrics["evictions"] == 3
+    _wait_until(lambda: sum(sandbox.closed for sandbox in sandboxes) == 3)
+
+
+def test_least_recently_used_session_is_evicted_at_cap():
+    pool = SandboxPool(FakeSandbox.factory(), max_total=2, min_session_idle_seconds=0)
+
+    async def scenario():
+        first = await pool.acquire("u1", "python")
+        await pool.acquire("u2", "python")
+        await pool.acquire("u1", "python")  # u2 is now least recently used
+        await pool.acquire("u3", "python")
+        return first
+
+    first = asyncio.run(scenario())
+    assert pool.session_keys() == ["u1", "u3"]
+    assert not first.closed
+    assert pool.metrics["evictions"] == 1
+
+
+def test_idle_sessions_are_reaped():
+    pool = SandboxPool(FakeSandbox.factory(), idle_timeout_seconds=0.05)
+    sandbox = asyncio.run(pool.acquire("u1", "python"))
+    time.sleep(0.1)
+
+    assert asyncio.run(pool.reap()) == 1
+    assert sandbox.closed
+    assert pool.session_keys() == []
+
+
+def test_warm_pool_refills_after_request_loops_end():
+    pool = SandboxPool(FakeSandbox.factory(boot_delay=0.02), warm_per_template={"python": 2})
+    asyncio.run(pool.prewarm())
+
+    # Each Flask request runs on its own short-lived loop
+    asyncio.run(pool.acquire("u1", "python"))
+    asyncio.run(pool.acquire("u2", "python"))
+
+    _wait_until(lambda: pool.get_metrics()["idle"] == {"python": 2})
+    assert pool.metrics["pool_hits"] == 2
+    assert pool.total() == 4
+
+
+def test_spare_is_evicted_before_a_user_session():
+    pool = SandboxPool(FakeSandbox.factory(), warm_per_template={"python": 1}, max_total=2)
+    asyncio.run(pool.prewarm())
+
+    alice = asyncio.run(pool.acquire("alice", "python"))
+    _wait_until(lambda: pool.get_metrics()["idle"] == {"python": 1})
+    asyncio.run(pool.acquire("bob", "node"))
+
+    assert not alice.closed
+    assert pool.session_keys() == ["alice", "bob"]
+    assert pool.metrics["evictions"] == 1
+    assert pool.get_metrics()["idle"] == {"python": 0}
+
+
+def test_recent_sessions_are_kept_and_the_caller_waits_for_capacity():
+    pool = SandboxPool(FakeSandbox.factory(), max_total=1, min_session_idle_seconds=0.2)
+    alice = asyncio.run(pool.acquire("alice", "python"))
+
+    start = time.monotonic()
+    asyncio.run(pool.acquire("bob", "python"))
+    assert time.monotonic() - start >= 0.15
+    assert alice.closed
+    assert pool.session_keys() == ["bob"]
+
+
+def test_busy_session_is_not_evicted_and_runs_on_the_pool_loop():
+    pool = SandboxPool(FakeSandbox.factory(), max_total=1, min_session_idle_seconds=0)
+    loops = []
+
+    async def execute(sandbox):
+        loops.append(asyncio.get_running_loop())
+        await asyncio.sleep(0.1)
+        return sandbox.run_code("print(1)")
+
+    async def scenario():
+        running = asyncio.ensure_future(pool.run("alice", "python", execute))
+        await asyncio.sleep(0.03)
+        bob = await pool.acquire("bob", "python")
+        return await running, bob
+
+    execution, bob = asyncio.run(scenario())
+    assert loops == [pool._loop]
+    assert "ran 1 line" in asyncio.run(execution.wait()).text
+    assert pool.session_keys() == ["bob"]
+    assert not bob.closed
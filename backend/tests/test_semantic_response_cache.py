@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from services.semantic_response_cache import SemanticResponseCache
+
+
+def _answer(text):
+    return {"success": True, "response": text}
+
+
+def test_exact_mode_is_default_and_ignores_near_duplicates():
+    cache = SemanticResponseCache()
+    cache.store("How do I sort a list ascending?", "m", "default", _answer("sorted(xs)"))
+
+    assert cache.mode == "exact"
+    assert cache.lookup("how do I sort a list ASCENDING", "m").match == "exact"
+    assert cache.lookup("How do I sort a list descending?", "m") is None
+    assert cache.lookup("How do I sort a list descending?", "m", mode="semantic") is None
+
+
+def test_semantic_mode_needs_an_embedder():
+    with pytest.raises(ValueError):
+        SemanticResponseCache(mode="semantic")
+
+    vectors = {"what is python": [1.0, 0.0], "what's python": [0.995, 0.0999]}
+    cache = SemanticResponseCache(
+        mode="semantic", embedder=lambda text: np.array(vectors[text.lower()], dtype=np.float32)
+    )
+    cache.store("what is python", "m", "default", _answer("a language"))
+    hit = cache.lookup("what's python", "m")
+    assert hit.match == "semantic"
+    assert hit.response["response"] == "a language"
+
+
+def test_zero_threshold_and_age_are_not_replaced_by_defaults():
+    cache = SemanticResponseCache(similarity_threshold=0.0, max_age_seconds=0.0)
+    assert cache.similarity_threshold == 0.0
+    assert cache.max_age_seconds == 0.0
+
+
+def test_scope_storage_grows_lazily_and_wraps_at_capacity():
+    cache = SemanticResponseCache(max_entries_per_scope=20)
+    cache.store("q0", "m", "default", _answer("a0"))
+    index = next(iter(cache._scopes.values()))
+    assert len(index.responses) < 20
+    assert index.vectors is None
+
+    for i in range(1, 25):
+        cache.store(f"q{i}", "m", "default", _answer(f"a{i}"))
+    assert len(index.responses) == 20
+    assert cache.lookup("q3", "m") is None
+    assert cache.lookup("q24", "m").response["response"] == "a24"
+
+
+def test_least_recently_stored_scope_is_evicted():
+    cache = SemanticResponseCache(max_scopes=2)
+    cache.store("q", "m1", "default", _answer("1"))
+    cache.store("q", "m2", "default", _answer("2"))
+    cache.store("q", "m1", "default", _answer("1"))
+    cache.store("q", "m3", "default", _answer("3"))
+
+    assert cache.lookup("q", "m1") is not None
+    assert cache.lookup("q", "m2") is None
+    assert cache.lookup("q", "m3") is not None
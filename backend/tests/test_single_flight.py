@@ -0,0 +1,124 @@
+import asyncio
+import threading
+
+from services.single_flight import SingleFlight, coalescing_key
+
+
+def test_calls_are_not_coalesced_unless_enabled():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"text": "hi"}
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("k", call) for _ in range(3)))
+
+    asyncio.run(scenario())
+    assert len(calls) == 3
+    assert flight.metrics["bypassed"] == 3
+
+
+def test_opted_in_calls_share_one_provider_call_and_copy_results():
+    flight = SingleFlight("test")
+    calls = []
+
+    async def call():
+        calls.append(1)
+        await asyncio.sleep(0.02)
+        return {"text": "hi"}
+
+    async def scenario():
+        return await asyncio.gather(*(flight.do("k", call, enabled=True) for _ in range(3)))
+
+    results = asyncio.run(scenario())
+    assert len(calls) == 1
+    assert all(result == {"text": "hi"} for result in results)
+    assert len({id(result) for result in results}) == 3
+    assert flight.get_metrics()["in_flight"] == 0
+
+
+def test_calls_on_separate_request_loops_coalesce():
+    flight = SingleFlight("test")
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+    results = []
+
+    async def call():
+        calls.append(1)
+        started.set()
+        while not release.is_set():
+            await asyncio.sleep(0.005)
+        return "answer"
+
+    def request():
+        results.append(asyncio.run(flight.do("k", call, enabled=True)))
+
+    leader = threading.Thread(target=request)
+    leader.start()
+    assert started.wait(2)
+    follower = threading.Thread(target=request)
+    follower.start()
+    while flight.metrics["coalesced"] < 1:
+        threading.Event().wait(0.005)
+    release.set()
+    leader.join(2)
+    follower.join(2)
+
+    assert results == ["answer", "answer"]
+    assert len(calls) == 1
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight("test")
+
+    async def call():
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    async def scenario():
+        return await asyncio.gather(
+            *(flight.do("k", call, enabled=True) for _ in range(2)), return_exceptions=True
+        )
+
+    results = asyncio.run(scenario())
+    assert all(isinstance(result, ValueError) for result in results)
+
+
+def test_follower_retries_when_the_leaders_loop_ends():
+    flight = SingleFlight("test")
+    started = threading.Event()
+    calls = []
+
+    async def slow():
+        calls.append("slow")
+        started.set()
+        await asyncio.sleep(10)
+
+    async def quick():
+        calls.append("quick")
+        return "own answer"
+
+    def timed_out_request():
+        # asyncio.run cancels the still-running shared call when this request's loop ends
+        try:
+            asyncio.run(asyncio.wait_for(flight.do("k", slow, enabled=True), timeout=0.1))
+        except asyncio.TimeoutError:
+            pass
+
+    leader = threading.Thread(target=timed_out_request)
+    leader.start()
+    assert started.wait(2)
+
+    assert asyncio.run(asyncio.wait_for(flight.do("k", quick, enabled=True), timeout=2)) == "own answer"
+    leader.join(2)
+    assert calls == ["slow", "quick"]
+    assert flight.metrics["coalesced"] == 1
+
+
+def test_coalescing_key_normalizes_whitespace_and_separates_params():
+    assert coalescing_key("m", "hello   world") == coalescing_key("m", " hello world ")
+    assert coalescing_key("m", "hi", {"temperature": 0}) != coalescing_key("m", "hi", {"temperature": 1})
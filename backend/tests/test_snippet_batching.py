@@ -0,0 +1,37 @@
+from services.snippet_batching import plan_snippet_groups, reads_session_state
+
+
+def test_dependent_snippets_share_a_group_in_order():
+    snippets = ["x = 1", "y = x + 1", "print(y)"]
+    assert plan_snippet_groups(snippets) == [[0, 1, 2]]
+
+
+def test_independent_snippets_get_their_own_groups():
+    snippets = ["a = 1\nprint(a)", "import math\nprint(math.pi)", "b = 2", "print(b * 2)"]
+    assert plan_snippet_groups(snippets) == [[0], [1], [2, 3]]
+
+
+def test_imports_and_definitions_are_not_reads():
+    snippets = ["import json\nprint(json.dumps({}))", "import json\nprint(json.dumps([]))",
+                "def f():\n    return 1\nprint(f())", "def f():\n    return 2\nprint(f())"]
+    assert plan_snippet_groups(snippets) == [[0], [1], [2], [3]]
+
+
+def test_shared_state_keeps_the_batch_together():
+    for snippets in (
+        ["open('out.txt', 'w').write('hi')", "print(open('out.txt').read())"],
+        ["import os\nos.environ['K'] = '1'", "print(1)"],
+        ["import subprocess", "print(2)"],
+    ):
+        assert plan_snippet_groups(snippets) == [[0, 1]]
+
+
+def test_non_python_or_single_snippets_are_one_group():
+    assert plan_snippet_groups(["const a = 1;", "let b = 2;"]) == [[0, 1]]
+    assert plan_snippet_groups(["print(1)"]) == [[0]]
+
+
+def test_reads_of_names_the_batch_never_binds_need_the_session():
+    snippets = ["x = 1", "print(x, len([]))", "print(df.head())"]
+    assert reads_session_state(snippets) == [False, False, True]
+    assert reads_session_state(["const a = 1;"]) == [True]
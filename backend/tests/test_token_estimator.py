@@ -0,0 +1,66 @@
+from services.token_estimator import (
+    FAMILY_CALIBRATION, MIN_CACHED_LENGTH, TokenEstimator, message_text, model_family
+)
+
+
+def test_model_names_map_to_families():
+    assert model_family("claude-3-5-sonnet-20241022") == "claude"
+    assert model_family("gemini-2.5-flash") == "gemini"
+    assert model_family("models/text-bison") == "gemini"
+    assert model_family("gpt-4o") == "gpt"
+    assert model_family("o3-mini") == "gpt"
+    assert model_family("llama-3") == "default"
+    assert model_family(None) == "default"
+
+
+def test_heuristic_counts_words_digits_and_punctuation():
+    assert TokenEstimator.heuristic_count("") == 0
+    assert TokenEstimator.heuristic_count("!!") == 2
+    # 12 letters at 4 chars/token, 6 digits at 3 digits/token, one period
+    assert TokenEstimator.heuristic_count("abcdefghijkl 123456.") == 3 + 2 + 1
+    # Gemini counts each digit as a token
+    assert TokenEstimator.heuristic_count("123456", "gemini") == 6
+
+
+def test_long_texts_are_cached_per_family():
+    estimator = TokenEstimator(use_exact=False)
+    text = "word " * (MIN_CACHED_LENGTH // 5 + 1)
+
+    first = estimator.count(text, "claude-3")
+    assert estimator.count(text, "claude-3") == first
+    assert estimator.stats["cache_hits"] == 1
+    estimator.count(text, "gemini-pro")
+    assert estimator.stats["cache_hits"] == 1
+
+    estimator.count("short", "claude-3")
+    estimator.count("short", "claude-3")
+    assert estimator.stats["cache_hits"] == 1
+    assert estimator.get_stats()["cache_size"] == 2
+
+
+def test_cache_is_bounded_lru():
+    estimator = TokenEstimator(cache_size=2, use_exact=False)
+    texts = [f"{i} " + "x" * MIN_CACHED_LENGTH for i in range(3)]
+    for text in texts:
+        estimator.count(text)
+    estimator.count(texts[0])
+    assert estimator.stats["cache_hits"] == 0
+    assert len(estimator._cache) == 2
+
+
+def test_messages_include_framing_overhead():
+    estimator = TokenEstimator(use_exact=False)
+    messages = [
+        {"role": "user", "content": "hello there"},
+        {"role": "user", "content": [{"type": "text", "text": "hello"}, {"type": "image"}]}
+    ]
+    calibration = FAMILY_CALIBRATION["claude"]
+    expected = (
+        calibration["reply_priming"]
+        + 2 * calibration["message_overhead"]
+        + estimator.count("hello there", "claude")
+        + estimator.count(message_text(messages[1]), "claude")
+    )
+    assert estimator.count_messages(messages, "claude") == expected
+    assert estimator.count_messages([], "claude") == 0
+    assert message_text(messages[1]) == "hello "
@@ -0,0 +1,82 @@
+import asyncio
+import time
+
+from services.warmup import WarmupManager
+
+
+def test_not_ready_until_critical_steps_finish():
+    warmup = WarmupManager()
+    seen_while_running = []
+
+    async def critical():
+        seen_while_running.append(warmup.is_ready())
+
+    warmup.register("critical", critical)
+    assert not warmup.is_ready()
+    assert warmup.readiness()["pending"] == ["critical"]
+
+    asyncio.run(warmup.run())
+    assert seen_while_running == [False]
+    assert warmup.is_ready()
+    assert warmup.readiness()["steps"]["critical"]["state"] == "ok"
+
+
+def test_optional_steps_do_not_gate_readiness():
+    warmup = WarmupManager()
+    warmup.register("critical", lambda: None)
+    warmup.register("optional", lambda: time.sleep(0.2), critical=False, timeout_seconds=0.05)
+
+    asyncio.run(warmup.run())
+    readiness = warmup.readiness()
+    assert readiness["ready"]
+    assert readiness["steps"]["optional"]["state"] == "timeout"
+
+
+def _failing():
+    raise RuntimeError("provider down")
+
+
+def test_failed_critical_step_gates_readiness_only_when_required():
+    lenient = WarmupManager(ready_on_failure=True)
+    strict = WarmupManager(ready_on_failure=False, retry_seconds=0)
+    for warmup in (lenient, strict):
+        warmup.register("critical", _failing)
+        asyncio.run(warmup.run())
+        step = warmup.readiness()["steps"]["critical"]
+        assert (step["state"], step["error"]) == ("failed", "provider down")
+
+    assert lenient.is_ready()
+    assert not strict.is_ready()
+
+
+def test_failed_critical_step_is_retried_until_it_passes():
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise RuntimeError("provider down")
+
+    warmup = WarmupManager(retry_seconds=0.01)
+    warmup.register("critical", flaky)
+    warmup.register("optional", _failing, critical=False)
+    asyncio.run(warmup.run())
+
+    assert warmup.is_ready()
+    assert len(attempts) == 3
+    assert warmup.readiness()["steps"]["critical"]["error"] is None
+    assert warmup.readiness()["steps"]["optional"]["state"] == "failed"
+
+
+def test_background_warmup_becomes_ready():
+    warmup = WarmupManager()
+    warmup.register("slow", lambda: time.sleep(0.05))
+    warmup.start_background()
+    assert not warmup.is_ready()
+    assert warmup.liveness()["status"] == "alive"
+
+    deadline = time.monotonic() + 2
+    while not warmup.is_ready() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert warmup.is_ready()
+    assert warmup.readiness()["warmup_duration_ms"] is not None